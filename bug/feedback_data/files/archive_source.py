@@ -0,0 +1,611 @@
+"""压缩包样本源：把压缩包中的成员文件作为样本，按需流式读取特征窗口
+
+支持 ZIP、tar（含 .tar.gz/.tgz/.tar.bz2/.tar.xz）以及单文件的 .gz/.bz2/.xz，
+压缩包中的压缩包按 FILE_CONFIG['archive_max_depth'] 限定的层数继续展开。
+
+成员文件用 "压缩包路径::成员名" 形式的虚拟路径表示（嵌套时为
+"外层.zip::内层.zip::成员名"），可以与普通文件路径一起放入样本列表，参与训练、
+检测和特征缓存。读取时流式解压，只保留特征提取使用的前 100KB 和后 10KB
+（与 read_file_window 相同），成员文件从不整体读入内存；嵌套的压缩包需要随机访问，
+复制到 SpooledTemporaryFile（超过 archive_spool_mb 时才落到临时文件）后再展开。
+
+所有格式的读取器都提供同一个迭代接口 iter_windows()，逐个返回
+(成员虚拟路径, 解压后大小, 特征窗口)；ZIP 还支持按成员名随机访问（random_access），
+不同成员可以在多个进程中并行解压。
+"""
+
+import os
+import re
+import bz2
+import gzip
+import lzma
+import shutil
+import tarfile
+import tempfile
+import threading
+import logging
+import zipfile
+from collections import OrderedDict
+
+from config import FILE_CONFIG
+
+logger = logging.getLogger("malware_detector.archive")
+
+# 虚拟路径中压缩包路径与成员名之间的分隔符
+MEMBER_SEPARATOR = "::"
+
+# 支持的压缩包扩展名
+TAR_EXTENSIONS = ('.tar', '.tar.gz', '.tgz', '.tar.bz2', '.tbz2', '.tar.xz', '.txz')
+COMPRESSED_FILE_OPENERS = {'.gz': gzip.open, '.bz2': bz2.open, '.xz': lzma.open}
+ARCHIVE_EXTENSIONS = ('.zip',) + TAR_EXTENSIONS + tuple(COMPRESSED_FILE_OPENERS)
+
+# 特征窗口：小于 1KB 的文件读取全部内容，其余读取前 100KB 和后 10KB
+SMALL_FILE_SIZE = 1024
+HEAD_WINDOW_SIZE = 100 * 1024
+TAIL_WINDOW_SIZE = 10 * 1024
+
+# 流式读取时每次解压的数据量
+STREAM_CHUNK_SIZE = 1024 * 1024
+
+# 可执行文件扩展名（添加压缩包时可选择跳过）
+EXECUTABLE_EXTENSIONS = frozenset({'.exe', '.dll', '.com', '.cmd', '.bat', '.ps1', '.vbs', '.js'})
+
+# 每个线程最多保持打开的压缩包数量
+MAX_OPEN_ARCHIVES = 4
+
+_member_path_pattern = re.compile(
+    r'^(.+?(?:' + '|'.join(re.escape(ext) for ext in ARCHIVE_EXTENSIONS) + r'))' +
+    re.escape(MEMBER_SEPARATOR) + r'(.+)$',
+    re.IGNORECASE | re.DOTALL
+)
+
+# 顶层压缩包路径 -> 候选密码（bytes）列表
+_passwords = {}
+
+# 每个线程（及进程）独立的已打开压缩包：{容器路径: (顶层压缩包 mtime_ns, 读取器)}
+_local = threading.local()
+
+
+def make_member_path(archive_path, member_name):
+    """生成成员文件的虚拟路径"""
+    return f"{archive_path}{MEMBER_SEPARATOR}{member_name}"
+
+
+def split_member_path(path):
+    """在第一个压缩包分隔符处拆分成员文件的虚拟路径
+
+    Returns:
+        (顶层压缩包路径, 成员名)，嵌套时成员名中仍包含分隔符；不是成员路径时返回 None
+    """
+    if not isinstance(path, str) or MEMBER_SEPARATOR not in path:
+        return None
+    match = _member_path_pattern.match(path)
+    if match is None:
+        return None
+    return match.group(1), match.group(2)
+
+
+def is_member_path(path):
+    """判断路径是否为压缩包成员文件的虚拟路径"""
+    return split_member_path(path) is not None
+
+
+def _split_container(member_path):
+    """拆分出成员所在的（可能是嵌套的）压缩包路径和成员名"""
+    container_path, member_name = member_path.rsplit(MEMBER_SEPARATOR, 1)
+    return container_path, member_name
+
+
+def _top_archive(path):
+    """返回路径所属的磁盘上的顶层压缩包"""
+    parts = split_member_path(path)
+    return parts[0] if parts is not None else path
+
+
+def nesting_depth(path):
+    """路径位于第几层压缩包中（磁盘文件为 0）"""
+    depth = 0
+    parts = split_member_path(path)
+    while parts is not None:
+        depth += 1
+        parts = split_member_path(parts[1])
+    return depth
+
+
+def is_archive_file(path):
+    """按扩展名判断文件是否为支持的压缩包"""
+    return isinstance(path, str) and path.lower().endswith(ARCHIVE_EXTENSIONS)
+
+
+def is_archive_path(path, max_depth=None):
+    """判断路径（磁盘文件或成员文件）是否为需要展开的压缩包
+
+    Args:
+        path: 文件路径或成员虚拟路径
+        max_depth: 最多展开的嵌套层数，None 使用 FILE_CONFIG['archive_max_depth']
+    """
+    if not is_archive_file(path):
+        return False
+    if max_depth is None:
+        max_depth = FILE_CONFIG.get('archive_max_depth', 2)
+    return nesting_depth(path) <= max_depth
+
+
+def _password_candidates(password):
+    """密码依次尝试 UTF-8 和 Latin-1 编码"""
+    candidates = []
+    for encoding in ('utf-8', 'latin-1'):
+        try:
+            encoded = password.encode(encoding)
+        except UnicodeEncodeError:
+            continue
+        if encoded not in candidates:
+            candidates.append(encoded)
+    return candidates
+
+
+def register_password(archive_path, password):
+    """登记压缩包的密码，之后读取该压缩包（及其中嵌套的 ZIP）的成员时自动使用"""
+    if password:
+        _passwords[archive_path] = _password_candidates(password)
+    else:
+        _passwords.pop(archive_path, None)
+
+
+def passwords_for(paths):
+    """返回 paths 中涉及的压缩包的已登记密码，供传给工作进程
+
+    Returns:
+        {archive_path: [password_bytes, ...]}，没有需要密码的压缩包时返回 None
+    """
+    if not _passwords:
+        return None
+    needed = {}
+    for path in paths:
+        archive_path = _top_archive(path)
+        if archive_path in _passwords:
+            needed[archive_path] = _passwords[archive_path]
+    return needed or None
+
+
+def set_passwords(passwords):
+    """在工作进程中登记主进程传来的密码"""
+    _passwords.update(passwords)
+
+
+def read_stream_window(stream):
+    """从顺序读取的流中读取特征窗口
+
+    结果与对同样内容调用 read_file_window 相同：小于 1KB 返回全部内容，否则返回前 100KB
+    和最后 10KB（文件不足 110KB 时两段有重叠）。中间部分按块读过并丢弃，内存占用有界，
+    因此不需要预先知道解压后的大小。
+
+    Returns:
+        (特征窗口, 解压后大小)
+    """
+    head = stream.read(HEAD_WINDOW_SIZE)
+    file_size = len(head)
+    if file_size < HEAD_WINDOW_SIZE:
+        return head, file_size
+
+    tail = head[-TAIL_WINDOW_SIZE:]
+    extra = 0
+    while True:
+        chunk = stream.read(STREAM_CHUNK_SIZE)
+        if not chunk:
+            break
+        extra += len(chunk)
+        tail = (tail + chunk)[-TAIL_WINDOW_SIZE:]
+    if not extra:
+        return head, file_size
+    return head + tail, file_size + extra
+
+
+def spool_stream(stream):
+    """把流复制到 SpooledTemporaryFile 中以便随机访问（嵌套压缩包）"""
+    max_size = int(FILE_CONFIG.get('archive_spool_mb', 64) * 1024 * 1024)
+    spooled = tempfile.SpooledTemporaryFile(max_size=max_size)
+    try:
+        shutil.copyfileobj(stream, spooled, STREAM_CHUNK_SIZE)
+        spooled.seek(0)
+    except Exception:
+        spooled.close()
+        raise
+    return spooled
+
+
+class ArchiveReader:
+    """压缩包读取器的公共接口
+
+    子类实现 _iter_entries() 和 open_member_stream()；iter_windows() 在此基础上统一处理
+    嵌套压缩包的展开和特征窗口的读取。
+    """
+
+    # 是否支持按成员名高效地随机读取（不同成员可以由多个进程分别解压）
+    random_access = False
+
+    def __init__(self, archive_path, fileobj=None):
+        """
+        Args:
+            archive_path: 压缩包的路径（嵌套时为成员虚拟路径），用于生成成员的虚拟路径
+            fileobj: 已打开的文件对象（嵌套压缩包），读取器关闭时一并关闭
+        """
+        self.archive_path = archive_path
+        self.fileobj = fileobj
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def close(self):
+        if self.fileobj is not None:
+            self.fileobj.close()
+            self.fileobj = None
+
+    def _iter_entries(self):
+        """逐个返回普通文件成员的 (成员名, 解压后大小或 None, 打开解压流的函数)"""
+        raise NotImplementedError
+
+    def open_member_stream(self, member_name):
+        """按成员名打开解压流"""
+        raise NotImplementedError
+
+    def member_size(self, member_name):
+        """不解压即可得到的成员大小，无法得到时返回 None"""
+        return None
+
+    def iter_members(self):
+        """逐个返回本层成员的 (成员虚拟路径, 解压后大小或 None)，不展开嵌套的压缩包"""
+        for member_name, size, _ in self._iter_entries():
+            yield make_member_path(self.archive_path, member_name), size
+
+    def iter_windows(self):
+        """逐个返回所有成员的 (成员虚拟路径, 解压后大小, 特征窗口)
+
+        成员本身是压缩包且未超过嵌套层数上限时，展开其中的成员而不是返回该压缩包本身。
+        """
+        for member_name, _, open_stream in self._iter_entries():
+            member_path = make_member_path(self.archive_path, member_name)
+            with open_stream() as stream:
+                if is_archive_path(member_path):
+                    with open_archive(member_path, fileobj=spool_stream(stream)) as nested:
+                        yield from nested.iter_windows()
+                else:
+                    window, size = read_stream_window(stream)
+                    yield member_path, size, window
+
+
+class ZipArchiveReader(ArchiveReader):
+    """ZIP 压缩包：读取中央目录后可按成员名随机访问"""
+
+    random_access = True
+
+    def __init__(self, archive_path, fileobj=None):
+        super().__init__(archive_path, fileobj)
+        self.zip_file = zipfile.ZipFile(fileobj if fileobj is not None else archive_path)
+        self._password_key = _top_archive(archive_path)
+
+    def close(self):
+        self.zip_file.close()
+        super().close()
+
+    def _open_info(self, info):
+        return open_member(self.zip_file, info, self._password_key)
+
+    def _iter_entries(self):
+        for info in self.zip_file.infolist():
+            if not info.is_dir():
+                yield info.filename, info.file_size, lambda info=info: self._open_info(info)
+
+    def open_member_stream(self, member_name):
+        return self._open_info(self.zip_file.getinfo(member_name))
+
+    def member_size(self, member_name):
+        return self.zip_file.getinfo(member_name).file_size
+
+    def check_password(self):
+        """用第一个加密成员验证已登记的密码（没有加密成员时总是 True）"""
+        encrypted = next((info for info in self.zip_file.infolist()
+                          if info.flag_bits & 0x1 and not info.is_dir()), None)
+        if encrypted is None:
+            return True
+        try:
+            with self._open_info(encrypted) as stream:
+                stream.read(1)
+            return True
+        except RuntimeError:
+            return False
+
+
+class TarArchiveReader(ArchiveReader):
+    """tar 压缩包（可带 gz/bz2/xz 压缩）：以流模式顺序读取，一次解压完成所有成员"""
+
+    def _open_tar(self):
+        if self.fileobj is not None:
+            self.fileobj.seek(0)
+            return tarfile.open(fileobj=self.fileobj, mode='r|*')
+        return tarfile.open(self.archive_path, mode='r|*')
+
+    def _iter_entries(self):
+        with self._open_tar() as tar_file:
+            for info in tar_file:
+                if info.isfile():
+                    yield info.name, info.size, lambda info=info: tar_file.extractfile(info)
+
+    def open_member_stream(self, member_name):
+        # 压缩的 tar 不能随机访问，顺序查找到该成员为止；成员流依赖 tar 对象，先把它复制出来
+        for name, _, open_stream in self._iter_entries():
+            if name == member_name:
+                with open_stream() as stream:
+                    return spool_stream(stream)
+        raise KeyError(f"压缩包中没有该成员: {member_name}")
+
+
+class CompressedFileReader(ArchiveReader):
+    """单个文件的 .gz/.bz2/.xz 压缩：唯一的成员名为去掉压缩扩展名后的文件名"""
+
+    def __init__(self, archive_path, fileobj=None):
+        super().__init__(archive_path, fileobj)
+        base_name = archive_path.rsplit(MEMBER_SEPARATOR, 1)[-1].replace('\\', '/').rsplit('/', 1)[-1]
+        self.member_name, extension = os.path.splitext(base_name)
+        self._opener = COMPRESSED_FILE_OPENERS[extension.lower()]
+
+    def _open_stream(self):
+        if self.fileobj is not None:
+            self.fileobj.seek(0)
+            return self._opener(self.fileobj, 'rb')
+        return self._opener(self.archive_path, 'rb')
+
+    def _iter_entries(self):
+        yield self.member_name, None, self._open_stream
+
+    def open_member_stream(self, member_name):
+        if member_name != self.member_name:
+            raise KeyError(f"压缩包中没有该成员: {member_name}")
+        return self._open_stream()
+
+
+def open_archive(archive_path, fileobj=None):
+    """按扩展名为压缩包创建读取器
+
+    Args:
+        archive_path: 压缩包路径或成员虚拟路径
+        fileobj: 嵌套压缩包的文件对象（由读取器负责关闭）
+
+    Raises:
+        ValueError: 不支持的格式
+    """
+    name = archive_path.lower()
+    if name.endswith('.zip'):
+        return ZipArchiveReader(archive_path, fileobj)
+    if name.endswith(TAR_EXTENSIONS):
+        return TarArchiveReader(archive_path, fileobj)
+    extension = os.path.splitext(name)[1]
+    if extension in COMPRESSED_FILE_OPENERS:
+        return CompressedFileReader(archive_path, fileobj)
+    if fileobj is not None:
+        fileobj.close()
+    raise ValueError(f"不支持的压缩包格式: {archive_path}")
+
+
+def open_member(zip_file, info, archive_path=None):
+    """打开 ZIP 成员的解压流，加密成员依次尝试已登记的密码
+
+    Raises:
+        RuntimeError: 成员已加密但没有正确的密码
+    """
+    if not info.flag_bits & 0x1:
+        return zip_file.open(info)
+    candidates = _passwords.get(archive_path, ())
+    for password in candidates:
+        try:
+            return zip_file.open(info, pwd=password)
+        except RuntimeError:
+            continue
+    raise RuntimeError(f"压缩包成员已加密，密码缺失或错误: {info.filename}")
+
+
+def _open_container(container_path):
+    """获取成员所在压缩包的读取器
+
+    支持随机访问的读取器（ZIP，包括嵌套在其他压缩包中的 ZIP）按线程缓存，
+    顶层压缩包被修改后重新打开。
+
+    Returns:
+        (读取器, 顶层压缩包的 mtime_ns, 读取器是否由调用方关闭)
+    """
+    # fork 出的工作进程继承的文件句柄与父进程共享读取位置，不能复用父进程打开的压缩包
+    archives = getattr(_local, 'archives', None)
+    if archives is None or _local.pid != os.getpid():
+        archives = _local.archives = OrderedDict()
+        _local.pid = os.getpid()
+
+    mtime_ns = os.stat(_top_archive(container_path)).st_mtime_ns
+    entry = archives.get(container_path)
+    if entry is not None:
+        if entry[0] == mtime_ns:
+            archives.move_to_end(container_path)
+            return entry[1], mtime_ns, False
+        entry[1].close()
+        del archives[container_path]
+
+    if is_member_path(container_path):
+        parent_path, member_name = _split_container(container_path)
+        parent, _, close_parent = _open_container(parent_path)
+        try:
+            with parent.open_member_stream(member_name) as stream:
+                reader = open_archive(container_path, fileobj=spool_stream(stream))
+        finally:
+            if close_parent:
+                parent.close()
+    else:
+        reader = open_archive(container_path)
+
+    if not reader.random_access:
+        return reader, mtime_ns, True
+
+    archives[container_path] = (mtime_ns, reader)
+    while len(archives) > MAX_OPEN_ARCHIVES:
+        _, (_, oldest) = archives.popitem(last=False)
+        oldest.close()
+    return reader, mtime_ns, False
+
+
+def archive_mtime_ns(path):
+    """路径所属的磁盘上顶层压缩包的修改时间（用于特征缓存的有效性判断）"""
+    return os.stat(_top_archive(path)).st_mtime_ns
+
+
+def iter_archive_windows(archive_path):
+    """顺序解压一个压缩包（磁盘文件或嵌套的成员），逐个返回 (成员虚拟路径, 解压后大小, 特征窗口)"""
+    if not is_member_path(archive_path):
+        with open_archive(archive_path) as reader:
+            yield from reader.iter_windows()
+        return
+
+    container_path, member_name = _split_container(archive_path)
+    parent, _, close_parent = _open_container(container_path)
+    try:
+        with parent.open_member_stream(member_name) as stream:
+            spooled = spool_stream(stream)
+    finally:
+        if close_parent:
+            parent.close()
+    with open_archive(archive_path, fileobj=spooled) as reader:
+        yield from reader.iter_windows()
+
+
+def _expand_zip(archive_path, member_paths, stream_archives):
+    """列出 ZIP 中的成员，嵌套的压缩包按格式继续展开或留给顺序解压"""
+    reader, _, close_reader = _open_container(archive_path)
+    try:
+        for member_path, _ in reader.iter_members():
+            if not is_archive_path(member_path):
+                member_paths.append(member_path)
+            elif member_path.lower().endswith('.zip'):
+                _expand_zip(member_path, member_paths, stream_archives)
+            else:
+                stream_archives.append(member_path)
+    finally:
+        if close_reader:
+            reader.close()
+
+
+def expand_archives(paths):
+    """把路径列表中的压缩包展开为可以独立读取的样本
+
+    ZIP（包括 ZIP 中嵌套的 ZIP）只读取中央目录，展开为成员虚拟路径，之后每个成员可以由
+    任意线程或进程单独解压；tar 和 gz/bz2/xz 不能随机访问，保留压缩包路径，
+    由调用方用 iter_archive_windows 一次顺序解压。无法打开的压缩包记录警告后跳过。
+
+    Args:
+        paths: 文件路径列表（可包含成员虚拟路径）
+
+    Returns:
+        (file_paths, stream_archives)：file_paths 为普通文件和成员虚拟路径（保持原有顺序），
+        stream_archives 为需要顺序解压的压缩包路径
+    """
+    file_paths = []
+    stream_archives = []
+    for path in paths:
+        if not is_archive_path(path):
+            file_paths.append(path)
+        elif path.lower().endswith('.zip'):
+            try:
+                _expand_zip(path, file_paths, stream_archives)
+            except (OSError, KeyError, RuntimeError, zipfile.BadZipFile) as e:
+                logger.warning("无法读取压缩包 %s: %s", path, e)
+        else:
+            stream_archives.append(path)
+    return file_paths, stream_archives
+
+
+def member_stat(member_path):
+    """不解压即可得到的成员信息，用于特征缓存的有效性判断
+
+    Returns:
+        (解压后大小, 顶层压缩包的 mtime_ns)；成员大小需要解压才能得到时（tar、gz 等）返回 None
+    """
+    container_path, member_name = _split_container(member_path)
+    reader, mtime_ns, close_reader = _open_container(container_path)
+    if close_reader:
+        reader.close()
+        return None
+    return reader.member_size(member_name), mtime_ns
+
+
+def read_member_window(member_path):
+    """流式读取成员文件的特征窗口（前 100KB 和后 10KB）
+
+    Returns:
+        (特征窗口, 解压后大小, 顶层压缩包的 mtime_ns)
+    """
+    container_path, member_name = _split_container(member_path)
+    reader, mtime_ns, close_reader = _open_container(container_path)
+    try:
+        with reader.open_member_stream(member_name) as stream:
+            window, size = read_stream_window(stream)
+    finally:
+        if close_reader:
+            reader.close()
+    return window, size, mtime_ns
+
+
+class ArchiveSampleSource:
+    """压缩包中的样本文件列表（用于把压缩包成员逐个加入样本列表）
+
+    ZIP 只读取中央目录来枚举成员，不解压任何内容，成员内容在提取特征时按需流式读取；
+    嵌套的压缩包作为一个成员加入，训练时再展开。tar、gz 等不能随机访问的压缩包
+    整体作为一项加入，训练和检测时一次顺序解压（见 expand_archives）。
+    """
+
+    def __init__(self, archive_path, password=None, include_executables=True):
+        """
+        Args:
+            archive_path: 压缩包路径
+            password: 压缩包密码（可选，仅 ZIP）
+            include_executables: 是否包含可执行文件（只对逐个列出成员的 ZIP 生效）
+        """
+        self.archive_path = archive_path
+        self.password = password
+        self.include_executables = include_executables
+        self.skipped = 0
+
+    @property
+    def random_access(self):
+        """成员是否逐个列出（ZIP）；否则整个压缩包作为一项"""
+        return self.archive_path.lower().endswith('.zip')
+
+    def check_password(self):
+        """验证并登记密码
+
+        Returns:
+            密码是否可用（没有加密成员时总是 True）
+        """
+        if not self.random_access:
+            return True
+        register_password(self.archive_path, self.password)
+        with ZipArchiveReader(self.archive_path) as reader:
+            valid = reader.check_password()
+        if not valid:
+            register_password(self.archive_path, None)
+        return valid
+
+    def iter_members(self):
+        """逐个返回成员文件的 (虚拟路径, 显示名称)，跳过（可选的）可执行文件
+
+        不能随机访问的压缩包只返回一项 (压缩包路径, 文件名)。跳过的数量记录在 skipped 中。
+        """
+        self.skipped = 0
+        if not self.random_access:
+            yield self.archive_path, os.path.basename(self.archive_path)
+            return
+        with ZipArchiveReader(self.archive_path) as reader:
+            for member_path, _ in reader.iter_members():
+                filename = member_path.rsplit(MEMBER_SEPARATOR, 1)[-1].replace('\\', '/').rsplit('/', 1)[-1]
+                if not self.include_executables and os.path.splitext(filename)[1].lower() in EXECUTABLE_EXTENSIONS:
+                    self.skipped += 1
+                    continue
+                yield member_path, filename
@@ -0,0 +1,377 @@
+"""吞吐量基准测试：在合成样本上实测特征提取、评分、批量检测和训练的速度
+
+按四个文件大小区间（与速度图表一致）生成确定性的合成样本，对每个区间测量：
+
+    extract                 逐文件 extract_features 的延迟
+    score                   逐文件 score_features 的延迟
+    score_batch             score_features_batch 的吞吐量
+    predict                 逐文件 predict（提取 + 评分）的延迟
+    predict_batch_thread    predict_batch（线程池）的吞吐量
+    predict_batch_process   iter_predict(use_multiprocessing=True) 的吞吐量
+    train                   train（并行提取 + 批量更新权重）的吞吐量
+    train_map_reduce        train_map_reduce 的吞吐量
+
+逐文件的阶段报告 p50/p95/p99/平均延迟（毫秒）和文件/秒，批量阶段重复 repeat 次，
+报告每轮耗时的中位数和对应的文件/秒。结果保存为 JSON，可以与之前的结果比较以发现性能回退。
+
+测试使用临时目录中的模型副本，关闭特征缓存（否则重复测量只会命中缓存），不会修改当前模型。
+启用 profile 时每个区间额外运行一轮分阶段性能分析，给出读取、解码、各类特征和评分的耗时占比。
+"""
+
+import os
+import json
+import time
+import random
+import shutil
+import string
+import platform
+import tempfile
+import multiprocessing
+from datetime import datetime
+
+import numpy as np
+
+from config import PERFORMANCE_CONFIG
+from malware_detector import MalwareDetector, DEFAULT_STORAGE_DIR
+from profiling import StageProfiler
+
+# (名称, 图表标签, 最小大小, 最大大小)，大小单位为字节
+SIZE_BUCKETS = (
+    ("small", "小型文件\n(<1KB)", 64, 1024),
+    ("medium", "中型文件\n(1-10KB)", 1024, 10 * 1024),
+    ("large", "大型文件\n(10-100KB)", 10 * 1024, 100 * 1024),
+    ("xlarge", "超大文件\n(>100KB)", 100 * 1024, 1024 * 1024),
+)
+
+# 基准测试结果的默认保存位置（图形界面的速度图表从这里读取）
+DEFAULT_RESULTS_PATH = os.path.join(DEFAULT_STORAGE_DIR, "benchmark_results.json")
+
+# 逐文件测量的阶段（报告延迟分位数）和批量测量的阶段（报告吞吐量）
+LATENCY_STAGES = ("extract", "score", "predict")
+THROUGHPUT_STAGES = ("score_batch", "predict_batch_thread", "predict_batch_process", "train", "train_map_reduce")
+
+# 合成内容中混入的文本片段（与模型关注的特征类型相近）
+_TEXT_SNIPPETS = (
+    "kernel32.dll", "user32.dll", "CreateRemoteThread", "VirtualAlloc", "WriteProcessMemory",
+    "http://example.com/update", "HKEY_LOCAL_MACHINE\\Software", "cmd.exe /c", "powershell -enc",
+    "import socket", "subprocess.Popen", "This program cannot be run in DOS mode",
+)
+
+
+def _synthetic_content(rng, size, keywords):
+    """生成一个合成文件的内容：随机字节、可打印文本、关键词、base64 和十六进制串的混合"""
+    parts = []
+    if rng.random() < 0.6:
+        # 大多数样本带 PE 头，与检测对象以 .exe/.dll 为主的情况一致
+        parts.append(b"MZ" + bytes(rng.getrandbits(8) for _ in range(62)))
+    length = sum(map(len, parts))
+    printable = (string.ascii_letters + string.digits + " \n").encode()
+    while length < size:
+        kind = rng.random()
+        if kind < 0.35:
+            chunk = rng.randbytes(rng.randint(64, 2048))
+        elif kind < 0.6:
+            chunk = bytes(rng.choice(printable) for _ in range(rng.randint(32, 512)))
+        elif kind < 0.8:
+            chunk = (" ".join(rng.choice(keywords) for _ in range(rng.randint(1, 8))) + "\n").encode()
+        elif kind < 0.9:
+            chunk = rng.randbytes(rng.randint(48, 192)).hex().encode()
+        else:
+            chunk = "".join(rng.choice(string.ascii_letters + "+/") for _ in range(rng.randint(60, 240))).encode()
+        parts.append(chunk)
+        length += len(chunk)
+    return b"".join(parts)[:size]
+
+
+def generate_corpus(directory, files_per_bucket=200, keywords=(), seed=0):
+    """在 directory 下为每个大小区间生成 files_per_bucket 个合成文件
+
+    相同参数生成的内容完全相同；目录中已有相同参数生成的样本时直接复用。
+
+    Returns:
+        {区间名称: [文件路径, ...]}
+    """
+    keywords = list(keywords) + list(_TEXT_SNIPPETS)
+    manifest_path = os.path.join(directory, "manifest.json")
+    manifest_key = {"files_per_bucket": files_per_bucket, "seed": seed, "keywords": keywords,
+                    "buckets": [list(bucket[::2]) + [bucket[3]] for bucket in SIZE_BUCKETS]}
+    if os.path.exists(manifest_path):
+        try:
+            with open(manifest_path, encoding="utf-8") as f:
+                manifest = json.load(f)
+            if manifest.get("key") == manifest_key and all(
+                    os.path.exists(path) for paths in manifest["files"].values() for path in paths):
+                return manifest["files"]
+        except (OSError, ValueError, KeyError):
+            pass
+
+    rng = random.Random(seed)
+    corpus = {}
+    for name, _, min_size, max_size in SIZE_BUCKETS:
+        bucket_dir = os.path.join(directory, name)
+        os.makedirs(bucket_dir, exist_ok=True)
+        paths = []
+        for index in range(files_per_bucket):
+            path = os.path.join(bucket_dir, f"{name}_{index:05d}.{'exe' if index % 3 else 'dll'}")
+            with open(path, "wb") as f:
+                f.write(_synthetic_content(rng, rng.randrange(min_size, max_size), keywords))
+            paths.append(path)
+        corpus[name] = paths
+
+    with open(manifest_path, "w", encoding="utf-8") as f:
+        json.dump({"key": manifest_key, "files": corpus}, f, ensure_ascii=False)
+    return corpus
+
+
+def latency_stats(latencies):
+    """延迟分位数（毫秒）和对应的文件/秒"""
+    values = np.asarray(latencies, dtype=np.float64)
+    p50, p95, p99 = np.percentile(values, [50, 95, 99]) * 1000
+    total = float(values.sum())
+    return {
+        "files": len(values),
+        "p50_ms": float(p50),
+        "p95_ms": float(p95),
+        "p99_ms": float(p99),
+        "mean_ms": float(values.mean() * 1000),
+        "files_per_second": len(values) / total if total > 0 else 0.0
+    }
+
+
+def throughput_stats(run_seconds, file_count):
+    """多轮批量测量的耗时中位数和对应的文件/秒"""
+    median = float(np.median(run_seconds))
+    return {
+        "files": file_count,
+        "runs": len(run_seconds),
+        "median_seconds": median,
+        "min_seconds": float(min(run_seconds)),
+        "files_per_second": file_count / median if median > 0 else 0.0
+    }
+
+
+def _time_each(function, items):
+    latencies = []
+    for item in items:
+        start = time.perf_counter()
+        function(item)
+        latencies.append(time.perf_counter() - start)
+    return latencies
+
+
+def _time_runs(function, repeat):
+    run_seconds = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        run_seconds.append(time.perf_counter() - start)
+    return run_seconds
+
+
+def _copy_model(source_dir, target_dir):
+    """把当前模型复制到临时目录（特征缓存和检查点不复制）"""
+    copied = False
+    for name in ("malware_model.bin", "malware_model.pkl", "training_stats.json"):
+        source = os.path.join(source_dir, name)
+        if os.path.exists(source):
+            shutil.copy2(source, os.path.join(target_dir, name))
+            copied = True
+    return copied
+
+
+def run_benchmark(files_per_bucket=None, repeat=None, corpus_dir=None, model_dir=None, num_workers=None,
+                  stages=None, seed=0, profile=False, callback=None):
+    """运行基准测试
+
+    Args:
+        files_per_bucket: 每个大小区间的文件数，None 使用 PERFORMANCE_CONFIG['benchmark'] 中的配置
+        repeat: 批量阶段的重复次数，None 使用配置
+        corpus_dir: 合成样本目录，None 时使用临时目录（测试结束后删除）
+        model_dir: 被测模型所在目录，None 使用默认的 model_data；目录中没有模型时
+            先用合成样本训练一个模型
+        num_workers: 批量检测和 map-reduce 训练的线程/进程数，None 使用CPU核心数
+        stages: 要测量的阶段名称集合，None 表示全部
+        seed: 合成样本的随机种子
+        profile: 是否额外对每个区间做一轮分阶段性能分析（见 profiling.py），结果保存在
+            区间的 "profile" 项中；分析单独一轮进行，不影响其他阶段的计时
+        callback: 进度回调函数，格式：callback(message)
+
+    Returns:
+        可直接序列化为 JSON 的结果字典
+    """
+    bench_config = PERFORMANCE_CONFIG['benchmark']
+    files_per_bucket = files_per_bucket or bench_config['files_per_bucket']
+    repeat = repeat or bench_config['repeat']
+    stages = set(stages or LATENCY_STAGES + THROUGHPUT_STAGES)
+    if num_workers is None:
+        num_workers = multiprocessing.cpu_count()
+
+    def report(message):
+        if callback:
+            callback(message)
+
+    work_dir = tempfile.mkdtemp(prefix="malware_benchmark_")
+    try:
+        corpus_dir = corpus_dir or os.path.join(work_dir, "corpus")
+        model_storage = os.path.join(work_dir, "model")
+        os.makedirs(model_storage)
+
+        report("正在生成合成样本...")
+        keyword_source = MalwareDetector(storage_dir=os.path.join(work_dir, "keywords"), feature_cache=False)
+        corpus = generate_corpus(corpus_dir, files_per_bucket,
+                                 keyword_source.suspicious_keywords + keyword_source.suspicious_imports, seed)
+
+        # 被测模型：当前模型的副本；没有模型时用合成样本训练一个
+        has_model = _copy_model(model_dir or DEFAULT_STORAGE_DIR, model_storage)
+        detector = MalwareDetector(storage_dir=model_storage, feature_cache=False)
+        if not has_model or not len(detector.vocabulary):
+            report("当前没有模型，使用合成样本训练测试模型...")
+            all_files = [path for paths in corpus.values() for path in paths]
+            detector.train(all_files[0::2], all_files[1::2], checkpoint_interval=0, resume=False)
+
+        results = {
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": multiprocessing.cpu_count(),
+            "num_workers": num_workers,
+            "files_per_bucket": files_per_bucket,
+            "repeat": repeat,
+            "feature_count": len(detector.vocabulary),
+            "threshold": detector.config["threshold"],
+            "buckets": {}
+        }
+
+        for name, label, min_size, max_size in SIZE_BUCKETS:
+            paths = corpus[name]
+            bucket = {
+                "label": label,
+                "min_size": min_size,
+                "max_size": max_size,
+                "mean_size": float(np.mean([os.path.getsize(path) for path in paths]))
+            }
+            results["buckets"][name] = bucket
+            label_text = label.replace("\n", "")
+
+            # 预热：加载文件系统缓存和进程池，避免首轮测量包含一次性开销
+            features_list = [detector.extract_features(path) for path in paths]
+
+            if "extract" in stages:
+                report(f"{label_text}：测量特征提取...")
+                bucket["extract"] = latency_stats(_time_each(detector.extract_features, paths))
+            if "score" in stages:
+                report(f"{label_text}：测量评分...")
+                bucket["score"] = latency_stats(_time_each(detector.score_features, features_list))
+            if "score_batch" in stages:
+                bucket["score_batch"] = throughput_stats(
+                    _time_runs(lambda: detector.score_features_batch(features_list), repeat), len(paths))
+            if "predict" in stages:
+                report(f"{label_text}：测量单文件检测...")
+                bucket["predict"] = latency_stats(_time_each(detector.predict, paths))
+            if profile:
+                report(f"{label_text}：分阶段性能分析...")
+                detector.enable_profiling()
+                for path in paths:
+                    detector.predict(path)
+                bucket["profile"] = detector.get_profile()
+                detector.enable_profiling(False)
+            if "predict_batch_thread" in stages:
+                report(f"{label_text}：测量批量检测（线程）...")
+                bucket["predict_batch_thread"] = throughput_stats(
+                    _time_runs(lambda: detector.predict_batch(paths), repeat), len(paths))
+            if "predict_batch_process" in stages:
+                report(f"{label_text}：测量批量检测（进程）...")
+                list(detector.iter_predict(paths[:1] * 11, num_workers, use_multiprocessing=True))
+                bucket["predict_batch_process"] = throughput_stats(
+                    _time_runs(lambda: list(detector.iter_predict(paths, num_workers, use_multiprocessing=True)),
+                               repeat), len(paths))
+
+            # 训练会修改模型，每轮使用独立的临时目录
+            for stage in ("train", "train_map_reduce"):
+                if stage not in stages:
+                    continue
+                report(f"{label_text}：测量训练（{stage}）...")
+                run_seconds = []
+                for run in range(repeat):
+                    trainee = MalwareDetector(storage_dir=os.path.join(work_dir, f"{stage}_{name}_{run}"),
+                                              feature_cache=False)
+                    start = time.perf_counter()
+                    if stage == "train":
+                        trainee.train(paths[0::2], paths[1::2], checkpoint_interval=0, resume=False)
+                    else:
+                        trainee.train_map_reduce(paths[0::2], paths[1::2], num_workers=num_workers)
+                    run_seconds.append(time.perf_counter() - start)
+                    trainee.shutdown_workers()
+                bucket[stage] = throughput_stats(run_seconds, len(paths))
+
+        detector.shutdown_workers()
+        report("基准测试完成")
+        return results
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+def combine_profiles(profiles):
+    """把多个区间的分阶段统计合并为一个（耗时、次数和计数器分别相加）"""
+    combined = StageProfiler()
+    for profile in profiles:
+        combined.merge({
+            "stages": {stage: (data["seconds"], data["calls"]) for stage, data in profile["stages"].items()},
+            "counters": profile["counters"]
+        })
+    return combined.to_dict()
+
+
+def save_results(results, path=None):
+    """保存基准测试结果（JSON）"""
+    path = path or DEFAULT_RESULTS_PATH
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(results, f, ensure_ascii=False, indent=2)
+    return path
+
+
+def load_results(path=None):
+    """读取基准测试结果，文件不存在时返回 None"""
+    path = path or DEFAULT_RESULTS_PATH
+    if not os.path.exists(path):
+        return None
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def compare_results(baseline, current, tolerance=None):
+    """与之前的结果比较各阶段的文件/秒
+
+    Args:
+        baseline: 之前保存的结果
+        current: 本次结果
+        tolerance: 允许的相对下降比例，超过时视为回退，None 使用配置
+
+    Returns:
+        [{bucket, stage, baseline, current, change}, ...]，按变化从差到好排列；
+        change 为相对变化（-0.2 表示慢了 20%），regression 表示是否超过容差
+    """
+    if tolerance is None:
+        tolerance = PERFORMANCE_CONFIG['benchmark']['regression_tolerance']
+    changes = []
+    for name, bucket in current.get("buckets", {}).items():
+        baseline_bucket = baseline.get("buckets", {}).get(name, {})
+        for stage in LATENCY_STAGES + THROUGHPUT_STAGES:
+            if stage not in bucket or stage not in baseline_bucket:
+                continue
+            before = baseline_bucket[stage]["files_per_second"]
+            after = bucket[stage]["files_per_second"]
+            if before <= 0:
+                continue
+            change = after / before - 1
+            changes.append({
+                "bucket": name,
+                "stage": stage,
+                "baseline": before,
+                "current": after,
+                "change": change,
+                "regression": change < -tolerance
+            })
+    changes.sort(key=lambda item: item["change"])
+    return changes
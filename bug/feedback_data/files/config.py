@@ -68,6 +68,12 @@ MODEL_CONFIG = {
         'C': 1.0,
         'kernel': 'linear',
         'probability': True
+    },
+    
+    # 训练检查点配置
+    'checkpoint': {
+        'interval_batches': 5,  # 每处理多少个批次写一次增量检查点（0 表示不写）
+        'max_deltas': 20  # 增量检查点超过该数量时合并为完整模型
     }
 }
 
@@ -85,6 +91,10 @@ FILE_CONFIG = {
     'scan_recursive': True,
     'ignore_hidden_files': True,
     
+    # 压缩包
+    'archive_max_depth': 2,     # 压缩包中的压缩包最多展开的层数
+    'archive_spool_mb': 64,     # 展开嵌套压缩包时内存中缓存的上限，超过后写入临时文件
+    
     # 临时文件
     'temp_dir': '.temp',
     'clean_temp_on_exit': True
@@ -96,13 +106,18 @@ LOG_CONFIG = {
     'log_level': 'INFO',
     'max_log_size_mb': 10,
     'backup_count': 5,
-    'log_format': '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    'log_format': '%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+    'console_level': 'INFO',  # 控制台只输出汇总信息，逐文件记录为 DEBUG 级别
+    'console_format': '%(message)s',
+    'sample_interval_seconds': 10,  # 逐文件警告的采样窗口（秒）
+    'sample_max_records': 20  # 每个采样窗口内最多输出的逐文件警告数
 }
 
 # 性能配置
 PERFORMANCE_CONFIG = {
     # 线程设置
     'max_threads': 4,
+    'io_threads': 16,  # 训练文件校验等 I/O 密集任务（并发 stat）的线程数
     
     # 缓存设置
     'cache_enabled': True,
@@ -110,7 +125,18 @@ PERFORMANCE_CONFIG = {
     
     # 超时设置
     'file_process_timeout_sec': 30,
-    'analysis_timeout_sec': 60
+    'analysis_timeout_sec': 60,
+    
+    # 分阶段性能分析（见 profiling.py），启用后记录特征提取和评分各阶段的耗时
+    'profiling_enabled': False,
+    
+    # 基准测试（见 benchmark.py）
+    'benchmark': {
+        'files_per_bucket': 200,  # 每个文件大小区间的合成文件数（命令行默认值）
+        'ui_files_per_bucket': 50,  # 图形界面中执行性能测试时每个区间的文件数
+        'repeat': 3,  # 批量阶段的重复次数
+        'regression_tolerance': 0.1  # 与之前结果比较时允许的吞吐量下降比例
+    }
 }
 
 # 评估配置
@@ -122,6 +148,12 @@ EVAL_CONFIG = {
     'confusion_matrix_normalize': True,
     'confusion_matrix_cmap': 'Blues',
     
+    # 流式评估
+    'report_interval_seconds': 5,  # 评估过程中输出中间指标的间隔（秒）
+    'confidence_level': 0.95,  # 抽样评估的置信水平
+    'target_false_positive_rate': 0.01,  # 阈值分析中求推荐阈值的目标误报率
+    'curve_points': 200,  # 评估结果中 ROC/PR 曲线最多保留的点数
+    
     # 交叉验证
     'cv_enabled': True,
     'cv_scoring': 'accuracy'
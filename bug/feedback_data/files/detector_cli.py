@@ -0,0 +1,409 @@
+"""命令行入口：python -m malware_detector scan|train|evaluate|bench|ui
+
+不依赖图形界面，适合在服务器上批量检测和训练（需要在本目录下运行，或把本目录加入
+PYTHONPATH）。tkinter 和 matplotlib 只在 ui 命令中导入，检测单个文件时不需要加载。
+
+文件可以来自命令行参数、--file-list 指定的列表文件（每行一个路径，"-" 表示标准输入），
+或者在没有给出任何路径时从标准输入读取；目录会被递归扫描。
+
+检测结果每个文件一行 JSON 输出到标准输出，日志和模型加载等提示信息输出到标准错误。
+指定 --profile 时，命令结束前再输出一行 {"profile": ...}，给出各阶段的耗时和计数。
+
+退出码（scan）：
+    0  所有文件都判定为正常
+    1  至少一个文件被判定为恶意
+    2  参数错误、执行失败，或没有恶意文件但部分文件无法检测
+其他命令执行成功时返回 0，失败时返回 2。
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import contextlib
+from collections import Counter
+
+EXIT_CLEAN = 0
+EXIT_MALICIOUS = 1
+EXIT_ERROR = 2
+
+
+def _write_record(output, record):
+    """输出一行 JSON"""
+    output.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+
+def _read_path_list(list_path):
+    """读取路径列表文件（"-" 表示标准输入），跳过空行"""
+    stream = sys.stdin if list_path == "-" else open(list_path, encoding="utf-8")
+    try:
+        for line in stream:
+            path = line.rstrip("\r\n")
+            if path.strip():
+                yield path
+    finally:
+        if stream is not sys.stdin:
+            stream.close()
+
+
+def _iter_input_paths(paths, file_lists=(), read_stdin=False, with_stats=False):
+    """逐个返回命令行参数、列表文件和标准输入中的路径，目录递归展开
+
+    Args:
+        paths: 命令行参数中的路径
+        file_lists: 路径列表文件
+        read_stdin: 是否从标准输入读取路径
+        with_stats: 目录中的文件是否返回 (path, size, mtime) 元组（供训练时复用 stat 结果）
+    """
+    from file_crawler import DirectoryCrawler
+
+    sources = [iter(paths)]
+    sources.extend(_read_path_list(list_path) for list_path in file_lists)
+    if read_stdin:
+        sources.append(_read_path_list("-"))
+
+    crawler = None
+    for source in sources:
+        for path in source:
+            if os.path.isdir(path):
+                crawler = crawler or DirectoryCrawler(max_files_per_directory=0)
+                for batch in crawler.iter_batches(path):
+                    for item in batch:
+                        yield item if with_stats else item[0]
+            else:
+                yield path
+
+
+def _collect_sample_paths(paths, file_lists, with_stats=False):
+    """收集一类样本（训练或评估用）"""
+    return list(_iter_input_paths(paths or (), file_lists or (), with_stats=with_stats))
+
+
+def _create_detector(args):
+    """按命令行选项配置日志和特征缓存，然后创建检测器"""
+    from config import LOG_CONFIG, PERFORMANCE_CONFIG
+    import malware_detector
+
+    log_config = dict(LOG_CONFIG)
+    if args.quiet:
+        log_config["console_level"] = "WARNING"
+    malware_detector.setup_logging(log_config)
+    if args.no_cache:
+        PERFORMANCE_CONFIG["cache_enabled"] = False
+
+    detector = malware_detector.MalwareDetector()
+    if getattr(args, "threshold", None) is not None:
+        detector.config["threshold"] = args.threshold
+    if args.profile:
+        detector.enable_profiling()
+    return detector
+
+
+def _write_profile(output, detector):
+    """启用了 --profile 时输出一行分阶段耗时统计"""
+    profile = detector.get_profile()
+    if profile is not None:
+        _write_record(output, {"profile": profile})
+
+
+def _verdict(result):
+    """检测结论：特征提取出错或评分失败的文件为 error"""
+    if "error" in result:
+        return "error"
+    return "malicious" if result["is_malicious"] else "benign"
+
+
+def cmd_scan(args, output):
+    """检测文件，每个文件输出一行 JSON，按检测结论返回退出码"""
+    import archive_source
+
+    read_stdin = not args.paths and not args.file_list
+    counts = Counter()
+    start_time = time.perf_counter()
+
+    def missing_filtered(paths):
+        # 不存在的路径直接输出错误记录，不进入特征提取
+        for path in paths:
+            if os.path.exists(path) or archive_source.is_member_path(path):
+                yield path
+            else:
+                counts["error"] += 1
+                _write_record(output, {"path": path, "verdict": "error", "score": None, "error": "文件不存在"})
+
+    detector = _create_detector(args)
+    try:
+        paths = missing_filtered(_iter_input_paths(args.paths, args.file_list or (), read_stdin))
+        for file_path, result in detector.iter_predict(paths, args.workers, args.processes,
+                                                       batch_size=args.batch_size,
+                                                       expand_archives=args.archives):
+            verdict = _verdict(result)
+            counts[verdict] += 1
+            record = {"path": file_path, "verdict": verdict, "score": round(float(result["score"]), 6)}
+            if args.features:
+                record["matched_features"] = result["matched_features"]
+            if "error" in result:
+                record["error"] = result["error"]
+            _write_record(output, record)
+            # 与评分批次对齐地刷新输出，管道下游能及时读到结果
+            if sum(counts.values()) % args.batch_size == 0:
+                output.flush()
+    finally:
+        detector.shutdown_workers()
+    _write_profile(output, detector)
+
+    elapsed = time.perf_counter() - start_time
+    total = sum(counts.values())
+    print(f"检测完成：{total} 个文件，恶意 {counts['malicious']}，正常 {counts['benign']}，"
+          f"无法检测 {counts['error']}，耗时 {elapsed:.2f} 秒（{total / max(elapsed, 1e-9):.0f} 文件/秒）")
+
+    if counts["malicious"]:
+        return EXIT_MALICIOUS
+    if counts["error"]:
+        return EXIT_ERROR
+    return EXIT_CLEAN
+
+
+def cmd_train(args, output):
+    """训练模型，输出一行 JSON 训练统计"""
+    benign_files = _collect_sample_paths(args.benign, args.benign_list, with_stats=True)
+    malicious_files = _collect_sample_paths(args.malicious, args.malicious_list, with_stats=True)
+    if not benign_files and not malicious_files:
+        print("错误：没有找到训练文件")
+        return EXIT_ERROR
+
+    detector = _create_detector(args)
+    try:
+        if args.map_reduce:
+            stats = detector.train_map_reduce(benign_files, malicious_files, args.incremental,
+                                              num_workers=args.workers)
+        else:
+            stats = detector.train(benign_files, malicious_files, args.incremental,
+                                   batch_size=args.batch_size, use_parallel=not args.serial)
+    finally:
+        detector.shutdown_workers()
+
+    _write_record(output, stats)
+    _write_profile(output, detector)
+    return EXIT_CLEAN if stats.get("save_success") else EXIT_ERROR
+
+
+def cmd_evaluate(args, output):
+    """评估模型，输出 JSON 格式的中间指标和最终指标"""
+    benign_files = _collect_sample_paths(args.benign, args.benign_list)
+    malicious_files = _collect_sample_paths(args.malicious, args.malicious_list)
+    if not benign_files or not malicious_files:
+        print("错误：白样本和黑样本测试文件都不能为空")
+        return EXIT_ERROR
+
+    detector = _create_detector(args)
+    try:
+        # 每隔 report_interval 秒输出一行中间指标，最后一行 final 为 true
+        for results in detector.iter_evaluate(benign_files, malicious_files,
+                                              sample_size=args.sample_size, sample_fraction=args.sample_fraction,
+                                              seed=args.seed, report_interval=args.report_interval,
+                                              confidence=args.confidence, num_workers=args.workers,
+                                              use_multiprocessing=args.processes, target_fpr=args.target_fpr):
+            if results["final"]:
+                scores = results.pop("scores")
+                if args.save_scores:
+                    scores.save_csv(args.save_scores)
+                if not args.curves:
+                    results["threshold_analysis"].pop("roc_curve")
+                    results["threshold_analysis"].pop("pr_curve")
+            _write_record(output, results)
+            output.flush()
+    finally:
+        detector.shutdown_workers()
+    _write_profile(output, detector)
+    return EXIT_CLEAN
+
+
+def cmd_bench(args, output):
+    """测量检测吞吐量
+
+    给出路径时在这些文件上重复运行批量检测，每轮输出一行 JSON，最后输出一行汇总；
+    没有给出路径时运行合成样本基准测试（见 benchmark 模块），输出完整结果，
+    指定 --compare 时与之前保存的结果比较，有阶段的吞吐量下降超过容差时返回 2。
+    """
+    if not args.paths and not args.file_list:
+        return _run_benchmark_suite(args, output)
+
+    file_paths = list(_iter_input_paths(args.paths, args.file_list or ()))
+    if not file_paths:
+        print("错误：没有找到测试文件")
+        return EXIT_ERROR
+
+    start_time = time.perf_counter()
+    detector = _create_detector(args)
+    startup_time = time.perf_counter() - start_time
+
+    mode = "process" if args.processes else "thread"
+    runs = []
+    try:
+        for run in range(1, (args.repeat or 3) + 1):
+            run_start = time.perf_counter()
+            count = sum(1 for _ in detector.iter_predict(file_paths, args.workers, args.processes,
+                                                         batch_size=args.batch_size))
+            elapsed = time.perf_counter() - run_start
+            runs.append(elapsed)
+            _write_record(output, {"run": run, "mode": mode, "files": count, "seconds": round(elapsed, 4),
+                                   "files_per_second": round(count / max(elapsed, 1e-9), 1)})
+            output.flush()
+    finally:
+        detector.shutdown_workers()
+
+    best = min(runs)
+    _write_record(output, {
+        "summary": True,
+        "mode": mode,
+        "files": len(file_paths),
+        "runs": len(runs),
+        "startup_seconds": round(startup_time, 4),
+        "best_seconds": round(best, 4),
+        "mean_seconds": round(sum(runs) / len(runs), 4),
+        "best_files_per_second": round(len(file_paths) / max(best, 1e-9), 1)
+    })
+    _write_profile(output, detector)
+    return EXIT_CLEAN
+
+
+def _run_benchmark_suite(args, output):
+    """合成样本基准测试：输出一行结果 JSON，指定 --compare 时再输出一行比较结果"""
+    import benchmark
+
+    baseline = None
+    if args.compare:
+        baseline = benchmark.load_results(args.compare)
+        if baseline is None:
+            print(f"错误：找不到基准结果文件 {args.compare}")
+            return EXIT_ERROR
+
+    results = benchmark.run_benchmark(
+        files_per_bucket=args.files_per_bucket, repeat=args.repeat, corpus_dir=args.corpus,
+        num_workers=args.workers, stages=args.stages, seed=args.seed, profile=args.profile,
+        callback=None if args.quiet else print
+    )
+    _write_record(output, results)
+    if args.output:
+        benchmark.save_results(results, args.output)
+
+    if baseline is None:
+        return EXIT_CLEAN
+    changes = benchmark.compare_results(baseline, results, args.tolerance)
+    regressions = [change for change in changes if change["regression"]]
+    _write_record(output, {"compare": args.compare,
+                           "regressions": regressions, "changes": changes})
+    return EXIT_ERROR if regressions else EXIT_CLEAN
+
+
+def cmd_ui(args, output):
+    """启动图形界面"""
+    from malware_detector_ui import main as ui_main
+    ui_main()
+    return EXIT_CLEAN
+
+
+def build_parser():
+    """构建命令行参数解析器"""
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument("-w", "--workers", type=int, default=None,
+                        help="工作线程/进程数，默认使用CPU核心数")
+    common.add_argument("-p", "--processes", action="store_true",
+                        help="使用多进程提取特征（大批量文件时更快）")
+    common.add_argument("--no-cache", action="store_true",
+                        help="不加载和使用特征缓存")
+    common.add_argument("-q", "--quiet", action="store_true",
+                        help="只输出警告和错误日志")
+    common.add_argument("--profile", action="store_true",
+                        help="记录特征提取和评分各阶段的耗时，结束时输出一行 {\"profile\": ...}")
+
+    inputs = argparse.ArgumentParser(add_help=False)
+    inputs.add_argument("paths", nargs="*",
+                        help="文件或目录；未给出路径和 --file-list 时从标准输入读取（每行一个路径）")
+    inputs.add_argument("-f", "--file-list", action="append", metavar="FILE",
+                        help="路径列表文件，每行一个路径，\"-\" 表示标准输入（可重复）")
+    inputs.add_argument("--batch-size", type=int, default=256,
+                        help="每次向量化评分的文件数")
+
+    samples = argparse.ArgumentParser(add_help=False)
+    samples.add_argument("--benign", nargs="+", metavar="PATH", help="白样本文件或目录")
+    samples.add_argument("--malicious", nargs="+", metavar="PATH", help="黑样本文件或目录")
+    samples.add_argument("--benign-list", action="append", metavar="FILE", help="白样本路径列表文件")
+    samples.add_argument("--malicious-list", action="append", metavar="FILE", help="黑样本路径列表文件")
+
+    parser = argparse.ArgumentParser(
+        prog="python -m malware_detector",
+        description="恶意软件检测器命令行工具",
+        epilog="scan 的退出码：0 全部正常，1 发现恶意文件，2 出错或部分文件无法检测"
+    )
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    scan = subparsers.add_parser("scan", parents=[common, inputs], help="检测文件，每个文件输出一行 JSON")
+    scan.add_argument("-t", "--threshold", type=float, default=None, help="覆盖模型的判定阈值")
+    scan.add_argument("-a", "--archives", action="store_true",
+                      help="展开压缩包，检测其中的每个文件（ZIP、tar、gz/bz2/xz）")
+    scan.add_argument("--features", action="store_true", help="输出匹配的特征")
+    scan.set_defaults(handler=cmd_scan)
+
+    train = subparsers.add_parser("train", parents=[common, samples], help="训练模型")
+    train.add_argument("-i", "--incremental", action="store_true", help="增量训练")
+    train.add_argument("--map-reduce", action="store_true", help="使用多进程 map-reduce 训练")
+    train.add_argument("--serial", action="store_true", help="顺序提取特征（用于调试）")
+    train.add_argument("--batch-size", type=int, default=1000, help="训练批次大小")
+    train.set_defaults(handler=cmd_train)
+
+    evaluate = subparsers.add_parser("evaluate", parents=[common, samples], help="评估模型")
+    evaluate.add_argument("-n", "--sample-size", type=int, default=None,
+                          help="每个类别最多检测的文件数（分层抽样，给出置信区间）")
+    evaluate.add_argument("--sample-fraction", type=float, default=None,
+                          help="每个类别检测的文件比例（0~1）")
+    evaluate.add_argument("--seed", type=int, default=None, help="抽样的随机种子")
+    evaluate.add_argument("--report-interval", type=float, default=None,
+                          help="输出中间指标的间隔（秒），0 表示只输出最终结果")
+    evaluate.add_argument("--confidence", type=float, default=None, help="置信水平，默认 0.95")
+    evaluate.add_argument("--target-fpr", type=float, default=None,
+                          help="阈值分析的目标误报率，默认 EVAL_CONFIG['target_false_positive_rate']")
+    evaluate.add_argument("--curves", action="store_true", help="在最终结果中输出 ROC 和 PR 曲线")
+    evaluate.add_argument("--save-scores", metavar="FILE", help="把每个文件的分数保存为 CSV")
+    evaluate.set_defaults(handler=cmd_evaluate)
+
+    bench = subparsers.add_parser("bench", parents=[common, inputs],
+                                  help="测量检测吞吐量（不给路径时运行合成样本基准测试）")
+    bench.add_argument("-r", "--repeat", type=int, default=None, help="重复次数，默认 3")
+    bench.add_argument("--files-per-bucket", type=int, default=None,
+                       help="基准测试中每个文件大小区间的合成文件数，默认 PERFORMANCE_CONFIG['benchmark']")
+    bench.add_argument("--corpus", metavar="DIR", help="合成样本目录（保留以便重复使用），默认使用临时目录")
+    bench.add_argument("--stages", nargs="+", metavar="STAGE",
+                       help="只测量指定阶段：extract score score_batch predict predict_batch_thread "
+                            "predict_batch_process train train_map_reduce")
+    bench.add_argument("--seed", type=int, default=0, help="合成样本的随机种子")
+    bench.add_argument("-o", "--output", metavar="FILE", help="把基准测试结果保存为 JSON")
+    bench.add_argument("--compare", metavar="FILE", help="与之前保存的基准测试结果比较")
+    bench.add_argument("--tolerance", type=float, default=None,
+                       help="比较时允许的吞吐量下降比例，超过时返回 2，默认 0.1")
+    bench.set_defaults(handler=cmd_bench)
+
+    ui = subparsers.add_parser("ui", help="启动图形界面")
+    ui.set_defaults(handler=cmd_ui)
+    return parser
+
+
+def main(argv=None):
+    """命令行入口，返回退出码"""
+    args = build_parser().parse_args(argv)
+
+    # 标准输出只留给 JSON 结果，模型加载等提示信息和控制台日志改为输出到标准错误
+    output = sys.stdout
+    try:
+        with contextlib.redirect_stdout(sys.stderr):
+            return args.handler(args, output)
+    except KeyboardInterrupt:
+        return EXIT_ERROR
+    except (OSError, ValueError) as e:
+        print(f"错误: {e}", file=sys.stderr)
+        return EXIT_ERROR
+
+
+if __name__ == "__main__":
+    sys.exit(main())
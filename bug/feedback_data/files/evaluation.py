@@ -0,0 +1,422 @@
+"""模型评估：增量混淆矩阵、分层抽样、置信区间和阈值扫描
+
+评估时检测结果按完成顺序逐个计入 ConfusionMatrix，随时可以得到当前的指标。
+测试集很大时可以按类别分层抽样，只检测一部分文件：指标按各类别在完整测试集中的
+文件数加权，换算为对完整测试集的估计，并给出置信区间（抽样比例越高区间越窄，
+检测了全部文件时区间退化为一个点）。
+
+每个文件的原始分数保存在 ScoreSet 中，评估结束后一次排序即可得到所有候选阈值下的指标、
+ROC 和 PR 曲线、AUC 以及满足目标误报率的阈值，调整阈值不需要重新检测。
+"""
+
+import csv
+import math
+import random
+from array import array
+from statistics import NormalDist
+
+import numpy as np
+
+
+def z_score(confidence):
+    """双侧置信水平对应的标准正态分位数（如 0.95 -> 1.96）"""
+    return NormalDist().inv_cdf(0.5 + confidence / 2)
+
+
+def wilson_interval(successes, trials, z, population=None):
+    """比例的 Wilson 置信区间
+
+    Args:
+        successes: 成功次数
+        trials: 抽样次数
+        z: 标准正态分位数
+        population: 总体大小，提供时做有限总体校正（不放回抽样）
+
+    Returns:
+        (下限, 上限)；没有样本时为 (0.0, 1.0)
+    """
+    if trials <= 0:
+        return 0.0, 1.0
+    if population is not None and trials >= population:
+        rate = successes / trials
+        return rate, rate
+    if population is not None and population > 1:
+        # 有限总体校正：等价于按 n / fpc 的有效样本量计算
+        z = z * math.sqrt((population - trials) / (population - 1))
+    rate = successes / trials
+    z2 = z * z
+    denominator = 1 + z2 / trials
+    center = (rate + z2 / (2 * trials)) / denominator
+    margin = z * math.sqrt(rate * (1 - rate) / trials + z2 / (4 * trials * trials)) / denominator
+    return max(0.0, center - margin), min(1.0, center + margin)
+
+
+def _rate_variance(successes, trials, population=None):
+    """比例估计的方差（带有限总体校正）"""
+    if trials <= 0:
+        return 0.25
+    rate = successes / trials
+    variance = rate * (1 - rate) / trials
+    if population is not None and population > 1:
+        variance *= max(0.0, (population - trials) / (population - 1))
+    return variance
+
+
+def stratified_sample(file_paths, sample_size=None, sample_fraction=None, rng=None):
+    """从一类测试文件中不放回地随机抽样
+
+    Args:
+        file_paths: 文件路径列表
+        sample_size: 抽样数量上限
+        sample_fraction: 抽样比例（0~1），与 sample_size 同时提供时取两者中较小的数量
+        rng: random.Random 实例，提供固定种子时抽样结果可复现
+
+    Returns:
+        抽样后的文件列表（顺序随机）；不需要抽样时返回打乱顺序的完整列表
+    """
+    rng = rng or random.Random()
+    count = len(file_paths)
+    if sample_fraction is not None:
+        count = min(count, max(1, math.ceil(len(file_paths) * sample_fraction)))
+    if sample_size is not None:
+        count = min(count, sample_size)
+    return rng.sample(list(file_paths), count)
+
+
+def interleave(malicious_files, benign_files):
+    """按比例交错两类文件，评估过程中的中间指标能代表两类文件的混合
+
+    Returns:
+        [(file_path, is_malicious), ...]
+    """
+    total = len(malicious_files) + len(benign_files)
+    merged = []
+    malicious_index = benign_index = 0
+    for position in range(total):
+        # 保持已取出的恶意文件比例与整体比例一致
+        if malicious_index < len(malicious_files) and (
+                benign_index >= len(benign_files) or
+                malicious_index * total <= position * len(malicious_files)):
+            merged.append((malicious_files[malicious_index], True))
+            malicious_index += 1
+        else:
+            merged.append((benign_files[benign_index], False))
+            benign_index += 1
+    return merged
+
+
+class ConfusionMatrix:
+    """增量更新的混淆矩阵
+
+    total_malicious / total_benign 为完整测试集中各类别的文件数（抽样时大于实际检测数），
+    用于把抽样结果换算为对完整测试集的估计。
+    """
+
+    def __init__(self, total_malicious=None, total_benign=None):
+        self.true_positives = 0  # 正确识别的恶意文件
+        self.false_negatives = 0  # 漏报的恶意文件
+        self.true_negatives = 0  # 正确识别的正常文件
+        self.false_positives = 0  # 误报的正常文件
+        self.total_malicious = total_malicious
+        self.total_benign = total_benign
+
+    def update(self, is_malicious, predicted_malicious):
+        """计入一个文件的检测结果"""
+        if is_malicious:
+            if predicted_malicious:
+                self.true_positives += 1
+            else:
+                self.false_negatives += 1
+        elif predicted_malicious:
+            self.false_positives += 1
+        else:
+            self.true_negatives += 1
+
+    @property
+    def malicious_tested(self):
+        return self.true_positives + self.false_negatives
+
+    @property
+    def benign_tested(self):
+        return self.true_negatives + self.false_positives
+
+    @property
+    def sampled(self):
+        """是否只检测了部分文件"""
+        return ((self.total_malicious is not None and self.malicious_tested < self.total_malicious) or
+                (self.total_benign is not None and self.benign_tested < self.total_benign))
+
+    def _class_weights(self):
+        """各类别在完整测试集中的文件数（未知时使用已检测的数量）"""
+        malicious = self.total_malicious if self.total_malicious is not None else self.malicious_tested
+        benign = self.total_benign if self.total_benign is not None else self.benign_tested
+        return malicious, benign
+
+    def metrics(self):
+        """当前的评估指标
+
+        抽样时准确率和精确率按各类别的完整文件数加权，是对完整测试集的估计；
+        召回率、漏报率、误报率是单个类别内的比例，不需要加权。
+        """
+        malicious_tested = self.malicious_tested
+        benign_tested = self.benign_tested
+        recall = self.true_positives / max(1, malicious_tested)
+        false_positive_rate = self.false_positives / max(1, benign_tested)
+
+        malicious_weight, benign_weight = self._class_weights()
+        estimated_tp = malicious_weight * recall
+        estimated_fp = benign_weight * false_positive_rate
+        estimated_tn = benign_weight * (1 - false_positive_rate) if benign_tested else 0.0
+        accuracy = (estimated_tp + estimated_tn) / max(1, malicious_weight + benign_weight) \
+            if malicious_tested + benign_tested else 0.0
+        precision = estimated_tp / (estimated_tp + estimated_fp) if estimated_tp + estimated_fp > 0 else 0.0
+        f1_score = 2 * precision * recall / (precision + recall) if precision + recall > 0 else 0.0
+
+        return {
+            "accuracy": accuracy,
+            "precision": precision,
+            "recall": recall,
+            "f1_score": f1_score,
+            "false_negative_rate": self.false_negatives / max(1, malicious_tested),
+            "false_positive_rate": false_positive_rate,
+            "true_positives": self.true_positives,
+            "false_positives": self.false_positives,
+            "true_negatives": self.true_negatives,
+            "false_negatives": self.false_negatives,
+            "total_malicious_tested": malicious_tested,
+            "total_benign_tested": benign_tested
+        }
+
+    def confidence_intervals(self, confidence=0.95):
+        """主要指标的置信区间
+
+        召回率、漏报率、误报率使用带有限总体校正的 Wilson 区间；准确率和精确率是两个类别
+        比例的函数，用正态近似（delta 方法）。
+
+        Returns:
+            {指标名: (下限, 上限)}
+        """
+        z = z_score(confidence)
+        malicious_weight, benign_weight = self._class_weights()
+        malicious_tested = self.malicious_tested
+        benign_tested = self.benign_tested
+
+        intervals = {
+            "recall": wilson_interval(self.true_positives, malicious_tested, z, self.total_malicious),
+            "false_negative_rate": wilson_interval(self.false_negatives, malicious_tested, z, self.total_malicious),
+            "false_positive_rate": wilson_interval(self.false_positives, benign_tested, z, self.total_benign),
+        }
+
+        recall = self.true_positives / max(1, malicious_tested)
+        false_positive_rate = self.false_positives / max(1, benign_tested)
+        recall_variance = _rate_variance(self.true_positives, malicious_tested, self.total_malicious)
+        fpr_variance = _rate_variance(self.false_positives, benign_tested, self.total_benign)
+
+        # 准确率 = (Nm * recall + Nb * (1 - fpr)) / (Nm + Nb)
+        total_weight = max(1, malicious_weight + benign_weight)
+        specificity = 1 - false_positive_rate if benign_tested else 0.0
+        accuracy = (malicious_weight * recall + benign_weight * specificity) / total_weight
+        accuracy_margin = z * math.sqrt(
+            (malicious_weight / total_weight) ** 2 * recall_variance +
+            (benign_weight / total_weight) ** 2 * fpr_variance
+        )
+        intervals["accuracy"] = (max(0.0, accuracy - accuracy_margin), min(1.0, accuracy + accuracy_margin))
+
+        # 精确率 = a / (a + b)，a = Nm * recall，b = Nb * fpr
+        a = malicious_weight * recall
+        b = benign_weight * false_positive_rate
+        if a + b > 0:
+            precision = a / (a + b)
+            d_recall = malicious_weight * b / (a + b) ** 2
+            d_fpr = benign_weight * a / (a + b) ** 2
+            precision_margin = z * math.sqrt(d_recall ** 2 * recall_variance + d_fpr ** 2 * fpr_variance)
+            intervals["precision"] = (max(0.0, precision - precision_margin), min(1.0, precision + precision_margin))
+        else:
+            intervals["precision"] = (0.0, 1.0)
+        return intervals
+
+
+class ScoreSet:
+    """评估中每个测试文件的原始分数和真实标签
+
+    判定规则与模型相同：分数 >= 阈值即判为恶意。抽样评估时计数按各类别在完整测试集中的
+    文件数加权（与 ConfusionMatrix 相同），精确率和准确率是对完整测试集的估计。
+    """
+
+    def __init__(self, total_malicious=None, total_benign=None):
+        self.paths = []
+        self._scores = array('d')
+        self._labels = bytearray()
+        self.total_malicious = total_malicious
+        self.total_benign = total_benign
+
+    def __len__(self):
+        return len(self._scores)
+
+    def add(self, file_path, score, is_malicious):
+        """记录一个文件的分数"""
+        self.paths.append(file_path)
+        self._scores.append(score)
+        self._labels.append(1 if is_malicious else 0)
+
+    @property
+    def scores(self):
+        return np.array(self._scores, dtype=np.float64)
+
+    @property
+    def labels(self):
+        return np.array(self._labels, dtype=np.uint8).astype(bool)
+
+    def _class_weights(self, positives, negatives):
+        """把样本计数换算为完整测试集计数的倍数"""
+        malicious_weight = (self.total_malicious / positives) if self.total_malicious and positives else 1.0
+        benign_weight = (self.total_benign / negatives) if self.total_benign and negatives else 1.0
+        return malicious_weight, benign_weight
+
+    def sweep(self):
+        """一次计算所有候选阈值下的指标
+
+        候选阈值为出现过的所有分数（从高到低），外加一个 +inf（全部判为正常）。
+
+        Returns:
+            字典，各项为与阈值一一对应的 numpy 数组：threshold、true_positives、false_positives、
+            true_negatives、false_negatives、recall、false_positive_rate、precision、accuracy、f1_score
+        """
+        scores = self.scores
+        labels = self.labels
+        order = np.argsort(-scores, kind='mergesort')
+        sorted_scores = scores[order]
+        sorted_labels = labels[order]
+
+        # 每组相同分数取最后一个位置：阈值取该分数时，此位置及之前的文件都判为恶意
+        group_ends = np.r_[np.flatnonzero(np.diff(sorted_scores)), len(sorted_scores) - 1] \
+            if len(sorted_scores) else np.zeros(0, dtype=np.int64)
+        true_positives = np.r_[0, np.cumsum(sorted_labels)[group_ends]]
+        false_positives = np.r_[0, np.cumsum(~sorted_labels)[group_ends]]
+        thresholds = np.r_[np.inf, sorted_scores[group_ends]]
+
+        positives = int(labels.sum())
+        negatives = len(labels) - positives
+        false_negatives = positives - true_positives
+        true_negatives = negatives - false_positives
+
+        malicious_weight, benign_weight = self._class_weights(positives, negatives)
+        weighted_tp = true_positives * malicious_weight
+        weighted_fp = false_positives * benign_weight
+        weighted_tn = true_negatives * benign_weight
+        total_weight = max(1.0, positives * malicious_weight + negatives * benign_weight)
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            recall = true_positives / max(1, positives)
+            false_positive_rate = false_positives / max(1, negatives)
+            # 没有判为恶意的文件时精确率记为 1（PR 曲线的起点）
+            precision = np.where(weighted_tp + weighted_fp > 0, weighted_tp / (weighted_tp + weighted_fp), 1.0)
+            accuracy = (weighted_tp + weighted_tn) / total_weight
+            f1_score = np.where(precision + recall > 0, 2 * precision * recall / (precision + recall), 0.0)
+
+        return {
+            "threshold": thresholds,
+            "true_positives": true_positives,
+            "false_positives": false_positives,
+            "true_negatives": true_negatives,
+            "false_negatives": false_negatives,
+            "recall": recall,
+            "false_positive_rate": false_positive_rate,
+            "precision": precision,
+            "accuracy": accuracy,
+            "f1_score": f1_score
+        }
+
+    @staticmethod
+    def roc_auc(sweep):
+        """ROC 曲线下面积（梯形法，曲线从 (0, 0) 到 (1, 1)）"""
+        # 直接按梯形公式计算（np.trapezoid 需要 NumPy 2.0，np.trapz 在 2.0 中已弃用）
+        recall = np.r_[sweep["recall"], 1.0]
+        false_positive_rate = np.r_[sweep["false_positive_rate"], 1.0]
+        return float(np.sum(np.diff(false_positive_rate) * (recall[1:] + recall[:-1]) / 2))
+
+    @staticmethod
+    def pr_auc(sweep):
+        """PR 曲线下面积（average precision：各阈值处召回率增量乘以精确率之和）"""
+        return float(np.sum(np.diff(sweep["recall"]) * sweep["precision"][1:]))
+
+    @staticmethod
+    def threshold_for_fpr(sweep, target_fpr):
+        """误报率不超过 target_fpr 时召回率最高的阈值
+
+        Returns:
+            阈值在 sweep 中的下标；没有任何阈值满足时返回 None
+        """
+        allowed = np.flatnonzero(sweep["false_positive_rate"] <= target_fpr)
+        if len(allowed) == 0 or not np.isfinite(sweep["threshold"][allowed[-1]]):
+            return None
+        return int(allowed[-1])
+
+    def metrics_at(self, threshold):
+        """指定阈值下的评估指标（与 ConfusionMatrix.metrics 的格式相同）"""
+        matrix = ConfusionMatrix(self.total_malicious, self.total_benign)
+        predicted = self.scores >= threshold
+        labels = self.labels
+        matrix.true_positives = int(np.count_nonzero(predicted & labels))
+        matrix.false_negatives = int(np.count_nonzero(~predicted & labels))
+        matrix.false_positives = int(np.count_nonzero(predicted & ~labels))
+        matrix.true_negatives = int(np.count_nonzero(~predicted & ~labels))
+        return matrix.metrics()
+
+    def analyze(self, target_fpr=0.01, max_curve_points=None):
+        """阈值分析：AUC、满足目标误报率的阈值、F1 最高的阈值，以及 ROC 和 PR 曲线
+
+        Args:
+            target_fpr: 目标误报率
+            max_curve_points: 曲线最多保留的点数（均匀抽取，保留首尾），None 表示全部
+
+        Returns:
+            可直接序列化为 JSON 的字典
+        """
+        sweep = self.sweep()
+        analysis = {
+            "roc_auc": self.roc_auc(sweep),
+            "pr_auc": self.pr_auc(sweep),
+            "target_false_positive_rate": target_fpr,
+            "threshold_for_target_fpr": None,
+            "recall_at_target_fpr": None,
+            "false_positive_rate_at_target": None,
+            "best_f1_threshold": None,
+            "best_f1": None
+        }
+
+        index = self.threshold_for_fpr(sweep, target_fpr)
+        if index is not None:
+            analysis["threshold_for_target_fpr"] = float(sweep["threshold"][index])
+            analysis["recall_at_target_fpr"] = float(sweep["recall"][index])
+            analysis["false_positive_rate_at_target"] = float(sweep["false_positive_rate"][index])
+
+        if len(sweep["threshold"]) > 1:
+            best = 1 + int(np.argmax(sweep["f1_score"][1:]))
+            analysis["best_f1_threshold"] = float(sweep["threshold"][best])
+            analysis["best_f1"] = float(sweep["f1_score"][best])
+
+        points = np.arange(len(sweep["threshold"]))
+        if max_curve_points and len(points) > max_curve_points:
+            points = np.unique(np.linspace(0, len(points) - 1, max_curve_points).round().astype(np.int64))
+        thresholds = sweep["threshold"][points]
+        analysis["roc_curve"] = {
+            "threshold": [None if not np.isfinite(t) else float(t) for t in thresholds],
+            "false_positive_rate": sweep["false_positive_rate"][points].tolist(),
+            "true_positive_rate": sweep["recall"][points].tolist()
+        }
+        analysis["pr_curve"] = {
+            "threshold": analysis["roc_curve"]["threshold"],
+            "recall": sweep["recall"][points].tolist(),
+            "precision": sweep["precision"][points].tolist()
+        }
+        return analysis
+
+    def save_csv(self, path):
+        """把每个文件的路径、标签和分数保存为 CSV，供离线调整阈值"""
+        with open(path, "w", newline="", encoding="utf-8") as f:
+            writer = csv.writer(f)
+            writer.writerow(["path", "is_malicious", "score"])
+            for file_path, label, score in zip(self.paths, self._labels, self._scores):
+                writer.writerow([file_path, label, repr(score)])
+
@@ -0,0 +1,154 @@
+"""基于 os.scandir 的并行递归目录爬取，用于收集训练和评估样本
+
+各子目录由线程池中的线程并发扫描（网络共享上目录读取和 stat 的延迟可以重叠），
+按 FILE_CONFIG 中的 scan_recursive、ignore_hidden_files 和 max_files_per_directory
+过滤，结果以 (path, size, mtime) 批次的形式逐步返回，调用方无需再次 stat。
+"""
+
+import os
+import stat
+import logging
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+from config import FILE_CONFIG, PERFORMANCE_CONFIG
+
+logger = logging.getLogger("malware_detector.crawler")
+
+# Windows 上的隐藏属性（其他平台只按 "." 开头判断）
+_FILE_ATTRIBUTE_HIDDEN = getattr(stat, "FILE_ATTRIBUTE_HIDDEN", 0)
+
+
+def _is_hidden(entry):
+    """判断目录项是否为隐藏文件或隐藏目录"""
+    if entry.name.startswith('.'):
+        return True
+    if _FILE_ATTRIBUTE_HIDDEN:
+        # Windows 上 DirEntry.stat 的结果来自目录读取本身，不需要额外的系统调用
+        attributes = getattr(entry.stat(follow_symlinks=False), "st_file_attributes", 0)
+        return bool(attributes & _FILE_ATTRIBUTE_HIDDEN)
+    return False
+
+
+def scan_directory(directory, ignore_hidden=True, max_files=None):
+    """扫描单个目录（不递归）
+
+    子目录不跟随符号链接，避免目录循环。单个文件或目录出错时跳过，不影响其余部分。
+
+    Args:
+        directory: 目录路径
+        ignore_hidden: 是否跳过隐藏文件和隐藏目录
+        max_files: 该目录最多收集的文件数，None 或 0 表示不限制
+
+    Returns:
+        (files, subdirectories)：files 为 (path, size, mtime) 列表，subdirectories 为子目录路径列表
+    """
+    files = []
+    subdirectories = []
+    try:
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                try:
+                    if ignore_hidden and _is_hidden(entry):
+                        continue
+                    if entry.is_dir(follow_symlinks=False):
+                        subdirectories.append(entry.path)
+                    elif entry.is_file():
+                        # 达到上限后不再 stat 文件，但继续收集子目录
+                        if max_files and len(files) >= max_files:
+                            continue
+                        entry_stat = entry.stat()
+                        files.append((entry.path, entry_stat.st_size, entry_stat.st_mtime))
+                except OSError as e:
+                    logger.debug("跳过无法访问的目录项 %s: %s", entry.path, e)
+    except OSError as e:
+        logger.warning("扫描目录时出错: %s", e)
+    return files, subdirectories
+
+
+class DirectoryCrawler:
+    """并行递归目录爬取器
+
+    使用示例：
+        crawler = DirectoryCrawler()
+        for batch in crawler.iter_batches(directory):
+            ...  # batch 为 (path, size, mtime) 列表
+
+    目录之间的返回顺序取决于扫描完成的先后，需要稳定顺序的调用方应自行排序。
+    """
+
+    def __init__(self, recursive=None, ignore_hidden=None, max_files_per_directory=None,
+                 num_threads=None, batch_size=1000):
+        """
+        Args:
+            recursive: 是否递归子目录，None 使用 FILE_CONFIG['scan_recursive']
+            ignore_hidden: 是否跳过隐藏文件，None 使用 FILE_CONFIG['ignore_hidden_files']
+            max_files_per_directory: 每个目录最多收集的文件数，None 使用
+                FILE_CONFIG['max_files_per_directory']，0 表示不限制
+            num_threads: 扫描线程数，None 使用 PERFORMANCE_CONFIG['io_threads']
+            batch_size: 每批返回的文件数
+        """
+        self.recursive = FILE_CONFIG.get('scan_recursive', True) if recursive is None else recursive
+        self.ignore_hidden = FILE_CONFIG.get('ignore_hidden_files', True) if ignore_hidden is None else ignore_hidden
+        if max_files_per_directory is None:
+            max_files_per_directory = FILE_CONFIG.get('max_files_per_directory', 0)
+        self.max_files_per_directory = max_files_per_directory
+        self.num_threads = max(1, num_threads or PERFORMANCE_CONFIG.get('io_threads', 16))
+        self.batch_size = max(1, batch_size)
+
+        # 统计信息
+        self.directories_scanned = 0
+        self.files_found = 0
+
+    def iter_batches(self, roots):
+        """逐批返回一个或多个根目录下的文件
+
+        Args:
+            roots: 根目录路径或路径列表
+
+        Yields:
+            (path, size, mtime) 列表，每批最多 batch_size 个文件
+        """
+        if isinstance(roots, (str, bytes, os.PathLike)):
+            roots = [roots]
+        pending = deque(roots)
+        batch = []
+
+        with ThreadPoolExecutor(max_workers=self.num_threads) as executor:
+            in_flight = set()
+            try:
+                while pending or in_flight:
+                    # 最多同时扫描 2 倍线程数的目录，待扫描目录只保存路径
+                    while pending and len(in_flight) < self.num_threads * 2:
+                        in_flight.add(executor.submit(
+                            scan_directory, pending.popleft(), self.ignore_hidden, self.max_files_per_directory
+                        ))
+
+                    done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        files, subdirectories = future.result()
+                        self.directories_scanned += 1
+                        self.files_found += len(files)
+                        if self.recursive:
+                            pending.extend(subdirectories)
+                        batch.extend(files)
+
+                    if len(batch) >= self.batch_size:
+                        full_batches = len(batch) // self.batch_size * self.batch_size
+                        for start in range(0, full_batches, self.batch_size):
+                            yield batch[start:start + self.batch_size]
+                        del batch[:full_batches]
+
+                if batch:
+                    yield batch
+            finally:
+                # 调用方提前停止迭代时取消尚未开始的扫描
+                for future in in_flight:
+                    future.cancel()
+
+    def crawl(self, roots):
+        """返回一个或多个根目录下所有文件的 (path, size, mtime) 列表"""
+        files = []
+        for batch in self.iter_batches(roots):
+            files.extend(batch)
+        return files
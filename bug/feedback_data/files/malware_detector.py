@@ -3,2971 +3,3300 @@ import re
 import json
 import hashlib
 import numpy as np
-import tkinter as tk
-from tkinter import filedialog, ttk, messagebox
 import pickle
-from collections import Counter, defaultdict
-import matplotlib.pyplot as plt
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
-import warnings
+import mmap
+import struct
+from collections import Counter, defaultdict, OrderedDict
 import threading
 import time
 from datetime import datetime
 import random
 import multiprocessing
 import psutil
-from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, as_completed
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, wait, FIRST_COMPLETED
+from itertools import chain, repeat
 import zipfile
-import tempfile
+import stat
+import sys
+import logging
+import logging.handlers
 
 # 导入配置文件
-from config import UI_CONFIG, MODEL_CONFIG, FILE_CONFIG, LOG_CONFIG, PERFORMANCE_CONFIG, EVAL_CONFIG, DATA_CONFIG
-
-# 忽略matplotlib的非关键警告
-warnings.filterwarnings("ignore")
-
-# 设置中文显示 - 改进版
-# 使用更健壮的字体设置方法，避免字体错误
-try:
-    # 先尝试获取系统可用字体
-    import matplotlib.font_manager as fm
-    available_fonts = [f.name for f in fm.fontManager.ttflist]
-    
-    # 定义字体优先级列表
-    preferred_fonts = ["SimHei", "WenQuanYi Micro Hei", "Heiti TC", "Arial Unicode MS", "Microsoft YaHei", "sans-serif"]
-    
-    # 选择系统中可用的第一个字体
-    for font in preferred_fonts:
-        if font in available_fonts:
-            plt.rcParams["font.family"] = [font]
-            break
-    else:
-        # 如果没有找到中文字体，使用通用设置
-        plt.rcParams["font.family"] = ["sans-serif"]
-        plt.rcParams["font.sans-serif"] = ["DejaVu Sans", "Arial", "Helvetica"]
-        
-    # 确保负号正常显示
-    plt.rcParams["axes.unicode_minus"] = False
+from config import UI_CONFIG, MODEL_CONFIG, FILE_CONFIG, LOG_CONFIG, PERFORMANCE_CONFIG, EVAL_CONFIG
+import archive_source
+import evaluation
+from profiling import StageProfiler
+
+# 训练和检测流程的日志记录器（由 setup_logging 按 LOG_CONFIG 配置输出）
+logger = logging.getLogger("malware_detector")
+
+
+def setup_logging(log_config=None):
+    """按 LOG_CONFIG 配置日志输出：控制台输出汇总信息，日志文件按大小轮转
+    
+    重复调用时不会重复添加处理器。
+    
+    Args:
+        log_config: 日志配置，None 时使用 config.py 中的 LOG_CONFIG
+    
+    Returns:
+        配置好的 logger
+    """
+    if getattr(logger, "_malware_detector_configured", False):
+        return logger
+    log_config = log_config or LOG_CONFIG
     
-except Exception as e:
-    # 如果字体设置出错，使用最基本的配置
-    plt.rcParams["font.family"] = ["sans-serif"]
-    plt.rcParams["font.sans-serif"] = ["DejaVu Sans", "Arial"]
-    plt.rcParams["axes.unicode_minus"] = False
-    warnings.warn(f"字体设置失败: {str(e)}")
+    console_level = logging.getLevelName(log_config.get("console_level", "INFO"))
+    file_level = logging.getLevelName(log_config.get("log_level", "INFO"))
+    
+    console_handler = logging.StreamHandler(sys.stdout)
+    console_handler.setLevel(console_level)
+    console_handler.setFormatter(logging.Formatter(log_config.get("console_format", "%(message)s")))
+    logger.addHandler(console_handler)
+    levels = [console_level]
+    
+    log_file = log_config.get("log_file")
+    if log_file:
+        # 相对路径按程序所在目录解析，与 model_data 目录一致
+        if not os.path.isabs(log_file):
+            log_file = os.path.join(os.path.dirname(os.path.abspath(__file__)), log_file)
+        try:
+            file_handler = logging.handlers.RotatingFileHandler(
+                log_file,
+                maxBytes=int(log_config.get("max_log_size_mb", 10) * 1024 * 1024),
+                backupCount=log_config.get("backup_count", 5),
+                encoding="utf-8",
+                delay=True
+            )
+            file_handler.setLevel(file_level)
+            file_handler.setFormatter(logging.Formatter(log_config.get("log_format")))
+            logger.addHandler(file_handler)
+            levels.append(file_level)
+        except Exception as e:
+            print(f"日志文件初始化失败: {str(e)}")
+    
+    # logger 级别取各处理器中最低的级别，未启用的级别在调用处直接跳过
+    logger.setLevel(min(levels))
+    logger.propagate = False
+    logger._malware_detector_configured = True
+    return logger
 
 
-class MalwareDetector:
-    def __init__(self):
-        # 模型核心数据结构
-        self.feature_weights = defaultdict(float)
-        self.feature_counts_benign = defaultdict(int)
-        self.feature_counts_malicious = defaultdict(int)
-        self.total_benign_files = 0
-        self.total_malicious_files = 0
-        self.model_version = "1.0"
-        self.last_trained = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        
-        # 关键词特征
-        self.suspicious_keywords = [
-            "eval", "exec", "system", "os", "subprocess", "popen", 
-            "socket", "requests", "__import__", "globals", "locals",
-            "__dict__", "__getattribute__", "compile", "open", "write",
-            "read", "append", "delete", "importlib", "ctypes", "dll",
-            "registry", "self.replicate", "infect", "encrypt", "ransom",
-            "botnet", "payload", "trojan", "virus", "worm", "keylogger",
-            "reverse_shell", "cmd.exe", "powershell", "\\x", "base64",
-            "hex", "encode", "decode", "http", "https", "tcp", "udp"
-        ]
-        
-        # 导入表特征
-        self.suspicious_imports = [
-            "os", "sys", "subprocess", "socket", "requests", "urllib",
-            "http.client", "pickle", "marshal", "importlib", "inspect",
-            "ctypes", "winreg", "win32api", "shutil", "tempfile",
-            "hashlib", "cryptography", "base64", "zlib", "gzip"
-        ]
-        
-        # 模型配置参数
-        self.config = {
-            "min_feature_weight": 0.01,
-            "max_feature_weight": 4.0,  # 降低最大权重限制
-            "threshold": 3.2,  
-            "keyword_weight": 0.9,  # 降低关键词权重
-            "import_weight": 1.2,
-            "structural_weight": 1.5,
-            "byte_weight": 0.8,
-            "dynamic_adjustment_factor": 0.5,  # 增加动态调整因子
-            "incremental_update_factor": 0.3  # 降低增量训练权重，避免权重过快增长
-        }
-        
-        # 创建存储目录
-        self.storage_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), "model_data")
-        if not os.path.exists(self.storage_dir):
-            os.makedirs(self.storage_dir)
-        
-        # 模型文件路径
-        self.model_path = os.path.join(self.storage_dir, "malware_model.pkl")
-        self.stats_path = os.path.join(self.storage_dir, "training_stats.json")
-        
-        # 尝试加载现有模型
-        self.load_model()
-        
-    def load_model(self):
-        """加载训练好的模型"""
-        if os.path.exists(self.model_path):
-            try:
-                with open(self.model_path, 'rb') as f:
-                    data = pickle.load(f)
-                    self.feature_weights = data.get("feature_weights", defaultdict(float))
-                    self.feature_counts_benign = data.get("feature_counts_benign", defaultdict(int))
-                    self.feature_counts_malicious = data.get("feature_counts_malicious", defaultdict(int))
-                    self.total_benign_files = data.get("total_benign_files", 0)
-                    self.total_malicious_files = data.get("total_malicious_files", 0)
-                    self.model_version = data.get("model_version", "1.0")
-                    self.last_trained = data.get("last_trained", datetime.now().strftime("%Y-%m-%d %H:%M:%S"))
-                print("模型加载成功")
-            except Exception as e:
-                print(f"模型加载失败: {str(e)}")
+class LogSampler:
+    """限速日志采样器，用于逐文件的警告和错误
     
-    def save_model(self):
-        """保存模型到文件"""
+    每个时间窗口内最多输出 max_records 条记录，其余只计数；下一个窗口的第一条记录
+    之前（或调用 flush 时）输出一条被省略条数的汇总，避免大批量训练时日志刷屏。
+    """
+    
+    def __init__(self, target_logger, interval=10.0, max_records=20):
+        self.logger = target_logger
+        self.interval = interval
+        self.max_records = max_records
+        self._window_start = None
+        self._emitted = 0
+        self._suppressed = 0
+        self._lock = threading.Lock()
+    
+    def log(self, level, msg, *args):
+        """按采样限制记录一条日志，参数与 logging.Logger.log 相同"""
+        if not self.logger.isEnabledFor(level):
+            return
+        now = time.monotonic()
+        with self._lock:
+            if self._window_start is None or now - self._window_start >= self.interval:
+                self._report_suppressed(level)
+                self._window_start = now
+                self._emitted = 0
+            if self._emitted >= self.max_records:
+                self._suppressed += 1
+                return
+            self._emitted += 1
+        self.logger.log(level, msg, *args)
+    
+    def warning(self, msg, *args):
+        self.log(logging.WARNING, msg, *args)
+    
+    def error(self, msg, *args):
+        self.log(logging.ERROR, msg, *args)
+    
+    def flush(self, level=logging.WARNING):
+        """输出当前窗口中被省略的记录数，并开始新的采样窗口"""
+        with self._lock:
+            self._report_suppressed(level)
+            self._window_start = None
+            self._emitted = 0
+    
+    def _report_suppressed(self, level):
+        if self._suppressed:
+            self.logger.log(level, "（采样限制：另有 %d 条同类日志被省略）", self._suppressed)
+            self._suppressed = 0
+
+
+class KeywordAutomaton:
+    """多模式关键词匹配自动机，一次扫描统计所有关键词的出现次数
+
+    关键词先构建为前缀树（Aho-Corasick 的 goto 结构），再编译成一个嵌套分支的
+    字节正则表达式，由正则引擎在 C 层完成逐字节的状态转移。每个起始位置只返回
+    最长的关键词，同一位置上更短的关键词（如 https 中的 http）通过预先计算的
+    前缀闭包补齐；下一次匹配从上一个起点的后一个字节继续，因此相互重叠的关键词
+    也不会遗漏。
+
+    计数结果与对解码文本逐个调用 str.count 完全一致（同一关键词的出现按从左到右
+    不重叠计数）。关键词均按 UTF-8 编码后在原始字节上匹配。
+    """
+
+    def __init__(self, keywords):
+        # 去重并保持原有顺序，忽略空关键词
+        self.keywords = tuple(dict.fromkeys(k for k in keywords if k))
+        self._encoded = {k.encode('utf-8'): k for k in self.keywords}
+
+        # 前缀闭包：匹配到最长关键词时，同一起点上所有作为其前缀的关键词
+        self._prefix_closure = {}
+        for encoded in self._encoded:
+            self._prefix_closure[encoded] = tuple(
+                (self._encoded[other], len(other))
+                for other in sorted(self._encoded, key=len)
+                if encoded.startswith(other)
+            )
+
+        if self._encoded:
+            self._pattern = re.compile(self._build_trie_pattern(self._encoded))
+        else:
+            self._pattern = None
+
+    @staticmethod
+    def _build_trie_pattern(encoded_keywords):
+        """将关键词前缀树编译为嵌套分支的正则表达式（长匹配优先）"""
+        trie = {}
+        for word in encoded_keywords:
+            node = trie
+            for byte in word:
+                node = node.setdefault(byte, {})
+            node[None] = {}  # 关键词结束标记
+
+        def build(node):
+            branches = [
+                re.escape(bytes([byte])) + build(node[byte])
+                for byte in sorted(key for key in node if key is not None)
+            ]
+            if not branches:
+                return b''
+            body = branches[0] if len(branches) == 1 else b'(?:' + b'|'.join(branches) + b')'
+            if None in node:
+                # 当前节点本身是关键词结尾，后续分支可选（贪婪，保证最长匹配）
+                body = b'(?:' + body + b')?'
+            return body
+
+        return build(trie)
+
+    def count(self, data):
+        """在字节内容上一次扫描，返回 {关键词: 出现次数}（仅包含出现过的关键词）"""
+        counts = {}
+        if self._pattern is None:
+            return counts
+
+        last_end = {}
+        closure = self._prefix_closure
+        search = self._pattern.search
+        match = search(data)
+        while match:
+            start = match.start()
+            for keyword, length in closure[match.group()]:
+                # 与 str.count 一致：同一关键词的出现不重叠计数
+                if start >= last_end.get(keyword, 0):
+                    counts[keyword] = counts.get(keyword, 0) + 1
+                    last_end[keyword] = start + length
+            match = search(data, start + 1)
+        return counts
+
+
+class FeatureExtractor:
+    """特征提取器，在创建时预编译全部正则表达式与关键词自动机
+
+    导入表特征与三类结构特征合并为一次带命名分组的扫描：分组正则只包含各模式的
+    字面量前缀，命中后再用对应的完整模式在该位置做锚定匹配。导入语句保持 findall
+    的不重叠语义，结构特征之间互不影响，因此结果与逐个模式单独扫描完全一致。
+    高熵字符串与十六进制串的字符类会和其他模式重叠，仍各自单独扫描。
+
+    提取器只保存提取所需的配置，不引用模型数据。
+    """
+
+    # 结构特征：特征名 -> 完整匹配模式
+    STRUCTURE_PATTERNS = {
+        "structural_dynamic_code": r'(eval\(|exec\(|__import__\()',
+        "structural_subprocess": r'subprocess\.(call|run|check_output)',
+        "structural_network": r'socket\.(connect|bind|listen)'
+    }
+
+    # 特征类别，按提取顺序排列；每类对应一个 _extract_<类别> 方法
+    FEATURE_FAMILIES = ("basic", "keywords", "tokens", "entropy", "string_patterns")
+
+    # 合并扫描的字面量前缀 -> 类别（导入语句或结构特征名）
+    TOKEN_KINDS = {
+        b"import": "imports",
+        b"from": "from_imports",
+        b"eval(": "structural_dynamic_code",
+        b"exec(": "structural_dynamic_code",
+        b"__import__(": "structural_dynamic_code",
+        b"subprocess.": "structural_subprocess",
+        b"socket.": "structural_network"
+    }
+
+    # 提取逻辑变化时递增，用于使特征缓存失效
+    EXTRACTOR_VERSION = 1
+
+    # 影响提取结果的配置项
+    CONFIG_KEYS = (
+        "keyword_weight", "import_weight", "structural_weight", "byte_weight",
+        "full_window_entropy", "sliding_window_entropy", "entropy_window_size", "entropy_window_step"
+    )
+
+    def __init__(self, suspicious_keywords, suspicious_imports, config):
+        self.keywords = tuple(suspicious_keywords)
+        self.suspicious_imports = tuple(suspicious_imports)
+        self.config = config
+        self.config_snapshot = self.snapshot_config(config)
+        self.keyword_automaton = KeywordAutomaton(self.keywords)
+
+        # 固定的特征名预先生成，提取时不再为每个文件拼接字符串
+        self._keyword_feature_names = {keyword: f"keyword_{keyword}" for keyword in self.keywords}
+        self._import_feature_names = {module: f"import_{module}" for module in self.suspicious_imports}
+
+        # 提取器版本：代码版本、关键词、导入表和相关配置共同决定，用作特征缓存的失效标记
+        self.version = hashlib.md5(repr((
+            self.EXTRACTOR_VERSION, self.keywords, self.suspicious_imports, self.config_snapshot
+        )).encode('utf-8')).hexdigest()
+
+        # 导入语句的两种写法分别编译，便于在候选位置做锚定匹配。模式的语义是对内容按 UTF-8
+        # 解码后的文本（\s、\w、\b 按 Unicode 规则）；语句附近全是 ASCII 字节时使用等价的
+        # 字节模式（Unicode 的 \s 在 ASCII 范围内还包括 \x1c-\x1f），否则只解码这一段（见 _match_import）
+        self._import_pattern = re.compile(r'\bimport\s+(\w+)\b')
+        self._from_import_pattern = re.compile(r'\bfrom\s+(\w+)\s+import')
+        self._ascii_import_pattern = re.compile(rb'import[\t-\r\x1c-\x20]+(\w+)')
+        self._ascii_from_import_pattern = re.compile(rb'from[\t-\r\x1c-\x20]+(\w+)[\t-\r\x1c-\x20]+import')
+        # 导入语句可能涉及的范围：从候选位置开始的空白、单词字符和非 ASCII 字节
+        self._statement_span = re.compile(rb'[\t-\r\x1c-\x20\w\x80-\xff]*')
+        self._word_char = re.compile(r'\w')
+        self._structure_patterns = {
+            name: re.compile(pattern.encode('ascii')) for name, pattern in self.STRUCTURE_PATTERNS.items()
+        }
+
+        # 合并扫描：各模式的字面量前缀组成一个纯字面量的多选分支，直接在字节上扫描。
+        # 不使用命名分组，正则引擎可以用首字符集合跳过不可能匹配的位置，命中后按匹配文本查类别
+        self._token_pattern = re.compile(b'|'.join(re.escape(token) for token in self.TOKEN_KINDS))
+
+        # 高熵字符串和十六进制字符串：字符类都是 ASCII，解码不改变 ASCII 字节，因此直接匹配字节
+        self._high_entropy_pattern = re.compile(rb'[a-zA-Z0-9+/=]{32,}')
+        self._hex_pattern = re.compile(rb'0x[0-9a-fA-F]{8,}')
+
+        # 按顺序执行的各类特征提取，(性能分析阶段名, 方法)
+        self._feature_families = tuple(
+            (f"features.{family}", getattr(self, f"_extract_{family}")) for family in self.FEATURE_FAMILIES
+        )
+
+    @classmethod
+    def snapshot_config(cls, config):
+        """提取影响特征结果的配置项快照"""
+        return tuple(config[key] for key in cls.CONFIG_KEYS)
+
+    def scan_tokens(self, data):
+        """一次扫描文件内容（字节），返回 (导入的模块集合, 命中的结构特征名集合)
+
+        结果与把内容按 UTF-8（errors='replace'）解码后在文本上匹配完全相同。
+        """
+        imported_modules = set()
+        structural_hits = set()
+        import_end = 0  # 上一个导入语句的结束位置，保证导入匹配互不重叠
+
+        search = self._token_pattern.search
+        token_kinds = self.TOKEN_KINDS
+        match = search(data)
+        while match:
+            start = match.start()
+            kind = token_kinds[match.group()]
+            if kind == 'imports' or kind == 'from_imports':
+                if start >= import_end:
+                    statement = self._match_import(data, start, kind == 'imports')
+                    if statement is not None:
+                        imported_modules.add(statement[0])
+                        import_end = statement[1]
+            elif kind not in structural_hits and self._structure_patterns[kind].match(data, start):
+                structural_hits.add(kind)
+            match = search(data, start + 1)
+
+        return imported_modules, structural_hits
+
+    def _match_import(self, data, start, is_import):
+        """在 start 处匹配导入语句，返回 (模块名, 语句结束位置) 或 None
+
+        语句只由空白、单词字符和字面量组成，匹配结果只取决于 start 之前的一个字符和之后
+        连续的空白/单词字符。这一段全是 ASCII 字节时直接用字节模式匹配；否则只解码这一段，
+        用 Unicode 规则的文本模式匹配（start 和段尾都在 ASCII 字节处，是解码后的字符边界）。
+        """
+        previous = self._char_before(data, start)
+        span_end = self._statement_span.match(data, start).end()
+        if data[start:span_end].isascii():
+            if previous and self._word_char.match(previous):
+                return None
+            pattern = self._ascii_import_pattern if is_import else self._ascii_from_import_pattern
+            match = pattern.match(data, start)
+            return (match.group(1).decode('ascii'), match.end()) if match else None
+
+        text = previous + data[start:span_end].decode('utf-8', errors='replace')
+        pattern = self._import_pattern if is_import else self._from_import_pattern
+        match = pattern.match(text, len(previous))
+        if match is None:
+            return None
+        # 匹配部分只包含有效字符，重新编码即得到对应的字节长度
+        return match.group(1), start + len(text[len(previous):match.end()].encode('utf-8'))
+
+    @staticmethod
+    def _char_before(data, position):
+        """内容按 UTF-8（errors='replace'）解码后 position 之前的一个字符，position 为 0 时返回空串
+
+        position 是字符边界；多字节字符的首字节不会被前面的无效序列吞掉，因此以 position
+        结尾的完整 UTF-8 序列就是解码后的前一个字符，否则前一个字符是替换字符。
+        """
+        if position == 0:
+            return ''
+        if data[position - 1] < 0x80:
+            return chr(data[position - 1])
+        for length in (2, 3, 4):
+            if position >= length:
+                try:
+                    char = data[position - length:position].decode('utf-8')
+                except UnicodeDecodeError:
+                    continue
+                if len(char) == 1:
+                    return char
+        return '\ufffd'
+
+    @staticmethod
+    def shannon_entropy(histogram):
+        """根据字节直方图计算香农熵（比特），二维输入按行计算"""
+        histogram = np.asarray(histogram, dtype=np.float64)
+        totals = histogram.sum(axis=-1, keepdims=True)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            probabilities = histogram / totals
+            terms = np.where(probabilities > 0, probabilities * np.log2(probabilities), 0.0)
+        return -terms.sum(axis=-1)
+
+    @classmethod
+    def sliding_window_entropy(cls, byte_array, window_size, step):
+        """计算滑动窗口熵
+
+        先按步长把数据切成块并一次性统计每块的直方图，窗口直方图由相邻块的累计和
+        相减得到，整个过程没有 Python 层的逐字节循环。
+
+        Args:
+            byte_array: uint8 数组
+            window_size: 窗口大小（向下取整为步长的整数倍）
+            step: 窗口滑动步长
+
+        Returns:
+            每个窗口的熵组成的数组，数据不足一个窗口时为空数组
+        """
+        step = max(1, int(step))
+        blocks_per_window = max(1, int(window_size) // step)
+        num_blocks = len(byte_array) // step
+        if num_blocks < blocks_per_window:
+            return np.empty(0, dtype=np.float64)
+
+        # 每个字节的桶编号 = 块号 * 256 + 字节值，一次 bincount 得到所有块的直方图
+        bin_ids = (np.arange(num_blocks, dtype=np.intp) * 256)[:, None] + \
+            byte_array[:num_blocks * step].reshape(num_blocks, step)
+        block_histograms = np.bincount(bin_ids.ravel(), minlength=num_blocks * 256).reshape(num_blocks, 256)
+
+        cumulative = np.zeros((num_blocks + 1, 256), dtype=np.int64)
+        np.cumsum(block_histograms, axis=0, out=cumulative[1:])
+        window_histograms = cumulative[blocks_per_window:] - cumulative[:-blocks_per_window]
+        return cls.shannon_entropy(window_histograms)
+
+    def extract(self, file_content, file_size, features=None, profiler=None):
+        """从文件内容（字节）中提取特征
+
+        Args:
+            file_content: 文件内容或读取窗口（前100KB和后10KB）
+            file_size: 原始文件大小
+            features: 可选，已有的特征字典，提取结果直接写入其中
+            profiler: 可选的 StageProfiler，提供时分别记录解码和每类特征的耗时
+
+        Returns:
+            特征字典
+        """
+        if features is None:
+            features = {}
+        if profiler is not None:
+            return self._extract_profiled(file_content, file_size, features, profiler)
+
+        # 所有特征都直接在字节上提取，不解码整个文件
+        self._extract_basic(file_content, file_size, features)
+        self._extract_keywords(file_content, file_size, features)
+        self._extract_tokens(file_content, file_size, features)
+        self._extract_entropy(file_content, file_size, features)
+        self._extract_string_patterns(file_content, file_size, features)
+        return features
+
+    def _extract_profiled(self, file_content, file_size, features, profiler):
+        """与 extract 相同，额外记录每个阶段的耗时"""
+        start = profiler.now()
+        for stage, extract_family in self._feature_families:
+            extract_family(file_content, file_size, features)
+            start = profiler.lap(stage, start)
+        return features
+
+    def _extract_basic(self, file_content, file_size, features):
+        """文件大小和哈希特征"""
+        # 文件基本信息特征
+        features[f"file_size_{file_size//1024}"] = 1.0  # 按KB分桶
+
+        # 计算文件哈希值 - 使用更快的算法和更少的字节
+        file_hash = hashlib.md5(file_content[:1000]).hexdigest()
+        features[f"file_hash_{file_hash[:8]}"] = 0.5
+
+    def _extract_keywords(self, file_content, file_size, features):
+        """关键词特征：自动机在原始字节上一次扫描得到所有关键词计数"""
+        keyword_counts = self.keyword_automaton.count(file_content)
+        if keyword_counts:
+            for keyword in self.keywords:
+                count = keyword_counts.get(keyword)
+                if count:
+                    features[self._keyword_feature_names[keyword]] = min(count * self.config["keyword_weight"], 5.0)
+
+    def _extract_tokens(self, file_content, file_size, features):
+        """导入表与结构特征 - 合并为一次扫描"""
+        imported_modules, structural_hits = self.scan_tokens(file_content)
+
+        # 使用集合操作加速查找
+        suspicious_found = imported_modules.intersection(self.suspicious_imports)
+        for module in suspicious_found:
+            features[self._import_feature_names[module]] = self.config["import_weight"]
+
+        for feature_name in self.STRUCTURE_PATTERNS:
+            if feature_name in structural_hits:
+                features[feature_name] = self.config["structural_weight"]
+
+    def _extract_entropy(self, file_content, file_size, features):
+        """字节序列统计特征 - 向量化计算字节直方图和熵"""
+        byte_array = np.frombuffer(file_content, dtype=np.uint8)
+
+        # 前5000字节的熵
+        sample_size = min(5000, len(byte_array))
+        if sample_size > 0:
+            entropy = self.shannon_entropy(np.bincount(byte_array[:sample_size], minlength=256))
+            features[f"entropy_{int(entropy*10)}"] = entropy * self.config["byte_weight"] / 10
+
+            # 可选：整个读取窗口（前100KB和后10KB）的熵
+            if self.config["full_window_entropy"]:
+                full_entropy = self.shannon_entropy(np.bincount(byte_array, minlength=256))
+                features[f"full_entropy_{int(full_entropy*10)}"] = full_entropy * self.config["byte_weight"] / 10
+
+            # 可选：滑动窗口熵，用于发现局部加壳或加密的数据段
+            if self.config["sliding_window_entropy"]:
+                window_entropies = self.sliding_window_entropy(
+                    byte_array,
+                    self.config["entropy_window_size"],
+                    self.config["entropy_window_step"]
+                )
+                if len(window_entropies) > 0:
+                    max_entropy = window_entropies.max()
+                    features[f"window_entropy_max_{int(max_entropy*10)}"] = max_entropy * self.config["byte_weight"] / 10
+
+                    high_ratio = float(np.count_nonzero(window_entropies >= 7.0)) / len(window_entropies)
+                    features[f"high_entropy_window_ratio_{int(high_ratio*10)}"] = high_ratio
+
+    def _extract_string_patterns(self, file_content, file_size, features):
+        """检测高熵字符串和十六进制字符串（使用预编译的正则表达式）"""
+        high_entropy_patterns = self._high_entropy_pattern.findall(file_content)
+        features[f"high_entropy_patterns_{min(len(high_entropy_patterns), 10)}"] = min(len(high_entropy_patterns), 10) * 0.5
+
+        hex_patterns = self._hex_pattern.findall(file_content)
+        features[f"hex_patterns_{min(len(hex_patterns), 10)}"] = min(len(hex_patterns), 10) * 0.5
+
+
+class FeatureCache:
+    """基于内容哈希的持久化特征缓存（LRU）
+
+    特征只由读取窗口（前100KB和后10KB）的内容和文件大小决定，因此缓存以
+    「窗口内容的 BLAKE2b 哈希 + 文件大小」为键，同一个文件的多个副本共享一条缓存。
+    另外维护一个路径索引（路径 -> 文件大小、修改时间、内容键），文件未修改时
+    无需读取内容即可命中。
+
+    缓存与提取器版本绑定，版本变化时整体失效；超出容量限制时按最近最少使用淘汰。
+    所有操作都是线程安全的，可以在多线程特征提取中共享。
+    """
+
+    # 每条缓存记录的固定开销估算（字节）
+    ENTRY_OVERHEAD = 240
+    PATH_ENTRY_OVERHEAD = 160
+
+    def __init__(self, cache_path, max_size_mb, extractor_version):
+        self.cache_path = cache_path
+        self.max_bytes = int(max_size_mb * 1024 * 1024)
+        self.extractor_version = extractor_version
+
+        self._entries = OrderedDict()  # 内容键 -> (特征字典, 估算大小)
+        self._path_index = OrderedDict()  # 路径 -> (文件大小, 修改时间, 内容键)
+        self._current_bytes = 0
+        self._dirty = False
+        self._lock = threading.Lock()
+
+        # 命中统计
+        self.hits = 0
+        self.path_hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def content_key(file_content, file_size):
+        """计算内容键：读取窗口的 BLAKE2b 哈希加文件大小"""
+        return f"{hashlib.blake2b(file_content, digest_size=16).hexdigest()}:{file_size}"
+
+    @classmethod
+    def _estimate_size(cls, features):
+        return cls.ENTRY_OVERHEAD + sum(len(name) + 80 for name in features)
+
+    def lookup_path(self, file_path, file_size, mtime_ns):
+        """按路径查询：文件大小和修改时间都未变化时直接返回缓存的特征"""
+        with self._lock:
+            record = self._path_index.get(file_path)
+            if record is None or record[0] != file_size or record[1] != mtime_ns:
+                return None
+            entry = self._entries.get(record[2])
+            if entry is None:
+                return None
+            self._entries.move_to_end(record[2])
+            self._path_index.move_to_end(file_path)
+            self.hits += 1
+            self.path_hits += 1
+            return dict(entry[0])
+
+    def get(self, key, file_path=None, file_size=None, mtime_ns=None):
+        """按内容键查询，命中且提供了路径信息时同时更新路径索引"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            if file_path is not None:
+                self._remember_path(file_path, file_size, mtime_ns, key)
+            return dict(entry[0])
+
+    def put(self, key, features, file_path=None, file_size=None, mtime_ns=None):
+        """写入缓存，必要时按 LRU 淘汰旧记录"""
+        size = self._estimate_size(features)
+        with self._lock:
+            old_entry = self._entries.pop(key, None)
+            if old_entry is not None:
+                self._current_bytes -= old_entry[1]
+            self._entries[key] = (dict(features), size)
+            self._current_bytes += size
+            if file_path is not None:
+                self._remember_path(file_path, file_size, mtime_ns, key)
+            self._dirty = True
+            self._evict()
+
+    def _remember_path(self, file_path, file_size, mtime_ns, key):
+        if file_path not in self._path_index:
+            self._current_bytes += self.PATH_ENTRY_OVERHEAD + len(file_path)
+        self._path_index[file_path] = (file_size, mtime_ns, key)
+        self._path_index.move_to_end(file_path)
+        self._dirty = True
+
+    def _evict(self):
+        while self._current_bytes > self.max_bytes and (self._entries or self._path_index):
+            # 优先淘汰路径索引（失去路径索引只会多读一次文件），再淘汰特征记录
+            if len(self._path_index) > len(self._entries) or not self._entries:
+                path, _ = self._path_index.popitem(last=False)
+                self._current_bytes -= self.PATH_ENTRY_OVERHEAD + len(path)
+            else:
+                _, (_, size) = self._entries.popitem(last=False)
+                self._current_bytes -= size
+
+    def reset(self, extractor_version=None):
+        """清空缓存，可同时更新提取器版本"""
+        with self._lock:
+            if extractor_version is not None:
+                self.extractor_version = extractor_version
+            self._entries.clear()
+            self._path_index.clear()
+            self._current_bytes = 0
+            self._dirty = True
+
+    def load(self):
+        """从磁盘加载缓存，提取器版本不一致时丢弃"""
+        if not os.path.exists(self.cache_path):
+            return False
         try:
+            with open(self.cache_path, 'rb') as f:
+                data = pickle.load(f)
+            if data.get("extractor_version") != self.extractor_version:
+                print("特征缓存版本已变化，忽略旧缓存")
+                return False
+            with self._lock:
+                for key, features in data.get("entries", []):
+                    size = self._estimate_size(features)
+                    self._entries[key] = (features, size)
+                    self._current_bytes += size
+                for file_path, record in data.get("paths", []):
+                    self._path_index[file_path] = tuple(record)
+                    self._current_bytes += self.PATH_ENTRY_OVERHEAD + len(file_path)
+                self._evict()
+                self._dirty = False
+            return True
+        except Exception as e:
+            print(f"特征缓存加载失败: {str(e)}")
+            return False
+
+    def save(self):
+        """将缓存写入磁盘（仅在有变化时）"""
+        with self._lock:
+            if not self._dirty:
+                return True
             data = {
-                "feature_weights": dict(self.feature_weights),
-                "feature_counts_benign": dict(self.feature_counts_benign),
-                "feature_counts_malicious": dict(self.feature_counts_malicious),
-                "total_benign_files": self.total_benign_files,
-                "total_malicious_files": self.total_malicious_files,
-                "model_version": self.model_version,
-                "last_trained": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-            }
-            with open(self.model_path, 'wb') as f:
-                pickle.dump(data, f)
-            
-            # 保存训练统计信息
-            stats = {
-                "total_benign_files": self.total_benign_files,
-                "total_malicious_files": self.total_malicious_files,
-                "feature_count": len(self.feature_weights),
-                "last_trained": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+                "extractor_version": self.extractor_version,
+                "entries": [(key, entry[0]) for key, entry in self._entries.items()],
+                "paths": list(self._path_index.items())
             }
-            with open(self.stats_path, 'w', encoding='utf-8') as f:
-                json.dump(stats, f, ensure_ascii=False, indent=2)
-                
-            print("模型保存成功")
+            self._dirty = False
+        try:
+            temp_path = self.cache_path + ".tmp"
+            with open(temp_path, 'wb') as f:
+                pickle.dump(data, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(temp_path, self.cache_path)
             return True
         except Exception as e:
-            print(f"模型保存失败: {str(e)}")
+            print(f"特征缓存保存失败: {str(e)}")
+            return False
+
+    def get_stats(self):
+        """获取缓存统计信息"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "paths": len(self._path_index),
+                "size_mb": self._current_bytes / (1024 * 1024),
+                "max_size_mb": self.max_bytes / (1024 * 1024),
+                "hits": self.hits,
+                "path_hits": self.path_hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0
+            }
+
+
+
+class FeatureVocabulary:
+    """特征名到稠密整数ID的映射
+
+    模型的权重和计数按特征ID存放在 NumPy 数组中；特征名只在词表中保存一份，
+    ID 按首次加入的顺序分配，与原先字典的插入顺序一致。
+    """
+
+    def __init__(self, names=()):
+        self.names = []  # ID -> 特征名
+        self.index = {}  # 特征名 -> ID
+        self._prefix_flags = {}  # 前缀 -> 每个ID的名称是否以该前缀开头
+        for name in names:
+            self.add(name)
+
+    @classmethod
+    def from_names(cls, names):
+        """由互不重复的特征名列表直接构建词表（用于加载模型文件）"""
+        vocabulary = cls()
+        vocabulary.names = list(names)
+        vocabulary.index = dict(zip(vocabulary.names, range(len(vocabulary.names))))
+        return vocabulary
+
+    def __len__(self):
+        return len(self.names)
+
+    def __contains__(self, name):
+        return name in self.index
+
+    def __iter__(self):
+        return iter(self.names)
+
+    def add(self, name):
+        """返回特征名的ID，不存在时分配新ID"""
+        feature_id = self.index.get(name)
+        if feature_id is None:
+            feature_id = len(self.names)
+            self.names.append(name)
+            self.index[name] = feature_id
+        return feature_id
+
+    def encode(self, features, add=False):
+        """把特征字典转换为 (ids, values) 数组
+
+        Args:
+            features: 特征字典 {特征名: 特征值}
+            add: 是否为未知特征分配新ID；为 False 时未知特征的ID为 -1
+
+        Returns:
+            (int64 ID 数组, float64 特征值数组)
+        """
+        count = len(features)
+        if add:
+            ids = np.fromiter(map(self.add, features), dtype=np.int64, count=count)
+        else:
+            ids = np.fromiter(map(self.index.get, features, [-1] * count), dtype=np.int64, count=count)
+        values = np.fromiter(features.values(), dtype=np.float64, count=count)
+        return ids, values
+
+    def encode_batch(self, features_list, add=False):
+        """把多个特征字典编码为 CSR 形式的稀疏矩阵（每个文件一行）
+
+        Args:
+            features_list: 特征字典列表
+            add: 是否为未知特征分配新ID；为 False 时未知特征的ID为 -1
+
+        Returns:
+            (names, ids, values, indptr)：第 i 个文件的特征位于 [indptr[i], indptr[i+1])，
+            names 为展开后的特征名列表，未知特征的ID为 -1
+        """
+        lengths = np.fromiter(map(len, features_list), dtype=np.int64, count=len(features_list))
+        indptr = np.zeros(len(features_list) + 1, dtype=np.int64)
+        np.cumsum(lengths, out=indptr[1:])
+        total = int(indptr[-1])
+
+        names = list(chain.from_iterable(features_list))
+        if add:
+            ids = np.fromiter(map(self.add, names), dtype=np.int64, count=total)
+        else:
+            ids = np.fromiter(map(self.index.get, names, repeat(-1, total)), dtype=np.int64, count=total)
+        values = np.fromiter(
+            chain.from_iterable(features.values() for features in features_list),
+            dtype=np.float64, count=total
+        )
+        return names, ids, values, indptr
+
+    def prefix_flags(self, prefix):
+        """返回布尔数组：每个特征ID的名称是否以 prefix 开头
+
+        数组末尾多一个 False，ID 为 -1 的未知特征取到它。新加入的特征增量计算。
+        """
+        size = len(self.names)
+        flags = self._prefix_flags.get(prefix)
+        if flags is None or len(flags) != size + 1:
+            known = 0 if flags is None else len(flags) - 1
+            new_flags = np.zeros(size + 1, dtype=bool)
+            if known:
+                new_flags[:known] = flags[:known]
+            new_flags[known:size] = [name.startswith(prefix) for name in self.names[known:size]]
+            self._prefix_flags[prefix] = flags = new_flags
+        return flags
+
+
+class FeatureArrayView:
+    """以字典接口访问按特征ID索引的数组
+
+    兼容原先 feature_weights / feature_counts_* 的字典用法（get、items、下标读写等）。
+    skip_zero 为 True 时值为 0 的特征视为不存在，对应计数字典中从未出现过的特征。
+    on_change 在通过下标写入后以特征ID调用，用于记录需要写入检查点的特征。
+    """
+
+    def __init__(self, vocabulary, get_array, ensure_capacity, skip_zero=False, on_change=None):
+        self._vocabulary = vocabulary
+        self._get_array = get_array
+        self._ensure_capacity = ensure_capacity
+        self._skip_zero = skip_zero
+        self._on_change = on_change
+
+    def _present_ids(self):
+        values = self._get_array()[:len(self._vocabulary)]
+        if self._skip_zero:
+            return np.flatnonzero(values)
+        return np.arange(len(values))
+
+    def __len__(self):
+        return len(self._present_ids())
+
+    def __contains__(self, name):
+        feature_id = self._vocabulary.index.get(name)
+        if feature_id is None:
             return False
+        return not self._skip_zero or self._get_array()[feature_id] != 0
+
+    def __iter__(self):
+        names = self._vocabulary.names
+        return (names[i] for i in self._present_ids())
+
+    def __getitem__(self, name):
+        return self.get(name, 0)
+
+    def __setitem__(self, name, value):
+        feature_id = self._vocabulary.add(name)
+        self._ensure_capacity(len(self._vocabulary))
+        self._get_array()[feature_id] = value
+        if self._on_change is not None:
+            self._on_change(feature_id)
+
+    def get(self, name, default=None):
+        feature_id = self._vocabulary.index.get(name)
+        if feature_id is None:
+            return default
+        value = self._get_array()[feature_id]
+        if self._skip_zero and value == 0:
+            return default
+        return value.item()
+
+    def keys(self):
+        return list(self)
+
+    def values(self):
+        array = self._get_array()
+        return [array[i].item() for i in self._present_ids()]
+
+    def items(self):
+        names = self._vocabulary.names
+        array = self._get_array()
+        return [(names[i], array[i].item()) for i in self._present_ids()]
+
+
+# 二进制模型文件：文件头 + 元数据(JSON) + 特征名表 + 按64字节对齐的权重和计数数组
+MODEL_FILE_MAGIC = b'XGMODEL\x00'
+MODEL_FILE_VERSION = 1
+MODEL_FILE_ALIGNMENT = 64
+# 魔数、格式版本、特征数、白样本数、黑样本数、元数据长度、特征名表长度
+MODEL_FILE_HEADER = struct.Struct('<8sIQQQQQ')
+# 数组依次为权重、白样本计数、黑样本计数；每个数组比特征数多一个值为 0 的元素
+MODEL_FILE_ARRAYS = (('weights', '<f8'), ('counts_benign', '<i4'), ('counts_malicious', '<i4'))
+
+
+def _model_array_offsets(num_features, data_start):
+    """计算模型文件中各数组的起始偏移"""
+    offsets = {}
+    offset = data_start
+    for name, dtype in MODEL_FILE_ARRAYS:
+        offset = -(-offset // MODEL_FILE_ALIGNMENT) * MODEL_FILE_ALIGNMENT
+        offsets[name] = offset
+        offset += (num_features + 1) * np.dtype(dtype).itemsize
+    return offsets
+
+
+def write_binary_model(model_path, names, weights, counts_benign, counts_malicious,
+                       total_benign_files, total_malicious_files, metadata):
+    """把模型写成二进制格式（先写临时文件再原子替换）
+
+    Args:
+        model_path: 模型文件路径
+        names: 特征名列表，顺序即特征ID
+        weights, counts_benign, counts_malicious: 按特征ID索引的数组（至少包含 len(names) 个元素）
+        total_benign_files, total_malicious_files: 训练样本数
+        metadata: 其他可 JSON 序列化的信息（model_version、last_trained 等）
+    """
+    num_features = len(names)
+    if any('\x00' in name for name in names):
+        raise ValueError("特征名不能包含空字符")
+    metadata_blob = json.dumps(metadata, ensure_ascii=False).encode('utf-8')
+    names_blob = '\x00'.join(names).encode('utf-8')
+    header = MODEL_FILE_HEADER.pack(
+        MODEL_FILE_MAGIC, MODEL_FILE_VERSION, num_features,
+        total_benign_files, total_malicious_files, len(metadata_blob), len(names_blob)
+    )
+    offsets = _model_array_offsets(num_features, len(header) + len(metadata_blob) + len(names_blob))
+    sources = {'weights': weights, 'counts_benign': counts_benign, 'counts_malicious': counts_malicious}
+
+    temp_path = model_path + ".tmp"
+    with open(temp_path, 'wb') as f:
+        f.write(header)
+        f.write(metadata_blob)
+        f.write(names_blob)
+        for name, dtype in MODEL_FILE_ARRAYS:
+            f.write(b'\x00' * (offsets[name] - f.tell()))
+            array = np.zeros(num_features + 1, dtype=dtype)
+            array[:num_features] = sources[name][:num_features]
+            f.write(array.tobytes())
+    os.replace(temp_path, model_path)
+
+
+def read_binary_model(model_path):
+    """通过 mmap 加载二进制模型文件
+
+    数组直接由 np.frombuffer 映射文件内容，不复制数据；多个进程加载同一模型时共享
+    同一份页缓存。映射使用写时复制，训练修改权重只影响本进程，不会写回文件。
+
+    Returns:
+        字典，包含 names、weights、counts_benign、counts_malicious、
+        total_benign_files、total_malicious_files、metadata 以及 mmap 对象
+    """
+    with open(model_path, 'rb') as f:
+        model_mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_COPY)
+
+    try:
+        (magic, version, num_features, total_benign_files, total_malicious_files,
+         metadata_size, names_size) = MODEL_FILE_HEADER.unpack_from(model_mmap, 0)
+        if magic != MODEL_FILE_MAGIC:
+            raise ValueError("不是有效的模型文件")
+        if version != MODEL_FILE_VERSION:
+            raise ValueError(f"不支持的模型文件版本: {version}")
+
+        position = MODEL_FILE_HEADER.size
+        metadata = json.loads(model_mmap[position:position + metadata_size].decode('utf-8'))
+        position += metadata_size
+        names = model_mmap[position:position + names_size].decode('utf-8').split('\x00') if num_features else []
+        position += names_size
+        if len(names) != num_features:
+            raise ValueError("模型文件的特征名表已损坏")
+
+        model = {
+            "names": names,
+            "total_benign_files": total_benign_files,
+            "total_malicious_files": total_malicious_files,
+            "metadata": metadata,
+            "mmap": model_mmap
+        }
+        offsets = _model_array_offsets(num_features, position)
+        for name, dtype in MODEL_FILE_ARRAYS:
+            model[name] = np.frombuffer(model_mmap, dtype=dtype, count=num_features + 1, offset=offsets[name])
+        return model
+    except Exception:
+        model_mmap.close()
+        raise
+
+
+def read_pickle_model(model_path):
+    """读取旧版 pickle 模型文件，返回与 read_binary_model 相同结构的字典（不含 mmap）"""
+    with open(model_path, 'rb') as f:
+        data = pickle.load(f)
+
+    if "feature_names" in data:
+        names = list(data["feature_names"])
+        weights = data["feature_weights"]
+        counts_benign = data["feature_counts_benign"]
+        counts_malicious = data["feature_counts_malicious"]
+    else:
+        # 最早的格式：三个以特征名为键的字典
+        vocabulary = FeatureVocabulary()
+        for mapping in ("feature_weights", "feature_counts_benign", "feature_counts_malicious"):
+            for name in data.get(mapping, {}):
+                vocabulary.add(name)
+        names = vocabulary.names
+        weights = np.zeros(len(names), dtype=np.float64)
+        counts_benign = np.zeros(len(names), dtype=np.int32)
+        counts_malicious = np.zeros(len(names), dtype=np.int32)
+        for array, mapping in ((weights, "feature_weights"),
+                               (counts_benign, "feature_counts_benign"),
+                               (counts_malicious, "feature_counts_malicious")):
+            for name, value in data.get(mapping, {}).items():
+                array[vocabulary.index[name]] = value
+
+    return {
+        "names": names,
+        "weights": weights,
+        "counts_benign": counts_benign,
+        "counts_malicious": counts_malicious,
+        "total_benign_files": data.get("total_benign_files", 0),
+        "total_malicious_files": data.get("total_malicious_files", 0),
+        "metadata": {
+            "model_version": data.get("model_version", "1.0"),
+            "last_trained": data.get("last_trained", datetime.now().strftime("%Y-%m-%d %H:%M:%S"))
+        }
+    }
+
+
+def convert_pickle_model(pickle_path, binary_path):
+    """把旧版 pickle 模型文件转换为二进制模型文件
+
+    Returns:
+        转换后的特征数
+    """
+    model = read_pickle_model(pickle_path)
+    write_binary_model(
+        binary_path, model["names"], model["weights"], model["counts_benign"], model["counts_malicious"],
+        model["total_benign_files"], model["total_malicious_files"], model["metadata"]
+    )
+    return len(model["names"])
+
+
+class PartialModel:
+    """可合并的部分训练结果（map-reduce 训练的中间结果）
+
+    只累计每个特征在两类样本中的出现次数和特征值之和，以及样本总数，不包含权重。
+    因此不同分片（不同进程甚至不同机器）的结果可以按任意顺序相加合并，
+    合并后由 MalwareDetector.apply_partial_model 一次推导出权重。
+    另外记录处理出错（特征为空或带 error_processing 标记）的文件数、工作进程失败后
+    改在主进程中处理的分片数，以及主进程中仍然失败而跳过的文件数，用于训练统计。
+    """
+
+    FORMAT_VERSION = 1
+
+    def __init__(self, extractor_version=None):
+        self.extractor_version = extractor_version  # 提取器版本不同的部分模型不能合并
+        self.vocabulary = FeatureVocabulary()
+        self.counts_benign = np.zeros(0, dtype=np.int64)
+        self.counts_malicious = np.zeros(0, dtype=np.int64)
+        self.value_sums_benign = np.zeros(0, dtype=np.float64)
+        self.value_sums_malicious = np.zeros(0, dtype=np.float64)
+        self.total_benign_files = 0
+        self.total_malicious_files = 0
+        self.error_files = 0
+        self.fallback_chunks = 0
+        self.skipped_files = 0
+
+    @property
+    def processed_files(self):
+        """累计的样本数（压缩包按成员计数）"""
+        return self.total_benign_files + self.total_malicious_files
+
+    def _grow(self):
+        """把各数组扩展到词表大小"""
+        size = len(self.vocabulary)
+        for attr in ('counts_benign', 'counts_malicious', 'value_sums_benign', 'value_sums_malicious'):
+            array = getattr(self, attr)
+            if len(array) < size:
+                setattr(self, attr, np.concatenate([array, np.zeros(size - len(array), dtype=array.dtype)]))
+
+    def add_batch(self, features_list, is_malicious):
+        """累计一批同类文件的特征"""
+        if not features_list:
+            return
+        # 与 train 相同，出错文件的特征（error_processing 等）仍计入模型，只单独计数
+        self.error_files += sum(1 for features in features_list
+                                if not features or "error_processing" in features)
+        _, ids, values, _ = self.vocabulary.encode_batch(features_list, add=True)
+        self._grow()
+        size = len(self.vocabulary)
+        if is_malicious:
+            self.counts_malicious += np.bincount(ids, minlength=size)
+            self.value_sums_malicious += np.bincount(ids, weights=values, minlength=size)
+            self.total_malicious_files += len(features_list)
+        else:
+            self.counts_benign += np.bincount(ids, minlength=size)
+            self.value_sums_benign += np.bincount(ids, weights=values, minlength=size)
+            self.total_benign_files += len(features_list)
+
+    def merge(self, other):
+        """把另一个部分模型按特征名对齐后累加到本模型"""
+        if (self.extractor_version is not None and other.extractor_version is not None
+                and self.extractor_version != other.extractor_version):
+            raise ValueError("部分模型的特征提取器版本不一致，不能合并")
+        if self.extractor_version is None:
+            self.extractor_version = other.extractor_version
+
+        ids = np.fromiter(map(self.vocabulary.add, other.vocabulary.names), dtype=np.int64,
+                          count=len(other.vocabulary))
+        self._grow()
+        self.counts_benign[ids] += other.counts_benign
+        self.counts_malicious[ids] += other.counts_malicious
+        self.value_sums_benign[ids] += other.value_sums_benign
+        self.value_sums_malicious[ids] += other.value_sums_malicious
+        self.total_benign_files += other.total_benign_files
+        self.total_malicious_files += other.total_malicious_files
+        self.error_files += other.error_files
+        self.fallback_chunks += other.fallback_chunks
+        self.skipped_files += other.skipped_files
+        return self
+
+    def save(self, path):
+        """保存部分模型（先写临时文件再原子替换）"""
+        data = {
+            "format_version": self.FORMAT_VERSION,
+            "extractor_version": self.extractor_version,
+            "feature_names": self.vocabulary.names,
+            "counts_benign": self.counts_benign,
+            "counts_malicious": self.counts_malicious,
+            "value_sums_benign": self.value_sums_benign,
+            "value_sums_malicious": self.value_sums_malicious,
+            "total_benign_files": self.total_benign_files,
+            "total_malicious_files": self.total_malicious_files,
+            "error_files": self.error_files,
+            "fallback_chunks": self.fallback_chunks,
+            "skipped_files": self.skipped_files
+        }
+        temp_path = path + ".tmp"
+        with open(temp_path, 'wb') as f:
+            pickle.dump(data, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temp_path, path)
+
+    @classmethod
+    def load(cls, path):
+        """加载 save 保存的部分模型"""
+        with open(path, 'rb') as f:
+            data = pickle.load(f)
+        if data.get("format_version") != cls.FORMAT_VERSION:
+            raise ValueError(f"不支持的部分模型格式: {data.get('format_version')}")
+        partial = cls(data["extractor_version"])
+        partial.vocabulary = FeatureVocabulary.from_names(data["feature_names"])
+        partial.counts_benign = np.asarray(data["counts_benign"], dtype=np.int64)
+        partial.counts_malicious = np.asarray(data["counts_malicious"], dtype=np.int64)
+        partial.value_sums_benign = np.asarray(data["value_sums_benign"], dtype=np.float64)
+        partial.value_sums_malicious = np.asarray(data["value_sums_malicious"], dtype=np.float64)
+        partial.total_benign_files = data["total_benign_files"]
+        partial.total_malicious_files = data["total_malicious_files"]
+        partial.error_files = data.get("error_files", 0)
+        partial.fallback_chunks = data.get("fallback_chunks", 0)
+        partial.skipped_files = data.get("skipped_files", 0)
+        return partial
+
+
+def merge_models(partial_model_paths, output_path=None):
+    """合并多个部分模型文件（例如在不同机器上分片训练得到的结果）
+
+    Args:
+        partial_model_paths: PartialModel.save 保存的文件路径列表
+        output_path: 可选，合并结果的保存路径
+
+    Returns:
+        合并后的 PartialModel，可用 MalwareDetector.apply_partial_model 推导权重
+    """
+    merged = PartialModel()
+    for path in partial_model_paths:
+        merged.merge(PartialModel.load(path))
+    if output_path:
+        merged.save(output_path)
+    return merged
+
+def read_file_window(file_path, file_size):
+    """读取文件中用于特征提取的窗口
     
-    def extract_features(self, file_path):
-        """从文件中提取特征，支持从磁盘文件或压缩包内存内容读取"""
+    小于1KB的文件读取全部内容，其余文件只读取前100KB和后10KB。
+    """
+    # 快速路径：对于非常小的文件（< 1KB），直接处理全部内容
+    if file_size < 1024:
+        with open(file_path, 'rb') as f:
+            return f.read()
+    
+    # 对于大文件，只读取关键部分（前100KB和后10KB）以加速处理
+    with open(file_path, 'rb') as f:
+        file_content = f.read(100 * 1024)  # 前100KB
+        if file_size > 100 * 1024:
+            f.seek(-min(10 * 1024, file_size), os.SEEK_END)
+            file_content += f.read(10 * 1024)  # 后10KB
+    return file_content
+
+
+def path_stat(file_path):
+    """返回文件的 (大小, mtime_ns)；压缩包成员文件返回解压后大小和所在压缩包的 mtime_ns，
+    大小需要解压才能得到的成员（tar、gz 等）返回 None"""
+    if archive_source.is_member_path(file_path):
+        return archive_source.member_stat(file_path)
+    stat_result = os.stat(file_path)
+    return stat_result.st_size, stat_result.st_mtime_ns
+
+
+# 无法读取的文件除 error_processing 外再带一个说明原因的标记特征，评分结果据此给出错误信息
+ERROR_FEATURE_MESSAGES = {
+    "error_file_not_found": "文件不存在",
+    "error_not_regular_file": "不是普通文件",
+    "error_unreadable": "文件不可读",
+}
+
+
+def _mark_unreadable(features, reason):
+    """把无法读取的文件标记为处理出错"""
+    features["error_processing"] = 1.0
+    features["file_size_unknown"] = 1.0
+    features[reason] = 1.0
+    return features
+
+
+def feature_error_message(features):
+    """特征提取出错时返回错误信息，否则返回 None"""
+    if "error_processing" not in features:
+        return None
+    for reason, message in ERROR_FEATURE_MESSAGES.items():
+        if reason in features:
+            return message
+    return "特征提取失败"
+
+
+def _extract_path_features(extractor, file_path, features, cache=None, want_cache_key=False, profiler=None):
+    """提取磁盘文件或压缩包成员文件（"压缩包路径::成员名"）的特征
+    
+    成员文件通过 archive_source 流式读取特征窗口，不解压整个成员。
+    
+    Args:
+        extractor: FeatureExtractor 实例
+        file_path: 文件路径或压缩包成员的虚拟路径
+        features: 特征字典，提取结果写入其中（出错时调用方可以保留已提取的部分）
+        cache: 可选的 FeatureCache，提供时先查询缓存并写回结果
+        want_cache_key: 未提供缓存时是否仍计算缓存记录（供工作进程返回给主进程）
+        profiler: 可选的 StageProfiler，记录各阶段耗时（见 profiling.py）
+    
+    Returns:
+        (特征字典, 缓存记录)，缓存记录为 (内容键, 文件大小, 修改时间) 或 None。
+        不存在、不是普通文件（FIFO、设备等）或不可读的文件返回带 error_processing 的特征。
+    """
+    if profiler is not None:
+        profiler.count("files")
+        start = profiler.now()
+    is_member = archive_source.is_member_path(file_path)
+    if is_member:
+        file_size, mtime_ns = archive_source.member_stat(file_path) or (None, None)
+    else:
+        # 快速检查文件是否存在并可读（不打开 FIFO 等特殊文件，以免阻塞）
+        try:
+            stat_result = os.stat(file_path)
+        except FileNotFoundError:
+            return _mark_unreadable(features, "error_file_not_found"), None
+        if not stat.S_ISREG(stat_result.st_mode):
+            return _mark_unreadable(features, "error_not_regular_file"), None
+        if not os.access(file_path, os.R_OK):
+            return _mark_unreadable(features, "error_unreadable"), None
+        
+        # 文件基本信息特征
+        file_size = stat_result.st_size
+        mtime_ns = stat_result.st_mtime_ns
+    if profiler is not None:
+        start = profiler.lap("stat", start)
+    
+    # 文件未修改时直接使用缓存，无需读取内容
+    if cache is not None and file_size is not None:
+        cached = cache.lookup_path(file_path, file_size, mtime_ns)
+        if profiler is not None:
+            start = profiler.lap("cache_lookup", start)
+        if cached is not None:
+            if profiler is not None:
+                profiler.count("cache_hits")
+            return cached, None
+    
+    if is_member:
+        file_content, file_size, mtime_ns = archive_source.read_member_window(file_path)
+    else:
+        file_content = read_file_window(file_path, file_size)
+    if profiler is not None:
+        profiler.lap("read", start)
+        profiler.count("bytes_read", len(file_content))
+    
+    return _extract_window_features(extractor, file_path, file_content, file_size, mtime_ns,
+                                    features, cache, want_cache_key, profiler)
+
+
+def _extract_window_features(extractor, file_path, file_content, file_size, mtime_ns, features,
+                             cache=None, want_cache_key=False, profiler=None):
+    """从已读取的特征窗口（前 100KB 和后 10KB）提取特征
+    
+    顺序解压的压缩包成员在解压时就得到了窗口，直接从这里开始提取。
+    
+    Args:
+        extractor: FeatureExtractor 实例
+        file_path: 文件路径或压缩包成员的虚拟路径
+        file_content: 特征窗口
+        file_size: 文件（解压后）大小
+        mtime_ns: 文件或所在压缩包的修改时间
+        features: 特征字典，提取结果写入其中
+        cache: 可选的 FeatureCache
+        want_cache_key: 未提供缓存时是否仍计算缓存记录
+        profiler: 可选的 StageProfiler
+    
+    Returns:
+        (特征字典, 缓存记录)
+    """
+    features[f"file_size_{file_size//1024}"] = 1.0  # 按KB分桶
+    
+    # 内容相同的文件（如多处拷贝的同一个DLL）共享缓存
+    cache_record = None
+    if cache is not None or want_cache_key:
+        if profiler is not None:
+            start = profiler.now()
+        cache_record = (FeatureCache.content_key(file_content, file_size), file_size, mtime_ns)
+        cached = cache.get(cache_record[0], file_path, file_size, mtime_ns) if cache is not None else None
+        if profiler is not None:
+            profiler.lap("cache_lookup", start)
+        if cached is not None:
+            if profiler is not None:
+                profiler.count("cache_hits")
+            return cached, None
+    
+    # 提取内容特征（提取器使用预编译的模式）
+    extractor.extract(file_content, file_size, features, profiler)
+    
+    if cache is not None:
+        if profiler is not None:
+            start = profiler.now()
+        cache.put(cache_record[0], features, file_path, file_size, mtime_ns)
+        if profiler is not None:
+            profiler.lap("cache_store", start)
+    return features, cache_record
+
+
+# 工作进程中的特征提取器，由 _init_extraction_worker 在进程启动时创建一次
+_worker_extractor = None
+
+
+def _init_extraction_worker(suspicious_keywords, suspicious_imports, extractor_config):
+    """工作进程初始化：只接收提取器配置，不复制模型数据"""
+    global _worker_extractor
+    _worker_extractor = FeatureExtractor(suspicious_keywords, suspicious_imports, extractor_config)
+
+
+def _extract_features_chunk(file_paths, want_cache_key=False, archive_passwords=None, profile=False):
+    """在工作进程中提取一批文件的特征
+    
+    Args:
+        file_paths: 文件路径列表（可包含压缩包成员的虚拟路径）
+        want_cache_key: 是否计算缓存记录
+        archive_passwords: 加密压缩包的密码（见 archive_source.passwords_for）
+        profile: 是否记录这一块的分阶段耗时
+    
+    Returns:
+        ([(file_path, features, cache_record), ...], 分阶段统计)，未启用性能分析时统计为 None
+    """
+    if archive_passwords:
+        archive_source.set_passwords(archive_passwords)
+    profiler = StageProfiler() if profile else None
+    results = []
+    for file_path in file_paths:
         features = {}
-        
+        cache_record = None
         try:
-            # 检查是否是压缩包中的文件（内存中的文件内容）
-            if hasattr(self, '_archive_file_contents') and file_path in self._archive_file_contents:
-                file_content = self._archive_file_contents[file_path]
-                file_size = len(file_content)
-                
-                # 文件基本信息特征
-                features[f"file_size_{file_size//1024}"] = 1.0  # 按KB分桶
-                
-                # 对于内存中的内容，模拟大文件处理逻辑
-                if file_size > 110 * 1024:  # 如果内容超过110KB，只保留关键部分
-                    # 保留前100KB和后10KB
-                    file_content = file_content[:100*1024] + file_content[-10*1024:]
-            else:
-                # 普通磁盘文件处理逻辑
-                # 快速检查文件是否存在并可读
-                if not os.path.isfile(file_path) or not os.access(file_path, os.R_OK):
-                    return features
-                    
-                # 文件基本信息特征 - 快速获取
-                file_size = os.path.getsize(file_path)
-                features[f"file_size_{file_size//1024}"] = 1.0  # 按KB分桶
-                
-                # 快速路径：对于非常小的文件（< 1KB），直接处理全部内容
-                if file_size < 1024:
-                    with open(file_path, 'rb') as f:
-                        file_content = f.read()
-                else:
-                    # 对于大文件，只读取关键部分（前100KB和后10KB）以加速处理
-                    with open(file_path, 'rb') as f:
-                        file_content = f.read(100 * 1024)  # 前100KB
-                        if file_size > 100 * 1024:
-                            f.seek(-min(10 * 1024, file_size), os.SEEK_END)
-                            file_content += f.read(10 * 1024)  # 后10KB
-            
-            # 转换为字符串，使用更高效的解码方式
-            file_content_str = file_content.decode('utf-8', errors='replace')
-            
-            # 计算文件哈希值 - 使用更快的算法和更少的字节
-            file_hash = hashlib.md5(file_content[:1000]).hexdigest()
-            features[f"file_hash_{file_hash[:8]}"] = 0.5
-            
-            # 优化关键词检测：先进行快速过滤，再精确计数
-            keyword_detected = False
-            for keyword in self.suspicious_keywords:
-                if keyword in file_content_str:
-                    keyword_detected = True
-                    break
-            
-            if keyword_detected:
-                # 只对可能包含关键词的文件进行精确计数
-                for keyword in self.suspicious_keywords:
-                    if keyword in file_content_str:
-                        count = file_content_str.count(keyword)
-                        features[f"keyword_{keyword}"] = min(count * self.config["keyword_weight"], 5.0)
-            
-            # 导入表特征 - 合并正则表达式以减少扫描次数
-            import_pattern = re.compile(r'\bimport\s+(\w+)\b|\bfrom\s+(\w+)\s+import')
-            imports = import_pattern.findall(file_content_str)
-            imported_modules = set()
-            for imp in imports:
-                if imp[0]:
-                    imported_modules.add(imp[0])
-                if imp[1]:
-                    imported_modules.add(imp[1])
-            
-            # 使用集合操作加速查找
-            suspicious_found = imported_modules.intersection(self.suspicious_imports)
-            for module in suspicious_found:
-                features[f"import_{module}"] = self.config["import_weight"]
-            
-            # 结构特征：合并正则表达式以减少扫描次数
-            structure_patterns = {
-                "structural_dynamic_code": r'(eval\(|exec\(|__import__\()',
-                "structural_subprocess": r'subprocess\.(call|run|check_output)',
-                "structural_network": r'socket\.(connect|bind|listen)'
-            }
-            
-            for feature_name, pattern in structure_patterns.items():
-                if re.search(pattern, file_content_str):
-                    features[feature_name] = self.config["structural_weight"]
-            
-            # 字节序列统计特征 - 只处理前5000字节以提高速度
-            sample_size = min(5000, len(file_content))
-            byte_sample = file_content[:sample_size]
-            
-            # 快速熵计算（使用字典而不是Counter）
-            byte_counts = {}
-            for byte in byte_sample:
-                byte_counts[byte] = byte_counts.get(byte, 0) + 1
-            
-            if sample_size > 0:
-                entropy = 0.0
-                for count in byte_counts.values():
-                    p = count / sample_size
-                    entropy -= p * np.log2(p)
-                features[f"entropy_{int(entropy*10)}"] = entropy * self.config["byte_weight"] / 10
-            
-            # 检测高熵字符串和十六进制字符串（使用预编译的正则表达式）
-            high_entropy_pattern = re.compile(r'[a-zA-Z0-9+/=]{32,}')
-            hex_pattern = re.compile(r'0x[0-9a-fA-F]{8,}')
-            
-            high_entropy_patterns = high_entropy_pattern.findall(file_content_str)
-            features[f"high_entropy_patterns_{min(len(high_entropy_patterns), 10)}"] = min(len(high_entropy_patterns), 10) * 0.5
-            
-            hex_patterns = hex_pattern.findall(file_content_str)
-            features[f"hex_patterns_{min(len(hex_patterns), 10)}"] = min(len(hex_patterns), 10) * 0.5
-            
-        except Exception as e:
-            # 使用静默错误处理，不打印每个文件的错误以提高性能
-            # 避免使用可能导致进一步错误的特征键格式
+            features, cache_record = _extract_path_features(
+                _worker_extractor, file_path, features, want_cache_key=want_cache_key, profiler=profiler
+            )
+        except Exception:
             features["error_processing"] = 1.0
             features["file_size_unknown"] = 1.0
-        
-        return features
+        results.append((file_path, features, cache_record))
+    return results, profiler and profiler.to_dict(raw=True)
+
+
+def _extract_windows_chunk(items, want_cache_key=False, profile=False):
+    """在工作进程中从主进程顺序解压得到的特征窗口提取特征
     
-    def extract_features_parallel(self, file_paths, num_workers=None, use_multiprocessing=False):
-        """并行提取多个文件的特征
-        
-        Args:
-            file_paths: 文件路径列表
-            num_workers: 工作线程/进程数量，如果为None则使用CPU核心数
-            use_multiprocessing: 是否使用多进程（对于CPU密集型任务更有效）
-        
-        Returns:
-            字典 {file_path: features}
-        """
-        if num_workers is None:
-            num_workers = multiprocessing.cpu_count()
-        
-        results = {}
-        
-        if not file_paths:
-            return results
-        
-        # 根据任务类型选择并行方式
-        if use_multiprocessing and len(file_paths) > 10:  # 小批量文件使用多线程更高效
-            # 使用多进程处理CPU密集型任务
-            with ProcessPoolExecutor(max_workers=num_workers) as executor:
-                future_to_file = {executor.submit(self.extract_features, file_path): file_path for file_path in file_paths}
-                for future in as_completed(future_to_file):
-                    file_path = future_to_file[future]
-                    try:
-                        features = future.result()
-                        results[file_path] = features
-                    except Exception:
-                        # 忽略单个文件的错误
-                        results[file_path] = {}
-        else:
-            # 使用多线程处理IO密集型任务
-            with ThreadPoolExecutor(max_workers=min(num_workers * 2, 32)) as executor:  # IO密集型可以使用更多线程
-                future_to_file = {executor.submit(self.extract_features, file_path): file_path for file_path in file_paths}
-                for future in as_completed(future_to_file):
-                    file_path = future_to_file[future]
-                    try:
-                        features = future.result()
-                        results[file_path] = features
-                    except Exception:
-                        # 忽略单个文件的错误
-                        results[file_path] = {}
-        
-        return results
+    Args:
+        items: [(member_path, file_size, mtime_ns, window), ...]
+        want_cache_key: 是否计算缓存记录
+        profile: 是否记录这一块的分阶段耗时
     
-    def update_feature_weights(self, features, is_malicious, is_incremental=False):
-        """更新特征权重，添加样本平衡处理和权重限制"""
-        update_factor = self.config["incremental_update_factor"] if is_incremental else 1.0
-        
-        # 计算样本平衡因子 - 解决样本不平衡问题
-        total_samples = max(1, self.total_benign_files + self.total_malicious_files)
-        benign_ratio = self.total_benign_files / total_samples if total_samples > 0 else 0.5
-        malicious_ratio = 1.0 - benign_ratio
-        
-        # 平衡因子：样本较少的类别获得更高的权重更新
-        balance_factor = 1.0
-        if is_malicious and malicious_ratio < 0.5:
-            balance_factor = 0.5 / max(0.01, malicious_ratio)
-        elif not is_malicious and benign_ratio < 0.5:
-            balance_factor = 0.5 / max(0.01, benign_ratio)
-        
+    Returns:
+        ([(member_path, features, cache_record), ...], 分阶段统计)，未启用性能分析时统计为 None
+    """
+    profiler = StageProfiler() if profile else None
+    results = []
+    for member_path, file_size, mtime_ns, window in items:
+        features = {}
+        cache_record = None
         try:
-            for feature, value in features.items():
-                try:
-                    # 更新特征计数
-                    if is_malicious:
-                        self.feature_counts_malicious[feature] += 1
-                    else:
-                        self.feature_counts_benign[feature] += 1
-                    
-                    # 计算新的权重增量，应用平衡因子
-                    if is_malicious:
-                        # 恶意文件中发现特征，增加权重
-                        weight_increment = value * 0.1 * update_factor * balance_factor
-                    else:
-                        # 正常文件中发现特征，减少权重
-                        weight_increment = -value * 0.05 * update_factor * self.config["dynamic_adjustment_factor"] * balance_factor
-                    
-                    # 获取当前权重，确保即使是新特征也有默认值
-                    current_weight = self.feature_weights.get(feature, 0.0)
-                    
-                    # 应用权重更新
-                    new_weight = current_weight + weight_increment
-                    
-                    # 严格限制权重范围
-                    bounded_weight = max(
-                        self.config["min_feature_weight"],
-                        min(self.config["max_feature_weight"], new_weight)
-                    )
-                    
-                    self.feature_weights[feature] = bounded_weight
-                    
-                    # 调试输出，监控权重异常
-                    if abs(bounded_weight) > 9.5:
-                        print(f"警告: 特征 {feature} 权重过高: {bounded_weight}")
-                    
-                except Exception as e:
-                    # 捕获任何特征级别的异常
-                    print(f"处理特征 {feature} 时出错: {str(e)}")
-                    continue
-        except Exception as e:
-            # 捕获其他可能的异常
-            print(f"update_feature_weights异常: {str(e)}")
-            pass
+            if profiler is not None:
+                profiler.count("files")
+                profiler.count("bytes_read", len(window))
+            features, cache_record = _extract_window_features(
+                _worker_extractor, member_path, window, file_size, mtime_ns, features,
+                want_cache_key=want_cache_key, profiler=profiler
+            )
+        except Exception:
+            features["error_processing"] = 1.0
+            features["file_size_unknown"] = 1.0
+        results.append((member_path, features, cache_record))
+    return results, profiler and profiler.to_dict(raw=True)
+
+
+def _iter_path_features(extractor, file_path):
+    """提取一个路径的特征；需要顺序解压的压缩包（tar、gz 等）逐个产出其中每个成员的特征"""
+    if not archive_source.is_archive_path(file_path):
+        features = {}
+        try:
+            features, _ = _extract_path_features(extractor, file_path, features)
+        except Exception:
+            features["error_processing"] = 1.0
+            features["file_size_unknown"] = 1.0
+        yield features
+        return
     
-    def train(self, benign_files, malicious_files, is_incremental=False, batch_size=1000, 
-              use_parallel=True, callback=None):
-        """训练模型，支持批量处理和并行计算
-        
-        Args:
-            benign_files: 正常文件路径列表
-            malicious_files: 恶意文件路径列表
-            is_incremental: 是否为增量训练
-            batch_size: 批处理大小
-            use_parallel: 是否使用并行处理
-            callback: 进度回调函数，格式：callback(processed, total, status)
-        
-        Returns:
-            训练统计信息
-        """
-        start_time = time.time()
-        total_files = len(benign_files) + len(malicious_files)
-        processed_files = 0
-        errors = 0
-        
-        # 记录增量训练前的样本数，用于统计本次新增的样本数
-        initial_malicious_files = self.total_malicious_files
-        initial_benign_files = self.total_benign_files
-        
-        # 进度回调函数
-        def update_progress(processed, status=""):
-            if callback:
-                callback(processed, total_files, status)
-        
-        # 优化：先过滤掉不存在或无法访问的文件，同时支持内存中的压缩包文件和临时解压文件
-        def filter_valid_files(file_paths):
-            valid = []
-            # 检查是否有内存中的压缩包文件内容
-            archive_contents = {}
-            if hasattr(self, '_archive_file_contents'):
-                archive_contents = self._archive_file_contents
-                print(f"filter_valid_files: 内存中的压缩包文件数量: {len(archive_contents)}")
-            
-            # 检查临时解压目录
-            temp_dir = getattr(self, '_temp_extract_dir', '无临时目录')
-            print(f"filter_valid_files: 临时解压目录: {temp_dir}")
-            
-            # 保留的文件类型
-            keep_extensions = {'.exe', '.dll', '.sys', '.bin', '.dat', '.ocx', '.scr', '.com', '.vbs', '.js', '.ps1', '.bat', '.cmd', '.msi', '.inf'}
-            print(f"filter_valid_files: 保留的文件类型: {keep_extensions}")
-            
-            for f in file_paths:
-                # 检查文件是否物理存在且可读
-                is_physical_file = os.path.isfile(f) and os.access(f, os.R_OK)
-                # 检查是否是内存中的压缩包文件
-                is_memory_file = f in archive_contents
-                
-                # 对于物理文件（包括临时解压文件），进行扩展名过滤
-                if is_physical_file:
-                    _, ext = os.path.splitext(f.lower())
-                    if ext in keep_extensions:
-                        # 检查文件大小
-                        try:
-                            file_size = os.path.getsize(f)
-                            if file_size > 0:
-                                valid.append(f)
-                                print(f"filter_valid_files: 保留文件 (物理): {f} - 大小: {file_size}字节 - 扩展名: {ext}")
-                            else:
-                                print(f"filter_valid_files: 跳过空文件: {f}")
-                        except Exception as e:
-                            print(f"filter_valid_files: 获取文件大小失败 {f}: {str(e)}")
-                    else:
-                        print(f"filter_valid_files: 跳过不支持的扩展名: {f} ({ext})")
-                # 对于内存中的压缩包文件，总是保留
-                elif is_memory_file:
-                    valid.append(f)
-                    print(f"filter_valid_files: 保留文件 (内存): {f}")
-                else:
-                    reason = '文件不存在' if not os.path.isfile(f) else '无法访问'
-                    print(f"filter_valid_files: 跳过无效文件: {f} - {reason}")
-            
-            print(f"filter_valid_files: 过滤后文件总数: {len(valid)} / 原始文件数: {len(file_paths)}")
-            return valid
+    for member_path, file_size, window in archive_source.iter_archive_windows(file_path):
+        features = {}
+        try:
+            features, _ = _extract_window_features(extractor, member_path, window, file_size, None, features)
+        except Exception:
+            features["error_processing"] = 1.0
+            features["file_size_unknown"] = 1.0
+        yield features
+
+
+def _train_partial_chunk(file_paths, is_malicious, archive_passwords=None):
+    """工作进程：提取一块同类文件的特征并累计为部分模型
+
+    Args:
+        file_paths: 文件路径列表（可包含压缩包成员的虚拟路径，以及需要顺序解压的压缩包）
+        is_malicious: 这些文件是否为恶意文件
+        archive_passwords: 加密压缩包的密码（见 archive_source.passwords_for）
+
+    Returns:
+        PartialModel
+    """
+    if archive_passwords:
+        archive_source.set_passwords(archive_passwords)
+    features_list = []
+    for file_path in file_paths:
+        try:
+            features_list.extend(_iter_path_features(_worker_extractor, file_path))
+        except Exception:
+            # 压缩包损坏时保留已解压成员的特征
+            features_list.append({"error_processing": 1.0, "file_size_unknown": 1.0})
+    partial = PartialModel(_worker_extractor.version)
+    partial.add_batch(features_list, is_malicious)
+    return partial
+
+
+# 训练文件保留的文件类型
+TRAINING_FILE_EXTENSIONS = frozenset({'.exe', '.dll', '.sys', '.bin', '.dat', '.ocx', '.scr', '.com', '.vbs',
+                                      '.js', '.ps1', '.bat', '.cmd', '.msi', '.inf'})
+
+
+def _check_training_file(item, keep_extensions, max_file_size):
+    """检查一个训练文件是否可用
+    
+    每个文件最多一次 stat：目录遍历得到的 os.DirEntry 复用其缓存的 stat 结果，
+    (path, size, mtime) 元组直接使用其中的大小；扩展名在 stat 之前检查。
+    
+    Args:
+        item: 文件路径、os.DirEntry 或 (path, size, mtime) 元组
+        keep_extensions: 保留的扩展名集合（小写，带点）
+        max_file_size: 文件大小上限（字节），None 表示不限制
+    
+    Returns:
+        (path, size, 跳过原因)，原因为 None 表示保留
+    """
+    if isinstance(item, tuple):
+        path, size = item[0], item[1]
+    else:
+        path = os.fspath(item)
+        size = None
+    
+    # 压缩包成员文件总是保留，读取失败时在提取特征时处理
+    if archive_source.is_member_path(path):
+        return path, None, None
+    
+    # 压缩包不受扩展名和大小限制（成员按窗口读取），训练时展开
+    is_archive = archive_source.is_archive_file(path)
+    ext = os.path.splitext(path.lower())[1]
+    if ext not in keep_extensions and not is_archive:
+        return path, size, "不支持的扩展名"
+    
+    try:
+        if isinstance(item, os.DirEntry):
+            if not item.is_file():
+                return path, None, "文件不存在"
+            size = item.stat().st_size
+        elif size is None:
+            file_stat = os.stat(path)
+            if not stat.S_ISREG(file_stat.st_mode):
+                return path, None, "文件不存在"
+            size = file_stat.st_size
+    except FileNotFoundError:
+        return path, None, "文件不存在"
+    except OSError:
+        return path, None, "无法访问"
+    
+    if size <= 0:
+        return path, size, "空文件"
+    if max_file_size is not None and size > max_file_size and not is_archive:
+        return path, size, "超过大小限制"
+    if not os.access(path, os.R_OK):
+        return path, size, "无法访问"
+    return path, size, None
+
+
+def validate_training_files(items, keep_extensions=TRAINING_FILE_EXTENSIONS, max_file_size=None,
+                            num_threads=None, chunk_size=256):
+    """在一遍中检查训练文件的存在性、类型、扩展名和大小限制
+    
+    文件较多时把 stat 调用分块交给线程池并发执行（网络共享上 stat 延迟较高），
+    结果保持输入顺序。
+    
+    Args:
+        items: 文件路径、os.DirEntry 或 (path, size, mtime) 元组的列表
+        keep_extensions: 保留的扩展名集合
+        max_file_size: 文件大小上限（字节），None 表示不限制
+        num_threads: 线程数，None 时使用 PERFORMANCE_CONFIG 中的 io_threads
+        chunk_size: 每个线程任务处理的文件数
+    
+    Returns:
+        每个文件的 (path, size, 跳过原因) 列表，与 items 顺序一致
+    """
+    items = list(items)
+    if num_threads is None:
+        num_threads = PERFORMANCE_CONFIG.get("io_threads", 16)
+    
+    def check_chunk(chunk):
+        return [_check_training_file(item, keep_extensions, max_file_size) for item in chunk]
+    
+    if num_threads <= 1 or len(items) <= chunk_size:
+        return check_chunk(items)
+    
+    chunks = [items[i:i + chunk_size] for i in range(0, len(items), chunk_size)]
+    with ThreadPoolExecutor(max_workers=min(num_threads, len(chunks))) as executor:
+        return list(chain.from_iterable(executor.map(check_chunk, chunks)))
+
+
+# 模型、统计和特征缓存文件的默认目录
+DEFAULT_STORAGE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "model_data")
+
+
+class MalwareDetector:
+    # 特征数组的初始容量，词表增长时按倍数扩容
+    INITIAL_FEATURE_CAPACITY = 1024
+    
+    def __init__(self, storage_dir=None, feature_cache=None):
+        """
+        Args:
+            storage_dir: 模型、统计和特征缓存文件所在的目录，None 使用程序目录下的 model_data
+            feature_cache: 是否启用特征缓存，None 按 PERFORMANCE_CONFIG['cache_enabled']
+        """
+        # 模型核心数据结构：特征词表 + 按特征ID索引的权重和计数数组
+        self._model_mmap = None  # 从二进制模型文件映射加载时持有的 mmap
+        self._init_feature_tables()
+        
+        # 检查点状态：基础模型标识、已写入的增量检查点序号、未完成的训练进度
+        self._base_id = None
+        self._checkpoint_sequence = 0
+        self._training_progress = None
+        self.total_benign_files = 0
+        self.total_malicious_files = 0
+        self.model_version = "1.0"
+        self.last_trained = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
         
-        print(f"训练前白样本数量: {len(benign_files)}")
-        print(f"训练前黑样本数量: {len(malicious_files)}")
+        # 关键词特征
+        self.suspicious_keywords = [
+            "eval", "exec", "system", "os", "subprocess", "popen", 
+            "socket", "requests", "__import__", "globals", "locals",
+            "__dict__", "__getattribute__", "compile", "open", "write",
+            "read", "append", "delete", "importlib", "ctypes", "dll",
+            "registry", "self.replicate", "infect", "encrypt", "ransom",
+            "botnet", "payload", "trojan", "virus", "worm", "keylogger",
+            "reverse_shell", "cmd.exe", "powershell", "\\x", "base64",
+            "hex", "encode", "decode", "http", "https", "tcp", "udp"
+        ]
         
-        benign_files = filter_valid_files(benign_files)
-        malicious_files = filter_valid_files(malicious_files)
+        # 导入表特征
+        self.suspicious_imports = [
+            "os", "sys", "subprocess", "socket", "requests", "urllib",
+            "http.client", "pickle", "marshal", "importlib", "inspect",
+            "ctypes", "winreg", "win32api", "shutil", "tempfile",
+            "hashlib", "cryptography", "base64", "zlib", "gzip"
+        ]
         
-        print(f"过滤后白样本数量: {len(benign_files)}")
-        print(f"过滤后黑样本数量: {len(malicious_files)}")
-        print(f"增量训练模式: {is_incremental}")
-        print(f"训练前累计白样本数: {self.total_benign_files}")
-        print(f"训练前累计黑样本数: {self.total_malicious_files}")
+        # 模型配置参数
+        self.config = {
+            "min_feature_weight": 0.01,
+            "max_feature_weight": 4.0,  # 降低最大权重限制
+            "threshold": 3.2,  
+            "keyword_weight": 0.9,  # 降低关键词权重
+            "import_weight": 1.2,
+            "structural_weight": 1.5,
+            "byte_weight": 0.8,
+            "dynamic_adjustment_factor": 0.5,  # 增加动态调整因子
+            "incremental_update_factor": 0.3,  # 降低增量训练权重，避免权重过快增长
+            "full_window_entropy": False,  # 是否额外计算整个读取窗口的熵
+            "sliding_window_entropy": False,  # 是否计算滑动窗口熵特征
+            "entropy_window_size": 2048,  # 滑动窗口大小（字节）
+            "entropy_window_step": 1024  # 滑动窗口步长（字节）
+        }
         
-        # 批量处理文件以减少内存压力
-        def process_batch(file_batch, is_malicious):
-            nonlocal processed_files, errors
-            batch_errors = 0
-            
-            if use_parallel:
-                # 并行提取特征
-                print(f"开始并行提取 {len(file_batch)} 个文件的特征，恶意文件: {is_malicious}")
-                features_dict = self.extract_features_parallel(file_batch)
-                print(f"特征提取完成，成功提取 {len(features_dict)} 个文件的特征")
-                
-                # 更新特征权重
-                for file_path, features in features_dict.items():
-                    try:
-                        print(f"处理文件: {file_path}, 提取到 {len(features)} 个特征")
-                        self.update_feature_weights(features, is_malicious, is_incremental)
-                        if is_malicious:
-                            self.total_malicious_files += 1
-                            print(f"增加黑样本计数，当前累计: {self.total_malicious_files}")
-                        else:
-                            self.total_benign_files += 1
-                            print(f"增加白样本计数，当前累计: {self.total_benign_files}")
-                    except Exception as e:
-                        batch_errors += 1
-                        print(f"处理文件 {file_path} 时出错: {str(e)}")
-            else:
-                # 顺序处理（用于调试或特殊情况）
-                print(f"开始顺序处理 {len(file_batch)} 个文件，恶意文件: {is_malicious}")
-                for file_path in file_batch:
-                    try:
-                        features = self.extract_features(file_path)
-                        print(f"处理文件: {file_path}, 提取到 {len(features)} 个特征")
-                        self.update_feature_weights(features, is_malicious, is_incremental)
-                        if is_malicious:
-                            self.total_malicious_files += 1
-                            print(f"增加黑样本计数，当前累计: {self.total_malicious_files}")
-                        else:
-                            self.total_benign_files += 1
-                            print(f"增加白样本计数，当前累计: {self.total_benign_files}")
-                    except Exception as e:
-                        batch_errors += 1
-                        print(f"处理文件 {file_path} 时出错: {str(e)}")
-            
-            processed_files += len(file_batch)
-            errors += batch_errors
-            return batch_errors
+        # 特征提取器：预编译正则表达式和关键词自动机（关键词或导入表变化时自动重建）
+        self._feature_extractor = FeatureExtractor(self.suspicious_keywords, self.suspicious_imports, self.config)
         
-        update_progress(0, "开始预处理文件...")
+        # 多进程特征提取的进程池（按需创建，跨批次复用）
+        self._process_pool = None
+        self._process_pool_key = None
         
-        # 分批处理正常文件
-        for i in range(0, len(benign_files), batch_size):
-            batch = benign_files[i:i+batch_size]
-            update_progress(processed_files, f"处理正常文件批次 {i//batch_size+1}")
-            process_batch(batch, False)
+        # 日志：汇总信息正常输出，逐文件的警告经采样器限速
+        setup_logging(LOG_CONFIG)
+        self._log_sampler = LogSampler(
+            logger,
+            LOG_CONFIG.get("sample_interval_seconds", 10),
+            LOG_CONFIG.get("sample_max_records", 20)
+        )
         
-        # 分批处理恶意文件
-        for i in range(0, len(malicious_files), batch_size):
-            batch = malicious_files[i:i+batch_size]
-            update_progress(processed_files, f"处理恶意文件批次 {i//batch_size+1}")
-            process_batch(batch, True)
+        # 创建存储目录
+        self.storage_dir = storage_dir or DEFAULT_STORAGE_DIR
+        if not os.path.exists(self.storage_dir):
+            os.makedirs(self.storage_dir)
         
-        # 保存模型
-        save_success = self.save_model()
+        # 模型文件路径
+        self.model_path = os.path.join(self.storage_dir, "malware_model.bin")
+        self.legacy_model_path = os.path.join(self.storage_dir, "malware_model.pkl")  # 旧版 pickle 模型，加载时自动转换
+        self.stats_path = os.path.join(self.storage_dir, "training_stats.json")
+        self.feature_cache_path = os.path.join(self.storage_dir, "feature_cache.pkl")
+        
+        # 分阶段性能分析（enable_profiling 启用，None 表示关闭）
+        self._profiler = StageProfiler() if PERFORMANCE_CONFIG.get('profiling_enabled', False) else None
+        
+        # 特征缓存（默认由 PERFORMANCE_CONFIG 控制）
+        if feature_cache is None:
+            feature_cache = PERFORMANCE_CONFIG.get('cache_enabled', False)
+        self._feature_cache = None
+        if feature_cache:
+            self._feature_cache = FeatureCache(
+                self.feature_cache_path,
+                PERFORMANCE_CONFIG.get('cache_size_mb', 256),
+                self._feature_extractor.version
+            )
+            self._feature_cache.load()
         
-        # 计算训练时间
-        training_time = time.time() - start_time
+        # 尝试加载现有模型
+        self.load_model()
         
-        # 计算性能指标
-        files_per_second = (processed_files - errors) / max(1, training_time)
-        cpu_utilization = psutil.cpu_percent(interval=0.1)  # 获取CPU使用率
+    def _init_feature_tables(self):
+        """清空特征词表以及权重、计数数组"""
+        self._release_model_mmap()
+        self.vocabulary = FeatureVocabulary()
+        self._weights = np.zeros(self.INITIAL_FEATURE_CAPACITY, dtype=np.float64)
+        self._counts_benign = np.zeros(self.INITIAL_FEATURE_CAPACITY, dtype=np.int32)
+        self._counts_malicious = np.zeros(self.INITIAL_FEATURE_CAPACITY, dtype=np.int32)
+        # 自上次保存或检查点以来发生变化的特征ID，以及当时的词表大小
+        self._dirty = np.zeros(self.INITIAL_FEATURE_CAPACITY, dtype=bool)
+        self._persisted_size = 0
+    
+    def _mark_persisted(self):
+        """当前内存中的模型已全部写入磁盘"""
+        self._dirty[:] = False
+        self._persisted_size = len(self.vocabulary)
+    
+    def _mark_feature_dirty(self, feature_id):
+        """记录通过字典接口修改的特征"""
+        self._dirty[feature_id] = True
+    
+    def _release_model_mmap(self):
+        """断开与模型文件的映射：仍在使用的数组复制到内存后关闭 mmap
         
-        # 计算本次训练新增的样本数
-        new_malicious_files = self.total_malicious_files - initial_malicious_files
-        new_benign_files = self.total_benign_files - initial_benign_files
+        Windows 上被映射的文件不能替换或删除，保存和重置模型前需要先调用。
+        """
+        if self._model_mmap is None:
+            return
+        for attr in ('_weights', '_counts_benign', '_counts_malicious'):
+            array = getattr(self, attr, None)
+            if array is not None and not array.flags.owndata:
+                setattr(self, attr, array.copy())
+        try:
+            self._model_mmap.close()
+        except BufferError:
+            # 仍有外部引用的数组视图时交给垃圾回收关闭
+            pass
+        self._model_mmap = None
+    
+    def _ensure_feature_capacity(self, size):
+        """保证权重和计数数组能容纳 size 个特征
         
-        # 记录训练完成后的状态
-        print(f"训练完成！")
-        print(f"训练后累计白样本数: {self.total_benign_files}")
-        print(f"训练后累计黑样本数: {self.total_malicious_files}")
-        print(f"本次新增白样本数: {new_benign_files}")
-        print(f"本次新增黑样本数: {new_malicious_files}")
-        print(f"处理错误数: {errors}")
-        print(f"保存模型结果: {'成功' if save_success else '失败'}")
+        数组末尾始终保留至少一个未使用的位置（值为 0），未知特征的ID -1 正好取到它。
+        """
+        capacity = len(self._weights)
+        if size < capacity:
+            return
+        new_capacity = max(size + 1, capacity * 2)
+        for attr in ('_weights', '_counts_benign', '_counts_malicious', '_dirty'):
+            old_array = getattr(self, attr)
+            new_array = np.zeros(new_capacity, dtype=old_array.dtype)
+            new_array[:capacity] = old_array
+            setattr(self, attr, new_array)
+    
+    def _set_feature_tables(self, model):
+        """用 read_binary_model / read_pickle_model 的结果替换当前模型数据"""
+        self._init_feature_tables()
+        self.vocabulary = FeatureVocabulary.from_names(model["names"])
+        size = len(self.vocabulary)
+        if model.get("mmap") is not None:
+            # 数组直接使用映射的文件内容（末尾自带一个值为 0 的空位）
+            self._model_mmap = model["mmap"]
+            self._weights = model["weights"]
+            self._counts_benign = model["counts_benign"]
+            self._counts_malicious = model["counts_malicious"]
+            self._dirty = np.zeros(len(self._weights), dtype=bool)
+        else:
+            self._ensure_feature_capacity(size)
+            self._weights[:size] = model["weights"][:size]
+            self._counts_benign[:size] = model["counts_benign"][:size]
+            self._counts_malicious[:size] = model["counts_malicious"][:size]
+        self.total_benign_files = model["total_benign_files"]
+        self.total_malicious_files = model["total_malicious_files"]
+        self.model_version = model["metadata"].get("model_version", "1.0")
+        self.last_trained = model["metadata"].get("last_trained", datetime.now().strftime("%Y-%m-%d %H:%M:%S"))
+        self._base_id = model["metadata"].get("base_id")
+        self._training_progress = model["metadata"].get("training_progress")
+        self._checkpoint_sequence = 0
+        self._mark_persisted()
+    
+    @property
+    def feature_weights(self):
+        """特征权重（字典接口视图，底层为按特征ID索引的数组）"""
+        return FeatureArrayView(self.vocabulary, lambda: self._weights, self._ensure_feature_capacity,
+                                on_change=self._mark_feature_dirty)
+    
+    @property
+    def feature_counts_benign(self):
+        """特征在正常文件中出现的次数（字典接口视图）"""
+        return FeatureArrayView(self.vocabulary, lambda: self._counts_benign,
+                                self._ensure_feature_capacity, skip_zero=True, on_change=self._mark_feature_dirty)
+    
+    @property
+    def feature_counts_malicious(self):
+        """特征在恶意文件中出现的次数（字典接口视图）"""
+        return FeatureArrayView(self.vocabulary, lambda: self._counts_malicious,
+                                self._ensure_feature_capacity, skip_zero=True, on_change=self._mark_feature_dirty)
+    
+    def encode_features(self, features, add=False):
+        """把特征字典编码为 (ids, values) 数组，未知特征的ID为 -1"""
+        return self.vocabulary.encode(features, add=add)
+    
+    def _gather_weights(self, ids):
+        """按特征ID取权重，未知特征（ID为 -1）取到数组末尾的空位，权重为 0"""
+        return self._weights[ids]
+    
+    def load_model(self):
+        """加载训练好的模型
         
+        优先通过 mmap 加载二进制模型文件，并依次应用其后写入的增量检查点；
+        只有旧版 pickle 模型时加载后自动转换为二进制格式。
+        """
+        if os.path.exists(self.model_path):
+            try:
+                self._set_feature_tables(read_binary_model(self.model_path))
+                self._replay_checkpoints()
+                print("模型加载成功")
+            except Exception as e:
+                print(f"模型加载失败: {str(e)}")
+        elif os.path.exists(self.legacy_model_path):
+            try:
+                self._set_feature_tables(read_pickle_model(self.legacy_model_path))
+                print("模型加载成功")
+            except Exception as e:
+                print(f"模型加载失败: {str(e)}")
+                return
+            try:
+                feature_count = convert_pickle_model(self.legacy_model_path, self.model_path)
+                print(f"已将旧版模型转换为二进制格式（{feature_count} 个特征）")
+            except Exception as e:
+                print(f"模型格式转换失败: {str(e)}")
+    
+    def save_model(self):
+        """保存完整模型到文件，并清除已合并的增量检查点"""
+        try:
+            self._write_base_model()
+            
+            # 同时保存特征缓存
+            self.save_feature_cache()
+                
+            print("模型保存成功")
+            return True
+        except Exception as e:
+            print(f"模型保存失败: {str(e)}")
+            return False
+    
+    def _write_base_model(self, training_progress=None):
+        """写入完整的二进制模型（原子替换），删除旧的增量检查点"""
+        last_trained = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        base_id = os.urandom(8).hex()
+        # 先断开映射，保证可以替换模型文件
+        self._release_model_mmap()
+        write_binary_model(
+            self.model_path,
+            self.vocabulary.names,
+            self._weights,
+            self._counts_benign,
+            self._counts_malicious,
+            self.total_benign_files,
+            self.total_malicious_files,
+            {
+                "model_version": self.model_version,
+                "last_trained": last_trained,
+                "base_id": base_id,
+                "training_progress": training_progress
+            }
+        )
+        self._base_id = base_id
+        self._training_progress = training_progress
+        self._checkpoint_sequence = 0
+        self._mark_persisted()
+        self._remove_checkpoints()
+        self._write_training_stats(last_trained)
+    
+    def _write_training_stats(self, last_trained):
+        """保存训练统计信息（先写临时文件再原子替换）"""
         stats = {
-            "total_files": total_files,
-            "processed_files": processed_files - errors,
-            "errors": errors,
-            "training_time": training_time,
-            "benign_files": len(benign_files),
-            "malicious_files": len(malicious_files),
-            "new_benign_files": new_benign_files,
-            "new_malicious_files": new_malicious_files,
-            "files_per_second": files_per_second,
-            "cpu_utilization": cpu_utilization,
-            "save_success": save_success
+            "total_benign_files": self.total_benign_files,
+            "total_malicious_files": self.total_malicious_files,
+            "feature_count": len(self.vocabulary),
+            "last_trained": last_trained
         }
+        temp_path = self.stats_path + ".tmp"
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(stats, f, ensure_ascii=False, indent=2)
+        os.replace(temp_path, self.stats_path)
+    
+    def _list_checkpoints(self):
+        """返回按序号排列的增量检查点文件 [(序号, 路径), ...]"""
+        prefix = os.path.basename(self.model_path) + ".delta."
+        checkpoints = []
+        for name in os.listdir(self.storage_dir):
+            if name.startswith(prefix) and name[len(prefix):].isdigit():
+                checkpoints.append((int(name[len(prefix):]), os.path.join(self.storage_dir, name)))
+        checkpoints.sort()
+        return checkpoints
+    
+    def _remove_checkpoints(self):
+        """删除所有增量检查点文件"""
+        for _, checkpoint_path in self._list_checkpoints():
+            try:
+                os.remove(checkpoint_path)
+            except OSError as e:
+                print(f"删除检查点失败 {checkpoint_path}: {str(e)}")
+    
+    def save_checkpoint(self, training_progress=None):
+        """写入增量检查点
         
-        update_progress(total_files, "训练完成")
+        只记录自上次保存或检查点以来新增的特征名，以及权重或计数发生变化的特征的当前值，
+        每个检查点单独写临时文件再原子重命名。还没有基础模型或检查点数量超过
+        MODEL_CONFIG['checkpoint']['max_deltas'] 时改为写入完整模型。
         
-        # 清理临时文件以确保安全
-        if hasattr(self, '_temp_extract_dir') and os.path.exists(self._temp_extract_dir):
+        Args:
+            training_progress: 可选，未完成训练的进度信息，用于中断后续训
+        
+        Returns:
+            是否成功
+        """
+        try:
+            max_deltas = MODEL_CONFIG.get('checkpoint', {}).get('max_deltas', 20)
+            if (self._base_id is None or not os.path.exists(self.model_path)
+                    or self._checkpoint_sequence >= max_deltas):
+                self._write_base_model(training_progress)
+                print("检查点已保存（完整模型）")
+                return True
+            
+            size = len(self.vocabulary)
+            changed_ids = np.flatnonzero(self._dirty[:size])
+            sequence = self._checkpoint_sequence + 1
+            last_trained = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+            record = {
+                "base_id": self._base_id,
+                "sequence": sequence,
+                "start_size": self._persisted_size,
+                "new_names": self.vocabulary.names[self._persisted_size:size],
+                "ids": changed_ids,
+                "weights": self._weights[changed_ids],
+                "counts_benign": self._counts_benign[changed_ids],
+                "counts_malicious": self._counts_malicious[changed_ids],
+                "total_benign_files": self.total_benign_files,
+                "total_malicious_files": self.total_malicious_files,
+                "model_version": self.model_version,
+                "last_trained": last_trained,
+                "training_progress": training_progress
+            }
+            
+            # 清除上次中断后残留的、序号不连续的检查点
+            for stale_sequence, stale_path in self._list_checkpoints():
+                if stale_sequence >= sequence:
+                    os.remove(stale_path)
+            
+            checkpoint_path = f"{self.model_path}.delta.{sequence:06d}"
+            temp_path = checkpoint_path + ".tmp"
+            with open(temp_path, 'wb') as f:
+                pickle.dump(record, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(temp_path, checkpoint_path)
+            
+            self._checkpoint_sequence = sequence
+            self._training_progress = training_progress
+            self._mark_persisted()
+            self._write_training_stats(last_trained)
+            print(f"检查点已保存（第 {sequence} 个增量，{len(changed_ids)} 个特征变化）")
+            return True
+        except Exception as e:
+            print(f"检查点保存失败: {str(e)}")
+            return False
+    
+    def _replay_checkpoints(self):
+        """在已加载的基础模型上依次应用增量检查点"""
+        applied = 0
+        for sequence, checkpoint_path in self._list_checkpoints():
             try:
-                import shutil
-                shutil.rmtree(self._temp_extract_dir)
-                print(f"安全删除临时解压目录: {self._temp_extract_dir}")
-                # 清理相关属性
-                delattr(self, '_temp_extract_dir')
+                with open(checkpoint_path, 'rb') as f:
+                    record = pickle.load(f)
             except Exception as e:
-                print(f"删除临时目录失败: {str(e)}")
+                print(f"检查点读取失败，停止应用后续检查点 {checkpoint_path}: {str(e)}")
+                break
+            
+            # 属于旧基础模型的检查点已合并，跳过
+            if record.get("base_id") != self._base_id:
+                continue
+            if record["sequence"] != self._checkpoint_sequence + 1 or record["start_size"] != len(self.vocabulary):
+                print(f"检查点不连续，停止应用后续检查点: {checkpoint_path}")
+                break
+            
+            for name in record["new_names"]:
+                self.vocabulary.add(name)
+            self._ensure_feature_capacity(len(self.vocabulary))
+            ids = record["ids"]
+            self._weights[ids] = record["weights"]
+            self._counts_benign[ids] = record["counts_benign"]
+            self._counts_malicious[ids] = record["counts_malicious"]
+            self.total_benign_files = record["total_benign_files"]
+            self.total_malicious_files = record["total_malicious_files"]
+            self.model_version = record["model_version"]
+            self.last_trained = record["last_trained"]
+            self._training_progress = record["training_progress"]
+            self._checkpoint_sequence = sequence
+            applied += 1
+        
+        self._mark_persisted()
+        if applied:
+            print(f"已应用 {applied} 个增量检查点")
+    
+    def save_feature_cache(self):
+        """保存特征缓存到磁盘"""
+        if self._feature_cache is not None:
+            return self._feature_cache.save()
+        return False
+    
+    def get_feature_cache_stats(self):
+        """获取特征缓存的命中统计，未启用缓存时返回 None"""
+        if self._feature_cache is not None:
+            return self._feature_cache.get_stats()
+        return None
+    
+    def enable_profiling(self, enabled=True):
+        """启用或关闭分阶段性能分析
         
-        # 清理内存中的压缩包文件内容
-        if hasattr(self, '_archive_file_contents'):
-            self._archive_file_contents.clear()
-            print("清理内存中的压缩包文件内容")
+        启用后 extract_features、predict、批量检测和训练（map-reduce 训练除外）中的特征提取
+        记录各阶段的耗时和计数（见 profiling.py），通过 get_profile 读取。重复启用时保留已有的统计。
         
-        return stats
+        Returns:
+            当前的 StageProfiler，关闭时为 None
+        """
+        if not enabled:
+            self._profiler = None
+        elif self._profiler is None:
+            self._profiler = StageProfiler()
+        return self._profiler
     
-    def predict_batch(self, file_paths, use_parallel=True):
-        """批量预测文件
+    def get_profile(self, reset=False):
+        """获取分阶段性能分析结果
         
         Args:
-            file_paths: 文件路径列表
-            use_parallel: 是否使用并行处理
+            reset: 读取后是否清空统计（按批次读取时使用）
         
         Returns:
-            字典 {file_path: prediction_result}
+            StageProfiler.to_dict() 的结果，未启用时为 None
         """
-        start_time = time.time()
-        results = {}
-        
-        if use_parallel:
-            # 并行提取特征
-            features_dict = self.extract_features_parallel(file_paths)
-            
-            # 批量预测
-            for file_path, features in features_dict.items():
-                # 计算恶意分数
-                malicious_score = 0.0
-                matched_features = []
-                
-                for feature, value in features.items():
-                    weight = self.feature_weights.get(feature, 0.0)
-                    if weight > 0:
-                        score = value * weight
-                        malicious_score += score
-                        matched_features.append((feature, score))
-                
-                # 归一化分数
-                if malicious_score > 0:
-                    total_files = max(1, self.total_benign_files + self.total_malicious_files)
-                    norm_factor = min(1.0, 100.0 / total_files)
-                    malicious_score = min(1.0, malicious_score * norm_factor)
-                
-                # 判定结果
-                is_malicious = malicious_score >= self.config["threshold"]
-                
-                # 按分数排序特征
-                matched_features.sort(key=lambda x: x[1], reverse=True)
-                
-                results[file_path] = {
-                    "is_malicious": is_malicious,
-                    "score": malicious_score,
-                    "matched_features": matched_features[:20],
-                    "total_features": len(features),
-                    "threshold": self.config["threshold"]
-                }
-        else:
-            # 顺序预测
-            for file_path in file_paths:
-                results[file_path] = self.predict(file_path)
+        profiler = self._profiler
+        if profiler is None:
+            return None
+        profile = profiler.to_dict()
+        if reset:
+            profiler.reset()
+        return profile
+    
+    def _get_feature_extractor(self):
+        """获取特征提取器，关键词、导入表或提取相关配置被修改后自动重建"""
+        extractor = self._feature_extractor
+        if (extractor.keywords != tuple(self.suspicious_keywords) or
+                extractor.suspicious_imports != tuple(self.suspicious_imports) or
+                extractor.config_snapshot != FeatureExtractor.snapshot_config(self.config)):
+            extractor = FeatureExtractor(self.suspicious_keywords, self.suspicious_imports, self.config)
+            self._feature_extractor = extractor
+            # 提取结果可能变化，旧缓存失效
+            if self._feature_cache is not None and self._feature_cache.extractor_version != extractor.version:
+                self._feature_cache.reset(extractor.version)
+        return extractor
+    
+    def extract_features(self, file_path):
+        """从文件中提取特征，支持磁盘文件和压缩包成员文件（"压缩包路径::成员名"）
         
-        # 计算性能指标
-        processing_time = time.time() - start_time
-        files_per_second = len(file_paths) / max(1, processing_time)
+        启用特征缓存时，未修改的文件或内容相同的文件直接返回缓存的特征。
+        """
+        features = {}
+        try:
+            return _extract_path_features(self._get_feature_extractor(), file_path, features, self._feature_cache,
+                                          profiler=self._profiler)[0]
+        except Exception as e:
+            # 使用静默错误处理，不打印每个文件的错误以提高性能
+            # 避免使用可能导致进一步错误的特征键格式
+            features["error_processing"] = 1.0
+            features["file_size_unknown"] = 1.0
         
-        # 添加性能信息
-        results['_performance'] = {
-            'total_files': len(file_paths),
-            'processing_time': processing_time,
-            'files_per_second': files_per_second,
-            'cpu_utilization': psutil.cpu_percent(interval=0.1)
-        }
+        return features
+    
+    def _get_process_pool(self, num_workers):
+        """获取多进程特征提取的进程池
         
-        return results
+        工作进程只在启动时接收一次提取器配置（关键词、导入表和提取相关参数），
+        之后每个任务只传递文件路径。提取器配置变化时重建进程池。
+        """
+        extractor = self._get_feature_extractor()
+        pool_key = (num_workers, extractor.version)
+        if self._process_pool is None or self._process_pool_key != pool_key:
+            self.shutdown_workers()
+            extractor_config = {key: self.config[key] for key in FeatureExtractor.CONFIG_KEYS}
+            self._process_pool = ProcessPoolExecutor(
+                max_workers=num_workers,
+                initializer=_init_extraction_worker,
+                initargs=(extractor.keywords, extractor.suspicious_imports, extractor_config)
+            )
+            self._process_pool_key = pool_key
+        return self._process_pool
     
-    def reset_model(self):
-        """重置模型，清除所有学习数据"""
-        # 清除内存中的模型数据
-        self.feature_weights = defaultdict(float)
-        self.feature_counts_benign = defaultdict(int)
-        self.feature_counts_malicious = defaultdict(int)
-        self.total_benign_files = 0
-        self.total_malicious_files = 0
-        self.last_trained = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    def shutdown_workers(self):
+        """关闭多进程特征提取的进程池"""
+        if self._process_pool is not None:
+            self._process_pool.shutdown(wait=True)
+            self._process_pool = None
+            self._process_pool_key = None
+    
+    def _iter_extract_multiprocess(self, file_paths, num_workers, chunk_size=None, max_in_flight=None):
+        """使用进程池分块提取特征，按完成顺序逐个产出 (file_path, features)
         
-        # 删除模型文件
-        if os.path.exists(self.model_path):
-            try:
-                os.remove(self.model_path)
-                print("模型文件已删除")
-            except Exception as e:
-                print(f"删除模型文件失败: {str(e)}")
+        缓存命中的文件在主进程处理；其余路径（包括压缩包成员）按块分发给工作进程，
+        同时在途的块数量默认限制为工作进程数的两倍，保证所有核心都有任务且内存占用有界。
+        路径按需从 file_paths 中读取，调用方停止消费时不会再提交新的块。
+        """
+        cache = self._feature_cache
+        profiler = self._profiler
         
-        # 删除统计文件
-        if hasattr(self, 'stats_path') and os.path.exists(self.stats_path):
-            try:
-                os.remove(self.stats_path)
-                print("统计文件已删除")
-            except Exception as e:
-                print(f"删除统计文件失败: {str(e)}")
+        if chunk_size is None:
+            if hasattr(file_paths, '__len__'):
+                # 块足够大以摊薄进程间通信开销，又足够小以保证负载均衡
+                chunk_size = max(1, min(256, len(file_paths) // (num_workers * 4)))
+            else:
+                chunk_size = 64
+        if max_in_flight is None:
+            max_in_flight = num_workers * 2
+        max_in_flight = max(1, max_in_flight)
+        
+        pool = self._get_process_pool(num_workers)
+        want_cache_key = cache is not None
+        path_iter = iter(file_paths)
+        exhausted = False
+        in_flight = {}
         
-        print("模型已重置，请重新训练")
-    
-    def clamp_existing_weights(self):
-        """限制现有特征权重在配置范围内"""
-        clamped_count = 0
-        for feature in list(self.feature_weights.keys()):
-            old_weight = self.feature_weights[feature]
-            clamped_weight = max(
-                self.config["min_feature_weight"],
-                min(self.config["max_feature_weight"], old_weight)
-            )
-            if old_weight != clamped_weight:
-                self.feature_weights[feature] = clamped_weight
-                clamped_count += 1
-        print(f"已限制 {clamped_count} 个特征的权重在有效范围内")
-        return clamped_count
-    
-    def predict(self, file_path):
-        """预测文件是否为恶意文件"""
         try:
-            features = self.extract_features(file_path)
-            
-            # 计算恶意分数
-            malicious_score = 0.0
-            matched_features = []
-            
-            for feature, value in features.items():
-                # 获取权重并确保在有效范围内
-                weight = self.feature_weights.get(feature, 0.0)
-                # 确保权重在配置的最小和最大值之间
-                clamped_weight = max(
-                    self.config["min_feature_weight"],
-                    min(self.config["max_feature_weight"], weight)
-                )
+            while not exhausted or in_flight:
+                # 补充任务直到在途块数达到上限
+                while not exhausted and len(in_flight) < max_in_flight:
+                    chunk = []
+                    while len(chunk) < chunk_size:
+                        try:
+                            file_path = next(path_iter)
+                        except StopIteration:
+                            exhausted = True
+                            break
+                        if cache is not None:
+                            try:
+                                file_stat = path_stat(file_path)
+                                cached = file_stat and cache.lookup_path(file_path, *file_stat)
+                                if cached is not None:
+                                    yield file_path, cached
+                                    continue
+                            except (OSError, KeyError, zipfile.BadZipFile):
+                                pass
+                        chunk.append(file_path)
+                    if chunk:
+                        in_flight[pool.submit(_extract_features_chunk, chunk, want_cache_key,
+                                              archive_source.passwords_for(chunk), profiler is not None)] = chunk
                 
-                if clamped_weight > 0:
-                    # 使用限制后的权重计算分数
-                    score = value * clamped_weight
-                    malicious_score += score
-                    # 存储限制后的权重和计算后的分数，确保调试信息准确
-                    matched_features.append((feature, clamped_weight, score))
-            
-            # 全面改进的归一化逻辑，大幅降低分数，特别是对非可执行文件
-            if malicious_score > 0:
-                matched_count = len(matched_features)
-                if matched_count > 0:
-                    # 1. 增强的基础归一化，强度约为修改前的90%
-                    base_norm_factor = 1.0 / (max(1.0, matched_count * self.config["max_feature_weight"] * 0.0022))
-                    
-                    # 2. 应用基础归一化
-                    malicious_score = malicious_score * base_norm_factor
-                    
-                    # 3. 较强的全局缩放，强度约为修改前的90%
-                    malicious_score = malicious_score * 0.22
-                    
-                    # 4. 关键词特征特殊处理 - 强度约为修改前的90%
-                    keyword_features = sum(1 for f, _, _ in matched_features if f.startswith('keyword_'))
-                    if keyword_features > 0:
-                        # 对关键词特征的影响进行较强衰减
-                        keyword_ratio = keyword_features / matched_count
-                        malicious_score = malicious_score * (1 - keyword_ratio * 0.65)
-                    
-                    # 5. 基于特征权重的智能调整 - 强度约为修改前的90%
-                    avg_feature_weight = sum(w for _, w, _ in matched_features) / matched_count
-                    if avg_feature_weight > 1.1:
-                        # 在较高权重时较强降低影响
-                        malicious_score = malicious_score * (1 - (avg_feature_weight - 1.1) * 0.18)
+                if not in_flight:
+                    continue
+                
+                done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in done:
+                    chunk = in_flight.pop(future)
+                    try:
+                        chunk_results, chunk_profile = future.result()
+                    except Exception:
+                        # 忽略单个块的错误
+                        chunk_results, chunk_profile = [(file_path, {}, None) for file_path in chunk], None
+                    if profiler is not None:
+                        profiler.merge(chunk_profile)
                     
-                    # 6. 特征数量补偿 - 强度约为修改前的90%
-                    if matched_count > 5:
-                        # 超过5个特征时较强降低分数
-                        feature_overload_factor = 1.0 / (1.0 + (matched_count - 5) * 0.09)
-                        malicious_score = malicious_score * feature_overload_factor
+                    for file_path, features, cache_record in chunk_results:
+                        if cache is not None and cache_record is not None:
+                            cache.put(cache_record[0], features, file_path, cache_record[1], cache_record[2])
+                        yield file_path, features
+        finally:
+            # 调用方提前结束迭代时取消尚未开始的块
+            for future in in_flight:
+                future.cancel()
+    
+    def _iter_extract_threaded(self, file_paths, num_workers, max_in_flight=None):
+        """使用线程池提取特征，按完成顺序逐个产出 (file_path, features)
+        
+        同时提交的任务数量有上限，调用方消费变慢时不再提交新任务。
+        """
+        max_workers = min(num_workers * 2, 32)  # IO密集型可以使用更多线程
+        if max_in_flight is None:
+            max_in_flight = max_workers * 2
+        max_in_flight = max(1, max_in_flight)
+        
+        path_iter = iter(file_paths)
+        exhausted = False
+        in_flight = {}
+        
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            try:
+                while not exhausted or in_flight:
+                    while not exhausted and len(in_flight) < max_in_flight:
+                        try:
+                            file_path = next(path_iter)
+                        except StopIteration:
+                            exhausted = True
+                            break
+                        in_flight[executor.submit(self.extract_features, file_path)] = file_path
                     
-                    # 7. 低权重特征的额外衰减 - 强度约为修改前的90%
-                    low_weight_features = sum(1 for _, w, _ in matched_features if w < 0.1)
-                    if low_weight_features > 0:
-                        # 大量低权重特征通常表示误匹配，较强降低分数
-                        low_weight_ratio = low_weight_features / matched_count
-                        if low_weight_ratio > 0.51:
-                            # 如果超过51%是低权重特征，较强降低分数
-                            malicious_score = malicious_score * 0.52
+                    if not in_flight:
+                        continue
                     
-                    # 只保留下限，确保分数不为负
-                    malicious_score = max(0.0, malicious_score)
-                else:
-                    malicious_score = 0.0
-            
-            # 判定结果
-            is_malicious = malicious_score >= self.config["threshold"]
-            
-            # 按计算后的分数排序特征
-            matched_features.sort(key=lambda x: x[2], reverse=True)
-            
-            # 转换为用户友好的格式
-            formatted_features = [(feature, f"{weight:.4f}", f"{score:.4f}") 
-                                 for feature, weight, score in matched_features[:20]]
-            
-            return {
-                "is_malicious": is_malicious,
-                "score": malicious_score,
-                "matched_features": formatted_features,
-                "total_features": len(features),
-                "threshold": self.config["threshold"]
-            }
-        except Exception as e:
-            print(f"预测失败 ({file_path}): {str(e)}")
-            return {
-                "is_malicious": False,
-                "score": 0.0,
-                "matched_features": [],
-                "error": str(e)
-            }
+                    done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        file_path = in_flight.pop(future)
+                        try:
+                            features = future.result()
+                        except Exception:
+                            # 忽略单个文件的错误
+                            features = {}
+                        yield file_path, features
+            finally:
+                for future in in_flight:
+                    future.cancel()
     
-    def evaluate(self, benign_test_files, malicious_test_files):
-        """评估模型性能"""
-        true_positives = 0  # 正确识别的恶意文件
-        false_negatives = 0  # 漏报的恶意文件
-        true_negatives = 0  # 正确识别的正常文件
-        false_positives = 0  # 误报的正常文件
-        
-        # 评估恶意文件
-        for file_path in malicious_test_files:
-            result = self.predict(file_path)
-            if result["is_malicious"]:
-                true_positives += 1
-            else:
-                false_negatives += 1
+    def _iter_stream_archive_features(self, archive_paths, num_workers=None, use_multiprocessing=False,
+                                      chunk_size=64):
+        """顺序解压 tar、gz 等压缩包，逐个产出其中每个成员的 (member_path, features)
         
-        # 评估正常文件
-        for file_path in benign_test_files:
-            result = self.predict(file_path)
-            if not result["is_malicious"]:
-                true_negatives += 1
-            else:
-                false_positives += 1
+        解压在当前线程中进行（zlib/bz2/lzma 解压时释放 GIL），每个成员只保留特征窗口。
+        使用多进程时窗口按块交给工作进程提取特征，解压与特征提取并行；否则在当前线程提取。
+        特征缓存按内容键查询和写入。压缩包损坏时记录警告，保留已解压成员的结果。
+        """
+        cache = self._feature_cache
+        profiler = self._profiler
+        extractor = self._get_feature_extractor()
+        pool = None
+        if use_multiprocessing:
+            if num_workers is None:
+                num_workers = multiprocessing.cpu_count()
+            pool = self._get_process_pool(num_workers)
+            max_in_flight = num_workers * 2
+        in_flight = {}
+        
+        def collect(return_when):
+            done, _ = wait(in_flight, return_when=return_when)
+            for future in done:
+                chunk = in_flight.pop(future)
+                try:
+                    chunk_results, chunk_profile = future.result()
+                except Exception:
+                    chunk_results, chunk_profile = [(item[0], {}, None) for item in chunk], None
+                if profiler is not None:
+                    profiler.merge(chunk_profile)
+                for member_path, features, cache_record in chunk_results:
+                    if cache is not None and cache_record is not None:
+                        cache.put(cache_record[0], features, member_path, cache_record[1], cache_record[2])
+                    yield member_path, features
         
-        # 计算评估指标
-        total_malicious = len(malicious_test_files)
-        total_benign = len(benign_test_files)
+        try:
+            for archive_path in archive_paths:
+                chunk = []
+                try:
+                    mtime_ns = archive_source.archive_mtime_ns(archive_path)
+                    for member_path, file_size, window in archive_source.iter_archive_windows(archive_path):
+                        if pool is None:
+                            features = {}
+                            if profiler is not None:
+                                profiler.count("files")
+                                profiler.count("bytes_read", len(window))
+                            try:
+                                features, _ = _extract_window_features(extractor, member_path, window, file_size,
+                                                                       mtime_ns, features, cache, profiler=profiler)
+                            except Exception:
+                                features["error_processing"] = 1.0
+                                features["file_size_unknown"] = 1.0
+                            yield member_path, features
+                            continue
+                        
+                        chunk.append((member_path, file_size, mtime_ns, window))
+                        if len(chunk) >= chunk_size:
+                            in_flight[pool.submit(_extract_windows_chunk, chunk, cache is not None,
+                                                  profiler is not None)] = chunk
+                            chunk = []
+                            if len(in_flight) >= max_in_flight:
+                                yield from collect(FIRST_COMPLETED)
+                except Exception as e:
+                    logger.warning("解压压缩包 %s 时出错: %s", archive_path, e)
+                if chunk:
+                    in_flight[pool.submit(_extract_windows_chunk, chunk, cache is not None,
+                                          profiler is not None)] = chunk
+            while in_flight:
+                yield from collect(FIRST_COMPLETED)
+        finally:
+            for future in in_flight:
+                future.cancel()
+    
+    def iter_extract_features(self, file_paths, num_workers=None, use_multiprocessing=False, max_in_flight=None,
+                              expand_archives=False):
+        """流式并行提取特征，按完成顺序逐个产出 (file_path, features)
+        
+        与 extract_features_parallel 不同，结果不会累积在内存中；在途任务数量有上限，
+        因此无论输入多大，峰值内存都保持平稳。
+        
+        Args:
+            file_paths: 文件路径的可迭代对象（列表或生成器均可）
+            num_workers: 工作线程/进程数量，如果为None则使用CPU核心数
+            use_multiprocessing: 是否使用多进程（对于CPU密集型任务更有效）
+            max_in_flight: 同时在途的任务数上限（多进程时为块数），None 表示使用默认值
+            expand_archives: 是否展开 file_paths 中的压缩包，为其中每个成员产出一项（file_path
+                为成员虚拟路径）。ZIP 成员与普通文件一起并行解压；tar、gz 等压缩包在普通文件
+                之后顺序解压（见 _iter_stream_archive_features）。展开时会先读完 file_paths
         
-        # 准确率
-        accuracy = (true_positives + true_negatives) / max(1, total_malicious + total_benign)
+        Yields:
+            (file_path, features) 元组
+        """
+        if num_workers is None:
+            num_workers = multiprocessing.cpu_count()
         
-        # 精确率（查准率）
-        precision = true_positives / max(1, true_positives + false_positives)
+        if expand_archives:
+            file_paths, stream_archives = archive_source.expand_archives(file_paths)
+            yield from self.iter_extract_features(file_paths, num_workers, use_multiprocessing, max_in_flight)
+            yield from self._iter_stream_archive_features(stream_archives, num_workers, use_multiprocessing)
+            return
         
-        # 召回率（查全率）- 特别关注，因为要降低危险文件的漏报率
-        recall = true_positives / max(1, total_malicious)
+        # 小批量文件使用多线程更高效；长度未知的输入视为大批量
+        if use_multiprocessing and (not hasattr(file_paths, '__len__') or len(file_paths) > 10):
+            # 使用多进程处理CPU密集型任务（工作进程只持有提取器配置，按块处理文件）
+            yield from self._iter_extract_multiprocess(file_paths, num_workers, max_in_flight=max_in_flight)
+        else:
+            # 使用多线程处理IO密集型任务
+            yield from self._iter_extract_threaded(file_paths, num_workers, max_in_flight=max_in_flight)
+    
+    def extract_features_parallel(self, file_paths, num_workers=None, use_multiprocessing=False):
+        """并行提取多个文件的特征
         
-        # F1分数
-        f1_score = 2 * (precision * recall) / max(1, precision + recall)
+        Args:
+            file_paths: 文件路径列表
+            num_workers: 工作线程/进程数量，如果为None则使用CPU核心数
+            use_multiprocessing: 是否使用多进程（对于CPU密集型任务更有效）
         
-        # 漏报率
-        false_negative_rate = false_negatives / max(1, total_malicious)
+        Returns:
+            字典 {file_path: features}
+        """
+        results = {}
         
-        # 误报率
-        false_positive_rate = false_positives / max(1, total_benign)
+        if not file_paths:
+            return results
         
-        return {
-            "accuracy": accuracy,
-            "precision": precision,
-            "recall": recall,
-            "f1_score": f1_score,
-            "false_negative_rate": false_negative_rate,
-            "false_positive_rate": false_positive_rate,
-            "true_positives": true_positives,
-            "false_positives": false_positives,
-            "true_negatives": true_negatives,
-            "false_negatives": false_negatives,
-            "total_malicious_tested": total_malicious,
-            "total_benign_tested": total_benign
-        }
+        for file_path, features in self.iter_extract_features(file_paths, num_workers, use_multiprocessing):
+            results[file_path] = features
+        
+        return results
     
-    def get_top_features(self, n=20):
-        """获取最重要的特征"""
-        sorted_features = sorted(self.feature_weights.items(), key=lambda x: x[1], reverse=True)
-        return sorted_features[:n]
+    @staticmethod
+    def _balance_factor(total_benign_files, total_malicious_files, is_malicious):
+        """计算样本平衡因子：样本较少的类别获得更高的权重更新"""
+        total_samples = max(1, total_benign_files + total_malicious_files)
+        benign_ratio = total_benign_files / total_samples if total_samples > 0 else 0.5
+        malicious_ratio = 1.0 - benign_ratio
+        
+        balance_factor = 1.0
+        if is_malicious and malicious_ratio < 0.5:
+            balance_factor = 0.5 / max(0.01, malicious_ratio)
+        elif not is_malicious and benign_ratio < 0.5:
+            balance_factor = 0.5 / max(0.01, benign_ratio)
+        return balance_factor
     
-    def get_model_info(self):
-        """获取模型信息"""
-        return {
-            "model_version": self.model_version,
-            "last_trained": self.last_trained,
-            "total_benign_files": self.total_benign_files,
-            "total_malicious_files": self.total_malicious_files,
-            "total_features": len(self.feature_weights),
-            "threshold": self.config["threshold"]
-        }
-
-
-class MalwareDetectorUI:
-    def __init__(self, root):
-        self.root = root
-        # 使用配置文件中的窗口设置
-        self.root.title(UI_CONFIG['window_title'])
-        self.root.geometry(f"{UI_CONFIG['window_width']}x{UI_CONFIG['window_height']}")
-        self.root.resizable(UI_CONFIG['resizable'], UI_CONFIG['resizable'])
+    def update_feature_weights(self, features, is_malicious, is_incremental=False):
+        """更新特征权重，添加样本平衡处理和权重限制"""
+        update_factor = self.config["incremental_update_factor"] if is_incremental else 1.0
         
-        # 从配置文件加载颜色主题
-        self.colors = UI_CONFIG['colors']
+        # 计算样本平衡因子 - 解决样本不平衡问题
+        balance_factor = self._balance_factor(self.total_benign_files, self.total_malicious_files, is_malicious)
         
-        # 创建恶意文件检测器实例
-        self.detector = MalwareDetector()
+        try:
+            # 新特征分配ID，然后对所有特征一次性更新计数和权重
+            ids, values = self.vocabulary.encode(features, add=True)
+            self._ensure_feature_capacity(len(self.vocabulary))
+            
+            # 更新特征计数
+            if is_malicious:
+                self._counts_malicious[ids] += 1
+                # 恶意文件中发现特征，增加权重
+                weight_increments = values * 0.1 * update_factor * balance_factor
+            else:
+                self._counts_benign[ids] += 1
+                # 正常文件中发现特征，减少权重
+                weight_increments = -values * 0.05 * update_factor * self.config["dynamic_adjustment_factor"] * balance_factor
+            
+            # 应用权重更新并严格限制权重范围（新特征的当前权重为 0）
+            bounded_weights = np.clip(
+                self._weights[ids] + weight_increments,
+                self.config["min_feature_weight"],
+                self.config["max_feature_weight"]
+            )
+            self._weights[ids] = bounded_weights
+            self._dirty[ids] = True
+            
+            # 调试输出，监控权重异常
+            for i in np.flatnonzero(np.abs(bounded_weights) > 9.5):
+                self._log_sampler.warning("警告: 特征 %s 权重过高: %s", self.vocabulary.names[ids[i]], bounded_weights[i])
+        except Exception as e:
+            # 捕获其他可能的异常
+            self._log_sampler.error("update_feature_weights异常: %s", e)
+            pass
+    
+    def update_feature_weights_batch(self, features_list, is_malicious, is_incremental=False, exact=True):
+        """批量更新特征权重：整批文件的计数和权重增量一次向量化完成
         
-        # 训练数据
-        self.benign_files = []
-        self.malicious_files = []
+        features_list 中的文件属于同一类别，处理后样本总数按文件数累加（逐个更新时由
+        train 负责累加）。
         
-        # 设置UI样式
-        self._setup_styles()
+        exact=True 为等价模式，结果与按顺序对每个文件调用 update_feature_weights
+        并累加样本数完全一致：
+          - 每个文件的平衡因子按它之前已计入的样本数计算；
+          - 每个特征第一次出现时单独做一次范围限制，之后的增量用 np.add.at 按文件顺序
+            累加，最后统一限制。同一类别的增量符号相同，权重一旦到达上限（或下限）
+            就不会再离开，因此与每步都限制的结果相同；
+          - 增量符号不一致的特征（特征值为负时）退回逐个更新。
         
-        # 创建UI
-        self.create_widgets()
+        exact=False 为快速模式：平衡因子按批开始时的样本数计算一次，增量用 bincount
+        汇总后只限制一次。批内样本比例变化较大或新特征的首个增量小于权重下限时，
+        结果与逐个更新略有差异。
         
-        # 更新模型信息
-        self.update_model_info_display()
+        Args:
+            features_list: 特征字典列表
+            is_malicious: 这批文件是否为恶意文件
+            is_incremental: 是否为增量训练
+            exact: 是否使用等价模式
+        """
+        num_files = len(features_list)
+        if num_files == 0:
+            return
         
-    def _setup_styles(self):
-        """设置UI样式主题"""
-        style = ttk.Style()
+        update_factor = self.config["incremental_update_factor"] if is_incremental else 1.0
+        min_weight = self.config["min_feature_weight"]
+        max_weight = self.config["max_feature_weight"]
+        
+        # 新特征分配ID，整批编码为稀疏矩阵
+        _, ids, values, indptr = self.vocabulary.encode_batch(features_list, add=True)
+        size = len(self.vocabulary)
+        self._ensure_feature_capacity(size)
+        rows = np.repeat(np.arange(num_files), np.diff(indptr))
+        
+        # 每个文件的平衡因子（快速模式下整批相同）
+        if exact:
+            balance_factors = [
+                self._balance_factor(
+                    self.total_benign_files + (0 if is_malicious else i),
+                    self.total_malicious_files + (i if is_malicious else 0),
+                    is_malicious
+                )
+                for i in range(num_files)
+            ]
+        else:
+            balance_factors = [self._balance_factor(self.total_benign_files, self.total_malicious_files, is_malicious)] * num_files
+        balance_factors = np.array(balance_factors, dtype=np.float64)[rows]
         
-        # 设置主题基础
-        style.configure(
-            ".",
-            background=self.colors["background"],
-            foreground=self.colors["text"],
-            font=(
-                "SimHei" if "SimHei" in plt.rcParams["font.family"] else 
-                "WenQuanYi Micro Hei" if "WenQuanYi Micro Hei" in plt.rcParams["font.family"] else 
-                "Heiti TC" if "Heiti TC" in plt.rcParams["font.family"] else 
-                "TkDefaultFont"
-            )
-        )
+        if is_malicious:
+            weight_increments = values * 0.1 * update_factor * balance_factors
+        else:
+            weight_increments = -values * 0.05 * update_factor * self.config["dynamic_adjustment_factor"] * balance_factors
         
-        # 配置框架样式
-        style.configure(
-            "Modern.TFrame",
-            background=self.colors["card_bg"],
-            borderwidth=1,
-            relief="flat"
-        )
+        # 更新特征计数
+        counts = self._counts_malicious if is_malicious else self._counts_benign
+        counts[:size] += np.bincount(ids, minlength=size).astype(counts.dtype)
         
-        # 配置主框架样式
-        style.configure(
-            "Main.TFrame",
-            background=self.colors["background"],
-            padding=10
-        )
+        weights = self._weights
+        touched_ids, first_positions = np.unique(ids, return_index=True)
         
-        # 配置卡片框架样式
-        style.configure(
-            "Card.TFrame",
-            background=self.colors["card_bg"],
-            padding=10,
-            relief="flat",
-            borderwidth=1,
-            bordercolor=self.colors["border"]
-        )
+        if exact:
+            # 增量方向与类别相反的特征不满足单调条件，退回逐个更新
+            wrong_direction = weight_increments < 0 if is_malicious else weight_increments > 0
+            sequential_ids = np.unique(ids[wrong_direction])
+            vectorised = ~np.isin(ids, sequential_ids)
+            
+            is_first = np.zeros(len(ids), dtype=bool)
+            is_first[first_positions] = True
+            first = np.flatnonzero(is_first & vectorised)
+            rest = np.flatnonzero(~is_first & vectorised)
+            
+            # 首次出现：与逐个更新相同，加上增量后立即限制
+            weights[ids[first]] = np.clip(weights[ids[first]] + weight_increments[first], min_weight, max_weight)
+            # 其余增量按文件顺序原地累加，再统一限制
+            np.add.at(weights, ids[rest], weight_increments[rest])
+            vectorised_ids = ids[first]
+            weights[vectorised_ids] = np.clip(weights[vectorised_ids], min_weight, max_weight)
+            
+            for i in np.flatnonzero(~vectorised).tolist():
+                feature_id = ids[i]
+                weights[feature_id] = max(min_weight, min(max_weight, weights[feature_id] + weight_increments[i]))
+        else:
+            increment_sums = np.bincount(ids, weights=weight_increments, minlength=size)
+            weights[touched_ids] = np.clip(weights[touched_ids] + increment_sums[touched_ids], min_weight, max_weight)
         
-        # 配置标签样式
-        style.configure(
-            "Title.TLabel",
-            font=(
-                "SimHei" if "SimHei" in plt.rcParams["font.family"] else 
-                "WenQuanYi Micro Hei" if "WenQuanYi Micro Hei" in plt.rcParams["font.family"] else 
-                "Heiti TC" if "Heiti TC" in plt.rcParams["font.family"] else 
-                "TkDefaultFont", 12, "bold"
-            ),
-            foreground=self.colors["primary_text"],
-            background=self.colors["card_bg"],
-            padding=(5, 3)
-        )
+        self._dirty[touched_ids] = True
         
-        # 配置次级标签样式
-        style.configure(
-            "Subtitle.TLabel",
-            font=(
-                "SimHei" if "SimHei" in plt.rcParams["font.family"] else 
-                "WenQuanYi Micro Hei" if "WenQuanYi Micro Hei" in plt.rcParams["font.family"] else 
-                "Heiti TC" if "Heiti TC" in plt.rcParams["font.family"] else 
-                "TkDefaultFont", 10, "bold"
-            ),
-            foreground=self.colors["secondary_text"],
-            background=self.colors["card_bg"],
-            padding=(5, 3)
-        )
+        # 调试输出，监控权重异常
+        for feature_id in touched_ids[np.abs(weights[touched_ids]) > 9.5].tolist():
+            self._log_sampler.warning("警告: 特征 %s 权重过高: %s", self.vocabulary.names[feature_id], weights[feature_id])
         
-        # 配置按钮样式
-        style.configure(
-            "Modern.TButton",
-            font=(
-                "SimHei" if "SimHei" in plt.rcParams["font.family"] else 
-                "WenQuanYi Micro Hei" if "WenQuanYi Micro Hei" in plt.rcParams["font.family"] else 
-                "Heiti TC" if "Heiti TC" in plt.rcParams["font.family"] else 
-                "TkDefaultFont", 10
-            ),
-            padding=(8, 4),
-            relief="raised"
-        )
+        if is_malicious:
+            self.total_malicious_files += num_files
+        else:
+            self.total_benign_files += num_files
+    
+    def _filter_training_files(self, file_paths):
+        """过滤掉不存在、无法访问、类型不支持或超过大小限制的训练文件，
+        压缩包成员文件（"压缩包路径::成员名"）总是保留
         
-        # 配置强调按钮样式
-        style.configure(
-            "Accent.TButton",
-            font=(
-                "SimHei" if "SimHei" in plt.rcParams["font.family"] else 
-                "WenQuanYi Micro Hei" if "WenQuanYi Micro Hei" in plt.rcParams["font.family"] else 
-                "Heiti TC" if "Heiti TC" in plt.rcParams["font.family"] else 
-                "TkDefaultFont", 10, "bold"
-            ),
-            padding=(10, 6),
-            foreground="white",
-            background=self.colors["primary"]
-        )
+        file_paths 中的元素可以是路径、os.DirEntry 或 (path, size, mtime) 元组，
+        后两者复用目录遍历时已有的 stat 结果。逐文件的保留/跳过记录为 DEBUG 级别，
+        过滤结束后按原因输出一条汇总。
         
-        # 配置危险按钮样式
-        style.configure(
-            "Danger.TButton",
-            font=(
-                "SimHei" if "SimHei" in plt.rcParams["font.family"] else 
-                "WenQuanYi Micro Hei" if "WenQuanYi Micro Hei" in plt.rcParams["font.family"] else 
-                "Heiti TC" if "Heiti TC" in plt.rcParams["font.family"] else 
-                "TkDefaultFont", 10
-            ),
-            padding=(8, 4),
-            foreground="white",
-            background=self.colors["danger"]
-        )
+        压缩包文件被展开（见 archive_source.expand_archives）：ZIP 替换为其中的成员，
+        tar 和 gz/bz2/xz 等需要顺序解压的压缩包保留为一项，提取特征时再展开。
         
-        # 配置标签页样式 - 标准样式保留
-        style.configure(
-            "Modern.TNotebook",
-            background=self.colors["background"],
-            tabmargins=[5, 5, 5, 5]
-        )
+        Returns:
+            可用文件的路径列表（保持原有顺序，需要顺序解压的压缩包排在最后）
+        """
+        # 保留的文件类型和大小上限
+        logger.debug("filter_valid_files: 保留的文件类型: %s", set(TRAINING_FILE_EXTENSIONS))
+        max_file_size_mb = FILE_CONFIG.get('max_file_size_mb')
+        max_file_size = int(max_file_size_mb * 1024 * 1024) if max_file_size_mb else None
+        
+        results = validate_training_files(file_paths, TRAINING_FILE_EXTENSIONS, max_file_size)
+        
+        debug_enabled = logger.isEnabledFor(logging.DEBUG)
+        valid = []
+        skipped = Counter()
+        for path, size, reason in results:
+            if reason is None:
+                valid.append(path)
+                if debug_enabled:
+                    logger.debug("filter_valid_files: 保留文件: %s - 大小: %s字节", path, size)
+            else:
+                skipped[reason] += 1
+                if debug_enabled:
+                    logger.debug("filter_valid_files: 跳过文件: %s - %s", path, reason)
+        
+        file_paths, stream_archives = archive_source.expand_archives(valid)
+        member_count = sum(1 for path in file_paths if archive_source.is_member_path(path))
+        
+        skipped_summary = "，".join(f"{reason} {count}" for reason, count in skipped.items()) or "无"
+        logger.info("filter_valid_files: 过滤后文件总数: %d / 原始文件数: %d（压缩包成员 %d，"
+                    "需要顺序解压的压缩包 %d；跳过：%s）",
+                    len(file_paths) + len(stream_archives), len(results), member_count,
+                    len(stream_archives), skipped_summary)
+        return file_paths + stream_archives
+    
+    def train(self, benign_files, malicious_files, is_incremental=False, batch_size=1000, 
+              use_parallel=True, callback=None, checkpoint_interval=None, resume=True,
+              update_batch_size=256, exact_updates=True):
+        """训练模型，支持批量处理和并行计算
         
-        # 配置标签页样式 - 现代风格
-        style.configure(
-            "Custom.TNotebook",
-            background=self.colors["background"],
-            tabmargins=[5, 5, 5, 5]
-        )
+        每处理 checkpoint_interval 个批次写一次增量检查点。训练中断后，用相同的文件列表
+        和参数再次调用时从最后一个检查点之后的批次继续。
         
-        style.configure(
-            "Modern.TNotebook.Tab",
-            font=(
-                "SimHei" if "SimHei" in plt.rcParams["font.family"] else 
-                "WenQuanYi Micro Hei" if "WenQuanYi Micro Hei" in plt.rcParams["font.family"] else 
-                "Heiti TC" if "Heiti TC" in plt.rcParams["font.family"] else 
-                "TkDefaultFont", 10
-            ),
-            padding=(15, 5),
-            background=self.colors["card_bg"],
-            foreground=self.colors["text"],
-            borderwidth=1,
-            relief="flat"
-        )
+        Args:
+            benign_files: 正常文件路径列表
+            malicious_files: 恶意文件路径列表
+            is_incremental: 是否为增量训练
+            batch_size: 批处理大小
+            use_parallel: 是否使用并行处理
+            callback: 进度回调函数，格式：callback(processed, total, status)
+            checkpoint_interval: 检查点间隔（批次数），None 使用 MODEL_CONFIG 中的配置，0 表示不写检查点
+            resume: 是否从上次中断的检查点继续
+            update_batch_size: 每次向量化更新权重的文件数
+            exact_updates: 是否使用等价模式更新权重（见 update_feature_weights_batch），
+                结果与逐个文件更新完全一致；False 时使用更快的近似模式
         
-        style.map(
-            "Modern.TNotebook.Tab",
-            background=[("selected", self.colors["primary"])],
-            foreground=[("selected", "white")],
-            expand=[("selected", [1, 1, 1, 0])]
-        )
+        Returns:
+            训练统计信息
+        """
+        start_time = time.time()
+        processed_files = 0
+        errors = 0
         
-        # 配置滚动条样式
-        style.configure(
-            "Vertical.TScrollbar",
-            troughcolor=self.colors["background"],
-            background=self.colors["border"],
-            arrowcolor=self.colors["text"],
-            width=10,
-            borderwidth=0
-        )
+        # 记录增量训练前的样本数，用于统计本次新增的样本数
+        initial_malicious_files = self.total_malicious_files
+        initial_benign_files = self.total_benign_files
         
-        style.map(
-            "Vertical.TScrollbar",
-            background=[("active", self.colors["primary"])],
-            arrowcolor=[("active", "white")]
-        )
+        # 进度回调函数
+        def update_progress(processed, status=""):
+            if callback:
+                callback(processed, total_files, status)
         
-        # 配置列表框样式
-        style.configure(
-            "Custom.TListbox",
-            background=self.colors["text_bg"],
-            foreground=self.colors["text_fg"],
-            font=(
-                "SimHei" if "SimHei" in plt.rcParams["font.family"] else 
-                "WenQuanYi Micro Hei" if "WenQuanYi Micro Hei" in plt.rcParams["font.family"] else 
-                "Heiti TC" if "Heiti TC" in plt.rcParams["font.family"] else 
-                "TkDefaultFont", 10
-            ),
-            borderwidth=1,
-            relief="flat"
-        )
+        logger.info("训练前白样本数量: %d，黑样本数量: %d", len(benign_files), len(malicious_files))
         
-        # 配置输入框样式
-        style.configure(
-            "Custom.TEntry",
-            background=self.colors["text_bg"],
-            foreground=self.colors["text_fg"],
-            font=(
-                "SimHei" if "SimHei" in plt.rcParams["font.family"] else 
-                "WenQuanYi Micro Hei" if "WenQuanYi Micro Hei" in plt.rcParams["font.family"] else 
-                "Heiti TC" if "Heiti TC" in plt.rcParams["font.family"] else 
-                "TkDefaultFont", 10
-            ),
-            padding=(5, 3),
-            borderwidth=1,
-            relief="flat"
-        )
-    
-    def create_widgets(self):
-        """创建用户界面组件"""
-        # 创建主框架
-        main_frame = ttk.Frame(self.root, padding="10", style="Main.TFrame")
-        main_frame.pack(fill=tk.BOTH, expand=True)
-        
-        # 创建标签页控件 - 使用新的样式
-        self.notebook = ttk.Notebook(main_frame, style="Custom.TNotebook")
-        
-        # 创建训练标签页
-        self.train_tab = ttk.Frame(self.notebook, padding="5")
-        self.notebook.add(self.train_tab, text="模型训练")
-        
-        # 创建检测标签页
-        self.detect_tab = ttk.Frame(self.notebook, padding="5")
-        self.notebook.add(self.detect_tab, text="文件检测")
-        
-        # 创建评估标签页
-        self.eval_tab = ttk.Frame(self.notebook, padding="5")
-        self.notebook.add(self.eval_tab, text="模型评估")
-        
-        # 创建模型信息标签页
-        self.info_tab = ttk.Frame(self.notebook, padding="5")
-        self.notebook.add(self.info_tab, text="模型信息")
-        
-        # 绑定标签页切换事件
-        self.notebook.bind("<<NotebookTabChanged>>", self.on_tab_changed)
-        
-        self.notebook.pack(expand=True, fill=tk.BOTH, padx=5, pady=5)
-        
-        # 创建各个标签页的内容
-        self.create_train_tab(self.train_tab)
-        self.create_detect_tab(self.detect_tab)
-        self.create_eval_tab(self.eval_tab)
-        self.create_info_tab(self.info_tab)
-        
-    def on_tab_changed(self, event):
-        """处理标签页切换事件"""
-        # 获取当前选中的标签页
-        tab_control = event.widget
-        current_tab = tab_control.select()
-        
-        # 更新当前标签页的样式
-        for i, tab in enumerate(tab_control.tabs()):
-            tab_text = tab_control.tab(i, "text")
-            # 可以在这里添加特定标签页的刷新逻辑
-            if tab == current_tab:
-                # 选中的标签页
-                if tab_text == "模型信息":
-                    # 刷新模型信息
-                    self.update_model_info_display()
-    
-    def create_train_tab(self, parent):
-        """创建训练标签页"""
-        # 设置父容器背景色
-        parent.configure(background=self.colors["background"])
-        
-        # 添加标题标签
-        ttk.Label(parent, text="模型训练配置", style="Title.TLabel").pack(anchor=tk.W, pady=(0, 10))
-        
-        # 分割面板
-        left_frame = ttk.Frame(parent, padding="5", style="Modern.TFrame")
-        left_frame.pack(side=tk.LEFT, fill=tk.BOTH, expand=True, padx=(0, 5))
-        
-        right_frame = ttk.Frame(parent, padding="5", style="Modern.TFrame")
-        right_frame.pack(side=tk.RIGHT, fill=tk.BOTH, expand=True, padx=(5, 0))
-        
-        # 左侧：白样本区域
-        ttk.Label(left_frame, text="白样本文件（正常文件）", style="Title.TLabel").pack(anchor=tk.W, pady=(0, 5))
-        
-        # 白样本文件列表
-        self.benign_files_frame = ttk.Frame(left_frame, style="Modern.TFrame")
-        self.benign_files_frame.pack(fill=tk.BOTH, expand=True, pady=(0, 10))
-        
-        benign_scrollbar = ttk.Scrollbar(self.benign_files_frame, style="Vertical.TScrollbar")
-        benign_scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
-        
-        self.benign_files_listbox = tk.Listbox(
-            self.benign_files_frame, 
-            yscrollcommand=benign_scrollbar.set, 
-            width=40, 
-            height=15,
-            bg=self.colors["card_bg"],
-            fg=self.colors["text"],
-            bd=0,
-            highlightthickness=1,
-            highlightbackground=self.colors["border"],
-            selectbackground=self.colors["primary"],
-            selectforeground="white",
-            font=("SimHei" if "SimHei" in plt.rcParams["font.family"] else "TkDefaultFont", 9)
-        )
-        self.benign_files_listbox.pack(fill=tk.BOTH, expand=True, padx=2, pady=2)
-        benign_scrollbar.config(command=self.benign_files_listbox.yview)
-        
-        # 白样本按钮区域
-        benign_buttons_frame = ttk.Frame(left_frame)
-        benign_buttons_frame.pack(fill=tk.X, pady=(0, 5))
-        
-        ttk.Button(benign_buttons_frame, text="添加白样本文件", command=self.add_benign_files, style="Modern.TButton").pack(side=tk.LEFT, padx=5, pady=5)
-        ttk.Button(benign_buttons_frame, text="添加白样本目录", command=self.add_benign_directory, style="Modern.TButton").pack(side=tk.LEFT, padx=5, pady=5)
-        ttk.Button(benign_buttons_frame, text="清空", command=self.clear_benign_files, style="Modern.TButton").pack(side=tk.RIGHT, padx=5, pady=5)
-        
-        # 右侧：黑样本区域
-        ttk.Label(right_frame, text="黑样本文件（恶意文件）", style="Title.TLabel").pack(anchor=tk.W, pady=(0, 5))
-        
-        # 黑样本文件列表
-        self.malicious_files_frame = ttk.Frame(right_frame, style="Modern.TFrame")
-        self.malicious_files_frame.pack(fill=tk.BOTH, expand=True, pady=(0, 10))
-        
-        malicious_scrollbar = ttk.Scrollbar(self.malicious_files_frame, style="Vertical.TScrollbar")
-        malicious_scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
-        
-        self.malicious_files_listbox = tk.Listbox(
-            self.malicious_files_frame, 
-            yscrollcommand=malicious_scrollbar.set, 
-            width=40, 
-            height=15,
-            bg=self.colors["card_bg"],
-            fg=self.colors["text"],
-            bd=0,
-            highlightthickness=1,
-            highlightbackground=self.colors["border"],
-            selectbackground=self.colors["primary"],
-            selectforeground="white",
-            font=("SimHei" if "SimHei" in plt.rcParams["font.family"] else "TkDefaultFont", 9)
-        )
-        self.malicious_files_listbox.pack(fill=tk.BOTH, expand=True, padx=2, pady=2)
-        malicious_scrollbar.config(command=self.malicious_files_listbox.yview)
-        
-        # 黑样本按钮区域
-        malicious_buttons_frame = ttk.Frame(right_frame)
-        malicious_buttons_frame.pack(fill=tk.X, pady=(0, 5))
-        
-        # 压缩包按钮放在最前面，确保可见
-        ttk.Button(malicious_buttons_frame, text="从压缩包添加", command=self.add_malicious_archive, style="Modern.TButton").pack(side=tk.LEFT, padx=5, pady=5)
-        # 添加文件按钮
-        ttk.Button(malicious_buttons_frame, text="添加黑样本文件", command=self.add_malicious_files, style="Modern.TButton").pack(side=tk.LEFT, padx=5, pady=5)
-        # 保存按钮引用，用于控制状态
-        self.add_malicious_dir_button = ttk.Button(malicious_buttons_frame, text="添加黑样本目录", command=self.add_malicious_directory, style="Modern.TButton")
-        self.add_malicious_dir_button.pack(side=tk.LEFT, padx=5, pady=5)
-        # 清空按钮在右侧
-        ttk.Button(malicious_buttons_frame, text="清空", command=self.clear_malicious_files, style="Modern.TButton").pack(side=tk.RIGHT, padx=5, pady=5)
-        
-        # 训练按钮区域
-        train_buttons_frame = ttk.Frame(parent, style="Modern.TFrame", padding="5")
-        train_buttons_frame.pack(fill=tk.X, pady=10, padx=5)
-        
-        # 左侧选项和进度条
-        left_train_frame = ttk.Frame(train_buttons_frame)
-        left_train_frame.pack(side=tk.LEFT, fill=tk.Y, padx=10)
-        
-        self.is_incremental_var = tk.BooleanVar(value=False)
-        ttk.Checkbutton(
-            left_train_frame, 
-            text="增量训练（保留现有模型）", 
-            variable=self.is_incremental_var
-        ).pack(side=tk.LEFT, padx=10, pady=5, anchor=tk.CENTER)
-        
-        # 训练进度条
-        self.train_progress_var = tk.DoubleVar()
-        self.train_progress = ttk.Progressbar(
-            train_buttons_frame, 
-            variable=self.train_progress_var, 
-            orient="horizontal", 
-            length=200, 
-            mode="determinate"
-        )
-        self.train_progress.pack(side=tk.LEFT, padx=10, pady=5, fill=tk.X, expand=True)
-        
-        # 右侧按钮
-        ttk.Button(
-            train_buttons_frame, 
-            text="开始训练", 
-            command=self.start_training, 
-            style="Accent.TButton"
-        ).pack(side=tk.RIGHT, padx=10, pady=5)
-        
-        # 训练状态区域
-        self.train_status_var = tk.StringVar(value="准备就绪")
-        self.train_status_label = ttk.Label(
-            parent, 
-            textvariable=self.train_status_var, 
-            relief=tk.SUNKEN, 
-            anchor=tk.W,
-            padding=(5, 3),
-            font=("SimHei" if "SimHei" in plt.rcParams["font.family"] else "TkDefaultFont", 9)
-        )
-        self.train_status_label.pack(fill=tk.X, pady=(5, 0), padx=5)
-        
-        # 配置训练按钮样式
-        style = ttk.Style()
-        style.configure("Accent.TButton", font=("SimHei", 10, "bold"))
-    
-    def create_detect_tab(self, parent):
-        """创建检测标签页"""
-        # 设置标签页样式
-        parent.configure(style="TabFrame.TFrame")
-        
-        # 创建标题标签
-        title_label = ttk.Label(parent, text="恶意软件检测系统", font=('微软雅黑', 14, 'bold'), foreground=self.colors['primary_text'])
-        title_label.pack(pady=(10, 5))
-        
-        # 检测文件选择区域 - 使用卡片式框架
-        select_frame = ttk.LabelFrame(parent, text="文件选择", padding="10")
-        select_frame.configure(style="Card.TLabelframe")
-        select_frame.pack(fill=tk.X, pady=(0, 10), padx=15)
-        
-        self.detect_file_var = tk.StringVar()
-        file_entry = ttk.Entry(select_frame, textvariable=self.detect_file_var, width=80)
-        file_entry.configure(style="Input.TEntry")
-        file_entry.pack(side=tk.LEFT, padx=5, fill=tk.X, expand=True)
-        
-        select_btn = ttk.Button(select_frame, text="选择文件", command=self.select_file_for_detection)
-        select_btn.configure(style="Secondary.TButton")
-        select_btn.pack(side=tk.LEFT, padx=5)
-        
-        detect_btn = ttk.Button(select_frame, text="开始检测", command=self.start_detection, style="Primary.TButton")
-        detect_btn.pack(side=tk.LEFT, padx=5)
-        
-        # 检测结果区域 - 使用卡片式框架
-        result_frame = ttk.LabelFrame(parent, text="检测结果", padding="15")
-        result_frame.configure(style="Card.TLabelframe")
-        result_frame.pack(fill=tk.BOTH, expand=True, pady=(0, 10), padx=15)
-        
-        # 结果状态标签
-        self.detection_result_var = tk.StringVar(value="等待检测...")
-        self.detection_result_label = ttk.Label(result_frame, textvariable=self.detection_result_var, font=('微软雅黑', 14, 'bold'), foreground=self.colors['status_text'])
-        self.detection_result_label.pack(pady=10)
-        
-        # 详细信息区域
-        details_frame = ttk.Frame(result_frame)
-        details_frame.pack(fill=tk.BOTH, expand=True)
-        
-        # 分数和阈值信息
-        self.score_info_var = tk.StringVar(value="")
-        score_label = ttk.Label(details_frame, textvariable=self.score_info_var, font=('微软雅黑', 10))
-        score_label.pack(anchor=tk.W, pady=5)
-        
-        # 特征列表
-        ttk.Label(details_frame, text="关键特征（按重要性排序）:", font=('微软雅黑', 10, 'bold'), foreground=self.colors['primary_text']).pack(anchor=tk.W, pady=(10, 5))
-        
-        # 特征文本框容器
-        text_container = ttk.Frame(details_frame)
-        text_container.pack(fill=tk.BOTH, expand=True)
-        
-        features_scrollbar = ttk.Scrollbar(text_container)
-        features_scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
-        
-        self.features_text = tk.Text(text_container, wrap=tk.WORD, yscrollcommand=features_scrollbar.set, height=15, font=('微软雅黑', 9))
-        self.features_text.configure(bg=self.colors['text_bg'], fg=self.colors['text_fg'], bd=0, highlightthickness=0)
-        self.features_text.pack(side=tk.LEFT, fill=tk.BOTH, expand=True, padx=2, pady=2)
-        features_scrollbar.config(command=self.features_text.yview)
-    
-    def create_eval_tab(self, parent):
-        """创建评估标签页"""
-        # 设置标签页样式
-        parent.configure(style="TabFrame.TFrame")
-        
-        # 创建标题标签
-        title_label = ttk.Label(parent, text="模型性能评估", font=('微软雅黑', 14, 'bold'), foreground=self.colors['primary_text'])
-        title_label.pack(pady=(10, 5))
-        
-        # 测试数据选择区域 - 使用卡片式框架
-        select_frame = ttk.LabelFrame(parent, text="评估数据设置", padding="15")
-        select_frame.configure(style="Card.TLabelframe")
-        select_frame.pack(fill=tk.X, pady=(0, 10), padx=15)
-        
-        # 白样本测试数据
-        eval_benign_frame = ttk.Frame(select_frame)
-        eval_benign_frame.pack(fill=tk.X, pady=(0, 8))
-        
-        ttk.Label(eval_benign_frame, text="白样本测试数据: ", width=15, font=('微软雅黑', 10)).pack(side=tk.LEFT, padx=5)
-        self.eval_benign_var = tk.StringVar()
-        benign_entry = ttk.Entry(eval_benign_frame, textvariable=self.eval_benign_var, width=60)
-        benign_entry.configure(style="Input.TEntry")
-        benign_entry.pack(side=tk.LEFT, padx=5, fill=tk.X, expand=True)
-        
-        ttk.Button(eval_benign_frame, text="选择目录", command=lambda: self.select_directory(self.eval_benign_var), style="Secondary.TButton").pack(side=tk.LEFT, padx=5)
-        
-        # 黑样本测试数据
-        eval_malicious_frame = ttk.Frame(select_frame)
-        eval_malicious_frame.pack(fill=tk.X, pady=(0, 5))
-        
-        ttk.Label(eval_malicious_frame, text="黑样本测试数据: ", width=15, font=('微软雅黑', 10)).pack(side=tk.LEFT, padx=5)
-        self.eval_malicious_var = tk.StringVar()
-        malicious_entry = ttk.Entry(eval_malicious_frame, textvariable=self.eval_malicious_var, width=60)
-        malicious_entry.configure(style="Input.TEntry")
-        malicious_entry.pack(side=tk.LEFT, padx=5, fill=tk.X, expand=True)
-        
-        ttk.Button(eval_malicious_frame, text="选择目录", command=lambda: self.select_directory(self.eval_malicious_var), style="Secondary.TButton").pack(side=tk.LEFT, padx=5)
-        
-        # 开始评估按钮
-        ttk.Button(select_frame, text="开始评估", command=self.start_evaluation, style="Primary.TButton").pack(side=tk.RIGHT, padx=10, pady=5)
-        
-        # 评估结果区域 - 使用卡片式框架
-        metrics_frame = ttk.LabelFrame(parent, text="评估指标", padding="15")
-        metrics_frame.configure(style="Card.TLabelframe")
-        metrics_frame.pack(fill=tk.X, pady=(0, 10), padx=15)
-        
-        # 数据统计框架 - 网格布局
-        stats_frame = ttk.Frame(metrics_frame)
-        stats_frame.pack(fill=tk.X, pady=5)
-        
-        # 评估指标标签
-        self.accuracy_var = tk.StringVar(value="准确率: --")
-        self.precision_var = tk.StringVar(value="精确率: --")
-        self.recall_var = tk.StringVar(value="召回率: --")
-        self.f1_var = tk.StringVar(value="F1分数: --")
-        self.fn_var = tk.StringVar(value="漏报率: --")
-        self.fp_var = tk.StringVar(value="误报率: --")
-        
-        # 使用网格布局代替左右分栏
-        metrics_grid = ttk.Frame(stats_frame)
-        metrics_grid.pack(fill=tk.BOTH, expand=True)
-        
-        ttk.Label(metrics_grid, textvariable=self.accuracy_var, font=('微软雅黑', 10, 'bold'), foreground=self.colors['primary_text']).grid(row=0, column=0, sticky=tk.W, padx=20, pady=3)
-        ttk.Label(metrics_grid, textvariable=self.precision_var, font=('微软雅黑', 10), foreground=self.colors['primary_text']).grid(row=0, column=1, sticky=tk.W, padx=20, pady=3)
-        ttk.Label(metrics_grid, textvariable=self.recall_var, font=('微软雅黑', 10), foreground=self.colors['primary_text']).grid(row=1, column=0, sticky=tk.W, padx=20, pady=3)
-        ttk.Label(metrics_grid, textvariable=self.f1_var, font=('微软雅黑', 10), foreground=self.colors['primary_text']).grid(row=1, column=1, sticky=tk.W, padx=20, pady=3)
-        ttk.Label(metrics_grid, textvariable=self.fn_var, font=('微软雅黑', 10), foreground=self.colors['warning_text']).grid(row=2, column=0, sticky=tk.W, padx=20, pady=3)
-        ttk.Label(metrics_grid, textvariable=self.fp_var, font=('微软雅黑', 10), foreground=self.colors['warning_text']).grid(row=2, column=1, sticky=tk.W, padx=20, pady=3)
-        
-        # 混淆矩阵可视化 - 使用卡片式框架
-        confusion_frame = ttk.LabelFrame(parent, text="混淆矩阵分析", padding="15")
-        confusion_frame.configure(style="Card.TLabelframe")
-        confusion_frame.pack(fill=tk.BOTH, expand=True, pady=10, padx=15)
-        
-        # 初始化混淆矩阵图表
-        self.fig, self.ax = plt.subplots(figsize=(6, 4), dpi=100)
-        self.ax.axis('off')
-        self.canvas = FigureCanvasTkAgg(self.fig, master=confusion_frame)
-        self.canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True)
-        self.canvas.draw()
-        
-        # 状态标签 - 现代化样式
-        self.eval_status_var = tk.StringVar(value="等待评估...")
-        self.eval_status_label = ttk.Label(parent, textvariable=self.eval_status_var, relief=tk.SUNKEN, anchor=tk.W, font=('微软雅黑', 9))
-        self.eval_status_label.pack(fill=tk.X, pady=(5, 0))
-    
-    def create_info_tab(self, parent):
-        """创建模型详细信息标签页"""
-        # 设置标签页样式
-        parent.configure(style="TabFrame.TFrame")
-        
-        # 创建标题标签
-        title_label = ttk.Label(parent, text="模型详情与性能分析", font=('微软雅黑', 14, 'bold'), foreground=self.colors['primary_text'])
-        title_label.pack(pady=(10, 5))
-        
-        # 创建一个主分割面板
-        main_frame = ttk.Frame(parent)
-        main_frame.pack(fill=tk.BOTH, expand=True, padx=15, pady=5)
-        
-        # 创建顶部信息面板 - 使用卡片式框架
-        top_frame = ttk.Frame(main_frame)
-        top_frame.pack(fill=tk.X, pady=(0, 10))
-        
-        # 模型信息框架
-        info_frame = ttk.LabelFrame(top_frame, text="模型基本信息", padding="15")
-        info_frame.configure(style="Card.TLabelframe")
-        info_frame.pack(fill=tk.X, pady=(0, 10))
-        
-        # 模型信息显示
-        self.model_info_var = tk.StringVar(value="")
-        info_label = ttk.Label(info_frame, textvariable=self.model_info_var, font=('微软雅黑', 10), justify=tk.LEFT, foreground=self.colors['primary_text'])
-        info_label.pack(anchor=tk.W, pady=5)
-        
-        # 创建中间图表区域
-        charts_frame = ttk.Frame(main_frame)
-        charts_frame.pack(fill=tk.BOTH, expand=True, pady=(0, 10))
-        
-        # 左侧：混淆矩阵和性能指标 - 使用卡片式框架
-        left_chart_frame = ttk.LabelFrame(charts_frame, text="模型性能指标", padding="15")
-        left_chart_frame.configure(style="Card.TLabelframe")
-        left_chart_frame.pack(side=tk.LEFT, fill=tk.BOTH, expand=True, padx=(0, 5))
-        
-        # 混淆矩阵图表
-        self.fig_matrix, self.ax_matrix = plt.subplots(figsize=(5, 4), dpi=100)
-        self.ax_matrix.axis('off')
-        self.canvas_matrix = FigureCanvasTkAgg(self.fig_matrix, master=left_chart_frame)
-        self.canvas_matrix.get_tk_widget().pack(fill=tk.BOTH, expand=True, pady=(0, 10))
-        
-        # 性能指标标签
-        performance_frame = ttk.Frame(left_chart_frame)
-        performance_frame.pack(fill=tk.X)
-        
-        self.detection_rate_var = tk.StringVar(value="恶意文件检测率: --")
-        self.false_positive_var = tk.StringVar(value="误报率: --")
-        self.false_negative_var = tk.StringVar(value="漏报率: --")
-        
-        ttk.Label(performance_frame, textvariable=self.detection_rate_var, font=('微软雅黑', 10, 'bold'), foreground=self.colors['success_text']).pack(anchor=tk.W, pady=3)
-        ttk.Label(performance_frame, textvariable=self.false_positive_var, font=('微软雅黑', 10), foreground=self.colors['warning_text']).pack(anchor=tk.W, pady=3)
-        ttk.Label(performance_frame, textvariable=self.false_negative_var, font=('微软雅黑', 10), foreground=self.colors['error_text']).pack(anchor=tk.W, pady=3)
-        
-        # 右侧：检测率趋势和速度评估 - 使用卡片式框架
-        right_chart_frame = ttk.LabelFrame(charts_frame, text="高级分析", padding="15")
-        right_chart_frame.configure(style="Card.TLabelframe")
-        right_chart_frame.pack(side=tk.RIGHT, fill=tk.BOTH, expand=True, padx=(5, 0))
-        
-        # 创建一个笔记本控件来切换不同的图表
-        chart_notebook = ttk.Notebook(right_chart_frame)
-        chart_notebook.pack(fill=tk.BOTH, expand=True)
-        
-        # 检测率图表标签页
-        detection_rate_tab = ttk.Frame(chart_notebook)
-        chart_notebook.add(detection_rate_tab, text="检测率分析")
-        
-        self.fig_detection, self.ax_detection = plt.subplots(figsize=(5, 3), dpi=100)
-        self.canvas_detection = FigureCanvasTkAgg(self.fig_detection, master=detection_rate_tab)
-        self.canvas_detection.get_tk_widget().pack(fill=tk.BOTH, expand=True)
-        
-        # 速度评估图表标签页
-        speed_tab = ttk.Frame(chart_notebook)
-        chart_notebook.add(speed_tab, text="速度评估")
-        
-        self.fig_speed, self.ax_speed = plt.subplots(figsize=(5, 3), dpi=100)
-        self.canvas_speed = FigureCanvasTkAgg(self.fig_speed, master=speed_tab)
-        self.canvas_speed.get_tk_widget().pack(fill=tk.BOTH, expand=True)
-        
-        # 底部：重要特征 - 使用卡片式框架
-        features_frame = ttk.LabelFrame(main_frame, text="重要特征（权重排序）", padding="15")
-        features_frame.configure(style="Card.TLabelframe")
-        features_frame.pack(fill=tk.BOTH, expand=True, pady=(0, 10))
-        
-        # 特征列表容器
-        text_container = ttk.Frame(features_frame)
-        text_container.pack(fill=tk.BOTH, expand=True)
-        
-        features_scrollbar = ttk.Scrollbar(text_container)
-        features_scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
-        
-        self.top_features_text = tk.Text(text_container, wrap=tk.WORD, yscrollcommand=features_scrollbar.set, height=10, font=('微软雅黑', 9))
-        self.top_features_text.configure(bg=self.colors['text_bg'], fg=self.colors['text_fg'], bd=0, highlightthickness=0)
-        self.top_features_text.pack(side=tk.LEFT, fill=tk.BOTH, expand=True, padx=2, pady=2)
-        features_scrollbar.config(command=self.top_features_text.yview)
-        
-        # 操作按钮 - 使用卡片式框架
-        actions_frame = ttk.LabelFrame(main_frame, text="系统操作", padding="15")
-        actions_frame.configure(style="Card.TLabelframe")
-        actions_frame.pack(fill=tk.X, pady=10)
-        
-        # 按钮框架
-        buttons_frame = ttk.Frame(actions_frame)
-        buttons_frame.pack(fill=tk.X)
-        
-        # 刷新信息按钮
-        refresh_btn = ttk.Button(buttons_frame, text="刷新信息", command=self.update_model_info_display)
-        refresh_btn.configure(style="Secondary.TButton")
-        refresh_btn.pack(side=tk.LEFT, padx=10)
-        
-        # 性能测试按钮
-        perf_btn = ttk.Button(buttons_frame, text="执行性能测试", command=self.perform_performance_test)
-        perf_btn.configure(style="Secondary.TButton")
-        perf_btn.pack(side=tk.LEFT, padx=5)
-        
-        # 重置模型按钮
-        reset_btn = ttk.Button(buttons_frame, text="重置模型", command=self.reset_model)
-        reset_btn.configure(style="Danger.TButton")
-        reset_btn.pack(side=tk.RIGHT, padx=10)
-    
-    def add_benign_files(self):
-        """添加白样本文件"""
-        files = filedialog.askopenfilenames(title="选择白样本文件")
-        for file in files:
-            if file not in self.benign_files:
-                self.benign_files.append(file)
-                self.benign_files_listbox.insert(tk.END, os.path.basename(file))
-    
-    def add_benign_directory(self):
-        """添加白样本目录（渐进式扫描，避免UI冻结）"""
-        directory = filedialog.askdirectory(title="选择白样本目录")
-        if directory:
-            # 显示提示
-            messagebox.showinfo("提示", "开始扫描目录，请等待...")
+        benign_files = self._filter_training_files(benign_files)
+        malicious_files = self._filter_training_files(malicious_files)
+        
+        logger.info("过滤后白样本数量: %d，黑样本数量: %d", len(benign_files), len(malicious_files))
+        # 样本总数按过滤后的列表计算（ZIP 已展开为成员）；tar、gz 等压缩包在处理时才知道成员数，
+        # 处理完一个批次后把其中压缩包的成员数补进总数，已处理数始终不超过总数
+        total_files = len(benign_files) + len(malicious_files)
+        logger.info("增量训练模式: %s，训练前累计白样本数: %d，黑样本数: %d",
+                    is_incremental, self.total_benign_files, self.total_malicious_files)
+        
+        # 批量处理文件以减少内存压力
+        def process_batch(file_batch, is_malicious):
+            nonlocal processed_files, total_files, errors
+            batch_errors = 0
+            batch_start = time.perf_counter()
             
-            # 创建扫描状态标签（如果不存在）
-            if not hasattr(self, 'scan_status_var'):
-                self.scan_status_var = tk.StringVar(value="准备扫描...")
-                self.scan_status_label = ttk.Label(self.train_status_label.master, textvariable=self.scan_status_var, foreground="blue")
-                self.scan_status_label.pack(fill=tk.X, pady=(2, 0))
+            # 过滤后仍留在列表中的压缩包（tar、gz 等）在这里顺序解压，每个成员作为一个样本
+            if use_parallel:
+                # 并行提取特征
+                logger.debug("开始并行提取 %d 个文件的特征，恶意文件: %s", len(file_batch), is_malicious)
+                extracted = self.iter_extract_features(file_batch, expand_archives=True)
             else:
-                self.scan_status_var.set("准备扫描...")
-                self.scan_status_label.pack(fill=tk.X, pady=(2, 0))
+                # 顺序处理（用于调试或特殊情况）
+                logger.debug("开始顺序处理 %d 个文件，恶意文件: %s", len(file_batch), is_malicious)
+                file_paths, stream_archives = archive_source.expand_archives(file_batch)
+                extracted = chain(((file_path, self.extract_features(file_path)) for file_path in file_paths),
+                                  self._iter_stream_archive_features(stream_archives))
             
-            # 禁用添加按钮
-            if hasattr(self, 'add_benign_dir_button'):
-                self.add_benign_dir_button.config(state=tk.DISABLED)
+            # 边提取边收集特征，每凑满 update_batch_size 个文件做一次向量化权重更新，
+            # 内存中最多只保留这么多个文件的特征
+            pending_paths = []
+            pending_features = []
             
-            # 在单独的线程中扫描，避免UI冻结
-            def scan_thread():
+            def flush():
+                nonlocal batch_errors
+                if not pending_features:
+                    return
                 try:
-                    count = 0
-                    batch_size = 1000  # 每批次添加的文件数
-                    batch = []
-                    
-                    # 使用生成器模式渐进式遍历
-                    walker = os.walk(directory)
-                    while True:
-                        try:
-                            # 每次只处理一部分目录
-                            for _ in range(10):  # 每次处理10个子目录
-                                root, _, files = next(walker)
-                                
-                                for file in files:
-                                    file_path = os.path.join(root, file)
-                                    if file_path not in self.benign_files:
-                                        batch.append((file_path, os.path.basename(file_path)))
-                                        count += 1
-                                
-                                # 更新进度
-                                current_root = root
-                                current_count = count
-                                self.root.after(0, lambda r=current_root, c=current_count: 
-                                    self.scan_status_var.set(f"扫描中 - 目录: {os.path.basename(r)} - 已发现: {c} 文件"))
-                            
-                            # 添加批次文件并刷新UI
-                            if batch:
-                                self.root.after(0, lambda b=batch.copy(): self._add_benign_files_batch(b))
-                                batch.clear()
-                                
-                            # 短暂休眠，让出CPU时间给UI线程
-                            time.sleep(0.01)
-                            
-                        except StopIteration:
-                            # 处理剩余文件
-                            if batch:
-                                self.root.after(0, lambda b=batch.copy(): self._add_benign_files_batch(b))
-                            break
-                        except Exception as e:
-                            # 单个目录错误不影响整体扫描
-                            print(f"扫描目录时出错: {e}")
-                            continue
-                    
-                    # 扫描完成
-                    self.root.after(0, lambda c=count: (
-                        self.scan_status_var.set(f"扫描完成 - 共添加 {c} 个文件"),
-                        messagebox.showinfo("完成", f"成功添加 {c} 个白样本文件"),
-                        self.scan_status_label.pack_forget() if hasattr(self, 'scan_status_label') else None
-                    ))
-                    
+                    self.update_feature_weights_batch(pending_features, is_malicious, is_incremental, exact_updates)
                 except Exception as e:
-                    self.root.after(0, lambda: (
-                        self.scan_status_var.set(f"扫描失败: {str(e)}"),
-                        messagebox.showerror("错误", f"扫描目录时发生错误: {str(e)}"),
-                        self.scan_status_label.pack_forget() if hasattr(self, 'scan_status_label') else None
-                    ))
-                finally:
-                    # 恢复按钮状态
-                    if hasattr(self, 'add_benign_dir_button'):
-                        self.root.after(0, lambda: self.add_benign_dir_button.config(state=tk.NORMAL))
-            
-            # 启动扫描线程
-            thread = threading.Thread(target=scan_thread)
-            thread.daemon = True
-            thread.start()
-    
-    def _add_benign_files_batch(self, batch):
-        """批量添加白样本文件，避免频繁UI更新"""
-        for file_path, filename in batch:
-            if file_path not in self.benign_files:
-                self.benign_files.append(file_path)
-                self.benign_files_listbox.insert(tk.END, filename)
-                
-                # 限制列表显示，避免内存问题
-                if len(self.benign_files) > 10000:
-                    self.benign_files_listbox.delete(0)
-        
-        # 更新UI
-        self.root.update()
-    
-    def clear_benign_files(self):
-        """清空白样本文件"""
-        self.benign_files = []
-        self.benign_files_listbox.delete(0, tk.END)
-    
-    def add_malicious_files(self):
-        """添加黑样本文件"""
-        files = filedialog.askopenfilenames(title="选择黑样本文件")
-        for file in files:
-            if file not in self.malicious_files:
-                self.malicious_files.append(file)
-                self.malicious_files_listbox.insert(tk.END, os.path.basename(file))
-    
-    def add_malicious_directory(self):
-        """添加黑样本目录（渐进式扫描，避免UI冻结）"""
-        directory = filedialog.askdirectory(title="选择黑样本目录")
-        if directory:
-            # 显示提示
-            messagebox.showinfo("提示", "开始扫描目录，请等待...")
-            
-            # 创建扫描状态标签（如果不存在）
-            if not hasattr(self, 'scan_status_var'):
-                self.scan_status_var = tk.StringVar(value="准备扫描...")
-                self.scan_status_label = ttk.Label(self.train_status_label.master, textvariable=self.scan_status_var, foreground="blue")
-                self.scan_status_label.pack(fill=tk.X, pady=(2, 0))
-            else:
-                self.scan_status_var.set("准备扫描...")
-                self.scan_status_label.pack(fill=tk.X, pady=(2, 0))
+                    # 批量更新失败时逐个更新，定位出错的文件
+                    logger.warning("批量更新权重失败，改为逐个更新: %s", e)
+                    for file_path, features in zip(pending_paths, pending_features):
+                        try:
+                            self.update_feature_weights(features, is_malicious, is_incremental)
+                            if is_malicious:
+                                self.total_malicious_files += 1
+                            else:
+                                self.total_benign_files += 1
+                        except Exception as file_error:
+                            batch_errors += 1
+                            self._log_sampler.error("处理文件 %s 时出错: %s", file_path, file_error)
+                pending_paths.clear()
+                pending_features.clear()
             
-            # 禁用添加按钮
-            if hasattr(self, 'add_malicious_dir_button'):
-                self.add_malicious_dir_button.config(state=tk.DISABLED)
+            # 逐文件记录默认关闭（DEBUG 级别），每个批次结束后输出一条汇总
+            debug_enabled = logger.isEnabledFor(logging.DEBUG)
+            extracted_count = 0
+            feature_total = 0
+            for file_path, features in extracted:
+                extracted_count += 1
+                feature_total += len(features)
+                if debug_enabled:
+                    logger.debug("处理文件: %s, 提取到 %d 个特征", file_path, len(features))
+                pending_paths.append(file_path)
+                pending_features.append(features)
+                if len(pending_features) >= update_batch_size:
+                    flush()
+            flush()
             
-            # 在单独的线程中扫描，避免UI冻结
-            def scan_thread():
-                try:
-                    count = 0
-                    batch_size = 1000  # 每批次添加的文件数
-                    batch = []
-                    
-                    # 使用生成器模式渐进式遍历
-                    walker = os.walk(directory)
-                    while True:
-                        try:
-                            # 每次只处理一部分目录
-                            for _ in range(10):  # 每次处理10个子目录
-                                root, _, files = next(walker)
-                                
-                                for file in files:
-                                    file_path = os.path.join(root, file)
-                                    if file_path not in self.malicious_files:
-                                        batch.append((file_path, os.path.basename(file_path)))
-                                        count += 1
-                                
-                                # 更新进度
-                                current_root = root
-                                current_count = count
-                                self.root.after(0, lambda r=current_root, c=current_count: 
-                                    self.scan_status_var.set(f"扫描中 - 目录: {os.path.basename(r)} - 已发现: {c} 文件"))
-                            
-                            # 添加批次文件并刷新UI
-                            if batch:
-                                self.root.after(0, lambda b=batch.copy(): self._add_malicious_files_batch(b))
-                                batch.clear()
-                                
-                            # 短暂休眠，让出CPU时间给UI线程
-                            time.sleep(0.01)
-                            
-                        except StopIteration:
-                            # 处理剩余文件
-                            if batch:
-                                self.root.after(0, lambda b=batch.copy(): self._add_malicious_files_batch(b))
-                            break
-                        except Exception as e:
-                            # 单个目录错误不影响整体扫描
-                            print(f"扫描目录时出错: {e}")
-                            continue
-                    
-                    # 扫描完成
-                    self.root.after(0, lambda c=count: (
-                        self.scan_status_var.set(f"扫描完成 - 共添加 {c} 个文件"),
-                        messagebox.showinfo("完成", f"成功添加 {c} 个黑样本文件"),
-                        self.scan_status_label.pack_forget() if hasattr(self, 'scan_status_label') else None
-                    ))
-                    
-                except Exception as e:
-                    self.root.after(0, lambda: (
-                        self.scan_status_var.set(f"扫描失败: {str(e)}"),
-                        messagebox.showerror("错误", f"扫描目录时发生错误: {str(e)}"),
-                        self.scan_status_label.pack_forget() if hasattr(self, 'scan_status_label') else None
-                    ))
-                finally:
-                    # 恢复按钮状态
-                    if hasattr(self, 'add_malicious_dir_button'):
-                        self.root.after(0, lambda: self.add_malicious_dir_button.config(state=tk.NORMAL))
+            batch_time = time.perf_counter() - batch_start
+            logger.info("%s批次完成: %d 个文件，平均 %.1f 个特征，错误 %d，累计%s样本 %d，耗时 %.2f 秒（%.0f 文件/秒）",
+                        "恶意" if is_malicious else "正常", extracted_count,
+                        feature_total / max(1, extracted_count), batch_errors,
+                        "黑" if is_malicious else "白",
+                        self.total_malicious_files if is_malicious else self.total_benign_files,
+                        batch_time, extracted_count / max(batch_time, 1e-9))
             
-            # 启动扫描线程
-            thread = threading.Thread(target=scan_thread)
-            thread.daemon = True
-            thread.start()
-    
-    def _add_malicious_files_batch(self, batch):
-        """批量添加黑样本文件，避免频繁UI更新"""
-        for file_path, filename in batch:
-            if file_path not in self.malicious_files:
-                self.malicious_files.append(file_path)
-                self.malicious_files_listbox.insert(tk.END, filename)
-                
-                # 限制列表显示，避免内存问题
-                if len(self.malicious_files) > 10000:
-                    self.malicious_files_listbox.delete(0)
-        
-        # 更新UI
-        self.root.update()
-    
-    def add_malicious_archive(self):
-        """从压缩包添加黑样本文件（安全模式）"""
-        # 选择压缩包文件
-        archive_path = filedialog.askopenfilename(
-            title="选择压缩包文件",
-            filetypes=[
-                ("压缩包文件", "*.zip *.rar *.7z *.tar *.tar.gz *.tgz"),
-                ("ZIP文件", "*.zip"),
-                ("所有文件", "*.*")
-            ]
-        )
-        
-        if not archive_path:
-            return
-        
-        # 显示安全提示
-        response = messagebox.askyesno(
-            "安全提示",
-            "警告：处理压缩包中的恶意样本时，请确保您了解潜在风险。程序将在隔离环境中读取文件内容，不会执行文件。\n\n是否继续？"
-        )
-        
-        if not response:
-            return
+            total_files += extracted_count - len(file_batch)
+            processed_files += extracted_count
+            errors += batch_errors
+            return batch_errors
         
-        # 询问密码
-        password = None
-        needs_password = messagebox.askyesno(
-            "密码提示",
-            "压缩包是否受密码保护？"
-        )
+        update_progress(0, "开始预处理文件...")
         
-        if needs_password:
-            # 创建一个简单的对话框获取密码
-            password_window = tk.Toplevel(self.root)
-            password_window.title("输入压缩包密码")
-            password_window.geometry("300x150")
-            password_window.resizable(False, False)
-            password_window.transient(self.root)
-            password_window.grab_set()
-            
-            ttk.Label(password_window, text="请输入压缩包密码:", padding=10).pack()
-            
-            password_var = tk.StringVar()
-            password_entry = ttk.Entry(password_window, textvariable=password_var, show="*")
-            password_entry.pack(pady=5, padx=20, fill=tk.X)
-            password_entry.focus()
-            
-            def on_ok():
-                nonlocal password
-                password = password_var.get()
-                password_window.destroy()
-            
-            button_frame = ttk.Frame(password_window)
-            button_frame.pack(pady=10, fill=tk.X)
-            
-            ttk.Button(button_frame, text="确定", command=on_ok).pack(side=tk.RIGHT, padx=10)
-            ttk.Button(button_frame, text="取消", command=password_window.destroy).pack(side=tk.RIGHT)
-            
-            # 等待密码窗口关闭
-            self.root.wait_window(password_window)
+        # 先处理正常文件，再处理恶意文件
+        batches = [(benign_files[i:i+batch_size], False, f"处理正常文件批次 {i//batch_size+1}")
+                   for i in range(0, len(benign_files), batch_size)]
+        batches += [(malicious_files[i:i+batch_size], True, f"处理恶意文件批次 {i//batch_size+1}")
+                    for i in range(0, len(malicious_files), batch_size)]
+        
+        if checkpoint_interval is None:
+            checkpoint_interval = MODEL_CONFIG.get('checkpoint', {}).get('interval_batches', 0)
+        
+        # 本次训练的标识：文件列表和影响批次划分的参数都相同时才能续训
+        run_hasher = hashlib.md5(f"{is_incremental}:{batch_size}".encode('utf-8'))
+        for file_list in (benign_files, malicious_files):
+            run_hasher.update(b'\x00')
+            run_hasher.update('\n'.join(file_list).encode('utf-8', errors='surrogatepass'))
+        run_key = run_hasher.hexdigest()
+        
+        start_batch = 0
+        progress = self._training_progress
+        if resume and progress and progress.get("run_key") == run_key:
+            start_batch = progress["batches_done"]
+            processed_files = progress.get("processed_files",
+                                           sum(len(batch) for batch, _, _ in batches[:start_batch]))
+            total_files = progress.get("total_files", total_files)
+            errors = progress.get("errors", 0)
+            initial_benign_files = progress.get("initial_benign_files", initial_benign_files)
+            initial_malicious_files = progress.get("initial_malicious_files", initial_malicious_files)
+            logger.info("从检查点继续训练：跳过已完成的 %d 个批次（%d 个文件）", start_batch, processed_files)
+        
+        for batch_index in range(start_batch, len(batches)):
+            batch, batch_is_malicious, status = batches[batch_index]
+            update_progress(processed_files, status)
+            process_batch(batch, batch_is_malicious)
             
-            if password is None:
-                return
+            # 定期写增量检查点（最后一个批次之后直接保存完整模型）
+            batches_done = batch_index + 1
+            if checkpoint_interval and batches_done % checkpoint_interval == 0 and batches_done < len(batches):
+                self.save_checkpoint({
+                    "run_key": run_key,
+                    "batches_done": batches_done,
+                    "processed_files": processed_files,
+                    "total_files": total_files,
+                    "errors": errors,
+                    "initial_benign_files": initial_benign_files,
+                    "initial_malicious_files": initial_malicious_files
+                })
         
-        # 询问是否处理可执行文件
-        process_executables = messagebox.askyesno(
-            "处理选项",
-            "是否处理压缩包中的可执行文件？\n(注意：这可能存在安全风险，但对恶意软件分析很重要)"
-        )
+        # 保存模型
+        save_success = self.save_model()
         
-        # 显示提示
-        messagebox.showinfo("提示", "开始处理压缩包，请等待...")
+        # 计算训练时间
+        training_time = time.time() - start_time
         
-        # 创建扫描状态标签（如果不存在）
-        if not hasattr(self, 'scan_status_var'):
-            self.scan_status_var = tk.StringVar(value="准备处理压缩包...")
-            self.scan_status_label = ttk.Label(self.train_status_label.master, textvariable=self.scan_status_var, foreground="blue")
-            self.scan_status_label.pack(fill=tk.X, pady=(2, 0))
-        else:
-            self.scan_status_var.set("准备处理压缩包...")
-            self.scan_status_label.pack(fill=tk.X, pady=(2, 0))
+        # 计算性能指标
+        files_per_second = (processed_files - errors) / max(1, training_time)
+        cpu_utilization = psutil.cpu_percent(interval=0.1)  # 获取CPU使用率
         
-        # 在单独的线程中处理压缩包，避免UI冻结
-        def process_archive_thread():
-            try:
-                # 使用临时目录存储解压的文件内容
-                with tempfile.TemporaryDirectory() as temp_dir:
-                    count = 0
-                    batch = []
-                    processed_files = 0
-                    skipped_files = 0
-                    
-                    # 处理ZIP文件
-                    if archive_path.lower().endswith('.zip'):
-                        try:
-                            with zipfile.ZipFile(archive_path, 'r') as zip_ref:
-                                # 获取所有文件
-                                file_list = zip_ref.namelist()
-                                total_files = len(file_list)
-                                
-                                # 尝试读取第一个文件来验证密码
-                                password_valid = True
-                                if password and file_list:
-                                    first_file = next((f for f in file_list if not (f.endswith('/') or f.endswith('\\'))), None)
-                                    if first_file:
-                                        try:
-                                            # 尝试读取第一个文件验证密码
-                                            zip_ref.read(first_file, pwd=password.encode('utf-8'))
-                                        except RuntimeError:
-                                            # 尝试使用不同的编码
-                                            try:
-                                                zip_ref.read(first_file, pwd=password.encode('latin-1'))
-                                            except RuntimeError:
-                                                password_valid = False
-                                                self.root.after(0, lambda: (
-                                                    self.scan_status_var.set("密码错误"),
-                                                    messagebox.showerror("错误", "压缩包密码错误或编码不支持，请重试"),
-                                                    self.scan_status_label.pack_forget() if hasattr(self, 'scan_status_label') else None
-                                                ))
-                                                return
-                                
-                                for i, file_name in enumerate(file_list):
-                                    # 跳过目录
-                                    if file_name.endswith('/') or file_name.endswith('\\'):
-                                        skipped_files += 1
-                                        continue
-                                    
-                                    # 检查是否是可执行文件
-                                    _, ext = os.path.splitext(file_name)
-                                    is_executable = ext.lower() in ['.exe', '.dll', '.com', '.cmd', '.bat', '.ps1', '.vbs', '.js']
-                                    
-                                    # 如果是可执行文件且用户选择不处理，则跳过
-                                    if is_executable and not process_executables:
-                                        skipped_files += 1
-                                        continue
-                                    
-                                    # 如果是可执行文件且用户选择处理，记录日志
-                                    if is_executable and process_executables:
-                                        print(f"处理可执行文件: {file_name}")
-                                    
-                                    try:
-                                        # 安全读取文件内容，不写入磁盘
-                                        if password:
-                                            # 尝试多种编码
-                                            try:
-                                                file_content = zip_ref.read(file_name, pwd=password.encode('utf-8'))
-                                            except RuntimeError:
-                                                file_content = zip_ref.read(file_name, pwd=password.encode('latin-1'))
-                                        else:
-                                            file_content = zip_ref.read(file_name)
-                                        
-                                        # 创建临时文件路径（但不实际写入文件系统）
-                                        temp_file_path = os.path.join(temp_dir, f"file_{count}.tmp")
-                                        
-                                        # 将文件信息添加到批次中
-                                        batch.append((temp_file_path, os.path.basename(file_name), file_content))
-                                        count += 1
-                                        processed_files += 1
-                                        
-                                        # 更新进度
-                                        current_progress = i + 1
-                                        self.root.after(0, lambda p=current_progress, t=total_files, c=count: 
-                                            self.scan_status_var.set(f"处理中 - {p}/{t} 文件，已添加 {c} 个样本"))
-                                        
-                                        # 每100个文件处理一次批次
-                                        if len(batch) >= 100:
-                                            self.root.after(0, lambda b=batch.copy(): self._add_malicious_files_from_archive(b))
-                                            batch.clear()
-                                            
-                                    except Exception as e:
-                                        # 跳过无法读取的文件
-                                        skipped_files += 1
-                                        print(f"无法读取文件 {file_name}: {e}")
-                                        continue
-                                    
-                                    # 短暂休眠，让出CPU时间给UI线程
-                                    if i % 10 == 0:
-                                        time.sleep(0.01)
-                            
-                        except Exception as e:
-                            self.root.after(0, lambda: (
-                                self.scan_status_var.set(f"处理失败: {str(e)}"),
-                                messagebox.showerror("错误", f"处理ZIP文件时发生错误: {str(e)}"),
-                                self.scan_status_label.pack_forget() if hasattr(self, 'scan_status_label') else None
-                            ))
-                            return
-                    else:
-                        self.root.after(0, lambda: (
-                            self.scan_status_var.set("不支持的格式"),
-                            messagebox.showerror("错误", "目前仅支持ZIP格式的压缩包"),
-                            self.scan_status_label.pack_forget() if hasattr(self, 'scan_status_label') else None
-                        ))
-                        return
-                    
-                    # 处理剩余的文件批次
-                    if batch:
-                        self.root.after(0, lambda b=batch.copy(): self._add_malicious_files_from_archive(b))
-                    
-                    # 处理完成
-                    self.root.after(0, lambda c=count, s=skipped_files: (
-                        self.scan_status_var.set(f"处理完成 - 共添加 {c} 个样本，跳过 {s} 个文件"),
-                        messagebox.showinfo("完成", f"成功从压缩包添加 {c} 个恶意样本文件\n\n跳过的文件数量: {s}\n(包括目录和可执行文件)"),
-                        self.scan_status_label.pack_forget() if hasattr(self, 'scan_status_label') else None
-                    ))
-                    
-            except Exception as e:
-                self.root.after(0, lambda: (
-                    self.scan_status_var.set(f"处理失败: {str(e)}"),
-                    messagebox.showerror("错误", f"处理压缩包时发生错误: {str(e)}"),
-                    self.scan_status_label.pack_forget() if hasattr(self, 'scan_status_label') else None
-                ))
-        
-        # 启动处理线程
-        thread = threading.Thread(target=process_archive_thread)
-        thread.daemon = True
-        thread.start()
-    
-    def _add_malicious_files_from_archive(self, batch):
-        """从压缩包批量添加黑样本文件，真正解压到临时目录"""
-        # 创建一个临时目录来存储解压的文件
-        if not hasattr(self, '_temp_extract_dir'):
-            self._temp_extract_dir = tempfile.mkdtemp(prefix="malware_temp_")
-            print(f"创建临时解压目录: {self._temp_extract_dir}")
-        
-        for temp_path, filename, file_content in batch:
-            # 生成一个安全的文件名
-            safe_filename = re.sub(r'[^a-zA-Z0-9_.-]', '_', filename)
-            # 创建实际的临时文件路径
-            actual_temp_path = os.path.join(self._temp_extract_dir, safe_filename)
-            
-            # 将文件内容写入临时文件
-            try:
-                with open(actual_temp_path, 'wb') as f:
-                    f.write(file_content)
-                print(f"已解压文件到: {actual_temp_path}")
-                
-                # 添加到恶意文件列表
-                if actual_temp_path not in self.malicious_files:
-                    self.malicious_files.append(actual_temp_path)
-                    
-                    # 在列表框中显示文件名
-                    display_name = f"[ARCHIVE] {filename}"
-                    self.malicious_files_listbox.insert(tk.END, display_name)
-                    
-                    # 限制列表显示，避免UI内存问题
-                    if len(self.malicious_files_listbox.get(0, tk.END)) > 10000:
-                        # 只清理列表显示，保留文件路径和实际文件
-                        self.malicious_files_listbox.delete(0)
-                        print(f"清理列表显示，保留文件数据")
-            except Exception as e:
-                print(f"写入临时文件失败 {actual_temp_path}: {str(e)}")
-                # 回退到内存存储方式
-                if not hasattr(self, '_archive_file_contents'):
-                    self._archive_file_contents = {}
-                self._archive_file_contents[temp_path] = file_content
-                if temp_path not in self.malicious_files:
-                    self.malicious_files.append(temp_path)
-                    display_name = f"[ARCHIVE] {filename} (内存)"
-                    self.malicious_files_listbox.insert(tk.END, display_name)
-        
-        # 更新UI
-        self.root.update()
-    
-    def clear_malicious_files(self):
-        """清空黑样本文件"""
-        self.malicious_files = []
-        self.malicious_files_listbox.delete(0, tk.END)
-        # 清理压缩包文件内容缓存
-        if hasattr(self, '_archive_file_contents'):
-            self._archive_file_contents = {}
-    
-    def start_training(self):
-        """开始训练模型，支持并行处理和性能监控"""
-        if not self.benign_files and not self.malicious_files:
-            messagebox.showerror("错误", "请至少添加一些白样本或黑样本文件")
-            return
+        # 计算本次训练新增的样本数
+        new_malicious_files = self.total_malicious_files - initial_malicious_files
+        new_benign_files = self.total_benign_files - initial_benign_files
         
-        # 确认开始训练
-        total_files = len(self.benign_files) + len(self.malicious_files)
-        if total_files > 10000:
-            response = messagebox.askyesno("确认训练", 
-                f"您即将训练 {total_files} 个文件，这可能需要较长时间。\n" +
-                f"是否继续？")
-            if not response:
-                return
+        # 记录训练完成后的状态
+        self._log_sampler.flush()
+        logger.info("训练完成！训练后累计白样本数: %d，黑样本数: %d", self.total_benign_files, self.total_malicious_files)
+        logger.info("本次新增白样本数: %d，黑样本数: %d，处理错误数: %d，耗时 %.1f 秒（%.0f 文件/秒）",
+                    new_benign_files, new_malicious_files, errors, training_time, files_per_second)
+        logger.info("保存模型结果: %s", '成功' if save_success else '失败')
         
-        # 初始化训练状态
-        self.is_training = True
+        stats = {
+            "total_files": total_files,
+            "processed_files": processed_files - errors,
+            "errors": errors,
+            "training_time": training_time,
+            "benign_files": len(benign_files),
+            "malicious_files": len(malicious_files),
+            "new_benign_files": new_benign_files,
+            "new_malicious_files": new_malicious_files,
+            "files_per_second": files_per_second,
+            "cpu_utilization": cpu_utilization,
+            "save_success": save_success
+        }
         
-        # 创建性能监控标签
-        if not hasattr(self, 'performance_frame'):
-            # 添加性能监控区域
-            self.performance_frame = ttk.LabelFrame(self.train_status_label.master, text="实时性能监控", padding="5")
-            self.performance_frame.place(relx=0, rely=0, anchor='nw')
-            
-            # 性能指标
-            performance_grid = ttk.Frame(self.performance_frame)
-            performance_grid.pack(fill=tk.X)
-            
-            self.cpu_usage_var = tk.StringVar(value="CPU使用率: --%")
-            self.files_per_sec_var = tk.StringVar(value="处理速度: -- 文件/秒")
-            self.memory_usage_var = tk.StringVar(value="内存使用: -- MB")
-            
-            ttk.Label(performance_grid, textvariable=self.cpu_usage_var, font=('SimHei', 10, 'bold')).grid(row=0, column=0, sticky=tk.W, padx=10, pady=2)
-            ttk.Label(performance_grid, textvariable=self.files_per_sec_var).grid(row=0, column=1, sticky=tk.W, padx=10, pady=2)
-            ttk.Label(performance_grid, textvariable=self.memory_usage_var).grid(row=0, column=2, sticky=tk.W, padx=10, pady=2)
-            
-            # 添加取消按钮
-            if not hasattr(self, 'cancel_button'):
-                self.cancel_button = ttk.Button(self.train_status_label.master, text="取消训练", command=self.cancel_training)
-                # 使用pack方法而不是place方法来避免参数错误
-                self.cancel_button.pack(side=tk.RIGHT, padx=10, pady=5)
-        else:
-            # 显示已存在的性能监控区域
-            self.performance_frame.pack(fill=tk.X, pady=(0, 5))
-            self.cancel_button.pack(side=tk.RIGHT, padx=10, pady=5)
-        
-        # 更新UI
-        self.root.after(0, lambda: self.cancel_button.config(state=tk.NORMAL))
-        self.root.after(0, lambda: self.train_status_var.set("训练中..."))
-        
-        # 性能监控线程
-        def performance_monitor():
-            process = psutil.Process()
-            while self.is_training:
-                # 获取CPU使用率
-                cpu_percent = psutil.cpu_percent(interval=0.5)
-                
-                # 获取内存使用
-                mem_info = process.memory_info()
-                mem_mb = mem_info.rss / (1024 * 1024)
-                
-                # 更新UI
-                self.root.after(0, lambda: self.cpu_usage_var.set(f"CPU使用率: {cpu_percent:.1f}%"))
-                self.root.after(0, lambda: self.memory_usage_var.set(f"内存使用: {mem_mb:.1f} MB"))
-                
-                # 短暂休眠
-                time.sleep(1)
-        
-        # 启动性能监控
-        self.performance_monitor_thread = threading.Thread(target=performance_monitor)
-        self.performance_monitor_thread.daemon = True
-        self.performance_monitor_thread.start()
-        
-        # 训练回调函数
-        def training_callback(processed, total, status):
-            # 更新状态信息
-            status_text = f"训练中 - {status} ({processed}/{total} 文件)"
-            self.root.after(0, lambda: self.train_status_var.set(status_text))
-            
-            # 如果有处理速度信息，更新显示
-            if hasattr(self, 'last_processed_count') and hasattr(self, 'last_update_time'):
-                elapsed = time.time() - self.last_update_time
-                if elapsed > 1:  # 每秒更新一次
-                    files_per_sec = (processed - self.last_processed_count) / elapsed
-                    self.root.after(0, lambda: self.files_per_sec_var.set(f"处理速度: {files_per_sec:.1f} 文件/秒"))
-                    self.last_processed_count = processed
-                    self.last_update_time = time.time()
-            else:
-                self.last_processed_count = processed
-                self.last_update_time = time.time()
+        update_progress(total_files, "训练完成")
         
-        # 在单独的线程中训练，避免UI冻结
-        def train_thread():
-            try:
-                # 执行训练
-                is_incremental = self.is_incremental_var.get()
-                results = self.detector.train(
-                    self.benign_files, 
-                    self.malicious_files, 
-                    is_incremental=is_incremental,
-                    use_parallel=True,
-                    batch_size=1000,
-                    callback=training_callback
-                )
-                
-                # 如果训练被取消，不继续处理
-                if not self.is_training:
-                    return
-                
-                # 更新UI
-                self.root.after(0, lambda: self.train_status_var.set(
-                    f"训练完成 - 处理: {results['processed_files']} 文件, 错误: {results['errors']}, 耗时: {results['training_time']:.2f}秒"
-                ))
-                
-                # 更新模型信息
-                self.root.after(0, self.update_model_info_display)
-                
-                # 显示结果
-                msg = "训练成功完成！\n\n"
-                msg += f"总计文件数: {results['total_files']}\n"
-                msg += f"成功处理: {results['processed_files']}\n"
-                msg += f"处理错误: {results['errors']}\n"
-                msg += f"训练时间: {results['training_time']:.2f}秒\n"
-                msg += f"本次新增白样本数: {results['new_benign_files']}\n"
-                msg += f"本次新增黑样本数: {results['new_malicious_files']}\n"
-                msg += f"累计白样本数: {self.detector.total_benign_files}\n"
-                msg += f"累计黑样本数: {self.detector.total_malicious_files}\n"
-                msg += f"平均处理速度: {results['files_per_second']:.2f} 文件/秒\n"
-                msg += f"CPU利用率: {results['cpu_utilization']:.1f}%"
-                self.root.after(0, lambda: messagebox.showinfo("训练完成", msg))
-            except Exception as e:
-                if self.is_training:
-                    self.root.after(0, lambda: messagebox.showerror("训练失败", f"训练过程中发生错误: {str(e)}"))
-            finally:
-                # 停止训练
-                self.is_training = False
-                
-                # 更新UI
-                self.root.after(0, lambda: self.cancel_button.config(state=tk.DISABLED))
-                self.root.after(0, lambda: self.cpu_usage_var.set("CPU使用率: --%"))
-                self.root.after(0, lambda: self.files_per_sec_var.set("处理速度: -- 文件/秒"))
-                self.root.after(0, lambda: self.memory_usage_var.set("内存使用: -- MB"))
-        
-        # 启动训练线程
-        self.training_thread = threading.Thread(target=train_thread)
-        self.training_thread.daemon = True
-        self.training_thread.start()
-    
-    def cancel_training(self):
-        """取消正在进行的训练"""
-        if messagebox.askyesno("确认取消", "确定要取消训练吗？"):
-            self.is_training = False
-            # 禁用取消按钮
-            self.cancel_button.config(state=tk.DISABLED)
-            self.train_status_var.set("取消训练中...")
-            # 等待线程结束
-            if hasattr(self, 'training_thread') and self.training_thread and self.training_thread.is_alive():
-                self.training_thread.join(timeout=5.0)
-            self.train_status_var.set("训练已取消")
-    
-    def create_train_tab(self, parent):
-        """创建训练标签页（增强版，支持并行处理）"""
-        # 原始代码保留，添加并行处理选项
-        # 分割面板
-        left_frame = ttk.Frame(parent, padding="5")
-        left_frame.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
-        
-        right_frame = ttk.Frame(parent, padding="5")
-        right_frame.pack(side=tk.RIGHT, fill=tk.BOTH, expand=True)
-        
-        # 左侧：白样本区域
-        ttk.Label(left_frame, text="白样本文件（正常文件）", font=('SimHei', 12)).pack(anchor=tk.W, pady=(0, 5))
-        
-        # 白样本文件列表
-        self.benign_files_frame = ttk.Frame(left_frame)
-        self.benign_files_frame.pack(fill=tk.BOTH, expand=True, pady=(0, 10))
-        
-        benign_scrollbar = ttk.Scrollbar(self.benign_files_frame)
-        benign_scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
-        
-        self.benign_files_listbox = tk.Listbox(self.benign_files_frame, yscrollcommand=benign_scrollbar.set, width=40, height=15)
-        self.benign_files_listbox.pack(fill=tk.BOTH, expand=True, padx=2, pady=2)
-        benign_scrollbar.config(command=self.benign_files_listbox.yview)
-        
-        # 白样本按钮区域
-        benign_buttons_frame = ttk.Frame(left_frame)
-        benign_buttons_frame.pack(fill=tk.X, pady=(0, 5))
-        
-        ttk.Button(benign_buttons_frame, text="添加白样本文件", command=self.add_benign_files).pack(side=tk.LEFT, padx=2)
-        # 保存按钮引用，用于控制状态
-        self.add_benign_dir_button = ttk.Button(benign_buttons_frame, text="添加白样本目录", command=self.add_benign_directory)
-        self.add_benign_dir_button.pack(side=tk.LEFT, padx=2)
-        ttk.Button(benign_buttons_frame, text="清空", command=self.clear_benign_files).pack(side=tk.RIGHT, padx=2)
-        
-        # 右侧：黑样本区域
-        ttk.Label(right_frame, text="黑样本文件（恶意文件）", font=('SimHei', 12)).pack(anchor=tk.W, pady=(0, 5))
-        
-        # 黑样本文件列表
-        self.malicious_files_frame = ttk.Frame(right_frame)
-        self.malicious_files_frame.pack(fill=tk.BOTH, expand=True, pady=(0, 10))
-        
-        malicious_scrollbar = ttk.Scrollbar(self.malicious_files_frame)
-        malicious_scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
-        
-        self.malicious_files_listbox = tk.Listbox(self.malicious_files_frame, yscrollcommand=malicious_scrollbar.set, width=40, height=15)
-        self.malicious_files_listbox.pack(fill=tk.BOTH, expand=True, padx=2, pady=2)
-        malicious_scrollbar.config(command=self.malicious_files_listbox.yview)
-        
-        # 黑样本按钮区域
-        malicious_buttons_frame = ttk.Frame(right_frame)
-        malicious_buttons_frame.pack(fill=tk.X, pady=(0, 5))
-        
-        # 压缩包按钮放在最前面，确保可见
-        ttk.Button(malicious_buttons_frame, text="从压缩包添加", command=self.add_malicious_archive).pack(side=tk.LEFT, padx=2)
-        # 添加文件按钮
-        ttk.Button(malicious_buttons_frame, text="添加黑样本文件", command=self.add_malicious_files).pack(side=tk.LEFT, padx=2)
-        # 添加目录按钮
-        ttk.Button(malicious_buttons_frame, text="添加黑样本目录", command=self.add_malicious_directory).pack(side=tk.LEFT, padx=2)
-        # 清空按钮在右侧
-        ttk.Button(malicious_buttons_frame, text="清空", command=self.clear_malicious_files).pack(side=tk.RIGHT, padx=2)
-        
-        # 训练按钮区域
-        train_buttons_frame = ttk.Frame(parent)
-        train_buttons_frame.pack(fill=tk.X, pady=10)
-        
-        # 训练选项
-        options_frame = ttk.Frame(train_buttons_frame)
-        options_frame.pack(side=tk.LEFT, fill=tk.X, expand=True)
-        
-        # 创建一个框架来容纳两个复选框
-        checkboxes_frame = ttk.Frame(options_frame)
-        checkboxes_frame.pack(side=tk.LEFT)
-        
-        self.is_incremental_var = tk.BooleanVar(value=False)
-        ttk.Checkbutton(checkboxes_frame, text="增量训练（保留现有模型）", variable=self.is_incremental_var).pack(anchor=tk.W, padx=10, pady=2)
-        
-        # 训练控制
-        control_frame = ttk.Frame(train_buttons_frame)
-        control_frame.pack(side=tk.RIGHT)
-        
-        ttk.Button(control_frame, text="开始训练", command=self.start_training, style="Accent.TButton").pack(side=tk.RIGHT, padx=10)
-        
-        # 训练状态区域
-        self.train_status_var = tk.StringVar(value="准备就绪")
-        self.train_status_label = ttk.Label(parent, textvariable=self.train_status_var, relief=tk.SUNKEN, anchor=tk.W)
-        self.train_status_label.pack(fill=tk.X, pady=(5, 0))
-        
-        # 初始化训练控制变量
-        self.is_training = False
-        self.training_thread = None
-        self.performance_monitor_thread = None
-        
-        # 配置训练按钮样式
-        style = ttk.Style()
-        style.configure("Accent.TButton", font=('TkDefaultFont', 10, 'bold'))
-        style.configure("Danger.TButton", font=('TkDefaultFont', 10, 'bold'), foreground='red')
-    
-    def select_file_for_detection(self):
-        """选择要检测的文件"""
-        file_path = filedialog.askopenfilename(title="选择要检测的文件")
-        if file_path:
-            self.detect_file_var.set(file_path)
-    
-    def start_detection(self):
-        """开始检测文件"""
-        file_path = self.detect_file_var.get()
-        if not file_path or not os.path.exists(file_path):
-            messagebox.showerror("错误", "请选择有效的文件")
-            return
+        return stats
+    
+    def build_partial_model(self, benign_files, malicious_files, num_workers=None, chunk_size=None, callback=None):
+        """map-reduce 训练的 map 阶段：工作进程各自提取一块文件的特征并累计部分计数，
+        主进程按完成顺序把部分模型相加合并
         
-        # 更新状态
-        self.detection_result_var.set("检测中...")
-        self.score_info_var.set("")
-        self.features_text.delete(1.0, tk.END)
-        self.root.update()
+        工作进程之间不共享特征缓存；压缩包成员文件与普通文件一样在工作进程中流式读取，
+        tar、gz 等需要顺序解压的压缩包整个交给一个工作进程解压。
         
-        # 在单独的线程中检测，避免UI冻结
-        def detect_thread():
-            try:
-                # 执行检测
-                result = self.detector.predict(file_path)
-                
-                # 更新UI
-                if result.get("error"):
-                    self.root.after(0, lambda: self.detection_result_var.set(f"检测错误: {result['error']}"))
-                else:
-                    # 设置检测结果
-                    status = "恶意文件" if result["is_malicious"] else "正常文件"
-                    color = "red" if result["is_malicious"] else "green"
-                    
-                    self.root.after(0, lambda: (
-                        self.detection_result_var.set(status),
-                        self.detection_result_label.config(foreground=color)
-                    ))
-                    
-                    # 设置分数信息
-                    # 准备信息文本
-                    score_info_text = f"恶意分数: {result['score']:.4f} (阈值: {result['threshold']:.2f}) | 匹配特征: {len(result['matched_features'])}/{result['total_features']}"
-                    # 使用参数传递避免作用域问题
-                    self.root.after(0, lambda info=score_info_text: self.score_info_var.set(info))
-                    
-                    # 设置特征列表
-                    if result["matched_features"]:
-                        # 检查matched_features的结构
-                        if isinstance(result["matched_features"], list) and result["matched_features"] and len(result["matched_features"][0]) == 3:
-                            # 格式：[(feature, formatted_weight, formatted_score), ...]
-                            features_text = "\n".join([
-                                f"{feature}: {formatted_score}" 
-                                for feature, formatted_weight, formatted_score in result["matched_features"]
-                            ])
-                        elif isinstance(result["matched_features"], dict):
-                            # 处理字典类型（向后兼容）
-                            features_items = sorted(result["matched_features"].items(), key=lambda x: x[1], reverse=True)
-                            features_text = "\n".join([
-                                f"{feature}: {score:.4f}" 
-                                for feature, score in features_items
-                            ])
-                        else:
-                            # 尝试作为简单列表处理
-                            features_text = "\n".join([str(item) for item in result["matched_features"]])
-                    else:
-                        features_text = "未匹配任何特征"
-                    
-                    # 使用局部变量传递文本内容
-                    features_content = features_text
-                    self.root.after(0, lambda text=features_content: self.features_text.insert(tk.END, text))
-                    
-            except Exception as e:
-                error_msg = str(e)
-                self.root.after(0, lambda msg=error_msg: self.detection_result_var.set(f"检测失败: {msg}"))
-        
-        # 启动检测线程
-        thread = threading.Thread(target=detect_thread)
-        thread.daemon = True
-        thread.start()
-    
-    def select_directory(self, var):
-        """选择目录"""
-        directory = filedialog.askdirectory(title="选择目录")
-        if directory:
-            var.set(directory)
-    
-    def start_evaluation(self):
-        """开始评估模型"""
-        benign_dir = self.eval_benign_var.get()
-        malicious_dir = self.eval_malicious_var.get()
-        
-        if not benign_dir or not os.path.isdir(benign_dir):
-            messagebox.showerror("错误", "请选择有效的白样本测试目录")
-            return
+        Args:
+            benign_files: 正常文件路径列表
+            malicious_files: 恶意文件路径列表
+            num_workers: 工作进程数量，如果为None则使用CPU核心数
+            chunk_size: 每个任务的文件数，None 时按文件数和进程数自动选择
+            callback: 进度回调函数，格式：callback(processed, total, status)
         
-        if not malicious_dir or not os.path.isdir(malicious_dir):
-            messagebox.showerror("错误", "请选择有效的黑样本测试目录")
-            return
+        Returns:
+            合并后的 PartialModel
+        """
+        if num_workers is None:
+            num_workers = multiprocessing.cpu_count()
         
-        # 更新状态为收集文件中
-        self.eval_status_var.set("正在收集测试文件...")
-        self.root.update()
+        merged = PartialModel(self._get_feature_extractor().version)
+        total_files = len(benign_files) + len(malicious_files)
+        if chunk_size is None:
+            chunk_size = max(1, min(256, total_files // (num_workers * 4)))
         
-        # 收集测试文件的线程函数
-        def collect_files_thread():
-            try:
-                benign_test_files = []
-                malicious_test_files = []
-                total_files = 0
-                
-                # 渐进式收集白样本文件
-                for root, _, files in os.walk(benign_dir):
-                    for file in files:
-                        file_path = os.path.join(root, file)
-                        benign_test_files.append(file_path)
-                        total_files += 1
-                        
-                        # 每1000个文件更新一次状态，避免UI冻结
-                        if total_files % 1000 == 0:
-                            current_total = total_files
-                            self.root.after(0, lambda t=current_total: 
-                                self.eval_status_var.set(f"正在收集测试文件... {t} 文件已收集"))
-                
-                # 渐进式收集黑样本文件
-                for root, _, files in os.walk(malicious_dir):
-                    for file in files:
-                        file_path = os.path.join(root, file)
-                        malicious_test_files.append(file_path)
-                        total_files += 1
-                        
-                        # 每1000个文件更新一次状态，避免UI冻结
-                        if total_files % 1000 == 0:
-                            current_total = total_files
-                            self.root.after(0, lambda t=current_total: 
-                                self.eval_status_var.set(f"正在收集测试文件... {t} 文件已收集"))
-                
-                # 检查文件数量
-                if not benign_test_files:
-                    self.root.after(0, lambda: (
-                        self.eval_status_var.set("评估失败"),
-                        messagebox.showerror("错误", "白样本测试目录中没有找到文件")
-                    ))
-                    return
-                
-                if not malicious_test_files:
-                    self.root.after(0, lambda: (
-                        self.eval_status_var.set("评估失败"),
-                        messagebox.showerror("错误", "黑样本测试目录中没有找到文件")
-                    ))
-                    return
-                
-                # 更新状态并开始评估
-                self.root.after(0, lambda: self.eval_status_var.set("评估中..."))
-                
-                # 执行评估
+        processed_files = 0
+        tasks = []
+        for file_list, is_malicious in ((benign_files, False), (malicious_files, True)):
+            # 需要顺序解压的压缩包各自作为一个任务，不同压缩包在不同进程中同时解压
+            file_list, stream_archives = archive_source.expand_archives(file_list)
+            tasks.extend((file_list[i:i + chunk_size], is_malicious) for i in range(0, len(file_list), chunk_size))
+            tasks.extend(([archive_path], is_malicious) for archive_path in stream_archives)
+        
+        pool = self._get_process_pool(num_workers)
+        max_in_flight = num_workers * 2
+        next_task = 0
+        in_flight = {}
+        
+        while next_task < len(tasks) or in_flight:
+            while next_task < len(tasks) and len(in_flight) < max_in_flight:
+                chunk, is_malicious = tasks[next_task]
+                in_flight[pool.submit(_train_partial_chunk, chunk, is_malicious,
+                                      archive_source.passwords_for(chunk))] = tasks[next_task]
+                next_task += 1
+            
+            done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in done:
+                chunk, is_malicious = in_flight.pop(future)
                 try:
-                    results = self.detector.evaluate(benign_test_files, malicious_test_files)
-                    
-                    # 更新UI指标
-                    self.root.after(0, lambda: (
-                        self.accuracy_var.set(f"准确率: {results['accuracy']:.4f}"),
-                        self.precision_var.set(f"精确率: {results['precision']:.4f}"),
-                        self.recall_var.set(f"召回率: {results['recall']:.4f}"),
-                        self.f1_var.set(f"F1分数: {results['f1_score']:.4f}"),
-                        self.fn_var.set(f"漏报率: {results['false_negative_rate']:.4f}"),
-                        self.fp_var.set(f"误报率: {results['false_positive_rate']:.4f}")
-                    ))
-                    
-                    # 更新混淆矩阵
-                    self.root.after(0, lambda: self.update_confusion_matrix(results))
-                    
-                    # 更新状态
-                    self.root.after(0, lambda: self.eval_status_var.set(
-                        f"评估完成 - 正常文件: {results['total_benign_tested']}, 恶意文件: {results['total_malicious_tested']}"
-                    ))
-                    
+                    merged.merge(future.result())
                 except Exception as e:
-                    self.root.after(0, lambda: self.eval_status_var.set(f"评估失败: {str(e)}"))
-                
-            except Exception as e:
-                self.root.after(0, lambda: (
-                    self.eval_status_var.set(f"文件收集失败: {str(e)}"),
-                    messagebox.showerror("错误", f"收集测试文件时发生错误: {str(e)}")
-                ))
-        
-        # 启动文件收集线程
-        thread = threading.Thread(target=collect_files_thread)
-        thread.daemon = True
-        thread.start()
-        
-        if not benign_test_files:
-            messagebox.showerror("错误", "白样本测试目录中没有找到文件")
-            return
-        
-        if not malicious_test_files:
-            messagebox.showerror("错误", "黑样本测试目录中没有找到文件")
-            return
+                    # 工作进程出错时在主进程中处理这一块
+                    logger.warning("分片训练失败，改为在主进程中处理 %d 个文件: %s", len(chunk), e)
+                    merged.fallback_chunks += 1
+                    try:
+                        merged.add_batch([features for _, features in self.iter_extract_features(
+                            chunk, use_multiprocessing=False, expand_archives=True)], is_malicious)
+                    except Exception as fallback_error:
+                        merged.skipped_files += len(chunk)
+                        logger.error("主进程处理分片失败，跳过 %d 个文件: %s", len(chunk), fallback_error)
+                processed_files += len(chunk)
+                if callback:
+                    callback(processed_files, total_files, f"已累计 {processed_files} 个文件")
+        
+        return merged
+    
+    def apply_partial_model(self, partial, is_incremental=False):
+        """map-reduce 训练的 reduce 结果：把合并后的部分模型计入当前模型并一次推导权重
         
-        # 更新状态
-        self.eval_status_var.set("评估中...")
-        self.root.update()
+        计数和样本数直接相加。权重增量由每个特征的特征值之和得到，
+        与逐个文件更新的公式相同（恶意 +0.1×值，正常 -0.05×值×动态调整因子），
+        平衡因子按合并后的样本总数计算，最后统一限制在权重范围内。
+        结果与文件顺序无关，但与逐个文件更新（平衡因子随样本数变化、每步限制）不完全相同。
         
-        # 在单独的线程中评估，避免UI冻结
-        def eval_thread():
-            try:
-                # 执行评估
-                results = self.detector.evaluate(benign_test_files, malicious_test_files)
-                
-                # 更新UI指标
-                self.root.after(0, lambda: (
-                    self.accuracy_var.set(f"准确率: {results['accuracy']:.4f}"),
-                    self.precision_var.set(f"精确率: {results['precision']:.4f}"),
-                    self.recall_var.set(f"召回率: {results['recall']:.4f}"),
-                    self.f1_var.set(f"F1分数: {results['f1_score']:.4f}"),
-                    self.fn_var.set(f"漏报率: {results['false_negative_rate']:.4f}"),
-                    self.fp_var.set(f"误报率: {results['false_positive_rate']:.4f}")
-                ))
-                
-                # 更新混淆矩阵
-                self.root.after(0, lambda: self.update_confusion_matrix(results))
-                
-                # 更新状态
-                self.root.after(0, lambda: self.eval_status_var.set(
-                    f"评估完成 - 正常文件: {results['total_benign_tested']}, 恶意文件: {results['total_malicious_tested']}"
-                ))
-                
-            except Exception as e:
-                self.root.after(0, lambda: self.eval_status_var.set(f"评估失败: {str(e)}"))
+        Args:
+            partial: PartialModel
+            is_incremental: 是否为增量训练
+        """
+        update_factor = self.config["incremental_update_factor"] if is_incremental else 1.0
         
-        # 启动评估线程
-        thread = threading.Thread(target=eval_thread)
-        thread.daemon = True
-        thread.start()
+        ids = np.fromiter(map(self.vocabulary.add, partial.vocabulary.names), dtype=np.int64,
+                          count=len(partial.vocabulary))
+        self._ensure_feature_capacity(len(self.vocabulary))
+        self._counts_benign[ids] += partial.counts_benign.astype(self._counts_benign.dtype)
+        self._counts_malicious[ids] += partial.counts_malicious.astype(self._counts_malicious.dtype)
+        self.total_benign_files += partial.total_benign_files
+        self.total_malicious_files += partial.total_malicious_files
+        
+        malicious_balance = self._balance_factor(self.total_benign_files, self.total_malicious_files, True)
+        benign_balance = self._balance_factor(self.total_benign_files, self.total_malicious_files, False)
+        weight_increments = (
+            partial.value_sums_malicious * 0.1 * update_factor * malicious_balance
+            - partial.value_sums_benign * 0.05 * update_factor * self.config["dynamic_adjustment_factor"] * benign_balance
+        )
+        self._weights[ids] = np.clip(
+            self._weights[ids] + weight_increments,
+            self.config["min_feature_weight"],
+            self.config["max_feature_weight"]
+        )
+        self._dirty[ids] = True
     
-    def update_confusion_matrix(self, results):
-        """更新混淆矩阵可视化，增强显示效果"""
-        self.ax.clear()
-        
-        # 创建混淆矩阵数据
-        matrix = [
-            [results['true_negatives'], results['false_positives']],  # 预测为正常
-            [results['false_negatives'], results['true_positives']]   # 预测为恶意
-        ]
+    def train_map_reduce(self, benign_files, malicious_files, is_incremental=False, num_workers=None,
+                         chunk_size=None, callback=None):
+        """多进程 map-reduce 训练
         
-        # 计算每个类别的总数
-        total_normal = results['true_negatives'] + results['false_positives']
-        total_malicious = results['false_negatives'] + results['true_positives']
-        
-        # 创建百分比混淆矩阵用于热图显示
-        percent_matrix = [[0, 0], [0, 0]]
-        if total_normal > 0:
-            percent_matrix[0][0] = results['true_negatives'] / total_normal
-            percent_matrix[0][1] = results['false_positives'] / total_normal
-        if total_malicious > 0:
-            percent_matrix[1][0] = results['false_negatives'] / total_malicious
-            percent_matrix[1][1] = results['true_positives'] / total_malicious
-        
-        # 绘制混淆矩阵
-        cax = self.ax.matshow(percent_matrix, cmap='RdBu_r', vmin=0, vmax=1)
-        
-        # 设置标题
-        self.ax.set_title('高级混淆矩阵分析', pad=15, fontsize=12, fontweight='bold')
-        
-        # 设置轴标签
-        self.ax.set_xlabel('预测标签', fontsize=10, labelpad=5)
-        self.ax.set_ylabel('实际标签', fontsize=10, labelpad=5)
-        
-        # 设置轴刻度标签
-        self.ax.set_xticks([0, 1])
-        self.ax.set_yticks([0, 1])
-        self.ax.set_xticklabels(['正常', '恶意'], fontsize=9)
-        self.ax.set_yticklabels(['正常', '恶意'], fontsize=9)
-        
-        # 在单元格中显示数量和百分比
-        for i in range(2):
-            for j in range(2):
-                value = matrix[i][j]
-                percent = percent_matrix[i][j] * 100
-                # 根据背景颜色选择文本颜色
-                text_color = 'white' if percent > 50 else 'black'
-                self.ax.text(j, i, f'{value}\n({percent:.1f}%)', 
-                           ha='center', va='center', 
-                           color=text_color, fontsize=11, fontweight='bold')
-        
-        # 添加颜色条并设置标签
-        cbar = self.fig.colorbar(cax, ax=self.ax)
-        cbar.set_label('百分比', fontsize=9)
-        
-        # 添加关键统计信息
-        stats_text = (
-            f"准确率: {results['accuracy']:.4f}\n" +
-            f"精确率: {results['precision']:.4f}\n" +
-            f"召回率: {results['recall']:.4f}\n" +
-            f"F1分数: {results['f1_score']:.4f}"
-        )
+        每个工作进程独立累计一块文件的部分计数（见 build_partial_model），主进程只做数组
+        相加，最后由 apply_partial_model 一次推导权重，训练速度随核心数线性扩展。
         
-        # 在图表旁边显示统计信息
-        self.ax.text(1.2, 0.5, stats_text, 
-                   transform=self.ax.transAxes, 
-                   bbox=dict(boxstyle="round,pad=0.5", facecolor="white", alpha=0.8),
-                   verticalalignment='center', fontsize=9, fontweight='bold')
-        
-        # 添加图例说明
-        legend_text = """
-        对角线: 正确分类\n
-tn: 正确识别的正常文件\nfp: 误报(正常文件被误判为恶意)\nf
-n: 漏报(恶意文件被误判为正常)\ntp: 正确识别的恶意文件
+        Returns:
+            训练统计信息
         """
-        self.ax.text(1.2, 0.1, legend_text, 
-                   transform=self.ax.transAxes, 
-                   bbox=dict(boxstyle="round,pad=0.5", facecolor="wheat", alpha=0.7),
-                   verticalalignment='top', fontsize=8)
-        
-        # 调整布局
-        self.fig.tight_layout()
-        self.canvas.draw()
-    
-    def update_model_info_display(self):
-        """更新模型信息显示，包括图表和详细指标"""
-        # 获取模型信息
-        info = self.detector.get_model_info()
-        
-        # 更新基本信息
-        info_text = (
-            f"模型版本: {info['model_version']}\n"
-            f"最后训练时间: {info['last_trained']}\n"
-            f"训练白样本数: {info['total_benign_files']}\n"
-            f"训练黑样本数: {info['total_malicious_files']}\n"
-            f"特征总数: {info['total_features']}\n"
-            f"检测阈值: {info['threshold']}\n"
-        )
-        self.model_info_var.set(info_text)
-        
-        # 更新重要特征列表
-        top_features = self.detector.get_top_features()
-        features_text = "\n".join([
-            f"{i+1}. {feature}: {weight:.4f}" 
-            for i, (feature, weight) in enumerate(top_features)
-        ])
-        self.top_features_text.delete(1.0, tk.END)
-        self.top_features_text.insert(tk.END, features_text)
-        
-        # 更新混淆矩阵和性能图表
-        self.update_info_confusion_matrix()
-        self.update_detection_rate_chart()
-        self.update_speed_chart()
-    
-    def update_info_confusion_matrix(self):
-        """更新模型信息页中的混淆矩阵"""
-        self.ax_matrix.clear()
-        
-        # 检查是否有足够的训练数据来模拟混淆矩阵
-        if self.detector.total_benign_files > 0 or self.detector.total_malicious_files > 0:
-            # 基于训练数据模拟一个混淆矩阵
-            # 注意：这是基于训练数据的估计，不是真实测试结果
-            total_benign = max(1, self.detector.total_benign_files)
-            total_malicious = max(1, self.detector.total_malicious_files)
-            
-            # 模拟一个合理的混淆矩阵
-            # 假设正常文件的正确率为95%，恶意文件的检测率为90%
-            tn = int(total_benign * 0.95)
-            fp = total_benign - tn
-            tp = int(total_malicious * 0.90)
-            fn = total_malicious - tp
-            
-            matrix = [[tn, fp], [fn, tp]]
-            
-            # 更新性能指标
-            detection_rate = tp / max(1, total_malicious)
-            false_positive_rate = fp / max(1, total_benign)
-            false_negative_rate = fn / max(1, total_malicious)
-            
-            self.detection_rate_var.set(f"恶意文件检测率: {detection_rate:.4f}")
-            self.false_positive_var.set(f"误报率: {false_positive_rate:.4f}")
-            self.false_negative_var.set(f"漏报率: {false_negative_rate:.4f}")
-        else:
-            # 如果没有训练数据，显示空矩阵
-            matrix = [[0, 0], [0, 0]]
-            self.detection_rate_var.set(f"恶意文件检测率: -- (需要训练数据)")
-            self.false_positive_var.set(f"误报率: -- (需要训练数据)")
-            self.false_negative_var.set(f"漏报率: -- (需要训练数据)")
-        
-        # 绘制混淆矩阵
-        cax = self.ax_matrix.matshow(matrix, cmap='Blues')
-        
-        # 设置标签
-        self.ax_matrix.set_title('混淆矩阵可视化', pad=10, fontsize=11)
-        self.ax_matrix.set_xlabel('预测标签')
-        self.ax_matrix.set_ylabel('实际标签')
-        
-        # 设置轴刻度标签
-        self.ax_matrix.set_xticks([0, 1])
-        self.ax_matrix.set_yticks([0, 1])
-        self.ax_matrix.set_xticklabels(['正常', '恶意'])
-        self.ax_matrix.set_yticklabels(['正常', '恶意'])
-        
-        # 在单元格中显示数值
-        for i in range(2):
-            for j in range(2):
-                self.ax_matrix.text(j, i, str(matrix[i][j]), 
-                                  ha='center', va='center', 
-                                  color='black', fontsize=12)
-        
-        # 添加颜色条
-        self.fig_matrix.colorbar(cax, ax=self.ax_matrix)
-        
-        # 添加额外的统计信息
-        stats_text = "注意: 此混淆矩阵基于训练数据估计\n请使用'模型评估'标签页获取真实测试结果"
-        self.ax_matrix.text(0.5, 1.15, stats_text, ha='center', transform=self.ax_matrix.transAxes, fontsize=9, color='gray')
-        
-        # 刷新图表
-        self.fig_matrix.tight_layout()
-        self.canvas_matrix.draw()
-    
-    def update_detection_rate_chart(self):
-        """更新检测率分析图表"""
-        self.ax_detection.clear()
-        
-        # 模拟不同类型文件的检测率数据
-        # 基于特征重要性分析
-        categories = ['关键词特征', '导入表特征', '结构特征', '字节序列特征']
-        
-        # 根据训练数据量调整模拟的准确率
-        if self.detector.total_benign_files + self.detector.total_malicious_files > 0:
-            # 随着训练数据增加，检测率提高
-            base_accuracy = min(0.9, 0.6 + (self.detector.total_benign_files + self.detector.total_malicious_files) * 0.005)
-            
-            # 模拟不同特征类型的检测效果
-            accuracies = [
-                base_accuracy * 0.95,  # 关键词特征
-                base_accuracy * 0.90,  # 导入表特征
-                base_accuracy * 0.98,  # 结构特征
-                base_accuracy * 0.85   # 字节序列特征
-            ]
-        else:
-            # 无训练数据时的默认值
-            accuracies = [0.6, 0.55, 0.65, 0.5]
+        start_time = time.time()
+        initial_benign_files = self.total_benign_files
+        initial_malicious_files = self.total_malicious_files
         
-        # 绘制条形图
-        colors = ['#FF9999', '#66B2FF', '#99FF99', '#FFCC99']
-        bars = self.ax_detection.bar(categories, accuracies, color=colors)
+        benign_files = self._filter_training_files(benign_files)
+        malicious_files = self._filter_training_files(malicious_files)
         
-        # 在条形图上添加数值标签
-        for bar in bars:
-            height = bar.get_height()
-            self.ax_detection.text(bar.get_x() + bar.get_width()/2., height + 0.01,
-                                 f'{height:.3f}', ha='center', va='bottom')
+        partial = self.build_partial_model(benign_files, malicious_files, num_workers, chunk_size, callback)
+        self.apply_partial_model(partial, is_incremental)
+        save_success = self.save_model()
         
-        # 设置图表标题和标签
-        self.ax_detection.set_title('不同特征类型的检测率分析')
-        self.ax_detection.set_ylabel('估计检测准确率')
-        self.ax_detection.set_ylim(0, 1.1)
+        training_time = time.time() - start_time
+        # 与 train 相同，按实际累计的样本数统计（tar、gz 等压缩包按成员计数），
+        # 跳过的文件不计入已处理数；工作进程失败的分片各计一次错误
+        processed_files = partial.processed_files
+        total_files = processed_files + partial.skipped_files
+        errors = partial.error_files + partial.skipped_files + partial.fallback_chunks
+        stats = {
+            "total_files": total_files,
+            "processed_files": processed_files,
+            "errors": errors,
+            "error_files": partial.error_files,
+            "fallback_chunks": partial.fallback_chunks,
+            "skipped_files": partial.skipped_files,
+            "training_time": training_time,
+            "benign_files": len(benign_files),
+            "malicious_files": len(malicious_files),
+            "new_benign_files": self.total_benign_files - initial_benign_files,
+            "new_malicious_files": self.total_malicious_files - initial_malicious_files,
+            "files_per_second": processed_files / max(1, training_time),
+            "cpu_utilization": psutil.cpu_percent(interval=0.1),
+            "save_success": save_success
+        }
+        self._log_sampler.flush()
+        logger.info("map-reduce 训练完成，共 %d 个文件，错误 %d（工作进程失败的分片 %d），%d 个特征，"
+                    "耗时 %.1f 秒，保存模型结果: %s", total_files, errors, partial.fallback_chunks, len(partial.vocabulary), training_time,
+                    '成功' if save_success else '失败')
+        return stats
+    
+    def iter_predict(self, file_paths, num_workers=None, use_multiprocessing=False, max_in_flight=None,
+                     batch_size=256, expand_archives=False):
+        """流式批量预测，逐个产出 (file_path, prediction_result)
         
-        # 添加网格线
-        self.ax_detection.grid(axis='y', linestyle='--', alpha=0.7)
+        特征按完成顺序收集，每凑满 batch_size 个文件用向量化评分一次处理；
+        结果与逐个调用 predict 完全一致，且不在内存中累积。
         
-        # 旋转x轴标签以避免重叠
-        plt.xticks(rotation=15, ha='right')
+        Args:
+            file_paths: 文件路径的可迭代对象（列表或生成器均可）
+            num_workers: 工作线程/进程数量，如果为None则使用CPU核心数
+            use_multiprocessing: 是否使用多进程提取特征
+            max_in_flight: 同时在途的任务数上限，None 表示使用默认值
+            batch_size: 每次向量化评分的文件数
+            expand_archives: 是否展开压缩包，为其中每个成员产出一个结果（见 iter_extract_features）
         
-        # 刷新图表
-        self.fig_detection.tight_layout()
-        self.canvas_detection.draw()
+        Yields:
+            (file_path, prediction_result) 元组
+        """
+        batch_paths = []
+        batch_features = []
+        for file_path, features in self.iter_extract_features(file_paths, num_workers, use_multiprocessing,
+                                                              max_in_flight, expand_archives):
+            batch_paths.append(file_path)
+            batch_features.append(features)
+            if len(batch_paths) >= batch_size:
+                yield from zip(batch_paths, self._score_batch_safely(batch_paths, batch_features))
+                batch_paths = []
+                batch_features = []
+        if batch_paths:
+            yield from zip(batch_paths, self._score_batch_safely(batch_paths, batch_features))
+    
+    def _score_batch_safely(self, file_paths, features_list):
+        """批量评分；整批出错时逐个评分，出错的文件返回与 predict 相同的失败结果"""
+        try:
+            return self.score_features_batch(features_list)
+        except Exception:
+            return [self._predict_from_features(file_path, features)
+                    for file_path, features in zip(file_paths, features_list)]
     
-    def update_speed_chart(self):
-        """更新速度评估图表"""
-        self.ax_speed.clear()
+    def predict_batch(self, file_paths, use_parallel=True, expand_archives=False):
+        """批量预测文件
+        
+        Args:
+            file_paths: 文件路径列表
+            use_parallel: 是否使用并行处理
+            expand_archives: 是否展开压缩包（ZIP、tar、gz/bz2/xz 等），结果以成员虚拟路径
+                （"压缩包路径::成员名"）为键，不包含压缩包本身
         
-        # 模拟不同文件大小的处理速度
-        file_sizes = ['小型文件\n(<1KB)', '中型文件\n(1-10KB)', '大型文件\n(10-100KB)', '超大文件\n(>100KB)']
+        Returns:
+            字典 {file_path: prediction_result}
+        """
+        start_time = time.time()
+        results = {}
         
-        # 基于特征数量调整模拟的处理时间
-        feature_count = len(self.detector.feature_weights)
+        if use_parallel:
+            # 并行提取特征，按批向量化评分
+            for file_path, result in self.iter_predict(file_paths, expand_archives=expand_archives):
+                results[file_path] = result
+        elif expand_archives:
+            # 顺序预测，压缩包逐个成员预测
+            paths, stream_archives = archive_source.expand_archives(file_paths)
+            for file_path in paths:
+                results[file_path] = self.predict(file_path)
+            for file_path, features in self._iter_stream_archive_features(stream_archives):
+                results[file_path] = self._predict_from_features(file_path, features)
+        else:
+            # 顺序预测
+            for file_path in file_paths:
+                results[file_path] = self.predict(file_path)
         
-        # 随着特征数量增加，处理时间也会增加
-        base_times = [0.01, 0.05, 0.2, 0.5]  # 基础处理时间（秒）
+        # 计算性能指标
+        processing_time = time.time() - start_time
+        files_per_second = len(results) / max(1, processing_time)
         
-        # 根据特征数量缩放处理时间
-        scale_factor = min(3.0, 1.0 + feature_count * 0.001)
-        process_times = [t * scale_factor for t in base_times]
+        # 添加性能信息
+        results['_performance'] = {
+            'total_files': len(results),
+            'processing_time': processing_time,
+            'files_per_second': files_per_second,
+            'cpu_utilization': psutil.cpu_percent(interval=0.1)
+        }
         
-        # 绘制折线图
-        self.ax_speed.plot(file_sizes, process_times, marker='o', linestyle='-', color='#FF6666', linewidth=2, markersize=6)
+        return results
+    
+    def reset_model(self):
+        """重置模型，清除所有学习数据"""
+        # 清除内存中的模型数据
+        self._init_feature_tables()
+        self._base_id = None
+        self._checkpoint_sequence = 0
+        self._training_progress = None
+        self._remove_checkpoints()
+        self.total_benign_files = 0
+        self.total_malicious_files = 0
+        self.last_trained = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
         
-        # 在每个点上添加数值标签
-        for i, time_val in enumerate(process_times):
-            self.ax_speed.text(i, time_val + 0.02, f'{time_val:.3f}s', ha='center', va='bottom')
+        # 删除模型文件（包括旧版 pickle 模型）
+        for model_path in (self.model_path, self.legacy_model_path):
+            if os.path.exists(model_path):
+                try:
+                    os.remove(model_path)
+                    print("模型文件已删除")
+                except Exception as e:
+                    print(f"删除模型文件失败: {str(e)}")
         
-        # 设置图表标题和标签
-        self.ax_speed.set_title('文件处理速度评估')
-        self.ax_speed.set_ylabel('估计处理时间 (秒)')
-        self.ax_speed.set_ylim(0, max(process_times) * 1.3)
+        # 删除统计文件
+        if hasattr(self, 'stats_path') and os.path.exists(self.stats_path):
+            try:
+                os.remove(self.stats_path)
+                print("统计文件已删除")
+            except Exception as e:
+                print(f"删除统计文件失败: {str(e)}")
         
-        # 添加网格线
-        self.ax_speed.grid(True, linestyle='--', alpha=0.7)
+        print("模型已重置，请重新训练")
+    
+    def clamp_existing_weights(self):
+        """限制现有特征权重在配置范围内"""
+        weights = self._weights[:len(self.vocabulary)]
+        clamped_weights = np.clip(weights, self.config["min_feature_weight"], self.config["max_feature_weight"])
+        changed = weights != clamped_weights
+        clamped_count = int(np.count_nonzero(changed))
+        weights[:] = clamped_weights
+        self._dirty[:len(changed)] |= changed
+        print(f"已限制 {clamped_count} 个特征的权重在有效范围内")
+        return clamped_count
+    
+    def predict(self, file_path):
+        """预测文件是否为恶意文件"""
+        try:
+            features = self.extract_features(file_path)
+            return self.score_features(features)
+        except Exception as e:
+            print(f"预测失败 ({file_path}): {str(e)}")
+            return {
+                "is_malicious": False,
+                "score": 0.0,
+                "matched_features": [],
+                "error": str(e)
+            }
+    
+    def _predict_from_features(self, file_path, features):
+        """对已提取的特征评分，出错时返回与 predict 相同的失败结果"""
+        try:
+            return self.score_features(features)
+        except Exception as e:
+            print(f"预测失败 ({file_path}): {str(e)}")
+            return {
+                "is_malicious": False,
+                "score": 0.0,
+                "matched_features": [],
+                "error": str(e)
+            }
+    
+    def score_features(self, features):
+        """根据已提取的特征计算预测结果
         
-        # 添加额外信息
-        info_text = f"当前特征数量: {feature_count}\n平均每秒可处理约 {int(10/scale_factor)} 个文件"
-        self.ax_speed.text(0.02, 0.95, info_text, transform=self.ax_speed.transAxes, 
-                         bbox=dict(boxstyle="round,pad=0.5", facecolor="wheat", alpha=0.5),
-                         verticalalignment='top', fontsize=9)
+        Args:
+            features: extract_features 返回的特征字典
         
-        # 刷新图表
-        self.fig_speed.tight_layout()
-        self.canvas_speed.draw()
+        Returns:
+            与 predict 相同格式的预测结果字典
+        """
+        return self.score_features_batch([features])[0]
     
-    def perform_performance_test(self):
-        """执行性能测试，测量实际的检测速度和资源使用情况"""
-        # 提示用户选择测试文件或使用示例文件
-        response = messagebox.askyesno("性能测试", "是否使用示例文件进行性能测试？\n选择'否'将允许您手动选择测试文件。")
+    def score_features_batch(self, features_list):
+        """向量化批量评分
         
-        if response:
-            # 使用示例文件
-            sample_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), "sample_files")
-            test_files = []
-            
-            # 收集所有示例文件
-            for root, _, files in os.walk(sample_dir):
-                for file in files:
-                    test_files.append(os.path.join(root, file))
-                    
-            if not test_files:
-                messagebox.showerror("错误", "没有找到示例文件，请先训练模型或创建示例文件")
-                return
-        else:
-            # 用户手动选择文件
-            test_files = filedialog.askopenfilenames(title="选择测试文件")
-            if not test_files:
-                return
+        N 个文件的特征组成 CSR 稀疏矩阵，一次稀疏矩阵-向量乘得到全部原始分数，
+        再按行向量化地应用 predict 的七步归一化。每行内按特征顺序逐个累加，
+        因此结果与逐个评分完全一致。
         
-        # 禁用按钮并显示状态
-        self.update_status("执行性能测试中...")
+        Args:
+            features_list: 特征字典列表
         
-        # 在单独的线程中执行测试
-        def test_thread():
-            try:
-                # 预热模型
-                if test_files:
-                    self.detector.predict(test_files[0])
-                
-                # 执行多次测试取平均值
-                num_runs = 3
-                total_times = []
-                
-                for run in range(num_runs):
-                    start_time = time.time()
-                    
-                    for file_path in test_files:
-                        self.detector.predict(file_path)
-                    
-                    end_time = time.time()
-                    run_time = end_time - start_time
-                    total_times.append(run_time)
-                
-                # 计算平均时间
-                avg_time = sum(total_times) / num_runs
-                files_per_second = len(test_files) / avg_time if avg_time > 0 else 0
-                
-                # 更新UI显示结果
-                result_text = (
-                    f"性能测试完成！\n\n" +
-                    f"测试文件数量: {len(test_files)}\n" +
-                    f"平均处理时间: {avg_time:.3f}秒\n" +
-                    f"处理速度: {files_per_second:.2f} 文件/秒\n\n" +
-                    f"注意: 实际性能可能因文件大小、复杂度和系统资源而异。"
-                )
-                
-                # 更新速度图表
-                self.root.after(0, self.update_speed_chart)
-                
-                # 显示结果
-                messagebox.showinfo("性能测试结果", result_text)
-                
-            except Exception as e:
-                messagebox.showerror("测试失败", f"性能测试过程中发生错误: {str(e)}")
-            finally:
-                self.update_status("就绪")
-        
-        # 启动测试线程
-        thread = threading.Thread(target=test_thread)
-        thread.daemon = True
-        thread.start()
-    
-    def update_status(self, message):
-        """更新状态显示"""
-        # 在所有标签页中查找状态标签并更新
-        for child in self.root.winfo_children():
-            for sub_child in child.winfo_children():
-                if isinstance(sub_child, ttk.Label) and hasattr(sub_child, 'configure'):
-                    if sub_child.cget('relief') == tk.SUNKEN:
-                        sub_child.config(text=message)
-                        return
-    
-    def reset_model(self):
-        """重置模型"""
-        if messagebox.askyesno("确认", "确定要重置模型吗？这将删除所有训练数据！"):
-            # 重置检测器
-            self.detector = MalwareDetector()
-            
-            # 删除模型文件
-            if os.path.exists(self.detector.model_path):
-                try:
-                    os.remove(self.detector.model_path)
-                except:
-                    pass
-            
-            # 更新UI
-            self.update_model_info_display()
-            messagebox.showinfo("重置完成", "模型已重置")
-
-
-# 创建示例文件用于测试（仅在没有训练数据时使用）
-def create_sample_files():
-    sample_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), "sample_files")
-    benign_dir = os.path.join(sample_dir, "benign")
-    malicious_dir = os.path.join(sample_dir, "malicious")
+        Returns:
+            预测结果字典列表，与 features_list 一一对应；特征提取出错的文件带有 "error"
+            （见 feature_error_message）
+        """
+        num_files = len(features_list)
+        if num_files == 0:
+            return []
+        profiler = self._profiler
+        if profiler is not None:
+            profiler.count("scored_files", num_files)
+            profiler.count("score_batches")
+            stage_start = profiler.now()
+        
+        names, ids, values, indptr = self.vocabulary.encode_batch(features_list)
+        if profiler is not None:
+            stage_start = profiler.lap("score.encode", stage_start)
+        rows = np.repeat(np.arange(num_files), np.diff(indptr))
+        max_feature_weight = self.config["max_feature_weight"]
+        threshold = self.config["threshold"]
+        
+        # 按ID取权重并确保在配置的最小和最大值之间（未知特征按权重 0 处理）
+        clamped_weights = np.minimum(
+            np.maximum(self._gather_weights(ids), self.config["min_feature_weight"]),
+            max_feature_weight
+        )
+        
+        # 只保留权重为正的特征（匹配特征），按行聚合
+        matched = np.flatnonzero(clamped_weights > 0)
+        matched_rows = rows[matched]
+        matched_weights = clamped_weights[matched]
+        matched_scores = values[matched] * matched_weights
+        is_keyword = self.vocabulary.prefix_flags('keyword_')[ids[matched]]
+        for i in np.flatnonzero(ids[matched] < 0).tolist():
+            is_keyword[i] = names[matched[i]].startswith('keyword_')
+        
+        matched_count = np.bincount(matched_rows, minlength=num_files)
+        raw_scores = np.bincount(matched_rows, weights=matched_scores, minlength=num_files)
+        weight_sums = np.bincount(matched_rows, weights=matched_weights, minlength=num_files)
+        keyword_features = np.bincount(matched_rows, weights=is_keyword, minlength=num_files)
+        low_weight_features = np.bincount(matched_rows, weights=matched_weights < 0.1, minlength=num_files)
+        
+        # 全面改进的归一化逻辑（与逐个评分相同的七个步骤），只作用于分数为正的行
+        count = np.maximum(matched_count, 1).astype(np.float64)
+        
+        # 1-2. 基础归一化
+        base_norm_factor = 1.0 / np.maximum(1.0, count * max_feature_weight * 0.0022)
+        scores = raw_scores * base_norm_factor
+        
+        # 3. 全局缩放
+        scores = scores * 0.22
+        
+        # 4. 关键词特征衰减
+        keyword_ratio = keyword_features / count
+        scores = np.where(keyword_features > 0, scores * (1 - keyword_ratio * 0.65), scores)
+        
+        # 5. 基于平均特征权重的调整
+        avg_feature_weight = weight_sums / count
+        scores = np.where(avg_feature_weight > 1.1, scores * (1 - (avg_feature_weight - 1.1) * 0.18), scores)
+        
+        # 6. 特征数量补偿
+        scores = np.where(count > 5, scores * (1.0 / (1.0 + (count - 5) * 0.09)), scores)
+        
+        # 7. 低权重特征的额外衰减
+        low_weight_ratio = low_weight_features / count
+        scores = np.where((low_weight_features > 0) & (low_weight_ratio > 0.51), scores * 0.52, scores)
+        
+        # 只保留下限，确保分数不为负
+        scores = np.maximum(0.0, scores)
+        scores = np.where(raw_scores > 0, scores, raw_scores)
+        
+        if profiler is not None:
+            stage_start = profiler.lap("score.compute", stage_start)
+        
+        # 每行取分数最高的20个匹配特征，转换为用户友好的格式
+        matched_indptr = np.zeros(num_files + 1, dtype=np.int64)
+        np.cumsum(matched_count, out=matched_indptr[1:])
+        score_list = scores.tolist()
+        total_features = np.diff(indptr).tolist()
+        
+        results = []
+        for row in range(num_files):
+            start, end = matched_indptr[row], matched_indptr[row + 1]
+            top = start + self._top_feature_order(matched_scores[start:end], 20)
+            formatted_features = [
+                (names[i], f"{weight:.4f}", f"{score:.4f}")
+                for i, weight, score in zip(matched[top].tolist(), matched_weights[top].tolist(),
+                                            matched_scores[top].tolist())
+            ]
+            result = {
+                "is_malicious": score_list[row] >= threshold,
+                "score": score_list[row],
+                "matched_features": formatted_features,
+                "total_features": total_features[row],
+                "threshold": threshold
+            }
+            error = feature_error_message(features_list[row])
+            if error is not None:
+                result["error"] = error
+            results.append(result)
+        if profiler is not None:
+            profiler.lap("score.format", stage_start)
+        return results
     
-    # 创建目录
-    for dir_path in [benign_dir, malicious_dir]:
-        if not os.path.exists(dir_path):
-            os.makedirs(dir_path)
+    @staticmethod
+    def _top_feature_order(scores, n):
+        """返回分数最高的 n 个位置（降序，分数相同时保持原顺序）"""
+        if len(scores) > n:
+            # argpartition 找到第 n 大的分数，只对不低于它的候选做稳定排序
+            kth_score = scores[np.argpartition(scores, len(scores) - n)[len(scores) - n]]
+            candidates = np.flatnonzero(scores >= kth_score)
+            return candidates[np.argsort(-scores[candidates], kind='stable')][:n]
+        return np.argsort(-scores, kind='stable')
     
-    # 创建示例白样本文件
-    benign_examples = [
-        ("simple_script.py", "print('Hello, World!')\n# 这是一个简单的Python脚本\nfor i in range(5):\n    print(i)")
-    ]
+    def benchmark_scoring(self, num_files=10000, features_per_file=50, features_list=None):
+        """评分性能测试：比较向量化批量评分与逐个评分的耗时
+        
+        Args:
+            num_files: 合成测试文件数（提供 features_list 时忽略）
+            features_per_file: 每个合成文件的特征数
+            features_list: 可选，使用已提取的特征字典列表
+        
+        Returns:
+            包含耗时和吞吐量的字典
+        """
+        if features_list is None:
+            # 从词表中抽取已知特征，并混入少量未知特征
+            rng = random.Random(0)
+            known_names = self.vocabulary.names or [f"keyword_{keyword}" for keyword in self.suspicious_keywords]
+            features_list = []
+            for i in range(num_files):
+                features = {name: rng.uniform(0.1, 5.0)
+                            for name in rng.sample(known_names, min(features_per_file, len(known_names)))}
+                features[f"file_hash_{i:08x}"] = 0.5
+                features_list.append(features)
+        
+        start_time = time.perf_counter()
+        batch_results = self.score_features_batch(features_list)
+        batch_time = time.perf_counter() - start_time
+        
+        start_time = time.perf_counter()
+        single_results = [self.score_features(features) for features in features_list]
+        single_time = time.perf_counter() - start_time
+        
+        return {
+            "num_files": len(features_list),
+            "total_features": sum(len(features) for features in features_list),
+            "batch_time": batch_time,
+            "single_time": single_time,
+            "batch_files_per_second": len(features_list) / max(batch_time, 1e-9),
+            "single_files_per_second": len(features_list) / max(single_time, 1e-9),
+            "speedup": single_time / max(batch_time, 1e-9),
+            "identical": batch_results == single_results
+        }
     
-    for filename, content in benign_examples:
-        file_path = os.path.join(benign_dir, filename)
-        if not os.path.exists(file_path):
-            with open(file_path, 'w', encoding='utf-8') as f:
-                f.write(content)
+    def iter_evaluate(self, benign_test_files, malicious_test_files, sample_size=None, sample_fraction=None,
+                      seed=None, report_interval=None, confidence=None, num_workers=None,
+                      use_multiprocessing=False, batch_size=256, target_fpr=None):
+        """流式评估：并行提取特征、批量评分，逐个文件更新混淆矩阵，定期产出中间指标
+        
+        两类测试文件先打乱顺序（抽样时只取一部分），再按比例交错检测，因此任意时刻
+        已完成的文件都相当于一个分层随机样本，中间指标及其置信区间都是对完整测试集的估计。
+        
+        Args:
+            benign_test_files: 正常测试文件路径列表
+            malicious_test_files: 恶意测试文件路径列表
+            sample_size: 每个类别最多检测的文件数，None 表示不限制
+            sample_fraction: 每个类别检测的文件比例（0~1），None 表示全部
+            seed: 抽样和打乱顺序的随机种子，相同种子的抽样结果相同
+            report_interval: 产出中间指标的间隔（秒），None 使用 EVAL_CONFIG['report_interval_seconds']，
+                0 表示只产出最终结果
+            confidence: 置信水平，None 使用 EVAL_CONFIG['confidence_level']
+            num_workers: 工作线程/进程数量，如果为None则使用CPU核心数
+            use_multiprocessing: 是否使用多进程提取特征
+            batch_size: 每次向量化评分的文件数
+            target_fpr: 阈值分析的目标误报率，None 使用 EVAL_CONFIG['target_false_positive_rate']
+        
+        Yields:
+            指标字典（与 evaluate 的返回值相同，另含 processed、total、elapsed_seconds、
+            files_per_second、sampled、confidence_intervals 和 final），最后一个 final 为 True。
+            最终结果还包含 threshold_analysis（ROC/PR 曲线、AUC、目标误报率对应的阈值等，
+            见 evaluation.ScoreSet.analyze）和 scores（保存了每个文件分数的 ScoreSet，
+            可以用 metrics_at 计算任意阈值下的指标而不必重新检测）
+        """
+        if report_interval is None:
+            report_interval = EVAL_CONFIG.get('report_interval_seconds', 5)
+        if confidence is None:
+            confidence = EVAL_CONFIG.get('confidence_level', 0.95)
+        if target_fpr is None:
+            target_fpr = EVAL_CONFIG.get('target_false_positive_rate', 0.01)
+        
+        rng = random.Random(seed)
+        malicious_sample = evaluation.stratified_sample(malicious_test_files, sample_size, sample_fraction, rng)
+        benign_sample = evaluation.stratified_sample(benign_test_files, sample_size, sample_fraction, rng)
+        schedule = evaluation.interleave(malicious_sample, benign_sample)
+        
+        matrix = evaluation.ConfusionMatrix(len(malicious_test_files), len(benign_test_files))
+        scores = evaluation.ScoreSet(len(malicious_test_files), len(benign_test_files))
+        # 结果按完成顺序返回，按路径找回标签（同一路径出现多次时按出现次数依次取出）
+        labels = defaultdict(list)
+        for file_path, is_malicious in reversed(schedule):
+            labels[file_path].append(is_malicious)
+        
+        start_time = time.perf_counter()
+        next_report = start_time + report_interval if report_interval else None
+        processed = 0
+        
+        def snapshot(final):
+            elapsed = time.perf_counter() - start_time
+            results = matrix.metrics()
+            results.update({
+                "processed": processed,
+                "total": len(schedule),
+                "elapsed_seconds": elapsed,
+                "files_per_second": processed / max(elapsed, 1e-9),
+                "sampled": matrix.sampled,
+                "confidence_level": confidence,
+                "confidence_intervals": matrix.confidence_intervals(confidence),
+                "final": final
+            })
+            return results
+        
+        for file_path, result in self.iter_predict((file_path for file_path, _ in schedule), num_workers,
+                                                   use_multiprocessing, batch_size=batch_size):
+            is_malicious = labels[file_path].pop()
+            matrix.update(is_malicious, result["is_malicious"])
+            scores.add(file_path, result["score"], is_malicious)
+            processed += 1
+            if next_report is not None and time.perf_counter() >= next_report:
+                next_report = time.perf_counter() + report_interval
+                results = snapshot(False)
+                logger.info("评估进度 %d/%d：准确率 %.4f，精确率 %.4f，召回率 %.4f，误报率 %.4f（%.0f 文件/秒）",
+                            processed, len(schedule), results["accuracy"], results["precision"],
+                            results["recall"], results["false_positive_rate"], results["files_per_second"])
+                yield results
+        
+        results = snapshot(True)
+        results["threshold_analysis"] = scores.analyze(target_fpr, EVAL_CONFIG.get('curve_points', 200))
+        results["scores"] = scores
+        logger.info("评估完成：%d 个文件（%s），准确率 %.4f，召回率 %.4f，误报率 %.4f，ROC AUC %.4f，耗时 %.1f 秒",
+                    processed, "抽样" if results["sampled"] else "全部", results["accuracy"],
+                    results["recall"], results["false_positive_rate"],
+                    results["threshold_analysis"]["roc_auc"], results["elapsed_seconds"])
+        yield results
     
-    # 创建示例黑样本文件
-    malicious_examples = [
-        ("suspicious_script.py", "import os\nimport subprocess\n\ndef execute_command(cmd):\n    return subprocess.check_output(cmd, shell=True)\n\n# 这是一个模拟的恶意脚本示例\nif __name__ == '__main__':\n    # 模拟反向连接\n    print('模拟建立网络连接...')\n    # 模拟系统命令执行\n    execute_command('dir')")
-    ]
+    def evaluate(self, benign_test_files, malicious_test_files, callback=None, **options):
+        """评估模型性能
+        
+        Args:
+            benign_test_files: 正常测试文件路径列表
+            malicious_test_files: 恶意测试文件路径列表
+            callback: 中间指标回调函数，格式：callback(results)，每隔 report_interval 秒调用一次
+            **options: 抽样、并行等选项，见 iter_evaluate
+        
+        Returns:
+            最终的评估指标字典
+        """
+        results = None
+        for results in self.iter_evaluate(benign_test_files, malicious_test_files, **options):
+            if callback and not results["final"]:
+                callback(results)
+        return results
     
-    for filename, content in malicious_examples:
-        file_path = os.path.join(malicious_dir, filename)
-        if not os.path.exists(file_path):
-            with open(file_path, 'w', encoding='utf-8') as f:
-                f.write(content)
+    def get_top_features(self, n=20):
+        """获取最重要的特征"""
+        weights = self._weights[:len(self.vocabulary)]
+        # 稳定排序，权重相同的特征保持加入词表的顺序
+        top_ids = np.argsort(-weights, kind='stable')[:n]
+        return [(self.vocabulary.names[i], weights[i].item()) for i in top_ids]
     
-    return benign_dir, malicious_dir
+    def get_model_info(self):
+        """获取模型信息"""
+        return {
+            "model_version": self.model_version,
+            "last_trained": self.last_trained,
+            "total_benign_files": self.total_benign_files,
+            "total_malicious_files": self.total_malicious_files,
+            "total_features": len(self.vocabulary),
+            "threshold": self.config["threshold"]
+        }
 
 
-# 主函数
+# 主函数：不带参数时启动图形界面，带参数时作为命令行工具运行（见 detector_cli.py）。
+# 图形界面和命令行模块都按需导入，扫描单个文件时不加载 tkinter 和 matplotlib
 if __name__ == "__main__":
-    # 创建示例文件
-    create_sample_files()
-    
-    # 创建并运行UI
-    root = tk.Tk()
-    app = MalwareDetectorUI(root)
+    # 让这两个模块中的 import malware_detector 复用当前模块，而不是再加载一份
+    sys.modules.setdefault("malware_detector", sys.modules[__name__])
+    if len(sys.argv) > 1:
+        from detector_cli import main
+        sys.exit(main())
     
-    # 运行主循环
-    root.mainloop()
\ No newline at end of file
+    from malware_detector_ui import main
+    main()
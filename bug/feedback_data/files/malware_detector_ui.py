@@ -0,0 +1,2174 @@
+"""恶意软件检测器的图形界面（Tkinter + matplotlib）
+
+界面相关的依赖只在这里导入，命令行工具（detector_cli.py）和其他调用 MalwareDetector
+的代码不需要加载 tkinter 和 matplotlib。
+"""
+
+import os
+import time
+import threading
+import warnings
+import tkinter as tk
+from tkinter import filedialog, ttk, messagebox
+import matplotlib.pyplot as plt
+from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+import psutil
+
+from config import UI_CONFIG, PERFORMANCE_CONFIG
+from file_crawler import DirectoryCrawler
+import archive_source
+import benchmark
+from archive_source import ArchiveSampleSource
+from malware_detector import MalwareDetector
+
+# 忽略matplotlib的非关键警告
+warnings.filterwarnings("ignore")
+
+# 设置中文显示 - 改进版
+# 使用更健壮的字体设置方法，避免字体错误
+try:
+    # 先尝试获取系统可用字体
+    import matplotlib.font_manager as fm
+    available_fonts = [f.name for f in fm.fontManager.ttflist]
+    
+    # 定义字体优先级列表
+    preferred_fonts = ["SimHei", "WenQuanYi Micro Hei", "Heiti TC", "Arial Unicode MS", "Microsoft YaHei", "sans-serif"]
+    
+    # 选择系统中可用的第一个字体
+    for font in preferred_fonts:
+        if font in available_fonts:
+            plt.rcParams["font.family"] = [font]
+            break
+    else:
+        # 如果没有找到中文字体，使用通用设置
+        plt.rcParams["font.family"] = ["sans-serif"]
+        plt.rcParams["font.sans-serif"] = ["DejaVu Sans", "Arial", "Helvetica"]
+        
+    # 确保负号正常显示
+    plt.rcParams["axes.unicode_minus"] = False
+    
+except Exception as e:
+    # 如果字体设置出错，使用最基本的配置
+    plt.rcParams["font.family"] = ["sans-serif"]
+    plt.rcParams["font.sans-serif"] = ["DejaVu Sans", "Arial"]
+    plt.rcParams["axes.unicode_minus"] = False
+    warnings.warn(f"字体设置失败: {str(e)}")
+
+
+class SampleSet:
+    """按添加顺序保存、自动去重的样本文件集合
+    
+    基于 dict 实现，成员判断、添加和删除都是 O(1)，批量添加 N 个文件为 O(N)。
+    迭代顺序即添加顺序，训练时按此顺序处理文件；同时保存按位置访问的顺序表，
+    供 SampleListView 只读取可见的几行。
+    """
+    
+    def __init__(self, file_paths=()):
+        # 文件路径 -> 显示名称（None 表示显示文件名）
+        self._paths = {}
+        self._order = []
+        # 每次内容变化时递增，视图据此判断筛选结果是否过期
+        self.version = 0
+        self.update(file_paths)
+    
+    def __contains__(self, file_path):
+        return file_path in self._paths
+    
+    def __len__(self):
+        return len(self._order)
+    
+    def __iter__(self):
+        return iter(self._order)
+    
+    def __getitem__(self, index):
+        return self._order[index]
+    
+    def add(self, file_path, display_name=None):
+        """添加一个文件，返回是否为新文件"""
+        return bool(self.update([file_path], {file_path: display_name} if display_name else None))
+    
+    def update(self, file_paths, display_names=None):
+        """批量添加文件
+        
+        Args:
+            file_paths: 文件路径序列
+            display_names: 可选的 {file_path: 显示名称}，未给出的文件显示文件名
+        
+        Returns:
+            新加入的文件路径列表（已存在或重复的路径不计入），顺序与输入一致
+        """
+        paths = self._paths
+        added = []
+        for file_path in file_paths:
+            if file_path not in paths:
+                display_name = display_names.get(file_path) if display_names else None
+                if display_name == os.path.basename(file_path):
+                    display_name = None
+                paths[file_path] = display_name
+                added.append(file_path)
+        if added:
+            self._order.extend(added)
+            self.version += 1
+        return added
+    
+    def display_name(self, file_path):
+        """返回文件在列表中的显示名称"""
+        display_name = self._paths.get(file_path)
+        return display_name if display_name is not None else os.path.basename(file_path)
+    
+    def discard(self, file_path):
+        """删除一个文件（不存在时忽略）"""
+        self.difference_update([file_path])
+    
+    def difference_update(self, file_paths):
+        """批量删除文件，返回实际删除的数量"""
+        paths = self._paths
+        removed = 0
+        for file_path in file_paths:
+            if file_path in paths:
+                del paths[file_path]
+                removed += 1
+        if removed:
+            self._order = [file_path for file_path in self._order if file_path in paths]
+            self.version += 1
+        return removed
+    
+    def clear(self):
+        self._paths.clear()
+        self._order = []
+        self.version += 1
+    
+    def to_list(self):
+        """按添加顺序返回文件路径列表的快照"""
+        return list(self._order)
+
+
+class SampleListView:
+    """样本文件的虚拟列表视图
+    
+    Listbox 中只保存当前可见的几行，滚动时按位置从 SampleSet 中取出对应的文件重新填充，
+    因此样本数量再多，每次添加也只需刷新计数和可见窗口，不产生逐行的 Tk 操作。
+    顶部提供筛选框（按文件路径和显示名称的子串筛选）和文件计数。
+    """
+    
+    def __init__(self, parent, sample_set, scrollbar_style=None, **listbox_options):
+        """
+        Args:
+            parent: 父容器
+            sample_set: 要显示的 SampleSet
+            scrollbar_style: 滚动条的 ttk 样式名
+            **listbox_options: 传给 tk.Listbox 的选项
+        """
+        self.sample_set = sample_set
+        self.frame = ttk.Frame(parent)
+        
+        # 筛选框和计数
+        toolbar = ttk.Frame(self.frame)
+        toolbar.pack(fill=tk.X, pady=(0, 2))
+        ttk.Label(toolbar, text="筛选:").pack(side=tk.LEFT)
+        self.filter_var = tk.StringVar()
+        ttk.Entry(toolbar, textvariable=self.filter_var).pack(side=tk.LEFT, fill=tk.X, expand=True, padx=(2, 5))
+        self.count_var = tk.StringVar(value="共 0 个文件")
+        ttk.Label(toolbar, textvariable=self.count_var).pack(side=tk.RIGHT)
+        
+        body = ttk.Frame(self.frame)
+        body.pack(fill=tk.BOTH, expand=True)
+        scrollbar_options = {"style": scrollbar_style} if scrollbar_style else {}
+        self.scrollbar = ttk.Scrollbar(body, command=self._on_scrollbar, **scrollbar_options)
+        self.scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        self.listbox = tk.Listbox(body, **listbox_options)
+        self.listbox.pack(fill=tk.BOTH, expand=True, padx=2, pady=2)
+        
+        self.first = 0  # 可见窗口第一行在（筛选后）列表中的位置
+        self.rows = int(listbox_options.get("height", 15))  # 可见行数，随控件大小更新
+        self._filtered = None  # 筛选结果（文件路径列表），None 表示未筛选
+        self._filter_version = None
+        self._filter_job = None
+        
+        self.filter_var.trace_add("write", lambda *_: self._schedule_filter())
+        self.listbox.bind("<Configure>", self._on_resize)
+        self.listbox.bind("<MouseWheel>", self._on_mousewheel)
+        self.listbox.bind("<Button-4>", self._on_mousewheel)
+        self.listbox.bind("<Button-5>", self._on_mousewheel)
+    
+    def pack(self, **kwargs):
+        self.frame.pack(**kwargs)
+    
+    def refresh(self):
+        """样本集合变化后调用：更新计数和可见窗口（筛选结果在短暂延迟后重新计算）"""
+        if self._filtered is not None and self._filter_version != self.sample_set.version:
+            self._schedule_filter()
+        self._render()
+    
+    def _items(self):
+        return self._filtered if self._filtered is not None else self.sample_set
+    
+    def _render(self):
+        """只把可见窗口中的几行写入 Listbox，并同步滚动条和计数"""
+        items = self._items()
+        total = len(items)
+        self.first = max(0, min(self.first, total - self.rows))
+        end = min(total, self.first + self.rows)
+        
+        display_name = self.sample_set.display_name
+        self.listbox.delete(0, tk.END)
+        if end > self.first:
+            self.listbox.insert(tk.END, *[display_name(items[i]) for i in range(self.first, end)])
+        
+        if total:
+            self.scrollbar.set(self.first / total, end / total)
+        else:
+            self.scrollbar.set(0.0, 1.0)
+        
+        if self._filtered is not None:
+            self.count_var.set(f"筛选出 {total} / {len(self.sample_set)} 个文件")
+        else:
+            self.count_var.set(f"共 {total} 个文件")
+    
+    def _scroll_to(self, first):
+        self.first = first
+        self._render()
+    
+    def _on_scrollbar(self, action, value, unit=None):
+        if action == "moveto":
+            self._scroll_to(int(float(value) * len(self._items())))
+        elif action == "scroll":
+            step = self.rows if unit == "pages" else 1
+            self._scroll_to(self.first + int(value) * step)
+    
+    def _on_mousewheel(self, event):
+        direction = -1 if (event.num == 4 or event.delta > 0) else 1
+        self._scroll_to(self.first + direction * 3)
+        return "break"
+    
+    def _on_resize(self, event):
+        import tkinter.font as tkfont
+        line_height = tkfont.Font(font=self.listbox.cget("font")).metrics("linespace") + 1
+        rows = max(1, event.height // line_height)
+        if rows != self.rows:
+            self.rows = rows
+            self._render()
+    
+    def _schedule_filter(self):
+        """输入筛选条件或样本变化后延迟 300 毫秒再筛选，避免连续输入时反复遍历全部样本"""
+        if self._filter_job is not None:
+            self.frame.after_cancel(self._filter_job)
+        self._filter_job = self.frame.after(300, self._apply_filter)
+    
+    def _apply_filter(self):
+        self._filter_job = None
+        text = self.filter_var.get().strip().lower()
+        if text:
+            display_name = self.sample_set.display_name
+            self._filtered = [file_path for file_path in self.sample_set
+                              if text in file_path.lower() or text in display_name(file_path).lower()]
+        else:
+            self._filtered = None
+        self._filter_version = self.sample_set.version
+        self.first = 0
+        self._render()
+
+
+class MalwareDetectorUI:
+    def __init__(self, root):
+        self.root = root
+        # 使用配置文件中的窗口设置
+        self.root.title(UI_CONFIG['window_title'])
+        self.root.geometry(f"{UI_CONFIG['window_width']}x{UI_CONFIG['window_height']}")
+        self.root.resizable(UI_CONFIG['resizable'], UI_CONFIG['resizable'])
+        
+        # 从配置文件加载颜色主题
+        self.colors = UI_CONFIG['colors']
+        
+        # 创建恶意文件检测器实例
+        self.detector = MalwareDetector()
+        
+        # 训练数据（按添加顺序去重）
+        self.benign_files = SampleSet()
+        self.malicious_files = SampleSet()
+        # 目录扫描得到的文件大小和修改时间：{file_path: (size, mtime)}
+        self.sample_file_stats = {}
+        
+        # 设置UI样式
+        self._setup_styles()
+        
+        # 创建UI
+        self.create_widgets()
+        
+        # 更新模型信息
+        self.update_model_info_display()
+        
+    def _setup_styles(self):
+        """设置UI样式主题"""
+        style = ttk.Style()
+        
+        # 设置主题基础
+        style.configure(
+            ".",
+            background=self.colors["background"],
+            foreground=self.colors["text"],
+            font=(
+                "SimHei" if "SimHei" in plt.rcParams["font.family"] else 
+                "WenQuanYi Micro Hei" if "WenQuanYi Micro Hei" in plt.rcParams["font.family"] else 
+                "Heiti TC" if "Heiti TC" in plt.rcParams["font.family"] else 
+                "TkDefaultFont"
+            )
+        )
+        
+        # 配置框架样式
+        style.configure(
+            "Modern.TFrame",
+            background=self.colors["card_bg"],
+            borderwidth=1,
+            relief="flat"
+        )
+        
+        # 配置主框架样式
+        style.configure(
+            "Main.TFrame",
+            background=self.colors["background"],
+            padding=10
+        )
+        
+        # 配置卡片框架样式
+        style.configure(
+            "Card.TFrame",
+            background=self.colors["card_bg"],
+            padding=10,
+            relief="flat",
+            borderwidth=1,
+            bordercolor=self.colors["border"]
+        )
+        
+        # 配置标签样式
+        style.configure(
+            "Title.TLabel",
+            font=(
+                "SimHei" if "SimHei" in plt.rcParams["font.family"] else 
+                "WenQuanYi Micro Hei" if "WenQuanYi Micro Hei" in plt.rcParams["font.family"] else 
+                "Heiti TC" if "Heiti TC" in plt.rcParams["font.family"] else 
+                "TkDefaultFont", 12, "bold"
+            ),
+            foreground=self.colors["primary_text"],
+            background=self.colors["card_bg"],
+            padding=(5, 3)
+        )
+        
+        # 配置次级标签样式
+        style.configure(
+            "Subtitle.TLabel",
+            font=(
+                "SimHei" if "SimHei" in plt.rcParams["font.family"] else 
+                "WenQuanYi Micro Hei" if "WenQuanYi Micro Hei" in plt.rcParams["font.family"] else 
+                "Heiti TC" if "Heiti TC" in plt.rcParams["font.family"] else 
+                "TkDefaultFont", 10, "bold"
+            ),
+            foreground=self.colors["secondary_text"],
+            background=self.colors["card_bg"],
+            padding=(5, 3)
+        )
+        
+        # 配置按钮样式
+        style.configure(
+            "Modern.TButton",
+            font=(
+                "SimHei" if "SimHei" in plt.rcParams["font.family"] else 
+                "WenQuanYi Micro Hei" if "WenQuanYi Micro Hei" in plt.rcParams["font.family"] else 
+                "Heiti TC" if "Heiti TC" in plt.rcParams["font.family"] else 
+                "TkDefaultFont", 10
+            ),
+            padding=(8, 4),
+            relief="raised"
+        )
+        
+        # 配置强调按钮样式
+        style.configure(
+            "Accent.TButton",
+            font=(
+                "SimHei" if "SimHei" in plt.rcParams["font.family"] else 
+                "WenQuanYi Micro Hei" if "WenQuanYi Micro Hei" in plt.rcParams["font.family"] else 
+                "Heiti TC" if "Heiti TC" in plt.rcParams["font.family"] else 
+                "TkDefaultFont", 10, "bold"
+            ),
+            padding=(10, 6),
+            foreground="white",
+            background=self.colors["primary"]
+        )
+        
+        # 配置危险按钮样式
+        style.configure(
+            "Danger.TButton",
+            font=(
+                "SimHei" if "SimHei" in plt.rcParams["font.family"] else 
+                "WenQuanYi Micro Hei" if "WenQuanYi Micro Hei" in plt.rcParams["font.family"] else 
+                "Heiti TC" if "Heiti TC" in plt.rcParams["font.family"] else 
+                "TkDefaultFont", 10
+            ),
+            padding=(8, 4),
+            foreground="white",
+            background=self.colors["danger"]
+        )
+        
+        # 配置标签页样式 - 标准样式保留
+        style.configure(
+            "Modern.TNotebook",
+            background=self.colors["background"],
+            tabmargins=[5, 5, 5, 5]
+        )
+        
+        # 配置标签页样式 - 现代风格
+        style.configure(
+            "Custom.TNotebook",
+            background=self.colors["background"],
+            tabmargins=[5, 5, 5, 5]
+        )
+        
+        style.configure(
+            "Modern.TNotebook.Tab",
+            font=(
+                "SimHei" if "SimHei" in plt.rcParams["font.family"] else 
+                "WenQuanYi Micro Hei" if "WenQuanYi Micro Hei" in plt.rcParams["font.family"] else 
+                "Heiti TC" if "Heiti TC" in plt.rcParams["font.family"] else 
+                "TkDefaultFont", 10
+            ),
+            padding=(15, 5),
+            background=self.colors["card_bg"],
+            foreground=self.colors["text"],
+            borderwidth=1,
+            relief="flat"
+        )
+        
+        style.map(
+            "Modern.TNotebook.Tab",
+            background=[("selected", self.colors["primary"])],
+            foreground=[("selected", "white")],
+            expand=[("selected", [1, 1, 1, 0])]
+        )
+        
+        # 配置滚动条样式
+        style.configure(
+            "Vertical.TScrollbar",
+            troughcolor=self.colors["background"],
+            background=self.colors["border"],
+            arrowcolor=self.colors["text"],
+            width=10,
+            borderwidth=0
+        )
+        
+        style.map(
+            "Vertical.TScrollbar",
+            background=[("active", self.colors["primary"])],
+            arrowcolor=[("active", "white")]
+        )
+        
+        # 配置列表框样式
+        style.configure(
+            "Custom.TListbox",
+            background=self.colors["text_bg"],
+            foreground=self.colors["text_fg"],
+            font=(
+                "SimHei" if "SimHei" in plt.rcParams["font.family"] else 
+                "WenQuanYi Micro Hei" if "WenQuanYi Micro Hei" in plt.rcParams["font.family"] else 
+                "Heiti TC" if "Heiti TC" in plt.rcParams["font.family"] else 
+                "TkDefaultFont", 10
+            ),
+            borderwidth=1,
+            relief="flat"
+        )
+        
+        # 配置输入框样式
+        style.configure(
+            "Custom.TEntry",
+            background=self.colors["text_bg"],
+            foreground=self.colors["text_fg"],
+            font=(
+                "SimHei" if "SimHei" in plt.rcParams["font.family"] else 
+                "WenQuanYi Micro Hei" if "WenQuanYi Micro Hei" in plt.rcParams["font.family"] else 
+                "Heiti TC" if "Heiti TC" in plt.rcParams["font.family"] else 
+                "TkDefaultFont", 10
+            ),
+            padding=(5, 3),
+            borderwidth=1,
+            relief="flat"
+        )
+    
+    def create_widgets(self):
+        """创建用户界面组件"""
+        # 创建主框架
+        main_frame = ttk.Frame(self.root, padding="10", style="Main.TFrame")
+        main_frame.pack(fill=tk.BOTH, expand=True)
+        
+        # 创建标签页控件 - 使用新的样式
+        self.notebook = ttk.Notebook(main_frame, style="Custom.TNotebook")
+        
+        # 创建训练标签页
+        self.train_tab = ttk.Frame(self.notebook, padding="5")
+        self.notebook.add(self.train_tab, text="模型训练")
+        
+        # 创建检测标签页
+        self.detect_tab = ttk.Frame(self.notebook, padding="5")
+        self.notebook.add(self.detect_tab, text="文件检测")
+        
+        # 创建评估标签页
+        self.eval_tab = ttk.Frame(self.notebook, padding="5")
+        self.notebook.add(self.eval_tab, text="模型评估")
+        
+        # 创建模型信息标签页
+        self.info_tab = ttk.Frame(self.notebook, padding="5")
+        self.notebook.add(self.info_tab, text="模型信息")
+        
+        # 绑定标签页切换事件
+        self.notebook.bind("<<NotebookTabChanged>>", self.on_tab_changed)
+        
+        self.notebook.pack(expand=True, fill=tk.BOTH, padx=5, pady=5)
+        
+        # 创建各个标签页的内容
+        self.create_train_tab(self.train_tab)
+        self.create_detect_tab(self.detect_tab)
+        self.create_eval_tab(self.eval_tab)
+        self.create_info_tab(self.info_tab)
+        
+    def on_tab_changed(self, event):
+        """处理标签页切换事件"""
+        # 获取当前选中的标签页
+        tab_control = event.widget
+        current_tab = tab_control.select()
+        
+        # 更新当前标签页的样式
+        for i, tab in enumerate(tab_control.tabs()):
+            tab_text = tab_control.tab(i, "text")
+            # 可以在这里添加特定标签页的刷新逻辑
+            if tab == current_tab:
+                # 选中的标签页
+                if tab_text == "模型信息":
+                    # 刷新模型信息
+                    self.update_model_info_display()
+    
+    def create_train_tab(self, parent):
+        """创建训练标签页"""
+        # 设置父容器背景色
+        parent.configure(background=self.colors["background"])
+        
+        # 添加标题标签
+        ttk.Label(parent, text="模型训练配置", style="Title.TLabel").pack(anchor=tk.W, pady=(0, 10))
+        
+        # 分割面板
+        left_frame = ttk.Frame(parent, padding="5", style="Modern.TFrame")
+        left_frame.pack(side=tk.LEFT, fill=tk.BOTH, expand=True, padx=(0, 5))
+        
+        right_frame = ttk.Frame(parent, padding="5", style="Modern.TFrame")
+        right_frame.pack(side=tk.RIGHT, fill=tk.BOTH, expand=True, padx=(5, 0))
+        
+        # 左侧：白样本区域
+        ttk.Label(left_frame, text="白样本文件（正常文件）", style="Title.TLabel").pack(anchor=tk.W, pady=(0, 5))
+        
+        # 白样本文件列表
+        self.benign_files_frame = ttk.Frame(left_frame, style="Modern.TFrame")
+        self.benign_files_frame.pack(fill=tk.BOTH, expand=True, pady=(0, 10))
+        
+        self.benign_files_view = SampleListView(
+            self.benign_files_frame,
+            self.benign_files,
+            scrollbar_style="Vertical.TScrollbar",
+            width=40, 
+            height=15,
+            bg=self.colors["card_bg"],
+            fg=self.colors["text"],
+            bd=0,
+            highlightthickness=1,
+            highlightbackground=self.colors["border"],
+            selectbackground=self.colors["primary"],
+            selectforeground="white",
+            font=("SimHei" if "SimHei" in plt.rcParams["font.family"] else "TkDefaultFont", 9)
+        )
+        self.benign_files_view.pack(fill=tk.BOTH, expand=True)
+        
+        # 白样本按钮区域
+        benign_buttons_frame = ttk.Frame(left_frame)
+        benign_buttons_frame.pack(fill=tk.X, pady=(0, 5))
+        
+        ttk.Button(benign_buttons_frame, text="添加白样本文件", command=self.add_benign_files, style="Modern.TButton").pack(side=tk.LEFT, padx=5, pady=5)
+        ttk.Button(benign_buttons_frame, text="添加白样本目录", command=self.add_benign_directory, style="Modern.TButton").pack(side=tk.LEFT, padx=5, pady=5)
+        ttk.Button(benign_buttons_frame, text="清空", command=self.clear_benign_files, style="Modern.TButton").pack(side=tk.RIGHT, padx=5, pady=5)
+        
+        # 右侧：黑样本区域
+        ttk.Label(right_frame, text="黑样本文件（恶意文件）", style="Title.TLabel").pack(anchor=tk.W, pady=(0, 5))
+        
+        # 黑样本文件列表
+        self.malicious_files_frame = ttk.Frame(right_frame, style="Modern.TFrame")
+        self.malicious_files_frame.pack(fill=tk.BOTH, expand=True, pady=(0, 10))
+        
+        self.malicious_files_view = SampleListView(
+            self.malicious_files_frame,
+            self.malicious_files,
+            scrollbar_style="Vertical.TScrollbar",
+            width=40, 
+            height=15,
+            bg=self.colors["card_bg"],
+            fg=self.colors["text"],
+            bd=0,
+            highlightthickness=1,
+            highlightbackground=self.colors["border"],
+            selectbackground=self.colors["primary"],
+            selectforeground="white",
+            font=("SimHei" if "SimHei" in plt.rcParams["font.family"] else "TkDefaultFont", 9)
+        )
+        self.malicious_files_view.pack(fill=tk.BOTH, expand=True)
+        
+        # 黑样本按钮区域
+        malicious_buttons_frame = ttk.Frame(right_frame)
+        malicious_buttons_frame.pack(fill=tk.X, pady=(0, 5))
+        
+        # 压缩包按钮放在最前面，确保可见
+        ttk.Button(malicious_buttons_frame, text="从压缩包添加", command=self.add_malicious_archive, style="Modern.TButton").pack(side=tk.LEFT, padx=5, pady=5)
+        # 添加文件按钮
+        ttk.Button(malicious_buttons_frame, text="添加黑样本文件", command=self.add_malicious_files, style="Modern.TButton").pack(side=tk.LEFT, padx=5, pady=5)
+        # 保存按钮引用，用于控制状态
+        self.add_malicious_dir_button = ttk.Button(malicious_buttons_frame, text="添加黑样本目录", command=self.add_malicious_directory, style="Modern.TButton")
+        self.add_malicious_dir_button.pack(side=tk.LEFT, padx=5, pady=5)
+        # 清空按钮在右侧
+        ttk.Button(malicious_buttons_frame, text="清空", command=self.clear_malicious_files, style="Modern.TButton").pack(side=tk.RIGHT, padx=5, pady=5)
+        
+        # 训练按钮区域
+        train_buttons_frame = ttk.Frame(parent, style="Modern.TFrame", padding="5")
+        train_buttons_frame.pack(fill=tk.X, pady=10, padx=5)
+        
+        # 左侧选项和进度条
+        left_train_frame = ttk.Frame(train_buttons_frame)
+        left_train_frame.pack(side=tk.LEFT, fill=tk.Y, padx=10)
+        
+        self.is_incremental_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(
+            left_train_frame, 
+            text="增量训练（保留现有模型）", 
+            variable=self.is_incremental_var
+        ).pack(side=tk.LEFT, padx=10, pady=5, anchor=tk.CENTER)
+        
+        # 训练进度条
+        self.train_progress_var = tk.DoubleVar()
+        self.train_progress = ttk.Progressbar(
+            train_buttons_frame, 
+            variable=self.train_progress_var, 
+            orient="horizontal", 
+            length=200, 
+            mode="determinate"
+        )
+        self.train_progress.pack(side=tk.LEFT, padx=10, pady=5, fill=tk.X, expand=True)
+        
+        # 右侧按钮
+        ttk.Button(
+            train_buttons_frame, 
+            text="开始训练", 
+            command=self.start_training, 
+            style="Accent.TButton"
+        ).pack(side=tk.RIGHT, padx=10, pady=5)
+        
+        # 训练状态区域
+        self.train_status_var = tk.StringVar(value="准备就绪")
+        self.train_status_label = ttk.Label(
+            parent, 
+            textvariable=self.train_status_var, 
+            relief=tk.SUNKEN, 
+            anchor=tk.W,
+            padding=(5, 3),
+            font=("SimHei" if "SimHei" in plt.rcParams["font.family"] else "TkDefaultFont", 9)
+        )
+        self.train_status_label.pack(fill=tk.X, pady=(5, 0), padx=5)
+        
+        # 配置训练按钮样式
+        style = ttk.Style()
+        style.configure("Accent.TButton", font=("SimHei", 10, "bold"))
+    
+    def create_detect_tab(self, parent):
+        """创建检测标签页"""
+        # 设置标签页样式
+        parent.configure(style="TabFrame.TFrame")
+        
+        # 创建标题标签
+        title_label = ttk.Label(parent, text="恶意软件检测系统", font=('微软雅黑', 14, 'bold'), foreground=self.colors['primary_text'])
+        title_label.pack(pady=(10, 5))
+        
+        # 检测文件选择区域 - 使用卡片式框架
+        select_frame = ttk.LabelFrame(parent, text="文件选择", padding="10")
+        select_frame.configure(style="Card.TLabelframe")
+        select_frame.pack(fill=tk.X, pady=(0, 10), padx=15)
+        
+        self.detect_file_var = tk.StringVar()
+        file_entry = ttk.Entry(select_frame, textvariable=self.detect_file_var, width=80)
+        file_entry.configure(style="Input.TEntry")
+        file_entry.pack(side=tk.LEFT, padx=5, fill=tk.X, expand=True)
+        
+        select_btn = ttk.Button(select_frame, text="选择文件", command=self.select_file_for_detection)
+        select_btn.configure(style="Secondary.TButton")
+        select_btn.pack(side=tk.LEFT, padx=5)
+        
+        detect_btn = ttk.Button(select_frame, text="开始检测", command=self.start_detection, style="Primary.TButton")
+        detect_btn.pack(side=tk.LEFT, padx=5)
+        
+        # 检测结果区域 - 使用卡片式框架
+        result_frame = ttk.LabelFrame(parent, text="检测结果", padding="15")
+        result_frame.configure(style="Card.TLabelframe")
+        result_frame.pack(fill=tk.BOTH, expand=True, pady=(0, 10), padx=15)
+        
+        # 结果状态标签
+        self.detection_result_var = tk.StringVar(value="等待检测...")
+        self.detection_result_label = ttk.Label(result_frame, textvariable=self.detection_result_var, font=('微软雅黑', 14, 'bold'), foreground=self.colors['status_text'])
+        self.detection_result_label.pack(pady=10)
+        
+        # 详细信息区域
+        details_frame = ttk.Frame(result_frame)
+        details_frame.pack(fill=tk.BOTH, expand=True)
+        
+        # 分数和阈值信息
+        self.score_info_var = tk.StringVar(value="")
+        score_label = ttk.Label(details_frame, textvariable=self.score_info_var, font=('微软雅黑', 10))
+        score_label.pack(anchor=tk.W, pady=5)
+        
+        # 特征列表
+        ttk.Label(details_frame, text="关键特征（按重要性排序）:", font=('微软雅黑', 10, 'bold'), foreground=self.colors['primary_text']).pack(anchor=tk.W, pady=(10, 5))
+        
+        # 特征文本框容器
+        text_container = ttk.Frame(details_frame)
+        text_container.pack(fill=tk.BOTH, expand=True)
+        
+        features_scrollbar = ttk.Scrollbar(text_container)
+        features_scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        
+        self.features_text = tk.Text(text_container, wrap=tk.WORD, yscrollcommand=features_scrollbar.set, height=15, font=('微软雅黑', 9))
+        self.features_text.configure(bg=self.colors['text_bg'], fg=self.colors['text_fg'], bd=0, highlightthickness=0)
+        self.features_text.pack(side=tk.LEFT, fill=tk.BOTH, expand=True, padx=2, pady=2)
+        features_scrollbar.config(command=self.features_text.yview)
+    
+    def create_eval_tab(self, parent):
+        """创建评估标签页"""
+        # 设置标签页样式
+        parent.configure(style="TabFrame.TFrame")
+        
+        # 创建标题标签
+        title_label = ttk.Label(parent, text="模型性能评估", font=('微软雅黑', 14, 'bold'), foreground=self.colors['primary_text'])
+        title_label.pack(pady=(10, 5))
+        
+        # 测试数据选择区域 - 使用卡片式框架
+        select_frame = ttk.LabelFrame(parent, text="评估数据设置", padding="15")
+        select_frame.configure(style="Card.TLabelframe")
+        select_frame.pack(fill=tk.X, pady=(0, 10), padx=15)
+        
+        # 白样本测试数据
+        eval_benign_frame = ttk.Frame(select_frame)
+        eval_benign_frame.pack(fill=tk.X, pady=(0, 8))
+        
+        ttk.Label(eval_benign_frame, text="白样本测试数据: ", width=15, font=('微软雅黑', 10)).pack(side=tk.LEFT, padx=5)
+        self.eval_benign_var = tk.StringVar()
+        benign_entry = ttk.Entry(eval_benign_frame, textvariable=self.eval_benign_var, width=60)
+        benign_entry.configure(style="Input.TEntry")
+        benign_entry.pack(side=tk.LEFT, padx=5, fill=tk.X, expand=True)
+        
+        ttk.Button(eval_benign_frame, text="选择目录", command=lambda: self.select_directory(self.eval_benign_var), style="Secondary.TButton").pack(side=tk.LEFT, padx=5)
+        
+        # 黑样本测试数据
+        eval_malicious_frame = ttk.Frame(select_frame)
+        eval_malicious_frame.pack(fill=tk.X, pady=(0, 5))
+        
+        ttk.Label(eval_malicious_frame, text="黑样本测试数据: ", width=15, font=('微软雅黑', 10)).pack(side=tk.LEFT, padx=5)
+        self.eval_malicious_var = tk.StringVar()
+        malicious_entry = ttk.Entry(eval_malicious_frame, textvariable=self.eval_malicious_var, width=60)
+        malicious_entry.configure(style="Input.TEntry")
+        malicious_entry.pack(side=tk.LEFT, padx=5, fill=tk.X, expand=True)
+        
+        ttk.Button(eval_malicious_frame, text="选择目录", command=lambda: self.select_directory(self.eval_malicious_var), style="Secondary.TButton").pack(side=tk.LEFT, padx=5)
+        
+        # 开始评估按钮
+        ttk.Button(select_frame, text="开始评估", command=self.start_evaluation, style="Primary.TButton").pack(side=tk.RIGHT, padx=10, pady=5)
+        
+        # 评估结果区域 - 使用卡片式框架
+        metrics_frame = ttk.LabelFrame(parent, text="评估指标", padding="15")
+        metrics_frame.configure(style="Card.TLabelframe")
+        metrics_frame.pack(fill=tk.X, pady=(0, 10), padx=15)
+        
+        # 数据统计框架 - 网格布局
+        stats_frame = ttk.Frame(metrics_frame)
+        stats_frame.pack(fill=tk.X, pady=5)
+        
+        # 评估指标标签
+        self.accuracy_var = tk.StringVar(value="准确率: --")
+        self.precision_var = tk.StringVar(value="精确率: --")
+        self.recall_var = tk.StringVar(value="召回率: --")
+        self.f1_var = tk.StringVar(value="F1分数: --")
+        self.fn_var = tk.StringVar(value="漏报率: --")
+        self.fp_var = tk.StringVar(value="误报率: --")
+        
+        # 使用网格布局代替左右分栏
+        metrics_grid = ttk.Frame(stats_frame)
+        metrics_grid.pack(fill=tk.BOTH, expand=True)
+        
+        ttk.Label(metrics_grid, textvariable=self.accuracy_var, font=('微软雅黑', 10, 'bold'), foreground=self.colors['primary_text']).grid(row=0, column=0, sticky=tk.W, padx=20, pady=3)
+        ttk.Label(metrics_grid, textvariable=self.precision_var, font=('微软雅黑', 10), foreground=self.colors['primary_text']).grid(row=0, column=1, sticky=tk.W, padx=20, pady=3)
+        ttk.Label(metrics_grid, textvariable=self.recall_var, font=('微软雅黑', 10), foreground=self.colors['primary_text']).grid(row=1, column=0, sticky=tk.W, padx=20, pady=3)
+        ttk.Label(metrics_grid, textvariable=self.f1_var, font=('微软雅黑', 10), foreground=self.colors['primary_text']).grid(row=1, column=1, sticky=tk.W, padx=20, pady=3)
+        ttk.Label(metrics_grid, textvariable=self.fn_var, font=('微软雅黑', 10), foreground=self.colors['warning_text']).grid(row=2, column=0, sticky=tk.W, padx=20, pady=3)
+        ttk.Label(metrics_grid, textvariable=self.fp_var, font=('微软雅黑', 10), foreground=self.colors['warning_text']).grid(row=2, column=1, sticky=tk.W, padx=20, pady=3)
+        
+        # 混淆矩阵可视化 - 使用卡片式框架
+        confusion_frame = ttk.LabelFrame(parent, text="混淆矩阵分析", padding="15")
+        confusion_frame.configure(style="Card.TLabelframe")
+        confusion_frame.pack(fill=tk.BOTH, expand=True, pady=10, padx=15)
+        
+        # 初始化混淆矩阵图表
+        self.fig, self.ax = plt.subplots(figsize=(6, 4), dpi=100)
+        self.ax.axis('off')
+        self.canvas = FigureCanvasTkAgg(self.fig, master=confusion_frame)
+        self.canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True)
+        self.canvas.draw()
+        
+        # 状态标签 - 现代化样式
+        self.eval_status_var = tk.StringVar(value="等待评估...")
+        self.eval_status_label = ttk.Label(parent, textvariable=self.eval_status_var, relief=tk.SUNKEN, anchor=tk.W, font=('微软雅黑', 9))
+        self.eval_status_label.pack(fill=tk.X, pady=(5, 0))
+    
+    def create_info_tab(self, parent):
+        """创建模型详细信息标签页"""
+        # 设置标签页样式
+        parent.configure(style="TabFrame.TFrame")
+        
+        # 创建标题标签
+        title_label = ttk.Label(parent, text="模型详情与性能分析", font=('微软雅黑', 14, 'bold'), foreground=self.colors['primary_text'])
+        title_label.pack(pady=(10, 5))
+        
+        # 创建一个主分割面板
+        main_frame = ttk.Frame(parent)
+        main_frame.pack(fill=tk.BOTH, expand=True, padx=15, pady=5)
+        
+        # 创建顶部信息面板 - 使用卡片式框架
+        top_frame = ttk.Frame(main_frame)
+        top_frame.pack(fill=tk.X, pady=(0, 10))
+        
+        # 模型信息框架
+        info_frame = ttk.LabelFrame(top_frame, text="模型基本信息", padding="15")
+        info_frame.configure(style="Card.TLabelframe")
+        info_frame.pack(fill=tk.X, pady=(0, 10))
+        
+        # 模型信息显示
+        self.model_info_var = tk.StringVar(value="")
+        info_label = ttk.Label(info_frame, textvariable=self.model_info_var, font=('微软雅黑', 10), justify=tk.LEFT, foreground=self.colors['primary_text'])
+        info_label.pack(anchor=tk.W, pady=5)
+        
+        # 创建中间图表区域
+        charts_frame = ttk.Frame(main_frame)
+        charts_frame.pack(fill=tk.BOTH, expand=True, pady=(0, 10))
+        
+        # 左侧：混淆矩阵和性能指标 - 使用卡片式框架
+        left_chart_frame = ttk.LabelFrame(charts_frame, text="模型性能指标", padding="15")
+        left_chart_frame.configure(style="Card.TLabelframe")
+        left_chart_frame.pack(side=tk.LEFT, fill=tk.BOTH, expand=True, padx=(0, 5))
+        
+        # 混淆矩阵图表
+        self.fig_matrix, self.ax_matrix = plt.subplots(figsize=(5, 4), dpi=100)
+        self.ax_matrix.axis('off')
+        self.canvas_matrix = FigureCanvasTkAgg(self.fig_matrix, master=left_chart_frame)
+        self.canvas_matrix.get_tk_widget().pack(fill=tk.BOTH, expand=True, pady=(0, 10))
+        
+        # 性能指标标签
+        performance_frame = ttk.Frame(left_chart_frame)
+        performance_frame.pack(fill=tk.X)
+        
+        self.detection_rate_var = tk.StringVar(value="恶意文件检测率: --")
+        self.false_positive_var = tk.StringVar(value="误报率: --")
+        self.false_negative_var = tk.StringVar(value="漏报率: --")
+        
+        ttk.Label(performance_frame, textvariable=self.detection_rate_var, font=('微软雅黑', 10, 'bold'), foreground=self.colors['success_text']).pack(anchor=tk.W, pady=3)
+        ttk.Label(performance_frame, textvariable=self.false_positive_var, font=('微软雅黑', 10), foreground=self.colors['warning_text']).pack(anchor=tk.W, pady=3)
+        ttk.Label(performance_frame, textvariable=self.false_negative_var, font=('微软雅黑', 10), foreground=self.colors['error_text']).pack(anchor=tk.W, pady=3)
+        
+        # 右侧：检测率趋势和速度评估 - 使用卡片式框架
+        right_chart_frame = ttk.LabelFrame(charts_frame, text="高级分析", padding="15")
+        right_chart_frame.configure(style="Card.TLabelframe")
+        right_chart_frame.pack(side=tk.RIGHT, fill=tk.BOTH, expand=True, padx=(5, 0))
+        
+        # 创建一个笔记本控件来切换不同的图表
+        chart_notebook = ttk.Notebook(right_chart_frame)
+        chart_notebook.pack(fill=tk.BOTH, expand=True)
+        
+        # 检测率图表标签页
+        detection_rate_tab = ttk.Frame(chart_notebook)
+        chart_notebook.add(detection_rate_tab, text="检测率分析")
+        
+        self.fig_detection, self.ax_detection = plt.subplots(figsize=(5, 3), dpi=100)
+        self.canvas_detection = FigureCanvasTkAgg(self.fig_detection, master=detection_rate_tab)
+        self.canvas_detection.get_tk_widget().pack(fill=tk.BOTH, expand=True)
+        
+        # 速度评估图表标签页
+        speed_tab = ttk.Frame(chart_notebook)
+        chart_notebook.add(speed_tab, text="速度评估")
+        
+        self.fig_speed, self.ax_speed = plt.subplots(figsize=(5, 3), dpi=100)
+        self.canvas_speed = FigureCanvasTkAgg(self.fig_speed, master=speed_tab)
+        self.canvas_speed.get_tk_widget().pack(fill=tk.BOTH, expand=True)
+        
+        # 阶段耗时图表标签页
+        profile_tab = ttk.Frame(chart_notebook)
+        chart_notebook.add(profile_tab, text="阶段耗时")
+        
+        self.fig_profile, self.ax_profile = plt.subplots(figsize=(5, 3), dpi=100)
+        self.canvas_profile = FigureCanvasTkAgg(self.fig_profile, master=profile_tab)
+        self.canvas_profile.get_tk_widget().pack(fill=tk.BOTH, expand=True)
+        
+        # 底部：重要特征 - 使用卡片式框架
+        features_frame = ttk.LabelFrame(main_frame, text="重要特征（权重排序）", padding="15")
+        features_frame.configure(style="Card.TLabelframe")
+        features_frame.pack(fill=tk.BOTH, expand=True, pady=(0, 10))
+        
+        # 特征列表容器
+        text_container = ttk.Frame(features_frame)
+        text_container.pack(fill=tk.BOTH, expand=True)
+        
+        features_scrollbar = ttk.Scrollbar(text_container)
+        features_scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        
+        self.top_features_text = tk.Text(text_container, wrap=tk.WORD, yscrollcommand=features_scrollbar.set, height=10, font=('微软雅黑', 9))
+        self.top_features_text.configure(bg=self.colors['text_bg'], fg=self.colors['text_fg'], bd=0, highlightthickness=0)
+        self.top_features_text.pack(side=tk.LEFT, fill=tk.BOTH, expand=True, padx=2, pady=2)
+        features_scrollbar.config(command=self.top_features_text.yview)
+        
+        # 操作按钮 - 使用卡片式框架
+        actions_frame = ttk.LabelFrame(main_frame, text="系统操作", padding="15")
+        actions_frame.configure(style="Card.TLabelframe")
+        actions_frame.pack(fill=tk.X, pady=10)
+        
+        # 按钮框架
+        buttons_frame = ttk.Frame(actions_frame)
+        buttons_frame.pack(fill=tk.X)
+        
+        # 刷新信息按钮
+        refresh_btn = ttk.Button(buttons_frame, text="刷新信息", command=self.update_model_info_display)
+        refresh_btn.configure(style="Secondary.TButton")
+        refresh_btn.pack(side=tk.LEFT, padx=10)
+        
+        # 性能测试按钮
+        perf_btn = ttk.Button(buttons_frame, text="执行性能测试", command=self.perform_performance_test)
+        perf_btn.configure(style="Secondary.TButton")
+        perf_btn.pack(side=tk.LEFT, padx=5)
+        
+        # 分阶段性能分析开关：启用后检测和训练时记录各阶段耗时，显示在“阶段耗时”图表中
+        self.profiling_var = tk.BooleanVar(value=self.detector.get_profile() is not None)
+        profiling_check = ttk.Checkbutton(buttons_frame, text="记录阶段耗时", variable=self.profiling_var,
+                                          command=self.toggle_profiling)
+        profiling_check.pack(side=tk.LEFT, padx=5)
+        
+        # 重置模型按钮
+        reset_btn = ttk.Button(buttons_frame, text="重置模型", command=self.reset_model)
+        reset_btn.configure(style="Danger.TButton")
+        reset_btn.pack(side=tk.RIGHT, padx=10)
+    
+    def add_benign_files(self):
+        """添加白样本文件"""
+        files = filedialog.askopenfilenames(title="选择白样本文件")
+        self._add_benign_files_batch([(file, os.path.basename(file)) for file in files])
+    
+    def add_benign_directory(self):
+        """添加白样本目录（在后台线程中并行扫描，避免UI冻结）"""
+        directory = filedialog.askdirectory(title="选择白样本目录")
+        if directory:
+            self._scan_sample_directory(directory, self._add_benign_files_batch, 'add_benign_dir_button', "白样本")
+    
+    def _scan_sample_directory(self, directory, add_batch, button_name, sample_label):
+        """在后台线程中用 DirectoryCrawler 扫描样本目录，按批次把文件交给 add_batch
+        
+        扫描得到的文件大小和修改时间记录在 sample_file_stats 中，训练时直接复用，
+        不再重复 stat。
+        
+        Args:
+            directory: 要扫描的目录
+            add_batch: 在UI线程中调用的批量添加函数，参数为 (file_path, filename) 列表
+            button_name: 扫描期间禁用的按钮属性名
+            sample_label: 提示信息中的样本类别名称
+        """
+        # 显示提示
+        messagebox.showinfo("提示", "开始扫描目录，请等待...")
+        
+        # 创建扫描状态标签（如果不存在）
+        if not hasattr(self, 'scan_status_var'):
+            self.scan_status_var = tk.StringVar(value="准备扫描...")
+            self.scan_status_label = ttk.Label(self.train_status_label.master, textvariable=self.scan_status_var, foreground="blue")
+            self.scan_status_label.pack(fill=tk.X, pady=(2, 0))
+        else:
+            self.scan_status_var.set("准备扫描...")
+            self.scan_status_label.pack(fill=tk.X, pady=(2, 0))
+        
+        # 禁用添加按钮
+        if hasattr(self, button_name):
+            getattr(self, button_name).config(state=tk.DISABLED)
+        
+        def scan_thread():
+            try:
+                crawler = DirectoryCrawler(batch_size=1000)
+                count = 0
+                # 每批（1000 个文件）只向UI线程提交一次添加和一次状态更新
+                for file_batch in crawler.iter_batches(directory):
+                    for file_path, size, mtime in file_batch:
+                        self.sample_file_stats[file_path] = (size, mtime)
+                    count += len(file_batch)
+                    batch = [(file_path, os.path.basename(file_path)) for file_path, _, _ in file_batch]
+                    self.root.after(0, lambda b=batch, c=count, d=crawler.directories_scanned: (
+                        add_batch(b),
+                        self.scan_status_var.set(f"扫描中 - 已扫描 {d} 个目录 - 已发现: {c} 文件")
+                    ))
+                
+                # 扫描完成
+                self.root.after(0, lambda c=count: (
+                    self.scan_status_var.set(f"扫描完成 - 共发现 {c} 个文件"),
+                    messagebox.showinfo("完成", f"扫描完成，共发现 {c} 个{sample_label}文件"),
+                    self.scan_status_label.pack_forget() if hasattr(self, 'scan_status_label') else None
+                ))
+                
+            except Exception as e:
+                self.root.after(0, lambda e=e: (
+                    self.scan_status_var.set(f"扫描失败: {str(e)}"),
+                    messagebox.showerror("错误", f"扫描目录时发生错误: {str(e)}"),
+                    self.scan_status_label.pack_forget() if hasattr(self, 'scan_status_label') else None
+                ))
+            finally:
+                # 恢复按钮状态
+                if hasattr(self, button_name):
+                    self.root.after(0, lambda: getattr(self, button_name).config(state=tk.NORMAL))
+        
+        # 启动扫描线程
+        thread = threading.Thread(target=scan_thread)
+        thread.daemon = True
+        thread.start()
+    
+    def _with_file_stats(self, file_paths):
+        """为训练文件附上目录扫描时记录的 (size, mtime)，使训练前的文件校验跳过 stat"""
+        stats = self.sample_file_stats
+        return [(file_path,) + stats[file_path] if file_path in stats else file_path for file_path in file_paths]
+    
+    def _add_benign_files_batch(self, batch):
+        """批量添加白样本文件，避免频繁UI更新"""
+        self._add_sample_batch(self.benign_files, self.benign_files_view, batch)
+    
+    def _add_sample_batch(self, sample_set, view, batch):
+        """把 (file_path, display_name) 批次中尚未添加的文件加入样本集合，并刷新列表视图
+        
+        去重基于集合的 O(1) 成员判断；列表视图只重绘可见的几行，与样本总数无关。
+        
+        Returns:
+            新加入的文件数
+        """
+        display_names = dict(batch)
+        added = sample_set.update(display_names, display_names)
+        if added:
+            view.refresh()
+        return len(added)
+    
+    def clear_benign_files(self):
+        """清空白样本文件"""
+        for file_path in self.benign_files:
+            self.sample_file_stats.pop(file_path, None)
+        self.benign_files.clear()
+        self.benign_files_view.refresh()
+    
+    def add_malicious_files(self):
+        """添加黑样本文件"""
+        files = filedialog.askopenfilenames(title="选择黑样本文件")
+        self._add_malicious_files_batch([(file, os.path.basename(file)) for file in files])
+    
+    def add_malicious_directory(self):
+        """添加黑样本目录（在后台线程中并行扫描，避免UI冻结）"""
+        directory = filedialog.askdirectory(title="选择黑样本目录")
+        if directory:
+            self._scan_sample_directory(directory, self._add_malicious_files_batch, 'add_malicious_dir_button', "黑样本")
+    
+    def _add_malicious_files_batch(self, batch):
+        """批量添加黑样本文件，避免频繁UI更新"""
+        self._add_sample_batch(self.malicious_files, self.malicious_files_view, batch)
+    
+    def add_malicious_archive(self):
+        """从压缩包添加黑样本文件（安全模式）"""
+        # 选择压缩包文件
+        archive_path = filedialog.askopenfilename(
+            title="选择压缩包文件",
+            filetypes=[
+                ("压缩包文件", "*.zip *.tar *.tar.gz *.tgz *.tar.bz2 *.tbz2 *.tar.xz *.txz *.gz *.bz2 *.xz"),
+                ("ZIP文件", "*.zip"),
+                ("所有文件", "*.*")
+            ]
+        )
+        
+        if not archive_path:
+            return
+        
+        # 显示安全提示
+        response = messagebox.askyesno(
+            "安全提示",
+            "警告：处理压缩包中的恶意样本时，请确保您了解潜在风险。程序将在隔离环境中读取文件内容，不会执行文件。\n\n是否继续？"
+        )
+        
+        if not response:
+            return
+        
+        # 询问密码
+        password = None
+        needs_password = messagebox.askyesno(
+            "密码提示",
+            "压缩包是否受密码保护？"
+        )
+        
+        if needs_password:
+            # 创建一个简单的对话框获取密码
+            password_window = tk.Toplevel(self.root)
+            password_window.title("输入压缩包密码")
+            password_window.geometry("300x150")
+            password_window.resizable(False, False)
+            password_window.transient(self.root)
+            password_window.grab_set()
+            
+            ttk.Label(password_window, text="请输入压缩包密码:", padding=10).pack()
+            
+            password_var = tk.StringVar()
+            password_entry = ttk.Entry(password_window, textvariable=password_var, show="*")
+            password_entry.pack(pady=5, padx=20, fill=tk.X)
+            password_entry.focus()
+            
+            def on_ok():
+                nonlocal password
+                password = password_var.get()
+                password_window.destroy()
+            
+            button_frame = ttk.Frame(password_window)
+            button_frame.pack(pady=10, fill=tk.X)
+            
+            ttk.Button(button_frame, text="确定", command=on_ok).pack(side=tk.RIGHT, padx=10)
+            ttk.Button(button_frame, text="取消", command=password_window.destroy).pack(side=tk.RIGHT)
+            
+            # 等待密码窗口关闭
+            self.root.wait_window(password_window)
+            
+            if password is None:
+                return
+        
+        # 询问是否处理可执行文件
+        process_executables = messagebox.askyesno(
+            "处理选项",
+            "是否处理压缩包中的可执行文件？\n(注意：这可能存在安全风险，但对恶意软件分析很重要)"
+        )
+        
+        # 显示提示
+        messagebox.showinfo("提示", "开始处理压缩包，请等待...")
+        
+        # 创建扫描状态标签（如果不存在）
+        if not hasattr(self, 'scan_status_var'):
+            self.scan_status_var = tk.StringVar(value="准备处理压缩包...")
+            self.scan_status_label = ttk.Label(self.train_status_label.master, textvariable=self.scan_status_var, foreground="blue")
+            self.scan_status_label.pack(fill=tk.X, pady=(2, 0))
+        else:
+            self.scan_status_var.set("准备处理压缩包...")
+            self.scan_status_label.pack(fill=tk.X, pady=(2, 0))
+        
+        # 在单独的线程中枚举压缩包成员，避免UI冻结
+        def process_archive_thread():
+            if not archive_source.is_archive_file(archive_path):
+                self.root.after(0, lambda: (
+                    self.scan_status_var.set("不支持的格式"),
+                    messagebox.showerror("错误", "仅支持 ZIP、tar（含 .tar.gz/.tar.bz2/.tar.xz）和 .gz/.bz2/.xz 格式的压缩包"),
+                    self.scan_status_label.pack_forget() if hasattr(self, 'scan_status_label') else None
+                ))
+                return
+            
+            try:
+                source = ArchiveSampleSource(archive_path, password, include_executables=process_executables)
+                
+                # 用第一个加密成员验证密码
+                if not source.check_password():
+                    self.root.after(0, lambda: (
+                        self.scan_status_var.set("密码错误"),
+                        messagebox.showerror("错误", "压缩包密码错误或编码不支持，请重试"),
+                        self.scan_status_label.pack_forget() if hasattr(self, 'scan_status_label') else None
+                    ))
+                    return
+                
+                # ZIP 只读取中央目录，成员以 "压缩包路径::成员名" 加入样本列表，训练时再流式读取
+                # 特征窗口，不解压到内存或临时目录；tar、gz 等整体作为一项，训练时顺序解压
+                count = 0
+                batch = []
+                for member_path, filename in source.iter_members():
+                    batch.append((member_path, f"[ARCHIVE] {filename}"))
+                    if len(batch) >= 1000:
+                        count += len(batch)
+                        self.root.after(0, lambda b=batch, c=count: (
+                            self._add_malicious_files_batch(b),
+                            self.scan_status_var.set(f"处理中 - 已添加 {c} 个样本")
+                        ))
+                        batch = []
+                
+                # 处理剩余的文件批次
+                if batch:
+                    count += len(batch)
+                    self.root.after(0, lambda b=batch: self._add_malicious_files_batch(b))
+                
+                # 处理完成
+                if not source.random_access:
+                    self.root.after(0, lambda: (
+                        self.scan_status_var.set("处理完成 - 已添加压缩包"),
+                        messagebox.showinfo("完成", f"已添加压缩包 {os.path.basename(archive_path)}\n\n"
+                                                  "训练时将顺序解压其中的全部文件作为恶意样本"),
+                        self.scan_status_label.pack_forget() if hasattr(self, 'scan_status_label') else None
+                    ))
+                    return
+                self.root.after(0, lambda c=count, s=source.skipped: (
+                    self.scan_status_var.set(f"处理完成 - 共添加 {c} 个样本，跳过 {s} 个文件"),
+                    messagebox.showinfo("完成", f"成功从压缩包添加 {c} 个恶意样本文件\n\n跳过的文件数量: {s}\n(包括目录和可执行文件)"),
+                    self.scan_status_label.pack_forget() if hasattr(self, 'scan_status_label') else None
+                ))
+                
+            except Exception as e:
+                self.root.after(0, lambda e=e: (
+                    self.scan_status_var.set(f"处理失败: {str(e)}"),
+                    messagebox.showerror("错误", f"处理压缩包时发生错误: {str(e)}"),
+                    self.scan_status_label.pack_forget() if hasattr(self, 'scan_status_label') else None
+                ))
+        
+        # 启动处理线程
+        thread = threading.Thread(target=process_archive_thread)
+        thread.daemon = True
+        thread.start()
+    
+    def clear_malicious_files(self):
+        """清空黑样本文件"""
+        for file_path in self.malicious_files:
+            self.sample_file_stats.pop(file_path, None)
+        self.malicious_files.clear()
+        self.malicious_files_view.refresh()
+    
+    def start_training(self):
+        """开始训练模型，支持并行处理和性能监控"""
+        if not self.benign_files and not self.malicious_files:
+            messagebox.showerror("错误", "请至少添加一些白样本或黑样本文件")
+            return
+        
+        # 确认开始训练
+        total_files = len(self.benign_files) + len(self.malicious_files)
+        if total_files > 10000:
+            response = messagebox.askyesno("确认训练", 
+                f"您即将训练 {total_files} 个文件，这可能需要较长时间。\n" +
+                f"是否继续？")
+            if not response:
+                return
+        
+        # 在UI线程中取训练文件的快照，训练期间继续添加样本不影响本次训练
+        benign_files = self._with_file_stats(self.benign_files)
+        malicious_files = self._with_file_stats(self.malicious_files)
+        
+        # 初始化训练状态
+        self.is_training = True
+        
+        # 创建性能监控标签
+        if not hasattr(self, 'performance_frame'):
+            # 添加性能监控区域
+            self.performance_frame = ttk.LabelFrame(self.train_status_label.master, text="实时性能监控", padding="5")
+            self.performance_frame.place(relx=0, rely=0, anchor='nw')
+            
+            # 性能指标
+            performance_grid = ttk.Frame(self.performance_frame)
+            performance_grid.pack(fill=tk.X)
+            
+            self.cpu_usage_var = tk.StringVar(value="CPU使用率: --%")
+            self.files_per_sec_var = tk.StringVar(value="处理速度: -- 文件/秒")
+            self.memory_usage_var = tk.StringVar(value="内存使用: -- MB")
+            
+            ttk.Label(performance_grid, textvariable=self.cpu_usage_var, font=('SimHei', 10, 'bold')).grid(row=0, column=0, sticky=tk.W, padx=10, pady=2)
+            ttk.Label(performance_grid, textvariable=self.files_per_sec_var).grid(row=0, column=1, sticky=tk.W, padx=10, pady=2)
+            ttk.Label(performance_grid, textvariable=self.memory_usage_var).grid(row=0, column=2, sticky=tk.W, padx=10, pady=2)
+            
+            # 添加取消按钮
+            if not hasattr(self, 'cancel_button'):
+                self.cancel_button = ttk.Button(self.train_status_label.master, text="取消训练", command=self.cancel_training)
+                # 使用pack方法而不是place方法来避免参数错误
+                self.cancel_button.pack(side=tk.RIGHT, padx=10, pady=5)
+        else:
+            # 显示已存在的性能监控区域
+            self.performance_frame.pack(fill=tk.X, pady=(0, 5))
+            self.cancel_button.pack(side=tk.RIGHT, padx=10, pady=5)
+        
+        # 更新UI
+        self.root.after(0, lambda: self.cancel_button.config(state=tk.NORMAL))
+        self.root.after(0, lambda: self.train_status_var.set("训练中..."))
+        
+        # 性能监控线程
+        def performance_monitor():
+            process = psutil.Process()
+            while self.is_training:
+                # 获取CPU使用率
+                cpu_percent = psutil.cpu_percent(interval=0.5)
+                
+                # 获取内存使用
+                mem_info = process.memory_info()
+                mem_mb = mem_info.rss / (1024 * 1024)
+                
+                # 更新UI
+                self.root.after(0, lambda: self.cpu_usage_var.set(f"CPU使用率: {cpu_percent:.1f}%"))
+                self.root.after(0, lambda: self.memory_usage_var.set(f"内存使用: {mem_mb:.1f} MB"))
+                
+                # 短暂休眠
+                time.sleep(1)
+        
+        # 启动性能监控
+        self.performance_monitor_thread = threading.Thread(target=performance_monitor)
+        self.performance_monitor_thread.daemon = True
+        self.performance_monitor_thread.start()
+        
+        # 训练回调函数
+        def training_callback(processed, total, status):
+            # 更新状态信息
+            status_text = f"训练中 - {status} ({processed}/{total} 文件)"
+            self.root.after(0, lambda: self.train_status_var.set(status_text))
+            
+            # 如果有处理速度信息，更新显示
+            if hasattr(self, 'last_processed_count') and hasattr(self, 'last_update_time'):
+                elapsed = time.time() - self.last_update_time
+                if elapsed > 1:  # 每秒更新一次
+                    files_per_sec = (processed - self.last_processed_count) / elapsed
+                    self.root.after(0, lambda: self.files_per_sec_var.set(f"处理速度: {files_per_sec:.1f} 文件/秒"))
+                    self.last_processed_count = processed
+                    self.last_update_time = time.time()
+            else:
+                self.last_processed_count = processed
+                self.last_update_time = time.time()
+        
+        # 在单独的线程中训练，避免UI冻结
+        def train_thread():
+            try:
+                # 执行训练
+                is_incremental = self.is_incremental_var.get()
+                results = self.detector.train(
+                    benign_files,
+                    malicious_files,
+                    is_incremental=is_incremental,
+                    use_parallel=True,
+                    batch_size=1000,
+                    callback=training_callback
+                )
+                
+                # 如果训练被取消，不继续处理
+                if not self.is_training:
+                    return
+                
+                # 更新UI
+                self.root.after(0, lambda: self.train_status_var.set(
+                    f"训练完成 - 处理: {results['processed_files']} 文件, 错误: {results['errors']}, 耗时: {results['training_time']:.2f}秒"
+                ))
+                
+                # 更新模型信息
+                self.root.after(0, self.update_model_info_display)
+                
+                # 显示结果
+                msg = "训练成功完成！\n\n"
+                msg += f"总计文件数: {results['total_files']}\n"
+                msg += f"成功处理: {results['processed_files']}\n"
+                msg += f"处理错误: {results['errors']}\n"
+                msg += f"训练时间: {results['training_time']:.2f}秒\n"
+                msg += f"本次新增白样本数: {results['new_benign_files']}\n"
+                msg += f"本次新增黑样本数: {results['new_malicious_files']}\n"
+                msg += f"累计白样本数: {self.detector.total_benign_files}\n"
+                msg += f"累计黑样本数: {self.detector.total_malicious_files}\n"
+                msg += f"平均处理速度: {results['files_per_second']:.2f} 文件/秒\n"
+                msg += f"CPU利用率: {results['cpu_utilization']:.1f}%"
+                self.root.after(0, lambda: messagebox.showinfo("训练完成", msg))
+            except Exception as e:
+                if self.is_training:
+                    self.root.after(0, lambda: messagebox.showerror("训练失败", f"训练过程中发生错误: {str(e)}"))
+            finally:
+                # 停止训练
+                self.is_training = False
+                
+                # 更新UI
+                self.root.after(0, lambda: self.cancel_button.config(state=tk.DISABLED))
+                self.root.after(0, lambda: self.cpu_usage_var.set("CPU使用率: --%"))
+                self.root.after(0, lambda: self.files_per_sec_var.set("处理速度: -- 文件/秒"))
+                self.root.after(0, lambda: self.memory_usage_var.set("内存使用: -- MB"))
+        
+        # 启动训练线程
+        self.training_thread = threading.Thread(target=train_thread)
+        self.training_thread.daemon = True
+        self.training_thread.start()
+    
+    def cancel_training(self):
+        """取消正在进行的训练"""
+        if messagebox.askyesno("确认取消", "确定要取消训练吗？"):
+            self.is_training = False
+            # 禁用取消按钮
+            self.cancel_button.config(state=tk.DISABLED)
+            self.train_status_var.set("取消训练中...")
+            # 等待线程结束
+            if hasattr(self, 'training_thread') and self.training_thread and self.training_thread.is_alive():
+                self.training_thread.join(timeout=5.0)
+            self.train_status_var.set("训练已取消")
+    
+    def create_train_tab(self, parent):
+        """创建训练标签页（增强版，支持并行处理）"""
+        # 原始代码保留，添加并行处理选项
+        # 分割面板
+        left_frame = ttk.Frame(parent, padding="5")
+        left_frame.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        
+        right_frame = ttk.Frame(parent, padding="5")
+        right_frame.pack(side=tk.RIGHT, fill=tk.BOTH, expand=True)
+        
+        # 左侧：白样本区域
+        ttk.Label(left_frame, text="白样本文件（正常文件）", font=('SimHei', 12)).pack(anchor=tk.W, pady=(0, 5))
+        
+        # 白样本文件列表
+        self.benign_files_frame = ttk.Frame(left_frame)
+        self.benign_files_frame.pack(fill=tk.BOTH, expand=True, pady=(0, 10))
+        
+        self.benign_files_view = SampleListView(self.benign_files_frame, self.benign_files, width=40, height=15)
+        self.benign_files_view.pack(fill=tk.BOTH, expand=True)
+        
+        # 白样本按钮区域
+        benign_buttons_frame = ttk.Frame(left_frame)
+        benign_buttons_frame.pack(fill=tk.X, pady=(0, 5))
+        
+        ttk.Button(benign_buttons_frame, text="添加白样本文件", command=self.add_benign_files).pack(side=tk.LEFT, padx=2)
+        # 保存按钮引用，用于控制状态
+        self.add_benign_dir_button = ttk.Button(benign_buttons_frame, text="添加白样本目录", command=self.add_benign_directory)
+        self.add_benign_dir_button.pack(side=tk.LEFT, padx=2)
+        ttk.Button(benign_buttons_frame, text="清空", command=self.clear_benign_files).pack(side=tk.RIGHT, padx=2)
+        
+        # 右侧：黑样本区域
+        ttk.Label(right_frame, text="黑样本文件（恶意文件）", font=('SimHei', 12)).pack(anchor=tk.W, pady=(0, 5))
+        
+        # 黑样本文件列表
+        self.malicious_files_frame = ttk.Frame(right_frame)
+        self.malicious_files_frame.pack(fill=tk.BOTH, expand=True, pady=(0, 10))
+        
+        self.malicious_files_view = SampleListView(self.malicious_files_frame, self.malicious_files, width=40, height=15)
+        self.malicious_files_view.pack(fill=tk.BOTH, expand=True)
+        
+        # 黑样本按钮区域
+        malicious_buttons_frame = ttk.Frame(right_frame)
+        malicious_buttons_frame.pack(fill=tk.X, pady=(0, 5))
+        
+        # 压缩包按钮放在最前面，确保可见
+        ttk.Button(malicious_buttons_frame, text="从压缩包添加", command=self.add_malicious_archive).pack(side=tk.LEFT, padx=2)
+        # 添加文件按钮
+        ttk.Button(malicious_buttons_frame, text="添加黑样本文件", command=self.add_malicious_files).pack(side=tk.LEFT, padx=2)
+        # 添加目录按钮
+        ttk.Button(malicious_buttons_frame, text="添加黑样本目录", command=self.add_malicious_directory).pack(side=tk.LEFT, padx=2)
+        # 清空按钮在右侧
+        ttk.Button(malicious_buttons_frame, text="清空", command=self.clear_malicious_files).pack(side=tk.RIGHT, padx=2)
+        
+        # 训练按钮区域
+        train_buttons_frame = ttk.Frame(parent)
+        train_buttons_frame.pack(fill=tk.X, pady=10)
+        
+        # 训练选项
+        options_frame = ttk.Frame(train_buttons_frame)
+        options_frame.pack(side=tk.LEFT, fill=tk.X, expand=True)
+        
+        # 创建一个框架来容纳两个复选框
+        checkboxes_frame = ttk.Frame(options_frame)
+        checkboxes_frame.pack(side=tk.LEFT)
+        
+        self.is_incremental_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(checkboxes_frame, text="增量训练（保留现有模型）", variable=self.is_incremental_var).pack(anchor=tk.W, padx=10, pady=2)
+        
+        # 训练控制
+        control_frame = ttk.Frame(train_buttons_frame)
+        control_frame.pack(side=tk.RIGHT)
+        
+        ttk.Button(control_frame, text="开始训练", command=self.start_training, style="Accent.TButton").pack(side=tk.RIGHT, padx=10)
+        
+        # 训练状态区域
+        self.train_status_var = tk.StringVar(value="准备就绪")
+        self.train_status_label = ttk.Label(parent, textvariable=self.train_status_var, relief=tk.SUNKEN, anchor=tk.W)
+        self.train_status_label.pack(fill=tk.X, pady=(5, 0))
+        
+        # 初始化训练控制变量
+        self.is_training = False
+        self.training_thread = None
+        self.performance_monitor_thread = None
+        
+        # 配置训练按钮样式
+        style = ttk.Style()
+        style.configure("Accent.TButton", font=('TkDefaultFont', 10, 'bold'))
+        style.configure("Danger.TButton", font=('TkDefaultFont', 10, 'bold'), foreground='red')
+    
+    def select_file_for_detection(self):
+        """选择要检测的文件"""
+        file_path = filedialog.askopenfilename(title="选择要检测的文件")
+        if file_path:
+            self.detect_file_var.set(file_path)
+    
+    def start_detection(self):
+        """开始检测文件"""
+        file_path = self.detect_file_var.get()
+        if not file_path or not os.path.exists(file_path):
+            messagebox.showerror("错误", "请选择有效的文件")
+            return
+        
+        # 更新状态
+        self.detection_result_var.set("检测中...")
+        self.score_info_var.set("")
+        self.features_text.delete(1.0, tk.END)
+        self.root.update()
+        
+        # 在单独的线程中检测，避免UI冻结
+        def detect_thread():
+            try:
+                # 执行检测
+                result = self.detector.predict(file_path)
+                
+                # 更新UI
+                if result.get("error"):
+                    self.root.after(0, lambda: self.detection_result_var.set(f"检测错误: {result['error']}"))
+                else:
+                    # 设置检测结果
+                    status = "恶意文件" if result["is_malicious"] else "正常文件"
+                    color = "red" if result["is_malicious"] else "green"
+                    
+                    self.root.after(0, lambda: (
+                        self.detection_result_var.set(status),
+                        self.detection_result_label.config(foreground=color)
+                    ))
+                    
+                    # 设置分数信息
+                    # 准备信息文本
+                    score_info_text = f"恶意分数: {result['score']:.4f} (阈值: {result['threshold']:.2f}) | 匹配特征: {len(result['matched_features'])}/{result['total_features']}"
+                    # 使用参数传递避免作用域问题
+                    self.root.after(0, lambda info=score_info_text: self.score_info_var.set(info))
+                    
+                    # 设置特征列表
+                    if result["matched_features"]:
+                        # 检查matched_features的结构
+                        if isinstance(result["matched_features"], list) and result["matched_features"] and len(result["matched_features"][0]) == 3:
+                            # 格式：[(feature, formatted_weight, formatted_score), ...]
+                            features_text = "\n".join([
+                                f"{feature}: {formatted_score}" 
+                                for feature, formatted_weight, formatted_score in result["matched_features"]
+                            ])
+                        elif isinstance(result["matched_features"], dict):
+                            # 处理字典类型（向后兼容）
+                            features_items = sorted(result["matched_features"].items(), key=lambda x: x[1], reverse=True)
+                            features_text = "\n".join([
+                                f"{feature}: {score:.4f}" 
+                                for feature, score in features_items
+                            ])
+                        else:
+                            # 尝试作为简单列表处理
+                            features_text = "\n".join([str(item) for item in result["matched_features"]])
+                    else:
+                        features_text = "未匹配任何特征"
+                    
+                    # 使用局部变量传递文本内容
+                    features_content = features_text
+                    self.root.after(0, lambda text=features_content: self.features_text.insert(tk.END, text))
+                    
+            except Exception as e:
+                error_msg = str(e)
+                self.root.after(0, lambda msg=error_msg: self.detection_result_var.set(f"检测失败: {msg}"))
+        
+        # 启动检测线程
+        thread = threading.Thread(target=detect_thread)
+        thread.daemon = True
+        thread.start()
+    
+    def select_directory(self, var):
+        """选择目录"""
+        directory = filedialog.askdirectory(title="选择目录")
+        if directory:
+            var.set(directory)
+    
+    def start_evaluation(self):
+        """开始评估模型"""
+        benign_dir = self.eval_benign_var.get()
+        malicious_dir = self.eval_malicious_var.get()
+        
+        if not benign_dir or not os.path.isdir(benign_dir):
+            messagebox.showerror("错误", "请选择有效的白样本测试目录")
+            return
+        
+        if not malicious_dir or not os.path.isdir(malicious_dir):
+            messagebox.showerror("错误", "请选择有效的黑样本测试目录")
+            return
+        
+        # 更新状态为收集文件中
+        self.eval_status_var.set("正在收集测试文件...")
+        self.root.update()
+        
+        # 收集测试文件的线程函数
+        def collect_files_thread():
+            try:
+                benign_test_files = []
+                malicious_test_files = []
+                total_files = 0
+                
+                # 并行扫描两个测试目录，每批更新一次状态
+                crawler = DirectoryCrawler(batch_size=1000)
+                for test_files, directory in ((benign_test_files, benign_dir), (malicious_test_files, malicious_dir)):
+                    for file_batch in crawler.iter_batches(directory):
+                        test_files.extend(file_path for file_path, _, _ in file_batch)
+                        total_files += len(file_batch)
+                        self.root.after(0, lambda t=total_files:
+                            self.eval_status_var.set(f"正在收集测试文件... {t} 文件已收集"))
+                
+                # 检查文件数量
+                if not benign_test_files:
+                    self.root.after(0, lambda: (
+                        self.eval_status_var.set("评估失败"),
+                        messagebox.showerror("错误", "白样本测试目录中没有找到文件")
+                    ))
+                    return
+                
+                if not malicious_test_files:
+                    self.root.after(0, lambda: (
+                        self.eval_status_var.set("评估失败"),
+                        messagebox.showerror("错误", "黑样本测试目录中没有找到文件")
+                    ))
+                    return
+                
+                # 更新状态并开始评估
+                self.root.after(0, lambda: self.eval_status_var.set("评估中..."))
+                
+                # 执行评估：并行检测，每隔几秒刷新一次中间指标
+                def show_progress(partial):
+                    self.root.after(0, lambda r=partial: (
+                        self.accuracy_var.set(f"准确率: {r['accuracy']:.4f}"),
+                        self.precision_var.set(f"精确率: {r['precision']:.4f}"),
+                        self.recall_var.set(f"召回率: {r['recall']:.4f}"),
+                        self.f1_var.set(f"F1分数: {r['f1_score']:.4f}"),
+                        self.fn_var.set(f"漏报率: {r['false_negative_rate']:.4f}"),
+                        self.fp_var.set(f"误报率: {r['false_positive_rate']:.4f}"),
+                        self.eval_status_var.set(
+                            f"评估中... {r['processed']}/{r['total']} 文件（{r['files_per_second']:.0f} 文件/秒）")
+                    ))
+                
+                try:
+                    results = self.detector.evaluate(benign_test_files, malicious_test_files,
+                                                     callback=show_progress)
+                    
+                    # 更新UI指标
+                    self.root.after(0, lambda: (
+                        self.accuracy_var.set(f"准确率: {results['accuracy']:.4f}"),
+                        self.precision_var.set(f"精确率: {results['precision']:.4f}"),
+                        self.recall_var.set(f"召回率: {results['recall']:.4f}"),
+                        self.f1_var.set(f"F1分数: {results['f1_score']:.4f}"),
+                        self.fn_var.set(f"漏报率: {results['false_negative_rate']:.4f}"),
+                        self.fp_var.set(f"误报率: {results['false_positive_rate']:.4f}")
+                    ))
+                    
+                    # 更新混淆矩阵
+                    self.root.after(0, lambda: self.update_confusion_matrix(results))
+                    
+                    # 更新状态（附带阈值分析：ROC AUC 和满足目标误报率的阈值）
+                    analysis = results["threshold_analysis"]
+                    target_threshold = analysis["threshold_for_target_fpr"]
+                    threshold_text = (f"误报率≤{analysis['target_false_positive_rate']:.2%} 的阈值: {target_threshold:.4f}"
+                                      if target_threshold is not None else "没有满足目标误报率的阈值")
+                    self.root.after(0, lambda: self.eval_status_var.set(
+                        f"评估完成 - 正常文件: {results['total_benign_tested']}, 恶意文件: {results['total_malicious_tested']}, "
+                        f"ROC AUC: {analysis['roc_auc']:.4f}, {threshold_text}"
+                    ))
+                    
+                except Exception as e:
+                    self.root.after(0, lambda: self.eval_status_var.set(f"评估失败: {str(e)}"))
+                
+            except Exception as e:
+                self.root.after(0, lambda: (
+                    self.eval_status_var.set(f"文件收集失败: {str(e)}"),
+                    messagebox.showerror("错误", f"收集测试文件时发生错误: {str(e)}")
+                ))
+        
+        # 启动文件收集线程
+        thread = threading.Thread(target=collect_files_thread)
+        thread.daemon = True
+        thread.start()
+    
+    def update_confusion_matrix(self, results):
+        """更新混淆矩阵可视化，增强显示效果"""
+        self.ax.clear()
+        
+        # 创建混淆矩阵数据
+        matrix = [
+            [results['true_negatives'], results['false_positives']],  # 预测为正常
+            [results['false_negatives'], results['true_positives']]   # 预测为恶意
+        ]
+        
+        # 计算每个类别的总数
+        total_normal = results['true_negatives'] + results['false_positives']
+        total_malicious = results['false_negatives'] + results['true_positives']
+        
+        # 创建百分比混淆矩阵用于热图显示
+        percent_matrix = [[0, 0], [0, 0]]
+        if total_normal > 0:
+            percent_matrix[0][0] = results['true_negatives'] / total_normal
+            percent_matrix[0][1] = results['false_positives'] / total_normal
+        if total_malicious > 0:
+            percent_matrix[1][0] = results['false_negatives'] / total_malicious
+            percent_matrix[1][1] = results['true_positives'] / total_malicious
+        
+        # 绘制混淆矩阵
+        cax = self.ax.matshow(percent_matrix, cmap='RdBu_r', vmin=0, vmax=1)
+        
+        # 设置标题
+        self.ax.set_title('高级混淆矩阵分析', pad=15, fontsize=12, fontweight='bold')
+        
+        # 设置轴标签
+        self.ax.set_xlabel('预测标签', fontsize=10, labelpad=5)
+        self.ax.set_ylabel('实际标签', fontsize=10, labelpad=5)
+        
+        # 设置轴刻度标签
+        self.ax.set_xticks([0, 1])
+        self.ax.set_yticks([0, 1])
+        self.ax.set_xticklabels(['正常', '恶意'], fontsize=9)
+        self.ax.set_yticklabels(['正常', '恶意'], fontsize=9)
+        
+        # 在单元格中显示数量和百分比
+        for i in range(2):
+            for j in range(2):
+                value = matrix[i][j]
+                percent = percent_matrix[i][j] * 100
+                # 根据背景颜色选择文本颜色
+                text_color = 'white' if percent > 50 else 'black'
+                self.ax.text(j, i, f'{value}\n({percent:.1f}%)', 
+                           ha='center', va='center', 
+                           color=text_color, fontsize=11, fontweight='bold')
+        
+        # 添加颜色条并设置标签
+        cbar = self.fig.colorbar(cax, ax=self.ax)
+        cbar.set_label('百分比', fontsize=9)
+        
+        # 添加关键统计信息
+        stats_text = (
+            f"准确率: {results['accuracy']:.4f}\n" +
+            f"精确率: {results['precision']:.4f}\n" +
+            f"召回率: {results['recall']:.4f}\n" +
+            f"F1分数: {results['f1_score']:.4f}"
+        )
+        
+        # 在图表旁边显示统计信息
+        self.ax.text(1.2, 0.5, stats_text, 
+                   transform=self.ax.transAxes, 
+                   bbox=dict(boxstyle="round,pad=0.5", facecolor="white", alpha=0.8),
+                   verticalalignment='center', fontsize=9, fontweight='bold')
+        
+        # 添加图例说明
+        legend_text = """
+        对角线: 正确分类\n
+tn: 正确识别的正常文件\nfp: 误报(正常文件被误判为恶意)\nf
+n: 漏报(恶意文件被误判为正常)\ntp: 正确识别的恶意文件
+        """
+        self.ax.text(1.2, 0.1, legend_text, 
+                   transform=self.ax.transAxes, 
+                   bbox=dict(boxstyle="round,pad=0.5", facecolor="wheat", alpha=0.7),
+                   verticalalignment='top', fontsize=8)
+        
+        # 调整布局
+        self.fig.tight_layout()
+        self.canvas.draw()
+    
+    def update_model_info_display(self):
+        """更新模型信息显示，包括图表和详细指标"""
+        # 获取模型信息
+        info = self.detector.get_model_info()
+        
+        # 更新基本信息
+        info_text = (
+            f"模型版本: {info['model_version']}\n"
+            f"最后训练时间: {info['last_trained']}\n"
+            f"训练白样本数: {info['total_benign_files']}\n"
+            f"训练黑样本数: {info['total_malicious_files']}\n"
+            f"特征总数: {info['total_features']}\n"
+            f"检测阈值: {info['threshold']}\n"
+        )
+        self.model_info_var.set(info_text)
+        
+        # 更新重要特征列表
+        top_features = self.detector.get_top_features()
+        features_text = "\n".join([
+            f"{i+1}. {feature}: {weight:.4f}" 
+            for i, (feature, weight) in enumerate(top_features)
+        ])
+        self.top_features_text.delete(1.0, tk.END)
+        self.top_features_text.insert(tk.END, features_text)
+        
+        # 更新混淆矩阵和性能图表
+        self.update_info_confusion_matrix()
+        self.update_detection_rate_chart()
+        self.update_speed_chart()
+        self.update_profile_chart()
+    
+    def toggle_profiling(self):
+        """启用或关闭分阶段性能分析"""
+        self.detector.enable_profiling(self.profiling_var.get())
+        self.update_profile_chart()
+    
+    def update_profile_chart(self):
+        """更新阶段耗时图表
+        
+        启用了阶段耗时记录时显示本次启动以来的检测和训练统计，否则显示最近一次基准测试
+        中各文件大小区间合计的统计。
+        """
+        self.ax_profile.clear()
+        
+        profile = self.detector.get_profile()
+        source = "检测与训练（实时）"
+        if profile is None or not profile["stages"]:
+            results = benchmark.load_results(self._benchmark_results_path())
+            profiles = [bucket["profile"] for bucket in (results or {}).get("buckets", {}).values()
+                        if "profile" in bucket]
+            profile = benchmark.combine_profiles(profiles) if profiles else None
+            source = f"基准测试（{results['timestamp']}）" if profile else None
+        
+        if profile is None or not profile["stages"]:
+            self.ax_profile.text(0.5, 0.5, "暂无阶段耗时数据\n勾选“记录阶段耗时”后检测文件，或执行性能测试",
+                                 ha='center', va='center', transform=self.ax_profile.transAxes)
+            self.ax_profile.set_axis_off()
+            self.fig_profile.tight_layout()
+            self.canvas_profile.draw()
+            return
+        
+        # 水平条形图：每个阶段的平均每文件耗时，按耗时从高到低排列
+        stages = list(profile["stages"].items())[:12][::-1]
+        files = max(1, profile["counters"].get("files", 0))
+        names = [stage for stage, _ in stages]
+        per_file_ms = [data["seconds"] / files * 1000 for _, data in stages]
+        bars = self.ax_profile.barh(names, per_file_ms, color='#4a6fa5')
+        for bar, (_, data) in zip(bars, stages):
+            self.ax_profile.text(bar.get_width(), bar.get_y() + bar.get_height() / 2, f" {data['share']:.0%}",
+                                 va='center', fontsize=8)
+        
+        self.ax_profile.set_title(f'各阶段耗时 - {source}')
+        self.ax_profile.set_xlabel('平均每文件耗时 (毫秒)')
+        self.ax_profile.set_xlim(0, max(per_file_ms) * 1.2)
+        self.ax_profile.tick_params(axis='y', labelsize=8)
+        self.ax_profile.grid(True, axis='x', linestyle='--', alpha=0.7)
+        
+        counters = profile["counters"]
+        info_text = (f"文件数: {counters.get('files', 0)}\n"
+                     f"读取: {counters.get('bytes_read', 0) / (1024 * 1024):.1f} MB\n"
+                     f"缓存命中: {counters.get('cache_hits', 0)}")
+        self.ax_profile.text(0.98, 0.05, info_text, transform=self.ax_profile.transAxes, ha='right',
+                             bbox=dict(boxstyle="round,pad=0.5", facecolor="wheat", alpha=0.5),
+                             verticalalignment='bottom', fontsize=8)
+        
+        self.fig_profile.tight_layout()
+        self.canvas_profile.draw()
+    
+    def update_info_confusion_matrix(self):
+        """更新模型信息页中的混淆矩阵"""
+        self.ax_matrix.clear()
+        
+        # 检查是否有足够的训练数据来模拟混淆矩阵
+        if self.detector.total_benign_files > 0 or self.detector.total_malicious_files > 0:
+            # 基于训练数据模拟一个混淆矩阵
+            # 注意：这是基于训练数据的估计，不是真实测试结果
+            total_benign = max(1, self.detector.total_benign_files)
+            total_malicious = max(1, self.detector.total_malicious_files)
+            
+            # 模拟一个合理的混淆矩阵
+            # 假设正常文件的正确率为95%，恶意文件的检测率为90%
+            tn = int(total_benign * 0.95)
+            fp = total_benign - tn
+            tp = int(total_malicious * 0.90)
+            fn = total_malicious - tp
+            
+            matrix = [[tn, fp], [fn, tp]]
+            
+            # 更新性能指标
+            detection_rate = tp / max(1, total_malicious)
+            false_positive_rate = fp / max(1, total_benign)
+            false_negative_rate = fn / max(1, total_malicious)
+            
+            self.detection_rate_var.set(f"恶意文件检测率: {detection_rate:.4f}")
+            self.false_positive_var.set(f"误报率: {false_positive_rate:.4f}")
+            self.false_negative_var.set(f"漏报率: {false_negative_rate:.4f}")
+        else:
+            # 如果没有训练数据，显示空矩阵
+            matrix = [[0, 0], [0, 0]]
+            self.detection_rate_var.set(f"恶意文件检测率: -- (需要训练数据)")
+            self.false_positive_var.set(f"误报率: -- (需要训练数据)")
+            self.false_negative_var.set(f"漏报率: -- (需要训练数据)")
+        
+        # 绘制混淆矩阵
+        cax = self.ax_matrix.matshow(matrix, cmap='Blues')
+        
+        # 设置标签
+        self.ax_matrix.set_title('混淆矩阵可视化', pad=10, fontsize=11)
+        self.ax_matrix.set_xlabel('预测标签')
+        self.ax_matrix.set_ylabel('实际标签')
+        
+        # 设置轴刻度标签
+        self.ax_matrix.set_xticks([0, 1])
+        self.ax_matrix.set_yticks([0, 1])
+        self.ax_matrix.set_xticklabels(['正常', '恶意'])
+        self.ax_matrix.set_yticklabels(['正常', '恶意'])
+        
+        # 在单元格中显示数值
+        for i in range(2):
+            for j in range(2):
+                self.ax_matrix.text(j, i, str(matrix[i][j]), 
+                                  ha='center', va='center', 
+                                  color='black', fontsize=12)
+        
+        # 添加颜色条
+        self.fig_matrix.colorbar(cax, ax=self.ax_matrix)
+        
+        # 添加额外的统计信息
+        stats_text = "注意: 此混淆矩阵基于训练数据估计\n请使用'模型评估'标签页获取真实测试结果"
+        self.ax_matrix.text(0.5, 1.15, stats_text, ha='center', transform=self.ax_matrix.transAxes, fontsize=9, color='gray')
+        
+        # 刷新图表
+        self.fig_matrix.tight_layout()
+        self.canvas_matrix.draw()
+    
+    def update_detection_rate_chart(self):
+        """更新检测率分析图表"""
+        self.ax_detection.clear()
+        
+        # 模拟不同类型文件的检测率数据
+        # 基于特征重要性分析
+        categories = ['关键词特征', '导入表特征', '结构特征', '字节序列特征']
+        
+        # 根据训练数据量调整模拟的准确率
+        if self.detector.total_benign_files + self.detector.total_malicious_files > 0:
+            # 随着训练数据增加，检测率提高
+            base_accuracy = min(0.9, 0.6 + (self.detector.total_benign_files + self.detector.total_malicious_files) * 0.005)
+            
+            # 模拟不同特征类型的检测效果
+            accuracies = [
+                base_accuracy * 0.95,  # 关键词特征
+                base_accuracy * 0.90,  # 导入表特征
+                base_accuracy * 0.98,  # 结构特征
+                base_accuracy * 0.85   # 字节序列特征
+            ]
+        else:
+            # 无训练数据时的默认值
+            accuracies = [0.6, 0.55, 0.65, 0.5]
+        
+        # 绘制条形图
+        colors = ['#FF9999', '#66B2FF', '#99FF99', '#FFCC99']
+        bars = self.ax_detection.bar(categories, accuracies, color=colors)
+        
+        # 在条形图上添加数值标签
+        for bar in bars:
+            height = bar.get_height()
+            self.ax_detection.text(bar.get_x() + bar.get_width()/2., height + 0.01,
+                                 f'{height:.3f}', ha='center', va='bottom')
+        
+        # 设置图表标题和标签
+        self.ax_detection.set_title('不同特征类型的检测率分析')
+        self.ax_detection.set_ylabel('估计检测准确率')
+        self.ax_detection.set_ylim(0, 1.1)
+        
+        # 添加网格线
+        self.ax_detection.grid(axis='y', linestyle='--', alpha=0.7)
+        
+        # 旋转x轴标签以避免重叠
+        plt.xticks(rotation=15, ha='right')
+        
+        # 刷新图表
+        self.fig_detection.tight_layout()
+        self.canvas_detection.draw()
+    
+    def update_speed_chart(self):
+        """更新速度评估图表：显示最近一次基准测试中各文件大小区间的实测检测延迟"""
+        self.ax_speed.clear()
+        
+        results = benchmark.load_results(self._benchmark_results_path())
+        buckets = [bucket for bucket in (results or {}).get("buckets", {}).values() if "predict" in bucket]
+        if not buckets:
+            self.ax_speed.text(0.5, 0.5, "尚未运行基准测试\n点击“执行性能测试”测量实际处理速度",
+                               ha='center', va='center', transform=self.ax_speed.transAxes)
+            self.ax_speed.set_axis_off()
+            self.fig_speed.tight_layout()
+            self.canvas_speed.draw()
+            return
+        
+        labels = [bucket["label"] for bucket in buckets]
+        p50 = [bucket["predict"]["p50_ms"] for bucket in buckets]
+        p95 = [bucket["predict"]["p95_ms"] for bucket in buckets]
+        
+        # 绘制折线图：中位数和 p95 延迟
+        self.ax_speed.plot(labels, p50, marker='o', linestyle='-', color='#FF6666', linewidth=2, markersize=6,
+                           label='p50')
+        self.ax_speed.plot(labels, p95, marker='s', linestyle='--', color='#6666FF', linewidth=1.5, markersize=5,
+                           label='p95')
+        
+        # 在每个点上标注延迟和对应的文件/秒
+        for i, bucket in enumerate(buckets):
+            self.ax_speed.text(i, p95[i] * 1.05, f'{p50[i]:.2f}ms\n{bucket["predict"]["files_per_second"]:.0f} 文件/秒',
+                               ha='center', va='bottom', fontsize=8)
+        
+        # 设置图表标题和标签
+        self.ax_speed.set_title('文件处理速度评估（实测）')
+        self.ax_speed.set_ylabel('单文件检测延迟 (毫秒)')
+        self.ax_speed.set_ylim(0, max(p95) * 1.4)
+        self.ax_speed.legend(loc='upper right', fontsize=8)
+        
+        # 添加网格线
+        self.ax_speed.grid(True, linestyle='--', alpha=0.7)
+        
+        # 添加额外信息：测试时间、特征数和批量检测吞吐量
+        batch_rates = [bucket["predict_batch_thread"]["files_per_second"]
+                       for bucket in buckets if "predict_batch_thread" in bucket]
+        info_text = f"测试时间: {results['timestamp']}\n特征数量: {results['feature_count']}"
+        if batch_rates:
+            info_text += f"\n批量检测: {min(batch_rates):.0f}~{max(batch_rates):.0f} 文件/秒"
+        self.ax_speed.text(0.02, 0.95, info_text, transform=self.ax_speed.transAxes, 
+                         bbox=dict(boxstyle="round,pad=0.5", facecolor="wheat", alpha=0.5),
+                         verticalalignment='top', fontsize=9)
+        
+        # 刷新图表
+        self.fig_speed.tight_layout()
+        self.canvas_speed.draw()
+    
+    def _benchmark_results_path(self):
+        """基准测试结果文件（与模型保存在同一目录）"""
+        return os.path.join(self.detector.storage_dir, os.path.basename(benchmark.DEFAULT_RESULTS_PATH))
+    
+    def perform_performance_test(self):
+        """执行性能测试：在合成样本上运行基准测试，或测量所选文件的实际检测速度"""
+        # 提示用户选择测试文件或使用合成样本
+        response = messagebox.askyesno("性能测试", "是否在合成样本上运行基准测试？\n"
+                                       "选择'否'将允许您手动选择测试文件。")
+        
+        test_files = ()
+        if not response:
+            # 用户手动选择文件
+            test_files = filedialog.askopenfilenames(title="选择测试文件")
+            if not test_files:
+                return
+        
+        # 禁用按钮并显示状态
+        self.update_status("执行性能测试中...")
+        
+        def run_benchmark():
+            # 当前模型先保存，基准测试使用的是模型文件的副本
+            self.detector.save_model()
+            results = benchmark.run_benchmark(
+                files_per_bucket=PERFORMANCE_CONFIG['benchmark']['ui_files_per_bucket'], repeat=2,
+                model_dir=self.detector.storage_dir, profile=True,
+                callback=lambda message: self.root.after(0, lambda m=message: self.update_status(f"性能测试：{m}"))
+            )
+            benchmark.save_results(results, self._benchmark_results_path())
+            lines = [f"{bucket['label'].replace(chr(10), '')}: p50 {bucket['predict']['p50_ms']:.2f}ms，"
+                     f"p99 {bucket['predict']['p99_ms']:.2f}ms，"
+                     f"批量 {bucket['predict_batch_thread']['files_per_second']:.0f} 文件/秒"
+                     for bucket in results["buckets"].values()]
+            return "基准测试完成！\n\n" + "\n".join(lines)
+        
+        def run_selected_files():
+            # 预热模型后执行多次测试取中位数
+            self.detector.predict(test_files[0])
+            latencies = []
+            run_seconds = []
+            for run in range(3):
+                start_time = time.perf_counter()
+                for file_path in test_files:
+                    file_start = time.perf_counter()
+                    self.detector.predict(file_path)
+                    latencies.append(time.perf_counter() - file_start)
+                run_seconds.append(time.perf_counter() - start_time)
+            stats = benchmark.latency_stats(latencies)
+            throughput = benchmark.throughput_stats(run_seconds, len(test_files))
+            return (
+                f"性能测试完成！\n\n" +
+                f"测试文件数量: {len(test_files)}\n" +
+                f"单文件延迟: p50 {stats['p50_ms']:.2f}ms，p95 {stats['p95_ms']:.2f}ms，p99 {stats['p99_ms']:.2f}ms\n" +
+                f"处理速度: {throughput['files_per_second']:.2f} 文件/秒\n\n" +
+                f"注意: 实际性能可能因文件大小、复杂度和系统资源而异。"
+            )
+        
+        # 在单独的线程中执行测试
+        def test_thread():
+            try:
+                result_text = run_selected_files() if test_files else run_benchmark()
+                
+                # 更新速度和阶段耗时图表
+                self.root.after(0, self.update_speed_chart)
+                self.root.after(0, self.update_profile_chart)
+                
+                # 显示结果
+                messagebox.showinfo("性能测试结果", result_text)
+                
+            except Exception as e:
+                messagebox.showerror("测试失败", f"性能测试过程中发生错误: {str(e)}")
+            finally:
+                self.update_status("就绪")
+        
+        # 启动测试线程
+        thread = threading.Thread(target=test_thread)
+        thread.daemon = True
+        thread.start()
+    
+    def update_status(self, message):
+        """更新状态显示"""
+        # 在所有标签页中查找状态标签并更新
+        for child in self.root.winfo_children():
+            for sub_child in child.winfo_children():
+                if isinstance(sub_child, ttk.Label) and hasattr(sub_child, 'configure'):
+                    if sub_child.cget('relief') == tk.SUNKEN:
+                        sub_child.config(text=message)
+                        return
+    
+    def reset_model(self):
+        """重置模型"""
+        if messagebox.askyesno("确认", "确定要重置模型吗？这将删除所有训练数据！"):
+            # 重置检测器（清除内存中的模型并删除模型文件）
+            self.detector.reset_model()
+            
+            # 更新UI
+            self.update_model_info_display()
+            messagebox.showinfo("重置完成", "模型已重置")
+
+
+# 创建示例文件用于测试（仅在没有训练数据时使用）
+def create_sample_files():
+    sample_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), "sample_files")
+    benign_dir = os.path.join(sample_dir, "benign")
+    malicious_dir = os.path.join(sample_dir, "malicious")
+    
+    # 创建目录
+    for dir_path in [benign_dir, malicious_dir]:
+        if not os.path.exists(dir_path):
+            os.makedirs(dir_path)
+    
+    # 创建示例白样本文件
+    benign_examples = [
+        ("simple_script.py", "print('Hello, World!')\n# 这是一个简单的Python脚本\nfor i in range(5):\n    print(i)")
+    ]
+    
+    for filename, content in benign_examples:
+        file_path = os.path.join(benign_dir, filename)
+        if not os.path.exists(file_path):
+            with open(file_path, 'w', encoding='utf-8') as f:
+                f.write(content)
+    
+    # 创建示例黑样本文件
+    malicious_examples = [
+        ("suspicious_script.py", "import os\nimport subprocess\n\ndef execute_command(cmd):\n    return subprocess.check_output(cmd, shell=True)\n\n# 这是一个模拟的恶意脚本示例\nif __name__ == '__main__':\n    # 模拟反向连接\n    print('模拟建立网络连接...')\n    # 模拟系统命令执行\n    execute_command('dir')")
+    ]
+    
+    for filename, content in malicious_examples:
+        file_path = os.path.join(malicious_dir, filename)
+        if not os.path.exists(file_path):
+            with open(file_path, 'w', encoding='utf-8') as f:
+                f.write(content)
+    
+    return benign_dir, malicious_dir
+
+
+def main():
+    """启动图形界面"""
+    # 创建示例文件
+    create_sample_files()
+    
+    # 创建并运行UI
+    root = tk.Tk()
+    app = MalwareDetectorUI(root)
+    
+    # 运行主循环
+    root.mainloop()
+
+
+# 主函数
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+"""分阶段性能分析：特征提取和评分各阶段的耗时与计数
+
+MalwareDetector.enable_profiling() 创建一个 StageProfiler，之后 extract_features、predict、
+批量检测和训练（map-reduce 训练除外）中的特征提取把每个阶段的耗时累计到其中。
+未启用时这些代码路径只多一次 ``profiler is not None`` 判断，没有可测量的开销。
+
+阶段名称：
+    stat                    获取文件大小和修改时间
+    cache_lookup            按路径或内容键查询特征缓存（含计算内容哈希）
+    read                    读取特征窗口（计数器 bytes_read 为读取的字节数）
+    features.<family>       各类特征的提取（见 FeatureExtractor.FEATURE_FAMILIES）
+    cache_store             写入特征缓存
+    score.encode            特征名编码为特征ID
+    score.compute           向量化计算分数
+    score.format            整理匹配特征和结果字典
+
+多进程提取时，每个工作进程按块（一个任务）在本地累计，随结果返回一个字典，由主进程合并；
+线程池中的提取直接累计到共享的分析器（加锁）。
+"""
+
+import threading
+from time import perf_counter
+from collections import defaultdict, Counter
+
+
+class StageProfiler:
+    """线程安全的分阶段计时器和计数器"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._seconds = defaultdict(float)
+        self._calls = Counter()
+        self._counters = Counter()
+        self._started = perf_counter()
+
+    @staticmethod
+    def now():
+        """计时起点，与 lap 配合使用"""
+        return perf_counter()
+
+    def add(self, stage, seconds, calls=1):
+        """累计一个阶段的耗时"""
+        with self._lock:
+            self._seconds[stage] += seconds
+            self._calls[stage] += calls
+
+    def lap(self, stage, start):
+        """把从 start 到现在的耗时计入 stage，返回当前时间作为下一阶段的起点"""
+        end = perf_counter()
+        self.add(stage, end - start)
+        return end
+
+    def count(self, name, value=1):
+        """累加计数器（文件数、读取字节数、缓存命中数等）"""
+        with self._lock:
+            self._counters[name] += value
+
+    def merge(self, data):
+        """合并另一个分析器的 to_dict(raw=True) 结果（工作进程返回的分块统计）"""
+        if not data:
+            return
+        with self._lock:
+            for stage, (seconds, calls) in data["stages"].items():
+                self._seconds[stage] += seconds
+                self._calls[stage] += calls
+            self._counters.update(data["counters"])
+
+    def reset(self):
+        """清空所有统计"""
+        with self._lock:
+            self._seconds.clear()
+            self._calls.clear()
+            self._counters.clear()
+            self._started = perf_counter()
+
+    def to_dict(self, raw=False):
+        """导出统计结果
+
+        Args:
+            raw: True 时只导出原始累计值 {stages: {阶段: (秒, 次数)}, counters}，用于进程间传递
+
+        Returns:
+            {
+                "wall_seconds": 启用（或上次重置）以来的时间,
+                "stage_seconds": 各阶段耗时之和（多线程/多进程时可能大于 wall_seconds）,
+                "stages": {阶段: {seconds, calls, mean_ms, share, per_file_ms}}，按耗时降序,
+                "counters": {计数器: 值}
+            }
+        """
+        with self._lock:
+            seconds = dict(self._seconds)
+            calls = dict(self._calls)
+            counters = dict(self._counters)
+            wall_seconds = perf_counter() - self._started
+
+        if raw:
+            return {"stages": {stage: (seconds[stage], calls[stage]) for stage in seconds}, "counters": counters}
+
+        total = sum(seconds.values())
+        files = counters.get("files", 0)
+        stages = {}
+        for stage in sorted(seconds, key=seconds.get, reverse=True):
+            stages[stage] = {
+                "seconds": seconds[stage],
+                "calls": calls[stage],
+                "mean_ms": seconds[stage] / calls[stage] * 1000 if calls[stage] else 0.0,
+                "share": seconds[stage] / total if total > 0 else 0.0,
+                "per_file_ms": seconds[stage] / files * 1000 if files else None
+            }
+        return {
+            "wall_seconds": wall_seconds,
+            "stage_seconds": total,
+            "stages": stages,
+            "counters": counters
+        }
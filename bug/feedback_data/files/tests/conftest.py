@@ -0,0 +1,44 @@
+"""测试配置：模块按文件名直接导入（与在本目录下运行程序时相同）"""
+
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@pytest.fixture
+def detector(tmp_path):
+    """使用临时目录、不启用特征缓存的检测器，不读写程序目录下的 model_data"""
+    from malware_detector import MalwareDetector
+
+    instance = MalwareDetector(storage_dir=str(tmp_path / "model_data"), feature_cache=False)
+    yield instance
+    instance.shutdown_workers()
+
+
+@pytest.fixture
+def archive_samples(tmp_path):
+    """一个普通文件、一个 ZIP（2 个成员）和一个内含 ZIP 的 tar.gz（2 个成员 + 嵌套 ZIP 的 3 个成员），
+    共 8 个样本；返回 (路径列表, 样本数)"""
+    import io
+    import tarfile
+    import zipfile
+
+    nested = io.BytesIO()
+    with zipfile.ZipFile(nested, "w") as archive:
+        for i in range(3):
+            archive.writestr(f"inner_{i}.exe", b"import socket\n" * (i + 1))
+    with tarfile.open(tmp_path / "samples.tar.gz", "w:gz") as archive:
+        for name, data in (("a.exe", b"exec(payload)\n"), ("b.dll", b"hello"), ("nested.zip", nested.getvalue())):
+            info = tarfile.TarInfo(name)
+            info.size = len(data)
+            archive.addfile(info, io.BytesIO(data))
+    with zipfile.ZipFile(tmp_path / "top.zip", "w") as archive:
+        archive.writestr("m1.exe", b"print(1)\n")
+        archive.writestr("m2.exe", b"print(2)\n")
+    (tmp_path / "plain.bin").write_bytes(b"print('hello')\n")
+
+    paths = [str(tmp_path / name) for name in ("samples.tar.gz", "plain.bin", "top.zip")]
+    return paths, 8
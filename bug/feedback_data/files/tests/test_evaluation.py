@@ -0,0 +1,14 @@
+"""评估指标"""
+
+import numpy as np
+import pytest
+
+from evaluation import ScoreSet
+
+
+def test_roc_auc_without_numpy_trapezoid(monkeypatch):
+    # NumPy 1.x 没有 np.trapezoid
+    monkeypatch.delattr(np, "trapezoid", raising=False)
+    sweep = {"recall": np.array([0.0, 0.5, 0.5, 1.0]), "false_positive_rate": np.array([0.0, 0.0, 0.5, 0.5])}
+    assert ScoreSet.roc_auc(sweep) == pytest.approx(0.75)
+    assert ScoreSet.roc_auc({"recall": np.array([0.0]), "false_positive_rate": np.array([0.0])}) == pytest.approx(0.5)
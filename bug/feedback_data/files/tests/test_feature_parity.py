@@ -0,0 +1,155 @@
+"""特征提取与重构前实现的一致性测试
+
+reference_extract 冻结了最初的 MalwareDetector.extract_features（逐个关键词 str.count、
+在解码文本上匹配导入和结构模式、按字典统计熵）。FeatureExtractor 之后的重构（关键词自动机、
+合并的导入/结构扫描、直接在字节上匹配）都必须得到相同的特征字典。
+"""
+
+import re
+import random
+import hashlib
+
+import numpy as np
+import pytest
+
+
+def reference_extract(file_content, file_size, keywords, suspicious_imports, config):
+    """最初版本 extract_features 的特征计算（读取窗口之后的部分），保持原样用作对照"""
+    features = {}
+    features[f"file_size_{file_size//1024}"] = 1.0
+
+    file_content_str = file_content.decode('utf-8', errors='replace')
+
+    file_hash = hashlib.md5(file_content[:1000]).hexdigest()
+    features[f"file_hash_{file_hash[:8]}"] = 0.5
+
+    for keyword in keywords:
+        if keyword in file_content_str:
+            count = file_content_str.count(keyword)
+            features[f"keyword_{keyword}"] = min(count * config["keyword_weight"], 5.0)
+
+    import_pattern = re.compile(r'\bimport\s+(\w+)\b|\bfrom\s+(\w+)\s+import')
+    imported_modules = set()
+    for imp in import_pattern.findall(file_content_str):
+        if imp[0]:
+            imported_modules.add(imp[0])
+        if imp[1]:
+            imported_modules.add(imp[1])
+    for module in imported_modules.intersection(suspicious_imports):
+        features[f"import_{module}"] = config["import_weight"]
+
+    structure_patterns = {
+        "structural_dynamic_code": r'(eval\(|exec\(|__import__\()',
+        "structural_subprocess": r'subprocess\.(call|run|check_output)',
+        "structural_network": r'socket\.(connect|bind|listen)'
+    }
+    for feature_name, pattern in structure_patterns.items():
+        if re.search(pattern, file_content_str):
+            features[feature_name] = config["structural_weight"]
+
+    sample_size = min(5000, len(file_content))
+    byte_counts = {}
+    for byte in file_content[:sample_size]:
+        byte_counts[byte] = byte_counts.get(byte, 0) + 1
+    if sample_size > 0:
+        entropy = 0.0
+        for count in byte_counts.values():
+            p = count / sample_size
+            entropy -= p * np.log2(p)
+        features[f"entropy_{int(entropy*10)}"] = entropy * config["byte_weight"] / 10
+
+    high_entropy_patterns = re.findall(r'[a-zA-Z0-9+/=]{32,}', file_content_str)
+    features[f"high_entropy_patterns_{min(len(high_entropy_patterns), 10)}"] = min(len(high_entropy_patterns), 10) * 0.5
+
+    hex_patterns = re.findall(r'0x[0-9a-fA-F]{8,}', file_content_str)
+    features[f"hex_patterns_{min(len(hex_patterns), 10)}"] = min(len(hex_patterns), 10) * 0.5
+    return features
+
+
+# 模糊测试的片段：导入语句、单词边界、Unicode 空白/字母、无效 UTF-8、相互重叠的关键词和结构模式
+FUZZ_PIECES = (
+    b"import", b"from", b" ", b"\t", b"\n", b"\x1c", b"\x1f", b"os", b"sys", b"socket", b"subprocess",
+    b"_x", b"x", b"1", b".", b"(", b"import os", b"from os import", b"import socket\n",
+    b"\xc3\xa9", b"\xc2\xa0", b"\xc2\x85", b"\xe3\x80\x80", b"\xe2\x80\xaf", b"\xe4\xb8\xad", b"\xd9\xa3",
+    b"\xf0\x9f\x98\x80", b"\xff", b"\xe2\x80", b"\xc3", b"\x80",
+    b"eval(", b"exec(", b"__import__(", b"subprocess.run", b"socket.connect", b"socket.",
+    b"https", b"http", b"hex", b"encode", b"decode", b"os.system", b"self.replicate", b"\\x",
+    b"cmd.exe", b"powershell", b"base64", b"0x", b"deadbeef", b"A" * 16, b"+/=",
+)
+
+
+def _fuzz_inputs(count, seed):
+    rng = random.Random(seed)
+    for _ in range(count):
+        yield b"".join(rng.choice(FUZZ_PIECES) for _ in range(rng.randint(1, 24)))
+
+
+@pytest.fixture
+def extractor(detector):
+    return detector._get_feature_extractor()
+
+
+def _assert_same(actual, expected):
+    assert actual.keys() == expected.keys()
+    for name, value in expected.items():
+        assert actual[name] == pytest.approx(value, rel=1e-12, abs=1e-12), name
+
+
+def _reference(detector, content, file_size=None):
+    return reference_extract(content, len(content) if file_size is None else file_size,
+                             detector.suspicious_keywords, detector.suspicious_imports, detector.config)
+
+
+@pytest.mark.parametrize("content", [
+    b"",
+    b"import os",
+    b"import os\nimport sys\nfrom socket import socket",
+    b"reimport os",                      # 单词中间的 import 不匹配
+    b"import os\xc3\xa9",                # 模块名后紧跟 Unicode 字母
+    b"\xc3\xa9import os",                # import 前紧跟 Unicode 字母
+    b"import\xc2\xa0os",                 # Unicode 空白
+    b"from\xe3\x80\x80os\xc2\x85import",
+    b"import os\x1fimport sys",          # \x1c-\x1f 在 Unicode 规则下是空白
+    b"\xffimport socket",                # 无效 UTF-8 字节
+    b"import import os",                 # 相互重叠的导入语句
+    b"from from os import",
+    b"https http httpss",                # 相互重叠的关键词
+    b"\\x41\\x42 hexhex encodeencode",
+    b"eval(exec(__import__(subprocess.check_output socket.listen",
+    b"0x" + b"a" * 40 + b" " + b"QUJD" * 20,
+])
+def test_extract_matches_reference(detector, extractor, content):
+    _assert_same(extractor.extract(content, len(content)), _reference(detector, content))
+
+
+def test_extract_matches_reference_fuzzed(detector, extractor):
+    for content in _fuzz_inputs(5000, seed=20240601):
+        _assert_same(extractor.extract(content, len(content)), _reference(detector, content))
+
+
+def test_scan_tokens_matches_decoded_text(extractor):
+    """导入的模块集合（包括非 ASCII 模块名）与在解码文本上匹配完全相同"""
+    import_pattern = re.compile(r'\bimport\s+(\w+)\b|\bfrom\s+(\w+)\s+import')
+    for content in _fuzz_inputs(5000, seed=7):
+        text = content.decode('utf-8', errors='replace')
+        # 原实现用 findall（匹配互不重叠），与扫描中的 import_end 规则对应
+        expected = {name for match in import_pattern.findall(text) for name in match if name}
+        assert extractor.scan_tokens(content)[0] == expected, content
+
+
+@pytest.mark.parametrize("file_size", [10, 1023, 1024, 50 * 1024, 100 * 1024, 100 * 1024 + 1, 300 * 1024])
+def test_extract_features_path_matches_reference(detector, tmp_path, file_size):
+    """按文件大小读取窗口（小文件全部读取，大文件只读前100KB和后10KB）后与原实现一致"""
+    rng = random.Random(file_size)
+    content = b"".join(rng.choice(FUZZ_PIECES) for _ in range(file_size))[:file_size]
+    content += b"x" * (file_size - len(content))
+    path = tmp_path / "sample.bin"
+    path.write_bytes(content)
+
+    if file_size < 1024:
+        window = content
+    else:
+        window = content[:100 * 1024]
+        if file_size > 100 * 1024:
+            window += content[-10 * 1024:]
+    _assert_same(detector.extract_features(str(path)), _reference(detector, window, file_size))
@@ -0,0 +1,53 @@
+"""无法读取的文件（FIFO、不可读文件）应判定为 error，而不是 benign"""
+
+import os
+import json
+
+import pytest
+
+import detector_cli
+import malware_detector
+
+
+@pytest.fixture
+def special_files(tmp_path, monkeypatch):
+    """返回 (FIFO 路径, 不可读文件路径, 正常文件路径)"""
+    fifo = tmp_path / "pipe.bin"
+    os.mkfifo(fifo)
+    unreadable = tmp_path / "unreadable.bin"
+    unreadable.write_bytes(b"import socket\n")
+    regular = tmp_path / "regular.bin"
+    regular.write_bytes(b"print('hello')\n")
+
+    # root 不受文件权限限制，用 os.access 模拟不可读
+    real_access = os.access
+    monkeypatch.setattr(os, "access", lambda path, mode, *args, **kwargs:
+                        False if os.fspath(path) == str(unreadable) else real_access(path, mode, *args, **kwargs))
+    return str(fifo), str(unreadable), str(regular)
+
+
+def test_extract_features_marks_unreadable_files(detector, special_files):
+    fifo, unreadable, regular = special_files
+    assert malware_detector.feature_error_message(detector.extract_features(fifo)) == "不是普通文件"
+    assert malware_detector.feature_error_message(detector.extract_features(unreadable)) == "文件不可读"
+    assert malware_detector.feature_error_message(detector.extract_features(regular)) is None
+
+    results = dict(detector.iter_predict([fifo, unreadable, regular], num_workers=1))
+    assert results[fifo]["error"] == "不是普通文件"
+    assert results[unreadable]["error"] == "文件不可读"
+    assert "error" not in results[regular]
+
+
+def test_scan_reports_error_verdict(special_files, tmp_path, monkeypatch, capsys):
+    monkeypatch.setattr(malware_detector, "DEFAULT_STORAGE_DIR", str(tmp_path / "model_data"))
+    monkeypatch.setattr(malware_detector, "setup_logging", lambda log_config=None: None)
+    monkeypatch.setitem(malware_detector.PERFORMANCE_CONFIG, "cache_enabled", True)
+    fifo, unreadable, regular = special_files
+
+    exit_code = detector_cli.main(["scan", "--no-cache", "-w", "1", fifo, unreadable, regular])
+
+    records = {record["path"]: record for record in map(json.loads, capsys.readouterr().out.splitlines())}
+    assert records[fifo]["verdict"] == "error"
+    assert records[unreadable]["verdict"] == "error"
+    assert records[regular]["verdict"] == "benign"
+    assert exit_code == detector_cli.EXIT_ERROR
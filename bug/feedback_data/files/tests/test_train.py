@@ -0,0 +1,14 @@
+"""训练统计"""
+
+
+def test_train_counts_archive_members(detector, archive_samples):
+    paths, sample_count = archive_samples
+    progress = []
+    stats = detector.train(paths, [], callback=lambda processed, total, status: progress.append((processed, total)))
+
+    assert stats["processed_files"] <= stats["total_files"]
+    assert stats["total_files"] == sample_count
+    assert stats["processed_files"] == sample_count
+    assert detector.total_benign_files == sample_count
+    assert all(processed <= total for processed, total in progress)
+    assert progress[-1] == (sample_count, sample_count)
@@ -0,0 +1,73 @@
+"""map-reduce 训练的错误统计"""
+
+import malware_detector
+from malware_detector import PartialModel
+
+
+def test_partial_model_counts_error_files(tmp_path):
+    partial = PartialModel(1)
+    partial.add_batch([{"keyword_eval": 0.9}, {}, {"error_processing": 1.0, "file_size_unknown": 1.0}], True)
+    other = PartialModel(1)
+    other.add_batch([{"error_processing": 1.0}], False)
+    other.fallback_chunks = 2
+    partial.merge(other)
+    assert partial.error_files == 3
+    assert partial.fallback_chunks == 2
+
+    path = str(tmp_path / "partial.pkl")
+    partial.save(path)
+    loaded = PartialModel.load(path)
+    assert (loaded.error_files, loaded.fallback_chunks) == (3, 2)
+
+
+def test_train_map_reduce_reports_fallback_chunks(detector, tmp_path, monkeypatch):
+    benign = []
+    for i in range(4):
+        path = tmp_path / f"benign_{i}.bin"
+        path.write_bytes(b"print('hello')\n" * (i + 1))
+        benign.append(str(path))
+    malicious = tmp_path / "malicious.bin"
+    malicious.write_bytes(b"import socket\nexec(payload)\n")
+
+    def failing_chunk(file_paths, is_malicious, archive_passwords=None):
+        raise RuntimeError("worker failed")
+
+    # 局部函数无法发送到工作进程，每个分片都在主进程中重新处理
+    monkeypatch.setattr(malware_detector, "_train_partial_chunk", failing_chunk)
+    stats = detector.train_map_reduce(benign, [str(malicious)], num_workers=1, chunk_size=2)
+
+    # 回退到主进程处理的文件照常计入模型
+    assert stats["total_files"] == 5
+    assert stats["fallback_chunks"] == 3
+    assert stats["error_files"] == 0
+    assert stats["skipped_files"] == 0
+    assert stats["errors"] == 3
+    assert stats["processed_files"] == 5
+    assert detector.total_benign_files == 4
+    assert detector.total_malicious_files == 1
+
+
+def test_train_map_reduce_counts_archive_members(detector, archive_samples):
+    paths, sample_count = archive_samples
+    stats = detector.train_map_reduce(paths, [], num_workers=1)
+
+    assert stats["processed_files"] == sample_count
+    assert stats["total_files"] == sample_count
+    assert stats["errors"] == 0
+    assert detector.total_benign_files == sample_count
+
+
+def test_train_map_reduce_matches_train_stats(tmp_path, archive_samples):
+    from malware_detector import MalwareDetector
+
+    paths, _ = archive_samples
+    stats = []
+    for name, train in (("train", lambda detector: detector.train(paths, [])),
+                        ("map_reduce", lambda detector: detector.train_map_reduce(paths, [], num_workers=1))):
+        detector = MalwareDetector(storage_dir=str(tmp_path / name), feature_cache=False)
+        try:
+            result = train(detector)
+        finally:
+            detector.shutdown_workers()
+        stats.append((result["total_files"], result["processed_files"], result["new_benign_files"]))
+    assert stats[0] == stats[1]